@@ -0,0 +1,264 @@
+"""
+Predictive Agent Autoscaler
+
+Models task arrival rate and service time per agent type (exponentially
+weighted moving averages) and sizes the agent pool so that queued tasks wait
+no longer than a target, using the M/M/c (Erlang C) queue wait estimate plus
+the backlog already queued. Scale-ups are applied in one step; scale-downs
+only after demand has stayed low for a hold period. Upcoming TDD phase
+transitions are turned into expected arrivals so agents can be pre-warmed.
+"""
+
+import math
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+
+# Import TDD models
+try:
+    from .tdd_models import TDDState
+except ImportError:
+    from tdd_models import TDDState
+
+
+# Agent type that performs the work of each TDD phase
+PHASE_AGENT_TYPES: Dict[TDDState, str] = {
+    TDDState.DESIGN: "DesignAgent",
+    TDDState.TEST_RED: "QAAgent",
+    TDDState.CODE_GREEN: "CodeAgent",
+    TDDState.REFACTOR: "CodeAgent",
+}
+
+
+def erlang_c_wait(servers: int, arrival_rate: float, service_time: float) -> float:
+    """
+    Mean time a task waits in an M/M/c queue.
+    
+    Returns infinity when the servers cannot keep up with the offered load.
+    """
+    if arrival_rate <= 0 or service_time <= 0:
+        return 0.0
+    
+    load = arrival_rate * service_time
+    if servers <= 0 or load >= servers:
+        return math.inf
+    
+    # Erlang B by recurrence, then Erlang C (probability of waiting)
+    blocking = 1.0
+    for k in range(1, servers + 1):
+        blocking = load * blocking / (k + load * blocking)
+    wait_probability = servers * blocking / (servers - load * (1 - blocking))
+    
+    return wait_probability * service_time / (servers - load)
+
+
+def servers_for_wait(arrival_rate: float, service_time: float, target_wait: float, limit: int = 10000) -> int:
+    """Smallest number of servers keeping the mean queue wait within target_wait"""
+    if arrival_rate <= 0 or service_time <= 0:
+        return 0
+    
+    servers = int(arrival_rate * service_time) + 1
+    while servers < limit and erlang_c_wait(servers, arrival_rate, service_time) > target_wait:
+        servers += 1
+    return servers
+
+
+@dataclass
+class WorkloadEstimate:
+    """Smoothed workload observations for one agent type"""
+    interarrival_time: Optional[float] = None  # seconds between arrivals (EWMA)
+    service_time: Optional[float] = None  # seconds per task (EWMA)
+    last_arrival: Optional[float] = None
+    arrivals: int = 0
+    completions: int = 0
+    low_demand_since: Optional[float] = None  # start of the current scale-down hold
+
+
+@dataclass
+class ScalingDecision:
+    """Recommended pool size for one agent type"""
+    agent_type: str
+    current_agents: int
+    target_agents: int
+    required_slots: int
+    arrival_rate: float
+    service_time: float
+    expected_wait: float
+    reason: str  # scale_up, scale_down, hold, steady
+
+
+class PredictiveAutoscaler:
+    """
+    Queueing-model autoscaler for the agent pool.
+    
+    The pool records arrivals and completions; recommend() then returns the
+    agent count for a type. The count covers both the steady-state load
+    (Erlang C servers for the target wait) and draining the current backlog,
+    including tasks expected from upcoming phase transitions, within the
+    target wait.
+    """
+    
+    def __init__(
+        self,
+        target_queue_wait: float = 30.0,
+        smoothing: float = 0.3,
+        scale_down_delay: float = 120.0,
+        default_service_time: float = 60.0,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the autoscaler.
+        
+        Args:
+            target_queue_wait: Seconds a queued task should wait at most
+            smoothing: Weight of the newest observation in the moving averages
+            scale_down_delay: Seconds demand must stay below the pool size
+                before agents are removed
+            default_service_time: Service time assumed before any completion
+            clock: Monotonic time source (replaceable for simulation)
+        """
+        self.target_queue_wait = target_queue_wait
+        self.smoothing = smoothing
+        self.scale_down_delay = scale_down_delay
+        self.default_service_time = default_service_time
+        self.clock = clock
+        self._estimates: Dict[str, WorkloadEstimate] = defaultdict(WorkloadEstimate)
+    
+    def record_arrival(self, agent_type: str) -> None:
+        """Record a task submitted for an agent type"""
+        now = self.clock()
+        estimate = self._estimates[agent_type]
+        if estimate.last_arrival is not None:
+            gap = now - estimate.last_arrival
+            estimate.interarrival_time = self._smooth(estimate.interarrival_time, gap)
+        estimate.last_arrival = now
+        estimate.arrivals += 1
+    
+    def record_completion(self, agent_type: str, service_time: float) -> None:
+        """Record how long a task of an agent type took"""
+        estimate = self._estimates[agent_type]
+        estimate.service_time = self._smooth(estimate.service_time, service_time)
+        estimate.completions += 1
+    
+    def arrival_rate(self, agent_type: str) -> float:
+        """Current arrival rate in tasks per second, decaying while no tasks arrive"""
+        estimate = self._estimates.get(agent_type)
+        if estimate is None or not estimate.interarrival_time:
+            return 0.0
+        
+        gap = max(estimate.interarrival_time, self.clock() - estimate.last_arrival)
+        return 1.0 / gap
+    
+    def service_time(self, agent_type: str) -> float:
+        """Smoothed service time, or the default before any task completed"""
+        estimate = self._estimates.get(agent_type)
+        if estimate is None or estimate.service_time is None:
+            return self.default_service_time
+        return estimate.service_time
+    
+    def recommend(
+        self,
+        agent_type: str,
+        current_agents: int,
+        slots_per_agent: int = 1,
+        busy_slots: int = 0,
+        queue_length: int = 0,
+        expected_arrivals: float = 0.0,
+        min_agents: int = 0,
+        max_agents: Optional[int] = None
+    ) -> ScalingDecision:
+        """
+        Recommend how many agents of a type the pool should run.
+        
+        Args:
+            agent_type: Agent type to size
+            current_agents: Agents of the type in the pool
+            slots_per_agent: Tasks one agent runs at a time
+            busy_slots: Tasks of the type currently running
+            queue_length: Tasks of the type waiting for an agent
+            expected_arrivals: Tasks expected shortly (e.g. phase transitions)
+            min_agents: Lower bound on the pool size
+            max_agents: Upper bound on the pool size
+        """
+        now = self.clock()
+        estimate = self._estimates[agent_type]
+        rate = self.arrival_rate(agent_type)
+        service = self.service_time(agent_type)
+        target_wait = self.target_queue_wait
+        
+        # A slot starts target_wait / service tasks within the target wait
+        tasks_per_slot = max(1.0, target_wait / service) if service > 0 else math.inf
+        backlog_slots = busy_slots + math.ceil((queue_length + expected_arrivals) / tasks_per_slot)
+        required_slots = max(servers_for_wait(rate, service, target_wait), backlog_slots)
+        
+        desired = math.ceil(required_slots / max(slots_per_agent, 1))
+        desired = max(desired, min_agents)
+        if max_agents is not None:
+            desired = min(desired, max_agents)
+        
+        if desired > current_agents:
+            target, reason = desired, "scale_up"
+            estimate.low_demand_since = None
+        elif desired < current_agents:
+            if estimate.low_demand_since is None:
+                estimate.low_demand_since = now
+            if now - estimate.low_demand_since >= self.scale_down_delay:
+                target, reason = desired, "scale_down"
+                estimate.low_demand_since = now  # A further scale-down needs another hold
+            else:
+                target, reason = current_agents, "hold"
+        else:
+            target, reason = current_agents, "steady"
+            estimate.low_demand_since = None
+        
+        return ScalingDecision(
+            agent_type=agent_type,
+            current_agents=current_agents,
+            target_agents=target,
+            required_slots=required_slots,
+            arrival_rate=rate,
+            service_time=service,
+            expected_wait=erlang_c_wait(target * max(slots_per_agent, 1), rate, service),
+            reason=reason
+        )
+    
+    def get_estimates(self) -> Dict[str, Dict[str, float]]:
+        """Get the workload model per agent type"""
+        return {
+            agent_type: {
+                "arrival_rate": self.arrival_rate(agent_type),
+                "service_time": self.service_time(agent_type),
+                "arrivals": estimate.arrivals,
+                "completions": estimate.completions
+            }
+            for agent_type, estimate in self._estimates.items()
+        }
+    
+    def _smooth(self, current: Optional[float], sample: float) -> float:
+        """Exponentially weighted moving average update"""
+        if current is None:
+            return sample
+        return self.smoothing * sample + (1 - self.smoothing) * current
+
+
+def forecast_phase_demand(state_machine, starting_cycles: Optional[Iterable[str]] = None) -> Dict[str, int]:
+    """
+    Count the tasks each agent type will receive from upcoming phase transitions.
+    
+    Every cycle tracked by the TDD state machine is expected to move to the
+    phase "/tdd next" leads to, which needs an agent of that phase's type.
+    Cycles that are just starting also need an agent for their current phase.
+    """
+    next_states = state_machine.TRANSITIONS.get("/tdd next", {})
+    starting = set(starting_cycles or ())
+    demand: Dict[str, int] = defaultdict(int)
+    for cycle_id, info in state_machine.parallel_states.items():
+        phases = [next_states.get(info.current_state)]
+        if cycle_id in starting:
+            phases.append(info.current_state)
+        for phase in phases:
+            agent_type = PHASE_AGENT_TYPES.get(phase)
+            if agent_type is not None:
+                demand[agent_type] += 1
+    return dict(demand)
@@ -6,20 +6,25 @@ between TDD phases. Provides memory retrieval based on relevance and recency.
 """
 
 import asyncio
+import heapq
 import json
 import logging
 import os
+import uuid
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Iterable, Tuple
 from dataclasses import asdict
 
 try:
     from .context.models import AgentMemory, Decision, PhaseHandoff, Pattern, ContextSnapshot
     from .context.interfaces import IAgentMemory
+    from .agent_memory_index import AgentMemoryIndex
 except ImportError:
     from context.models import AgentMemory, Decision, PhaseHandoff, Pattern, ContextSnapshot
     from context.interfaces import IAgentMemory
+    from agent_memory_index import AgentMemoryIndex
 
 # Import TDD models
 try:
@@ -36,14 +41,25 @@ class FileBasedAgentMemory(IAgentMemory):
     
     Stores agent memories in JSON files within the project's .orch-state directory,
     providing persistence and retrieval of agent decisions, patterns, and context.
+    An SQLite index alongside the files serves cross-story, time-bounded and
+    top-k queries without loading every memory file.
     """
     
-    def __init__(self, base_path: str = ".orch-state"):
+    def __init__(
+        self,
+        base_path: str = ".orch-state",
+        max_cache_entries: int = 100,
+        max_cache_bytes: int = 64 * 1024 * 1024,
+        enable_index: bool = True
+    ):
         """
         Initialize FileBasedAgentMemory.
         
         Args:
             base_path: Base directory for memory storage
+            max_cache_entries: Maximum number of memories kept in the cache
+            max_cache_bytes: Maximum serialized size of cached memories in bytes
+            enable_index: Whether to maintain the SQLite query index
         """
         self.base_path = Path(base_path)
         self.memory_dir = self.base_path / "agent_memory"
@@ -51,17 +67,34 @@ class FileBasedAgentMemory(IAgentMemory):
         # Create directories if they don't exist
         self.memory_dir.mkdir(parents=True, exist_ok=True)
         
-        # In-memory cache for frequently accessed memories with LRU eviction
-        self._memory_cache: Dict[str, tuple[AgentMemory, datetime]] = {}
+        # In-memory cache for frequently accessed memories with LRU eviction.
+        # Entries are kept in access order (least recently used first).
+        self._memory_cache: "OrderedDict[str, tuple[AgentMemory, datetime]]" = OrderedDict()
         self._cache_ttl = timedelta(minutes=30)
-        self._cache_access_times: Dict[str, datetime] = {}  # For LRU tracking
-        self._max_cache_entries = 100  # Limit cache size
+        self._cache_entry_sizes: Dict[str, int] = {}  # Serialized size per entry
+        self._cache_bytes = 0
+        self._max_cache_entries = max_cache_entries
+        self._max_cache_bytes = max_cache_bytes
         
         # Performance tracking
         self._get_calls = 0
         self._store_calls = 0
         self._cache_hits = 0
         self._cache_misses = 0
+        self._cache_evictions = 0
+        
+        # Per-memory locks serializing read-modify-write updates, since file
+        # I/O yields to the event loop between load and store
+        self._update_locks: Dict[str, asyncio.Lock] = {}
+        
+        # Secondary query index (files remain the source of truth)
+        self.index: Optional[AgentMemoryIndex] = None
+        self._index_ready = False
+        if enable_index:
+            try:
+                self.index = AgentMemoryIndex(str(self.base_path / "agent_memory_index.db"))
+            except Exception as e:
+                logger.warning(f"Agent memory index unavailable, falling back to file scans: {str(e)}")
         
         logger.info(f"AgentMemory initialized with storage at {self.memory_dir}")
     
@@ -88,14 +121,12 @@ class FileBasedAgentMemory(IAgentMemory):
             memory, timestamp = self._memory_cache[cache_key]
             if datetime.utcnow() - timestamp < self._cache_ttl:
                 self._cache_hits += 1
-                self._cache_access_times[cache_key] = datetime.utcnow()  # Update LRU
+                self._memory_cache.move_to_end(cache_key)  # Update LRU
                 logger.debug(f"Memory cache hit for {cache_key}")
                 return memory
             else:
                 # Remove expired entry
-                del self._memory_cache[cache_key]
-                if cache_key in self._cache_access_times:
-                    del self._cache_access_times[cache_key]
+                self._evict_cache_entry(cache_key)
         
         self._cache_misses += 1
         
@@ -107,13 +138,13 @@ class FileBasedAgentMemory(IAgentMemory):
             return None
         
         try:
-            with open(memory_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            # File I/O and JSON parsing run off the event loop
+            data, size = await asyncio.to_thread(self._read_memory_file, memory_file)
             
             memory = AgentMemory.from_dict(data)
             
             # Cache the loaded memory with LRU management
-            self._cache_memory_with_lru(cache_key, memory)
+            self._cache_memory_with_lru(cache_key, memory, size)
             
             logger.debug(f"Loaded memory for {agent_type}:{story_id} from {memory_file}")
             return memory
@@ -122,6 +153,28 @@ class FileBasedAgentMemory(IAgentMemory):
             logger.error(f"Failed to load memory from {memory_file}: {str(e)}")
             return None
     
+    async def get_memories(
+        self,
+        keys: Iterable[Tuple[str, str]]
+    ) -> Dict[Tuple[str, str], Optional[AgentMemory]]:
+        """
+        Retrieve several agent memories concurrently.
+        
+        Cache misses are loaded in parallel worker threads, which keeps
+        fan-out (e.g. many TDD cycles starting at once) off the event loop.
+        
+        Args:
+            keys: Iterable of (agent_type, story_id) pairs
+            
+        Returns:
+            Mapping of (agent_type, story_id) to memory (None if unavailable)
+        """
+        unique_keys = list(dict.fromkeys(keys))
+        results = await asyncio.gather(
+            *(self.get_memory(agent_type, story_id) for agent_type, story_id in unique_keys)
+        )
+        return dict(zip(unique_keys, results))
+    
     async def store_memory(self, memory: AgentMemory) -> None:
         """
         Store agent memory.
@@ -140,15 +193,15 @@ class FileBasedAgentMemory(IAgentMemory):
             # Update timestamp
             memory.updated_at = datetime.utcnow()
             
-            # Convert to dictionary and save
+            # Convert to dictionary and save off the event loop
             data = memory.to_dict()
-            
-            with open(memory_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            size = await asyncio.to_thread(self._write_memory_file, memory_file, data)
+            if self.index is not None:
+                await asyncio.to_thread(self._index_memory_data, memory.agent_type, memory.story_id, data)
             
             # Update cache with LRU management
             cache_key = f"{memory.agent_type}:{memory.story_id}"
-            self._cache_memory_with_lru(cache_key, memory)
+            self._cache_memory_with_lru(cache_key, memory, size)
             
             logger.debug(f"Stored memory for {memory.agent_type}:{memory.story_id} to {memory_file}")
             
@@ -170,24 +223,25 @@ class FileBasedAgentMemory(IAgentMemory):
             story_id: Story ID
             updates: Updates to apply
         """
-        memory = await self.get_memory(agent_type, story_id)
-        
-        if memory is None:
-            # Create new memory if it doesn't exist
-            memory = AgentMemory(
-                agent_type=agent_type,
-                story_id=story_id
-            )
-        
-        # Apply updates
-        for key, value in updates.items():
-            if hasattr(memory, key):
-                setattr(memory, key, value)
-            else:
-                # Store in metadata if attribute doesn't exist
-                memory.metadata[key] = value
-        
-        await self.store_memory(memory)
+        async with self._get_update_lock(agent_type, story_id):
+            memory = await self.get_memory(agent_type, story_id)
+            
+            if memory is None:
+                # Create new memory if it doesn't exist
+                memory = AgentMemory(
+                    agent_type=agent_type,
+                    story_id=story_id
+                )
+            
+            # Apply updates
+            for key, value in updates.items():
+                if hasattr(memory, key):
+                    setattr(memory, key, value)
+                else:
+                    # Store in metadata if attribute doesn't exist
+                    memory.metadata[key] = value
+            
+            await self.store_memory(memory)
         
         logger.debug(f"Updated memory for {agent_type}:{story_id} with {len(updates)} changes")
     
@@ -211,9 +265,8 @@ class FileBasedAgentMemory(IAgentMemory):
                 logger.info(f"Cleared memory for {agent_type}:{story_id}")
             
             # Remove from cache
-            cache_key = f"{agent_type}:{story_id}"
-            if cache_key in self._memory_cache:
-                del self._memory_cache[cache_key]
+            self._evict_cache_entry(f"{agent_type}:{story_id}")
+            self._remove_from_index(agent_type, story_id)
         else:
             # Clear all memories for agent
             agent_dir = self.memory_dir / agent_type
@@ -232,7 +285,8 @@ class FileBasedAgentMemory(IAgentMemory):
             # Clear from cache
             keys_to_remove = [key for key in self._memory_cache.keys() if key.startswith(f"{agent_type}:")]
             for key in keys_to_remove:
-                del self._memory_cache[key]
+                self._evict_cache_entry(key)
+            self._remove_from_index(agent_type)
     
     # Specialized methods for TDD workflow
     
@@ -243,13 +297,14 @@ class FileBasedAgentMemory(IAgentMemory):
         decision: Decision
     ) -> None:
         """Add a decision to agent memory"""
-        memory = await self.get_memory(agent_type, story_id)
-        
-        if memory is None:
-            memory = AgentMemory(agent_type=agent_type, story_id=story_id)
-        
-        memory.add_decision(decision)
-        await self.store_memory(memory)
+        async with self._get_update_lock(agent_type, story_id):
+            memory = await self.get_memory(agent_type, story_id)
+            
+            if memory is None:
+                memory = AgentMemory(agent_type=agent_type, story_id=story_id)
+            
+            memory.add_decision(decision)
+            await self.store_memory(memory)
         
         logger.debug(f"Added decision {decision.id} to {agent_type}:{story_id}")
     
@@ -260,13 +315,14 @@ class FileBasedAgentMemory(IAgentMemory):
         pattern: Pattern
     ) -> None:
         """Add a learned pattern to agent memory"""
-        memory = await self.get_memory(agent_type, story_id)
-        
-        if memory is None:
-            memory = AgentMemory(agent_type=agent_type, story_id=story_id)
-        
-        memory.add_pattern(pattern)
-        await self.store_memory(memory)
+        async with self._get_update_lock(agent_type, story_id):
+            memory = await self.get_memory(agent_type, story_id)
+            
+            if memory is None:
+                memory = AgentMemory(agent_type=agent_type, story_id=story_id)
+            
+            memory.add_pattern(pattern)
+            await self.store_memory(memory)
         
         logger.debug(f"Added pattern {pattern.id} to {agent_type}:{story_id}")
     
@@ -277,13 +333,14 @@ class FileBasedAgentMemory(IAgentMemory):
         handoff: PhaseHandoff
     ) -> None:
         """Add a phase handoff record to agent memory"""
-        memory = await self.get_memory(agent_type, story_id)
-        
-        if memory is None:
-            memory = AgentMemory(agent_type=agent_type, story_id=story_id)
-        
-        memory.add_phase_handoff(handoff)
-        await self.store_memory(memory)
+        async with self._get_update_lock(agent_type, story_id):
+            memory = await self.get_memory(agent_type, story_id)
+            
+            if memory is None:
+                memory = AgentMemory(agent_type=agent_type, story_id=story_id)
+            
+            memory.add_phase_handoff(handoff)
+            await self.store_memory(memory)
         
         logger.debug(f"Added phase handoff {handoff.id} to {agent_type}:{story_id}")
     
@@ -294,13 +351,14 @@ class FileBasedAgentMemory(IAgentMemory):
         snapshot: ContextSnapshot
     ) -> None:
         """Add a context snapshot to agent memory"""
-        memory = await self.get_memory(agent_type, story_id)
-        
-        if memory is None:
-            memory = AgentMemory(agent_type=agent_type, story_id=story_id)
-        
-        memory.add_context_snapshot(snapshot)
-        await self.store_memory(memory)
+        async with self._get_update_lock(agent_type, story_id):
+            memory = await self.get_memory(agent_type, story_id)
+            
+            if memory is None:
+                memory = AgentMemory(agent_type=agent_type, story_id=story_id)
+            
+            memory.add_context_snapshot(snapshot)
+            await self.store_memory(memory)
         
         logger.debug(f"Added context snapshot {snapshot.id} to {agent_type}:{story_id}")
     
@@ -419,57 +477,178 @@ class FileBasedAgentMemory(IAgentMemory):
         if memory is None:
             return {"analysis": "No memory available"}
         
-        analysis = {
-            "pattern_types": {},
-            "decision_confidence_avg": 0.0,
-            "successful_patterns": [],
-            "phase_transitions": {},
-            "common_artifacts": {},
-            "learning_progression": []
-        }
+        return self._analyze_memory(memory)
+    
+    # Indexed queries across stories
+    
+    async def query_decisions(
+        self,
+        agent_type: Optional[str] = None,
+        story_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        limit: int = 10
+    ) -> List[Decision]:
+        """
+        Get the most recent decisions across memories, newest first.
         
-        # Analyze pattern types
-        for pattern in memory.learned_patterns:
-            pattern_type = pattern.pattern_type
-            if pattern_type not in analysis["pattern_types"]:
-                analysis["pattern_types"][pattern_type] = {
-                    "count": 0,
-                    "avg_success_rate": 0.0,
-                    "total_usage": 0
-                }
+        Args:
+            agent_type: Optional agent type filter
+            story_id: Optional story ID filter
+            since: Only include decisions at or after this time
+            limit: Maximum number of decisions to return
             
-            analysis["pattern_types"][pattern_type]["count"] += 1
-            analysis["pattern_types"][pattern_type]["avg_success_rate"] += pattern.success_rate
-            analysis["pattern_types"][pattern_type]["total_usage"] += pattern.usage_count
+        Returns:
+            List of decisions
+        """
+        if await self._ensure_index():
+            return await asyncio.to_thread(
+                self.index.query_decisions, agent_type, story_id, since, limit
+            )
         
-        # Calculate averages
-        for pattern_type, data in analysis["pattern_types"].items():
-            if data["count"] > 0:
-                data["avg_success_rate"] /= data["count"]
+        decisions = [
+            d for memory in await self._load_memories_for_scan(agent_type, story_id)
+            for d in memory.decisions
+            if since is None or d.timestamp >= since
+        ]
+        return heapq.nlargest(limit, decisions, key=lambda d: d.timestamp)
+    
+    async def query_patterns(
+        self,
+        pattern_type: Optional[str] = None,
+        agent_type: Optional[str] = None,
+        story_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        min_success_rate: float = 0.0,
+        min_usage_count: int = 0,
+        exclude_story_id: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Pattern]:
+        """
+        Get learned patterns across memories, best performing first.
         
-        # Analyze decisions
-        if memory.decisions:
-            total_confidence = sum(d.confidence for d in memory.decisions)
-            analysis["decision_confidence_avg"] = total_confidence / len(memory.decisions)
+        Args:
+            pattern_type: Optional pattern type filter
+            agent_type: Optional agent type filter
+            story_id: Optional story ID filter
+            since: Only include patterns learned at or after this time
+            min_success_rate: Minimum success rate
+            min_usage_count: Minimum usage count
+            exclude_story_id: Story ID to leave out (for cross-story lookups)
+            limit: Maximum number of patterns to return
+            
+        Returns:
+            List of patterns
+        """
+        if await self._ensure_index():
+            return await asyncio.to_thread(
+                self.index.query_patterns, pattern_type, agent_type, story_id, since,
+                min_success_rate, min_usage_count, exclude_story_id, limit
+            )
         
-        # Analyze successful patterns
-        analysis["successful_patterns"] = [
-            {
-                "pattern_type": p.pattern_type,
-                "description": p.description,
-                "success_rate": p.success_rate,
-                "usage_count": p.usage_count
-            }
+        patterns = [
+            p for memory in await self._load_memories_for_scan(agent_type, story_id)
+            if exclude_story_id is None or memory.story_id != exclude_story_id
             for p in memory.learned_patterns
-            if p.success_rate > 0.8 and p.usage_count > 2
+            if (pattern_type is None or p.pattern_type == pattern_type)
+            and (since is None or p.timestamp >= since)
+            and p.success_rate >= min_success_rate
+            and p.usage_count >= min_usage_count
         ]
+        patterns.sort(key=lambda p: (p.success_rate, p.usage_count), reverse=True)
+        return patterns[:limit] if limit is not None else patterns
+    
+    async def query_phase_handoffs(
+        self,
+        agent_type: Optional[str] = None,
+        story_id: Optional[str] = None,
+        from_phase: Optional[TDDState] = None,
+        to_phase: Optional[TDDState] = None,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[PhaseHandoff]:
+        """
+        Get phase handoffs across memories, newest first.
         
-        # Analyze phase transitions
-        for handoff in memory.phase_handoffs:
-            transition = f"{handoff.from_phase.value if handoff.from_phase else 'none'} -> {handoff.to_phase.value if handoff.to_phase else 'none'}"
-            analysis["phase_transitions"][transition] = analysis["phase_transitions"].get(transition, 0) + 1
+        Args:
+            agent_type: Optional agent type filter
+            story_id: Optional story ID filter
+            from_phase: Optional source phase filter
+            to_phase: Optional target phase filter
+            since: Only include handoffs at or after this time
+            limit: Maximum number of handoffs to return
+            
+        Returns:
+            List of phase handoffs
+        """
+        if await self._ensure_index():
+            return await asyncio.to_thread(
+                self.index.query_phase_handoffs, agent_type, story_id,
+                from_phase.value if from_phase else None,
+                to_phase.value if to_phase else None,
+                since, limit
+            )
         
-        return analysis
+        handoffs = [
+            h for memory in await self._load_memories_for_scan(agent_type, story_id)
+            for h in memory.phase_handoffs
+            if (from_phase is None or h.from_phase == from_phase)
+            and (to_phase is None or h.to_phase == to_phase)
+            and (since is None or h.timestamp >= since)
+        ]
+        handoffs.sort(key=lambda h: h.timestamp, reverse=True)
+        return handoffs[:limit] if limit is not None else handoffs
+    
+    async def analyze_agent_patterns_across_stories(
+        self,
+        agent_type: str,
+        since: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Analyze patterns in agent behavior across all stories.
+        
+        Returns the same shape as analyze_agent_patterns, computed with
+        aggregate index queries instead of loading every memory.
+        
+        Args:
+            agent_type: Type of agent
+            since: Only include records at or after this time
+            
+        Returns:
+            Analysis of agent patterns
+        """
+        if not await self._ensure_index():
+            memories = await self._load_memories_for_scan(agent_type, None)
+            merged = AgentMemory(agent_type=agent_type, story_id="")
+            for memory in memories:
+                merged.decisions.extend(d for d in memory.decisions if since is None or d.timestamp >= since)
+                merged.learned_patterns.extend(p for p in memory.learned_patterns if since is None or p.timestamp >= since)
+                merged.phase_handoffs.extend(h for h in memory.phase_handoffs if since is None or h.timestamp >= since)
+            return self._analyze_memory(merged)
+        
+        pattern_types, confidence_avg, transitions, successful = await asyncio.gather(
+            asyncio.to_thread(self.index.get_pattern_type_stats, agent_type, None, since),
+            asyncio.to_thread(self.index.get_decision_confidence_avg, agent_type, None, since),
+            asyncio.to_thread(self.index.get_phase_transition_counts, agent_type, None, since),
+            asyncio.to_thread(self.index.query_patterns, None, agent_type, None, since, 0.8, 3)
+        )
+        
+        return {
+            "pattern_types": pattern_types,
+            "decision_confidence_avg": confidence_avg,
+            "successful_patterns": [
+                {
+                    "pattern_type": p.pattern_type,
+                    "description": p.description,
+                    "success_rate": p.success_rate,
+                    "usage_count": p.usage_count
+                }
+                for p in successful
+                if p.success_rate > 0.8
+            ],
+            "phase_transitions": transitions,
+            "common_artifacts": {},
+            "learning_progression": []
+        }
     
     async def cleanup_old_memories(self, older_than_days: int = 90) -> int:
         """Clean up old memory files"""
@@ -495,6 +674,14 @@ class FileBasedAgentMemory(IAgentMemory):
         
         # Clear cache of deleted entries
         self._memory_cache.clear()
+        self._cache_entry_sizes.clear()
+        self._cache_bytes = 0
+        
+        # Deleted files are identified by sanitized name only, so rebuild the
+        # index lazily on the next query
+        if deleted_count and self.index is not None:
+            self.index.clear()
+            self._index_ready = False
         
         logger.info(f"Cleaned up {deleted_count} old memory files")
         return deleted_count
@@ -513,6 +700,8 @@ class FileBasedAgentMemory(IAgentMemory):
             "cache_misses": self._cache_misses,
             "cache_hit_rate": cache_hit_rate,
             "cached_memories": len(self._memory_cache),
+            "cache_bytes": self._cache_bytes,
+            "cache_evictions": self._cache_evictions,
             "storage_path": str(self.memory_dir)
         }
     
@@ -549,22 +738,182 @@ class FileBasedAgentMemory(IAgentMemory):
             "last_activity": memory.updated_at.isoformat() if memory.updated_at else None
         }
     
-    def _cache_memory_with_lru(self, cache_key: str, memory: AgentMemory) -> None:
-        """Cache memory with LRU eviction policy"""
-        now = datetime.utcnow()
+    def _analyze_memory(self, memory: AgentMemory) -> Dict[str, Any]:
+        """Build pattern analysis for a single (possibly merged) memory"""
+        analysis = {
+            "pattern_types": {},
+            "decision_confidence_avg": 0.0,
+            "successful_patterns": [],
+            "phase_transitions": {},
+            "common_artifacts": {},
+            "learning_progression": []
+        }
+        
+        # Analyze pattern types
+        for pattern in memory.learned_patterns:
+            pattern_type = pattern.pattern_type
+            if pattern_type not in analysis["pattern_types"]:
+                analysis["pattern_types"][pattern_type] = {
+                    "count": 0,
+                    "avg_success_rate": 0.0,
+                    "total_usage": 0
+                }
+            
+            analysis["pattern_types"][pattern_type]["count"] += 1
+            analysis["pattern_types"][pattern_type]["avg_success_rate"] += pattern.success_rate
+            analysis["pattern_types"][pattern_type]["total_usage"] += pattern.usage_count
+        
+        # Calculate averages
+        for pattern_type, data in analysis["pattern_types"].items():
+            if data["count"] > 0:
+                data["avg_success_rate"] /= data["count"]
         
-        # Check if cache is full and needs eviction
-        if len(self._memory_cache) >= self._max_cache_entries:
-            # Find least recently used entry
-            if self._cache_access_times:
-                lru_key = min(self._cache_access_times.keys(), 
-                             key=lambda k: self._cache_access_times[k])
-                # Remove LRU entry
-                if lru_key in self._memory_cache:
-                    del self._memory_cache[lru_key]
-                del self._cache_access_times[lru_key]
-                logger.debug(f"Evicted LRU cache entry: {lru_key}")
-        
-        # Add new entry
-        self._memory_cache[cache_key] = (memory, now)
-        self._cache_access_times[cache_key] = now
\ No newline at end of file
+        # Analyze decisions
+        if memory.decisions:
+            total_confidence = sum(d.confidence for d in memory.decisions)
+            analysis["decision_confidence_avg"] = total_confidence / len(memory.decisions)
+        
+        # Analyze successful patterns
+        analysis["successful_patterns"] = [
+            {
+                "pattern_type": p.pattern_type,
+                "description": p.description,
+                "success_rate": p.success_rate,
+                "usage_count": p.usage_count
+            }
+            for p in memory.learned_patterns
+            if p.success_rate > 0.8 and p.usage_count > 2
+        ]
+        
+        # Analyze phase transitions
+        for handoff in memory.phase_handoffs:
+            transition = f"{handoff.from_phase.value if handoff.from_phase else 'none'} -> {handoff.to_phase.value if handoff.to_phase else 'none'}"
+            analysis["phase_transitions"][transition] = analysis["phase_transitions"].get(transition, 0) + 1
+        
+        return analysis
+    
+    def _read_memory_file(self, memory_file: Path) -> Tuple[Dict[str, Any], int]:
+        """Read and parse a memory file (runs in a worker thread)"""
+        with open(memory_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data, memory_file.stat().st_size
+    
+    def _write_memory_file(self, memory_file: Path, data: Dict[str, Any]) -> int:
+        """Atomically write a memory file (runs in a worker thread)"""
+        temp_file = memory_file.with_name(f".{memory_file.name}.{uuid.uuid4().hex}.tmp")
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(temp_file, memory_file)
+        finally:
+            if temp_file.exists():
+                temp_file.unlink()
+        return memory_file.stat().st_size
+    
+    def _index_memory_data(self, agent_type: str, story_id: str, data: Dict[str, Any]) -> None:
+        """Update the query index for one memory (runs in a worker thread)"""
+        try:
+            self.index.index_memory(agent_type, story_id, data)
+        except Exception as e:
+            # The index is rebuilt from files, so a failed update only costs freshness
+            logger.warning(f"Failed to index memory {agent_type}:{story_id}: {str(e)}")
+            self._index_ready = False
+            try:
+                self.index.clear()
+            except Exception:
+                pass
+    
+    def _remove_from_index(self, agent_type: str, story_id: Optional[str] = None) -> None:
+        """Remove a memory (or all memories of an agent) from the query index"""
+        if self.index is None:
+            return
+        try:
+            self.index.remove_memory(agent_type, story_id)
+        except Exception as e:
+            logger.warning(f"Failed to remove {agent_type}:{story_id} from index: {str(e)}")
+    
+    async def _ensure_index(self) -> bool:
+        """Make sure the query index is populated; returns False if unavailable"""
+        if self.index is None:
+            return False
+        if not self._index_ready:
+            try:
+                await asyncio.to_thread(self._build_index_from_files)
+                self._index_ready = True
+            except Exception as e:
+                logger.warning(f"Failed to build agent memory index: {str(e)}")
+                return False
+        return True
+    
+    def _build_index_from_files(self) -> None:
+        """Populate the index from memory files if it is missing or outdated"""
+        if self.index.is_built():
+            return
+        
+        indexed = 0
+        for memory_file in self.memory_dir.glob("*/*.json"):
+            try:
+                with open(memory_file, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                self.index.index_memory(data["agent_type"], data["story_id"], data)
+                indexed += 1
+            except Exception as e:
+                logger.warning(f"Skipping unindexable memory file {memory_file}: {str(e)}")
+        
+        self.index.mark_built()
+        logger.info(f"Built agent memory index from {indexed} memory files")
+    
+    async def _load_memories_for_scan(
+        self,
+        agent_type: Optional[str],
+        story_id: Optional[str]
+    ) -> List[AgentMemory]:
+        """Load memories from files for queries when the index is unavailable"""
+        if agent_type is not None and story_id is not None:
+            memory = await self.get_memory(agent_type, story_id)
+            return [memory] if memory else []
+        
+        pattern = f"{agent_type}/*.json" if agent_type is not None else "*/*.json"
+        keys = [(path.parent.name, path.stem) for path in self.memory_dir.glob(pattern)]
+        memories = await self.get_memories(keys)
+        return [
+            m for m in memories.values()
+            if m is not None and (story_id is None or m.story_id == story_id)
+        ]
+    
+    def _get_update_lock(self, agent_type: str, story_id: str) -> asyncio.Lock:
+        """Get the lock guarding read-modify-write updates of one memory"""
+        cache_key = f"{agent_type}:{story_id}"
+        lock = self._update_locks.get(cache_key)
+        if lock is None:
+            lock = self._update_locks[cache_key] = asyncio.Lock()
+        return lock
+    
+    def _evict_cache_entry(self, cache_key: str) -> None:
+        """Remove a single entry from the cache and release its byte budget"""
+        self._memory_cache.pop(cache_key, None)
+        self._cache_bytes -= self._cache_entry_sizes.pop(cache_key, 0)
+    
+    def _cache_memory_with_lru(self, cache_key: str, memory: AgentMemory, size: int = 0) -> None:
+        """Cache memory with O(1) LRU eviction bounded by entry count and bytes"""
+        # Replace any existing entry so its size is not double counted
+        self._evict_cache_entry(cache_key)
+        
+        if self._max_cache_bytes and size > self._max_cache_bytes:
+            logger.debug(f"Memory {cache_key} exceeds cache byte limit, not caching")
+            return
+        
+        # Evict least recently used entries until the new one fits
+        while self._memory_cache and (
+            len(self._memory_cache) >= self._max_cache_entries
+            or (self._max_cache_bytes and self._cache_bytes + size > self._max_cache_bytes)
+        ):
+            lru_key = next(iter(self._memory_cache))
+            self._evict_cache_entry(lru_key)
+            self._cache_evictions += 1
+            logger.debug(f"Evicted LRU cache entry: {lru_key}")
+        
+        # Add new entry as most recently used
+        self._memory_cache[cache_key] = (memory, datetime.utcnow())
+        self._cache_entry_sizes[cache_key] = size
+        self._cache_bytes += size
@@ -0,0 +1,427 @@
+"""
+Agent Memory Index - SQLite query layer over agent memory files
+
+Maintains a secondary SQLite index next to the JSON memory files written by
+FileBasedAgentMemory so that decisions, patterns and phase handoffs can be
+queried across stories without loading every memory file. Provides:
+- Time-bounded, top-k decision queries indexed on (agent_type, story_id, timestamp)
+- Pattern lookups indexed on pattern_type and success rate
+- Phase transition aggregation indexed on (from_phase, to_phase)
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+
+try:
+    from .context.models import Decision, Pattern, PhaseHandoff
+except ImportError:
+    from context.models import Decision, Pattern, PhaseHandoff
+
+logger = logging.getLogger(__name__)
+
+INDEX_SCHEMA_VERSION = "1"
+
+
+class AgentMemoryIndex:
+    """
+    SQLite-backed secondary index for agent memories.
+
+    The JSON memory files remain the source of truth; the index stores one
+    row per decision, pattern and handoff so that queries run against B-tree
+    indexes instead of materializing whole memories. All methods are
+    synchronous and thread-safe so they can be called via asyncio.to_thread.
+    """
+
+    def __init__(self, db_path: str):
+        """
+        Initialize AgentMemoryIndex.
+
+        Args:
+            db_path: Path to the SQLite index database
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._init_database()
+
+    def _init_database(self) -> None:
+        """Initialize SQLite tables and indexes"""
+        try:
+            self.db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self.db.execute('''
+                CREATE TABLE IF NOT EXISTS memories (
+                    agent_type TEXT,
+                    story_id TEXT,
+                    updated_at TEXT,
+                    PRIMARY KEY (agent_type, story_id)
+                )
+            ''')
+
+            self.db.execute('''
+                CREATE TABLE IF NOT EXISTS decisions (
+                    id TEXT,
+                    agent_type TEXT,
+                    story_id TEXT,
+                    timestamp TEXT,
+                    confidence REAL,
+                    data TEXT
+                )
+            ''')
+
+            self.db.execute('''
+                CREATE TABLE IF NOT EXISTS patterns (
+                    id TEXT,
+                    agent_type TEXT,
+                    story_id TEXT,
+                    pattern_type TEXT,
+                    success_rate REAL,
+                    usage_count INTEGER,
+                    timestamp TEXT,
+                    data TEXT
+                )
+            ''')
+
+            self.db.execute('''
+                CREATE TABLE IF NOT EXISTS handoffs (
+                    id TEXT,
+                    agent_type TEXT,
+                    story_id TEXT,
+                    from_phase TEXT,
+                    to_phase TEXT,
+                    timestamp TEXT,
+                    data TEXT
+                )
+            ''')
+
+            self.db.execute('''
+                CREATE TABLE IF NOT EXISTS index_metadata (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            ''')
+
+            # Create indices for the supported query shapes
+            self.db.execute('CREATE INDEX IF NOT EXISTS idx_decisions_agent_story_time ON decisions(agent_type, story_id, timestamp)')
+            self.db.execute('CREATE INDEX IF NOT EXISTS idx_decisions_agent_time ON decisions(agent_type, timestamp)')
+            self.db.execute('CREATE INDEX IF NOT EXISTS idx_patterns_type ON patterns(pattern_type, success_rate)')
+            self.db.execute('CREATE INDEX IF NOT EXISTS idx_patterns_agent_story ON patterns(agent_type, story_id)')
+            self.db.execute('CREATE INDEX IF NOT EXISTS idx_handoffs_transition ON handoffs(from_phase, to_phase)')
+            self.db.execute('CREATE INDEX IF NOT EXISTS idx_handoffs_agent_story_time ON handoffs(agent_type, story_id, timestamp)')
+
+            self.db.commit()
+
+        except Exception as e:
+            logger.error(f"Error initializing agent memory index: {str(e)}")
+            raise
+
+    # Maintenance
+
+    def is_built(self) -> bool:
+        """Check whether the index has been populated for the current schema"""
+        with self._lock:
+            row = self.db.execute(
+                'SELECT value FROM index_metadata WHERE key = ?', ('schema_version',)
+            ).fetchone()
+        return row is not None and row[0] == INDEX_SCHEMA_VERSION
+
+    def mark_built(self) -> None:
+        """Record that the index has been fully populated"""
+        with self._lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO index_metadata (key, value) VALUES (?, ?)',
+                ('schema_version', INDEX_SCHEMA_VERSION)
+            )
+            self.db.commit()
+
+    def index_memory(self, agent_type: str, story_id: str, data: Dict[str, Any]) -> None:
+        """
+        Replace the indexed rows of one memory.
+
+        Args:
+            agent_type: Type of agent
+            story_id: Story ID
+            data: Serialized memory as produced by AgentMemory.to_dict()
+        """
+        decision_rows = [
+            (d.get("id"), agent_type, story_id, d.get("timestamp"),
+             d.get("confidence", 0.0), json.dumps(d, ensure_ascii=False))
+            for d in data.get("decisions", [])
+        ]
+        pattern_rows = [
+            (p.get("id"), agent_type, story_id, p.get("pattern_type"),
+             p.get("success_rate", 0.0), p.get("usage_count", 0), p.get("timestamp"),
+             json.dumps(p, ensure_ascii=False))
+            for p in data.get("learned_patterns", [])
+        ]
+        handoff_rows = [
+            (h.get("id"), agent_type, story_id, h.get("from_phase"), h.get("to_phase"),
+             h.get("timestamp"), json.dumps(h, ensure_ascii=False))
+            for h in data.get("phase_handoffs", [])
+        ]
+
+        with self._lock:
+            try:
+                self._delete_rows(agent_type, story_id)
+                self.db.execute(
+                    'INSERT INTO memories (agent_type, story_id, updated_at) VALUES (?, ?, ?)',
+                    (agent_type, story_id, data.get("updated_at"))
+                )
+                self.db.executemany('INSERT INTO decisions VALUES (?, ?, ?, ?, ?, ?)', decision_rows)
+                self.db.executemany('INSERT INTO patterns VALUES (?, ?, ?, ?, ?, ?, ?, ?)', pattern_rows)
+                self.db.executemany('INSERT INTO handoffs VALUES (?, ?, ?, ?, ?, ?, ?)', handoff_rows)
+                self.db.commit()
+            except Exception:
+                self.db.rollback()
+                raise
+
+    def remove_memory(self, agent_type: str, story_id: Optional[str] = None) -> None:
+        """
+        Remove indexed rows for one memory, or all memories of an agent.
+
+        Args:
+            agent_type: Type of agent
+            story_id: Story ID (if None, removes all for agent)
+        """
+        with self._lock:
+            self._delete_rows(agent_type, story_id)
+            self.db.commit()
+
+    def clear(self) -> None:
+        """Remove all indexed data"""
+        with self._lock:
+            for table in ("memories", "decisions", "patterns", "handoffs", "index_metadata"):
+                self.db.execute(f'DELETE FROM {table}')
+            self.db.commit()
+
+    def close(self) -> None:
+        """Close the database connection"""
+        with self._lock:
+            self.db.close()
+
+    # Queries
+
+    def query_decisions(
+        self,
+        agent_type: Optional[str] = None,
+        story_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        limit: int = 10
+    ) -> List[Decision]:
+        """
+        Get the most recent decisions, newest first.
+
+        Args:
+            agent_type: Optional agent type filter
+            story_id: Optional story ID filter
+            since: Only include decisions at or after this time
+            limit: Maximum number of decisions to return
+
+        Returns:
+            List of decisions
+        """
+        where, params = self._build_filters(agent_type, story_id, since)
+        rows = self._fetch(
+            f'SELECT data FROM decisions {where} ORDER BY timestamp DESC LIMIT ?',
+            params + [limit]
+        )
+        return [Decision.from_dict(json.loads(row[0])) for row in rows]
+
+    def query_patterns(
+        self,
+        pattern_type: Optional[str] = None,
+        agent_type: Optional[str] = None,
+        story_id: Optional[str] = None,
+        since: Optional[datetime] = None,
+        min_success_rate: float = 0.0,
+        min_usage_count: int = 0,
+        exclude_story_id: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Pattern]:
+        """
+        Get patterns ordered by success rate and usage.
+
+        Args:
+            pattern_type: Optional pattern type filter
+            agent_type: Optional agent type filter
+            story_id: Optional story ID filter
+            since: Only include patterns learned at or after this time
+            min_success_rate: Minimum success rate
+            min_usage_count: Minimum usage count
+            exclude_story_id: Story ID to leave out (for cross-story lookups)
+            limit: Maximum number of patterns to return
+
+        Returns:
+            List of patterns
+        """
+        where, params = self._build_filters(agent_type, story_id, since)
+        clauses = [where[len("WHERE "):]] if where else []
+        if pattern_type is not None:
+            clauses.append('pattern_type = ?')
+            params.append(pattern_type)
+        if min_success_rate > 0.0:
+            clauses.append('success_rate >= ?')
+            params.append(min_success_rate)
+        if min_usage_count > 0:
+            clauses.append('usage_count >= ?')
+            params.append(min_usage_count)
+        if exclude_story_id is not None:
+            clauses.append('story_id != ?')
+            params.append(exclude_story_id)
+
+        sql = 'SELECT data FROM patterns'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY success_rate DESC, usage_count DESC'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        return [Pattern.from_dict(json.loads(row[0])) for row in self._fetch(sql, params)]
+
+    def query_phase_handoffs(
+        self,
+        agent_type: Optional[str] = None,
+        story_id: Optional[str] = None,
+        from_phase: Optional[str] = None,
+        to_phase: Optional[str] = None,
+        since: Optional[datetime] = None,
+        limit: Optional[int] = None
+    ) -> List[PhaseHandoff]:
+        """
+        Get phase handoffs, newest first.
+
+        Args:
+            agent_type: Optional agent type filter
+            story_id: Optional story ID filter
+            from_phase: Optional source phase value filter
+            to_phase: Optional target phase value filter
+            since: Only include handoffs at or after this time
+            limit: Maximum number of handoffs to return
+
+        Returns:
+            List of phase handoffs
+        """
+        where, params = self._build_filters(agent_type, story_id, since)
+        clauses = [where[len("WHERE "):]] if where else []
+        if from_phase is not None:
+            clauses.append('from_phase = ?')
+            params.append(from_phase)
+        if to_phase is not None:
+            clauses.append('to_phase = ?')
+            params.append(to_phase)
+
+        sql = 'SELECT data FROM handoffs'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY timestamp DESC'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+
+        return [PhaseHandoff.from_dict(json.loads(row[0])) for row in self._fetch(sql, params)]
+
+    def get_pattern_type_stats(
+        self,
+        agent_type: Optional[str] = None,
+        story_id: Optional[str] = None,
+        since: Optional[datetime] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Aggregate count, average success rate and total usage per pattern type"""
+        where, params = self._build_filters(agent_type, story_id, since)
+        rows = self._fetch(
+            f'SELECT pattern_type, COUNT(*), AVG(success_rate), SUM(usage_count) '
+            f'FROM patterns {where} GROUP BY pattern_type',
+            params
+        )
+        return {
+            pattern_type: {
+                "count": count,
+                "avg_success_rate": avg_success or 0.0,
+                "total_usage": total_usage or 0
+            }
+            for pattern_type, count, avg_success, total_usage in rows
+        }
+
+    def get_phase_transition_counts(
+        self,
+        agent_type: Optional[str] = None,
+        story_id: Optional[str] = None,
+        since: Optional[datetime] = None
+    ) -> Dict[str, int]:
+        """Count phase transitions, keyed as 'from -> to'"""
+        where, params = self._build_filters(agent_type, story_id, since)
+        rows = self._fetch(
+            f'SELECT from_phase, to_phase, COUNT(*) FROM handoffs {where} '
+            f'GROUP BY from_phase, to_phase',
+            params
+        )
+        return {
+            f"{from_phase or 'none'} -> {to_phase or 'none'}": count
+            for from_phase, to_phase, count in rows
+        }
+
+    def get_decision_confidence_avg(
+        self,
+        agent_type: Optional[str] = None,
+        story_id: Optional[str] = None,
+        since: Optional[datetime] = None
+    ) -> float:
+        """Average decision confidence"""
+        where, params = self._build_filters(agent_type, story_id, since)
+        rows = self._fetch(f'SELECT AVG(confidence) FROM decisions {where}', params)
+        return (rows[0][0] if rows else None) or 0.0
+
+    def get_indexed_memories(self, agent_type: Optional[str] = None) -> List[Tuple[str, str]]:
+        """List (agent_type, story_id) pairs present in the index"""
+        if agent_type is None:
+            rows = self._fetch('SELECT agent_type, story_id FROM memories', [])
+        else:
+            rows = self._fetch(
+                'SELECT agent_type, story_id FROM memories WHERE agent_type = ?', [agent_type]
+            )
+        return [(row[0], row[1]) for row in rows]
+
+    # Private helper methods
+
+    def _delete_rows(self, agent_type: str, story_id: Optional[str]) -> None:
+        """Delete rows for a memory (caller holds the lock)"""
+        for table in ("memories", "decisions", "patterns", "handoffs"):
+            if story_id is None:
+                self.db.execute(f'DELETE FROM {table} WHERE agent_type = ?', (agent_type,))
+            else:
+                self.db.execute(
+                    f'DELETE FROM {table} WHERE agent_type = ? AND story_id = ?',
+                    (agent_type, story_id)
+                )
+
+    def _build_filters(
+        self,
+        agent_type: Optional[str],
+        story_id: Optional[str],
+        since: Optional[datetime]
+    ) -> Tuple[str, List[Any]]:
+        """Build the common WHERE clause for agent/story/time filters"""
+        clauses = []
+        params: List[Any] = []
+        if agent_type is not None:
+            clauses.append('agent_type = ?')
+            params.append(agent_type)
+        if story_id is not None:
+            clauses.append('story_id = ?')
+            params.append(story_id)
+        if since is not None:
+            # ISO-8601 timestamps sort lexicographically
+            clauses.append('timestamp >= ?')
+            params.append(since.isoformat())
+        where = 'WHERE ' + ' AND '.join(clauses) if clauses else ''
+        return where, params
+
+    def _fetch(self, sql: str, params: List[Any]) -> List[Tuple]:
+        """Execute a read query under the connection lock"""
+        with self._lock:
+            return self.db.execute(sql, params).fetchall()
@@ -6,7 +6,10 @@ Manages a pool of agents across multiple concurrent TDD cycles with intelligent
 """
 
 import asyncio
+import heapq
+import itertools
 import logging
+import math
 import time
 import uuid
 from typing import Dict, List, Optional, Any, Set, Union, Callable
@@ -22,11 +25,13 @@ try:
     from .tdd_models import TDDState, TDDCycle, TDDTask
     from .tdd_state_machine import TDDStateMachine
     from .context_manager import ContextManager
+    from .agent_autoscaler import PredictiveAutoscaler, ScalingDecision, forecast_phase_demand
 except ImportError:
     from agents import BaseAgent, Task, TaskStatus, AgentResult, create_agent, get_available_agents
     from tdd_models import TDDState, TDDCycle, TDDTask
     from tdd_state_machine import TDDStateMachine
     from context_manager import ContextManager
+    from agent_autoscaler import PredictiveAutoscaler, ScalingDecision, forecast_phase_demand
 
 logger = logging.getLogger(__name__)
 
@@ -152,6 +157,11 @@ class PoolConfiguration:
     recovery_delay_seconds: int = 60
     health_check_interval: float = 30.0
     cleanup_interval_minutes: int = 60
+    decision_log_size: int = 1000  # Load balancing decisions kept for inspection
+    priority_aging_seconds: float = 30.0  # Waiting this long raises a queued task one priority level
+    queue_wait_window: int = 1000  # Queue wait samples kept per priority
+    target_queue_wait_seconds: float = 30.0  # Predictive scaling keeps queue waits within this
+    scale_down_delay_seconds: float = 120.0  # Demand must stay low this long before agents are removed
 
 
 @dataclass
@@ -170,6 +180,166 @@ class PoolStatistics:
     recovery_events: int = 0
     agent_creation_time: float = 0.0
     load_balancing_decisions: int = 0
+    deadline_misses: int = 0
+
+
+@dataclass(order=True)
+class QueuedTask:
+    """A pending task in a ready queue, ordered by sort_key then arrival"""
+    sort_key: float
+    sequence: int
+    task: Task = field(compare=False)
+    priority: int = field(compare=False)
+    cycle_id: Optional[str] = field(compare=False)
+    enqueued_at: float = field(compare=False)  # time.monotonic()
+    deadline: Optional[float] = field(default=None, compare=False)  # time.monotonic()
+    removed: bool = field(default=False, compare=False)
+
+
+class ReadyQueues:
+    """
+    Priority ready queues of pending tasks, one heap per agent type.
+    
+    A task's sort key is its arrival time plus (priority - 1) aging intervals,
+    so a waiting task overtakes each newer task one priority level more
+    urgent for every interval it has waited, and no priority starves. A
+    deadline caps the key at the task's latest start time. Cancelled tasks
+    are removed lazily. Behaves like a single task queue (len, iteration,
+    append, remove) for callers that do not care about agent types.
+    """
+    
+    def __init__(self, aging_seconds: float = 30.0):
+        self.aging_seconds = aging_seconds
+        self._heaps: Dict[str, List[QueuedTask]] = {}  # agent_type -> heap
+        self._entries: Dict[str, QueuedTask] = {}  # task_id -> live entry
+        self._counts: Dict[str, int] = defaultdict(int)  # agent_type -> live entries
+        self._cycle_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._sequence = itertools.count()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+    
+    def __iter__(self):
+        for entry in sorted(self._entries.values()):
+            yield entry.task
+    
+    def append(self, task: Task, deadline: Optional[float] = None, lead_seconds: float = 0.0) -> QueuedTask:
+        """
+        Queue a task using the priority and cycle in its context.
+        
+        Args:
+            task: Task to queue
+            deadline: time.monotonic() by which the task should finish
+            lead_seconds: Expected run time, subtracted from the deadline to
+                get the latest start time
+        """
+        now = time.monotonic()
+        priority = int(task.context.get("priority", 5))
+        sort_key = now + (priority - 1) * self.aging_seconds
+        if deadline is not None:
+            sort_key = min(sort_key, deadline - lead_seconds)
+        
+        entry = QueuedTask(
+            sort_key, next(self._sequence), task, priority,
+            task.context.get("cycle_id"), now, deadline
+        )
+        self.requeue(entry)
+        return entry
+    
+    def requeue(self, entry: QueuedTask) -> None:
+        """Put a popped entry back, keeping its place in the order"""
+        entry.removed = False
+        heapq.heappush(self._heaps.setdefault(entry.task.agent_type, []), entry)
+        self._track(entry, 1)
+    
+    def pop(
+        self,
+        agent_type: str,
+        eligible: Optional[Callable[[QueuedTask], bool]] = None
+    ) -> Optional[QueuedTask]:
+        """
+        Take the most urgent task queued for an agent type.
+        
+        If eligible is given, the most urgent entry it accepts is taken. If it
+        accepts none, the most urgent entry is taken anyway so that agents
+        are never left idle while tasks wait.
+        """
+        heap = self._heaps.get(agent_type)
+        skipped: List[QueuedTask] = []
+        chosen = None
+        while heap:
+            entry = heapq.heappop(heap)
+            if entry.removed:
+                continue
+            if eligible is None or eligible(entry):
+                chosen = entry
+                break
+            skipped.append(entry)
+        
+        if chosen is None and skipped:
+            chosen = skipped.pop(0)
+        for entry in skipped:
+            heapq.heappush(heap, entry)
+        
+        if heap is not None and not heap:
+            del self._heaps[agent_type]
+        if chosen is not None:
+            self._track(chosen, -1)
+        return chosen
+    
+    def remove(self, task: Task) -> None:
+        """Remove a queued task, raising ValueError if it is not queued"""
+        entry = self._entries.get(task.id)
+        if entry is None:
+            raise ValueError("task not queued")
+        
+        entry.removed = True
+        self._track(entry, -1)
+    
+    def queued_for(self, agent_type: str) -> int:
+        """Number of tasks waiting for an agent type"""
+        return self._counts.get(agent_type, 0)
+    
+    def waiting_types(self) -> List[str]:
+        """Agent types with queued tasks"""
+        return [agent_type for agent_type, count in self._counts.items() if count]
+    
+    def waiting_cycles(self, agent_type: str) -> List[str]:
+        """Cycles with tasks waiting for an agent type"""
+        return list(self._cycle_counts.get(agent_type, {}))
+    
+    def queued_by_priority(self) -> Dict[int, int]:
+        """Number of queued tasks per priority"""
+        counts: Dict[int, int] = defaultdict(int)
+        for entry in self._entries.values():
+            counts[entry.priority] += 1
+        return dict(counts)
+    
+    def clear(self) -> None:
+        self._heaps.clear()
+        self._entries.clear()
+        self._counts.clear()
+        self._cycle_counts.clear()
+    
+    def _track(self, entry: QueuedTask, delta: int) -> None:
+        """Update the live entry bookkeeping when an entry is queued or leaves"""
+        agent_type = entry.task.agent_type
+        if delta > 0:
+            self._entries[entry.task.id] = entry
+        else:
+            self._entries.pop(entry.task.id, None)
+        
+        self._counts[agent_type] += delta
+        if not self._counts[agent_type]:
+            del self._counts[agent_type]
+        
+        if entry.cycle_id is not None:
+            cycles = self._cycle_counts[agent_type]
+            cycles[entry.cycle_id] += delta
+            if not cycles[entry.cycle_id]:
+                del cycles[entry.cycle_id]
+            if not cycles:
+                del self._cycle_counts[agent_type]
 
 
 class AgentPool:
@@ -213,12 +383,31 @@ class AgentPool:
         # Agent pool state
         self.agents: Dict[str, PooledAgent] = {}  # agent_id -> PooledAgent
         self.agent_types: Dict[str, List[str]] = defaultdict(list)  # type -> [agent_ids]
-        self.task_queue: deque = deque()  # Task queue for load balancing
+        self.task_queue = ReadyQueues(self.config.priority_aging_seconds)  # Pending tasks per agent type
         self.active_tasks: Dict[str, Task] = {}  # task_id -> Task
         
+        # Available agents per type, kept in step with agent state changes
+        # (insertion ordered, so round-robin sees a stable order)
+        self._idle_agents: Dict[str, Dict[str, None]] = defaultdict(dict)
+        
+        # Running tasks per agent type and cycle, for fair sharing between cycles
+        self._running_by_cycle: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        
+        # Callbacks invoked with (agent_type, task, execution_time, success) per finished task
+        self._completion_listeners: List[Callable[[str, Task, float, bool], None]] = []
+        
+        # Time tasks spent queued, per priority
+        self._queue_wait_times: Dict[int, deque] = defaultdict(
+            lambda: deque(maxlen=self.config.queue_wait_window)
+        )
+        
         # Load balancing state
         self._round_robin_counters: Dict[str, int] = defaultdict(int)
-        self._load_balancing_history: List[Dict[str, Any]] = []
+        self._load_balancing_history: deque = deque(maxlen=self.config.decision_log_size)
+        
+        # Dispatcher, woken whenever agent capacity frees up or tasks are queued
+        self._dispatcher_task: Optional[asyncio.Task] = None
+        self._dispatch_event = asyncio.Event()
         
         # Health monitoring
         self._health_check_task: Optional[asyncio.Task] = None
@@ -232,7 +421,11 @@ class AgentPool:
         
         # Predictive scaling
         self._workload_patterns: Dict[str, List[float]] = defaultdict(list)
-        self._scaling_predictions: Dict[str, float] = {}
+        self._scaling_predictions: Dict[str, float] = {}  # Tasks expected from upcoming phases
+        self.autoscaler = PredictiveAutoscaler(
+            target_queue_wait=self.config.target_queue_wait_seconds,
+            scale_down_delay=self.config.scale_down_delay_seconds
+        )
         
         logger.info(
             f"AgentPool initialized with strategy={strategy.value}, "
@@ -251,6 +444,9 @@ class AgentPool:
         # Initialize minimum agents
         await self._initialize_minimum_agents()
         
+        # Start dispatching queued tasks
+        self._dispatcher_task = asyncio.create_task(self._dispatcher_loop())
+        
         # Start health monitoring
         if self.enable_health_monitoring:
             self._health_check_task = asyncio.create_task(self._health_monitoring_loop())
@@ -269,6 +465,14 @@ class AgentPool:
         self._running = False
         
         # Cancel background tasks
+        if self._dispatcher_task:
+            self._dispatcher_task.cancel()
+            try:
+                await self._dispatcher_task
+            except asyncio.CancelledError:
+                pass
+            self._dispatcher_task = None
+        
         if self._health_check_task:
             self._health_check_task.cancel()
             try:
@@ -295,11 +499,16 @@ class AgentPool:
         context: Dict[str, Any],
         priority: int = 5,
         cycle_id: Optional[str] = None,
-        max_retries: int = 3
+        max_retries: int = 3,
+        deadline: Optional[datetime] = None
     ) -> str:
         """
         Submit a task to the agent pool.
         
+        Queued tasks are dispatched by priority, with waiting tasks aged so
+        that low priorities do not starve, and cycles with many running tasks
+        yield to other cycles waiting for the same agent type.
+        
         Args:
             agent_type: Type of agent required
             command: Command to execute
@@ -307,6 +516,7 @@ class AgentPool:
             priority: Task priority (1-10, lower is higher priority)
             cycle_id: TDD cycle ID for task association
             max_retries: Maximum retry attempts
+            deadline: Time (UTC) by which the task should complete
             
         Returns:
             Task ID
@@ -328,15 +538,20 @@ class AgentPool:
             "submitted_at": datetime.utcnow().isoformat()
         })
         
-        self.active_tasks[task_id] = task
+        deadline_at = None
+        if deadline is not None:
+            task.context["deadline"] = deadline.isoformat()
+            deadline_at = time.monotonic() + (deadline - datetime.utcnow()).total_seconds()
         
-        # Try to assign immediately or queue
-        agent = await self._select_agent(agent_type, task)
-        if agent:
-            await self._assign_task_to_agent(agent, task)
-        else:
-            # Queue task for later assignment
-            self.task_queue.append(task)
+        self.active_tasks[task_id] = task
+        self.autoscaler.record_arrival(agent_type)
+        if self._scaling_predictions.get(agent_type, 0) > 0:
+            self._scaling_predictions[agent_type] -= 1
+        
+        # Queue by urgency among tasks of the same type and dispatch right away
+        self.task_queue.append(task, deadline_at, lead_seconds=self.statistics.average_task_time)
+        await self._dispatch_agent_type(agent_type)
+        if task.context.get("assigned_agent_id") is None:
             logger.info(f"Queued task {task_id} for {agent_type} (no available agents)")
         
         return task_id
@@ -467,6 +682,7 @@ class AgentPool:
                 "idle": len([a for a in agents if a.status == AgentStatus.IDLE]),
                 "busy": len([a for a in agents if a.status == AgentStatus.BUSY]),
                 "failed": len([a for a in agents if a.status == AgentStatus.FAILED]),
+                "queued": self.task_queue.queued_for(agent_type),
                 "average_load": sum(a.load_factor for a in agents) / len(agents) if agents else 0,
                 "total_tasks": sum(a.metrics.total_tasks for a in agents),
                 "success_rate": sum(a.metrics.success_rate for a in agents) / len(agents) if agents else 0
@@ -481,6 +697,8 @@ class AgentPool:
                 "active_tasks": len(self.active_tasks),
                 "pool_utilization": await self.get_utilization()
             },
+            "queue_wait_times": self._get_queue_wait_metrics(),
+            "scaling_model": self.autoscaler.get_estimates(),
             "agent_types": agent_status_by_type,
             "configuration": {
                 "strategy": self.strategy.value,
@@ -496,7 +714,8 @@ class AgentPool:
                 ),
                 "average_task_time": self.statistics.average_task_time,
                 "scaling_events": self.statistics.scaling_events,
-                "recovery_events": self.statistics.recovery_events
+                "recovery_events": self.statistics.recovery_events,
+                "deadline_misses": self.statistics.deadline_misses
             }
         }
     
@@ -512,6 +731,23 @@ class AgentPool:
         current_load = sum(len(a.current_tasks) for a in self.agents.values())
         return current_load / total_capacity
     
+    def get_task_capacity(self) -> int:
+        """Get the number of tasks the pool can run concurrently at its permitted size"""
+        if self.enable_auto_scaling:
+            return sum(
+                max_count * self._get_max_concurrent_tasks(agent_type)
+                for agent_type, max_count in self.config.max_agents_per_type.items()
+            )
+        
+        return sum(
+            a.max_concurrent_tasks for a in self.agents.values()
+            if a.status != AgentStatus.FAILED
+        )
+    
+    def add_completion_listener(self, listener: Callable[[str, Task, float, bool], None]) -> None:
+        """Register a callback invoked with (agent_type, task, execution_time, success) per finished task"""
+        self._completion_listeners.append(listener)
+    
     async def get_agent_details(self, agent_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed information about a specific agent"""
         if agent_id not in self.agents:
@@ -575,6 +811,7 @@ class AgentPool:
             # Add to pool
             self.agents[agent_id] = pooled_agent
             self.agent_types[agent_type].append(agent_id)
+            self._update_agent_availability(pooled_agent)
             
             # Update statistics
             self.statistics.total_agents += 1
@@ -626,6 +863,7 @@ class AgentPool:
         # Remove from tracking structures
         del self.agents[agent_id]
         self.agent_types[agent.agent_type].remove(agent_id)
+        self._idle_agents[agent.agent_type].pop(agent_id, None)
         
         # Update statistics
         self.statistics.total_agents -= 1
@@ -634,20 +872,14 @@ class AgentPool:
     
     async def _select_agent(self, agent_type: str, task: Task) -> Optional[PooledAgent]:
         """Select the best available agent for a task"""
-        available_agents = [
-            self.agents[aid] for aid in self.agent_types[agent_type]
-            if self.agents[aid].is_available
-        ]
+        available_agents = self._available_agents(agent_type)
         
         if not available_agents:
             # Try to scale up if auto-scaling is enabled
             if self.enable_auto_scaling:
                 await self._attempt_auto_scale(agent_type)
                 # Retry selection after scaling
-                available_agents = [
-                    self.agents[aid] for aid in self.agent_types[agent_type]
-                    if self.agents[aid].is_available
-                ]
+                available_agents = self._available_agents(agent_type)
             
             if not available_agents:
                 return None
@@ -668,6 +900,29 @@ class AgentPool:
         
         return selected_agent
     
+    def _available_agents(self, agent_type: str) -> List[PooledAgent]:
+        """Get the available agents of a type from the idle set"""
+        idle = self._idle_agents[agent_type]
+        available = []
+        for agent_id in list(idle):
+            agent = self.agents.get(agent_id)
+            if agent is not None and agent.is_available:
+                available.append(agent)
+            else:
+                # Agent state was changed without going through the pool
+                del idle[agent_id]
+        return available
+    
+    def _update_agent_availability(self, agent: PooledAgent) -> None:
+        """Keep the idle set in step with an agent's state and wake the dispatcher"""
+        idle = self._idle_agents[agent.agent_type]
+        if agent.agent_id in self.agents and agent.is_available:
+            idle[agent.agent_id] = None
+            if self.task_queue.queued_for(agent.agent_type):
+                self._dispatch_event.set()
+        else:
+            idle.pop(agent.agent_id, None)
+    
     async def _apply_load_balancing(self, agents: List[PooledAgent], task: Task) -> Optional[PooledAgent]:
         """Apply load balancing algorithm to select agent"""
         if not agents:
@@ -712,6 +967,11 @@ class AgentPool:
         agent.current_tasks.add(task.id)
         agent.status = AgentStatus.BUSY
         agent.last_activity = datetime.utcnow()
+        self._update_agent_availability(agent)
+        
+        cycle_id = task.context.get("cycle_id")
+        if cycle_id is not None:
+            self._running_by_cycle[agent.agent_type][cycle_id] += 1
         
         # Update task context with agent information
         task.context.update({
@@ -725,6 +985,14 @@ class AgentPool:
         
         logger.info(f"Assigned task {task.id} to agent {agent.agent_id}")
     
+    def _notify_completed(self, agent_type: str, task: Task, execution_time: float, success: bool) -> None:
+        """Invoke completion listeners for a finished task"""
+        for listener in self._completion_listeners:
+            try:
+                listener(agent_type, task, execution_time, success)
+            except Exception as e:
+                logger.warning(f"Task completion listener failed for {task.id}: {e}")
+    
     async def _execute_task(self, agent: PooledAgent, task: Task) -> None:
         """Execute a task on an agent"""
         execution_start = time.time()
@@ -761,6 +1029,9 @@ class AgentPool:
                 agent.metrics.failed_tasks / agent.metrics.total_tasks * 100
             )
             
+            self.autoscaler.record_completion(agent.agent_type, execution_time)
+            self._notify_completed(agent.agent_type, task, execution_time, result.success)
+            
             # Update pool statistics
             self.statistics.total_tasks_processed += 1
             self.statistics.average_task_time = (
@@ -779,6 +1050,7 @@ class AgentPool:
             agent.current_tasks.discard(task.id)
             if not agent.current_tasks:
                 agent.status = AgentStatus.IDLE
+            self._finish_cycle_task(agent.agent_type, task)
             
             # Remove from active tasks
             if task.id in self.active_tasks:
@@ -787,36 +1059,110 @@ class AgentPool:
             # Check if agent needs recovery
             if agent.failure_count >= self.config.failure_threshold:
                 await self._recover_agent(agent)
+            else:
+                self._update_agent_availability(agent)
             
-            # Process queued tasks
-            await self._process_task_queue()
+            # Without a running dispatcher, hand queued tasks to the freed agent here
+            if self._dispatcher_task is None:
+                await self._process_task_queue()
     
     async def _process_task_queue(self) -> None:
-        """Process queued tasks with batch optimization"""
-        batch_size = 5  # Process up to 5 tasks at once
-        processed_count = 0
-        
-        while self.task_queue and processed_count < batch_size:
-            task = self.task_queue.popleft()
-            agent = await self._select_agent(task.agent_type, task)
+        """Dispatch queued tasks of every agent type to available agents"""
+        for agent_type in self.task_queue.waiting_types():
+            await self._dispatch_agent_type(agent_type)
+    
+    async def _dispatch_agent_type(self, agent_type: str) -> None:
+        """Assign queued tasks of one type, most urgent first, until no agent is available"""
+        while self.task_queue.queued_for(agent_type):
+            entry = self.task_queue.pop(agent_type, self._fair_share_filter(agent_type))
+            agent = await self._select_agent(agent_type, entry.task)
             
-            if agent:
-                await self._assign_task_to_agent(agent, task)
-                processed_count += 1
-            else:
-                # Put task back in queue if no agent available
-                self.task_queue.appendleft(task)
+            if agent is None:
+                # Put task back; tasks for other types are not held up
+                self.task_queue.requeue(entry)
                 break
+            
+            self._record_queue_wait(entry)
+            await self._assign_task_to_agent(agent, entry.task)
+    
+    def _fair_share_filter(self, agent_type: str) -> Optional[Callable[[QueuedTask], bool]]:
+        """
+        Build a filter deferring tasks of cycles already running their share.
+        
+        The agent type's capacity is split evenly between the cycles running
+        or waiting for it; a cycle at its share only gets another agent when
+        no other cycle's task is waiting.
+        """
+        running = self._running_by_cycle.get(agent_type, {})
+        cycles = set(running) | set(self.task_queue.waiting_cycles(agent_type))
+        if len(cycles) < 2:
+            return None
         
-        # If we processed some tasks but queue still has items, schedule another batch
-        if processed_count > 0 and self.task_queue:
-            asyncio.create_task(self._process_task_queue())
+        capacity = sum(
+            self.agents[aid].max_concurrent_tasks for aid in self.agent_types[agent_type]
+            if self.agents[aid].status != AgentStatus.FAILED
+        )
+        share = max(1, math.ceil(capacity / len(cycles)))
+        return lambda entry: entry.cycle_id is None or running.get(entry.cycle_id, 0) < share
+    
+    def _finish_cycle_task(self, agent_type: str, task: Task) -> None:
+        """Release a finished task's slot in its cycle's share"""
+        cycle_id = task.context.get("cycle_id")
+        running = self._running_by_cycle.get(agent_type)
+        if cycle_id is None or not running or cycle_id not in running:
+            return
+        
+        running[cycle_id] -= 1
+        if running[cycle_id] <= 0:
+            del running[cycle_id]
+    
+    def _record_queue_wait(self, entry: QueuedTask) -> None:
+        """Record how long a task waited and whether it can still meet its deadline"""
+        now = time.monotonic()
+        self._queue_wait_times[entry.priority].append(now - entry.enqueued_at)
+        if entry.deadline is not None and now > entry.deadline:
+            self.statistics.deadline_misses += 1
+            logger.warning(f"Task {entry.task.id} dispatched after its deadline")
+    
+    def _get_queue_wait_metrics(self) -> Dict[str, Dict[str, float]]:
+        """Summarize queue wait times per priority"""
+        queued = self.task_queue.queued_by_priority()
+        metrics = {}
+        for priority in sorted(set(self._queue_wait_times) | set(queued)):
+            samples = sorted(self._queue_wait_times.get(priority, ()))
+            metrics[str(priority)] = {
+                "count": len(samples),
+                "average": sum(samples) / len(samples) if samples else 0.0,
+                "p95": samples[min(len(samples) - 1, int(len(samples) * 0.95))] if samples else 0.0,
+                "max": samples[-1] if samples else 0.0,
+                "queued": queued.get(priority, 0)
+            }
+        return metrics
+    
+    async def _dispatcher_loop(self) -> None:
+        """Dispatch queued tasks whenever agent capacity frees up"""
+        while self._running:
+            try:
+                await self._dispatch_event.wait()
+                self._dispatch_event.clear()
+                await self._process_task_queue()
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                logger.error(f"Task dispatcher error: {str(e)}")
     
     async def _attempt_auto_scale(self, agent_type: str) -> None:
         """Attempt to auto-scale agents for a type"""
         if not self.enable_auto_scaling:
             return
         
+        if self.enable_predictive_scaling:
+            # Add enough agents in one step to bring queue waits within target
+            decision = self._predict_scaling(agent_type)
+            if decision.target_agents > decision.current_agents:
+                await self.scale_pool(agent_type, decision.target_agents)
+            return
+        
         current_count = len(self.agent_types[agent_type])
         max_count = self.config.max_agents_per_type.get(agent_type, 5)
         
@@ -824,10 +1170,33 @@ class AgentPool:
             await self._create_agent(agent_type)
             logger.info(f"Auto-scaled {agent_type}: {current_count} -> {current_count + 1}")
     
+    def _predict_scaling(self, agent_type: str) -> ScalingDecision:
+        """Ask the autoscaler for the agent count of a type given the current pool state"""
+        agents = [self.agents[aid] for aid in self.agent_types[agent_type]]
+        slots_per_agent = self._get_max_concurrent_tasks(agent_type)
+        
+        # An agent that cannot take more work occupies all of its slots
+        busy_slots = sum(
+            len(agent.current_tasks) if agent.is_available else slots_per_agent
+            for agent in agents
+        )
+        
+        return self.autoscaler.recommend(
+            agent_type,
+            current_agents=len(agents),
+            slots_per_agent=slots_per_agent,
+            busy_slots=busy_slots,
+            queue_length=self.task_queue.queued_for(agent_type),
+            expected_arrivals=self._scaling_predictions.get(agent_type, 0),
+            min_agents=self.config.min_agents_per_type.get(agent_type, 1),
+            max_agents=self.config.max_agents_per_type.get(agent_type, 5)
+        )
+    
     async def _recover_agent(self, agent: PooledAgent) -> None:
         """Attempt to recover a failed agent"""
         agent.status = AgentStatus.FAILED
         agent.recovery_attempts += 1
+        self._update_agent_availability(agent)
         
         logger.warning(
             f"Agent {agent.agent_id} failed (failures: {agent.failure_count}, "
@@ -841,6 +1210,7 @@ class AgentPool:
         agent.failure_count = 0
         agent.status = AgentStatus.IDLE
         agent.last_activity = datetime.utcnow()
+        self._update_agent_availability(agent)
         
         self.statistics.recovery_events += 1
         logger.info(f"Recovered agent {agent.agent_id}")
@@ -892,8 +1262,14 @@ class AgentPool:
     async def _evaluate_agent_type_scaling(self, agent_type: str) -> None:
         """Evaluate scaling needs for a specific agent type"""
         try:
+            if self.enable_predictive_scaling:
+                decision = self._predict_scaling(agent_type)
+                if decision.target_agents != decision.current_agents:
+                    await self.scale_pool(agent_type, decision.target_agents)
+                return
+            
             utilization = await self._calculate_type_utilization(agent_type)
-            queue_length = len([t for t in self.task_queue if t.agent_type == agent_type])
+            queue_length = self.task_queue.queued_for(agent_type)
             
             # Enhanced scaling logic with queue consideration
             scale_up_threshold = self.config.scaling_thresholds["scale_up_threshold"]
@@ -950,10 +1326,13 @@ class AgentPool:
             if datetime.fromisoformat(entry["timestamp"]) > cutoff_time
         ]
         
-        self._load_balancing_history = [
-            entry for entry in self._load_balancing_history
-            if datetime.fromisoformat(entry["timestamp"]) > cutoff_time
-        ]
+        self._load_balancing_history = deque(
+            (
+                entry for entry in self._load_balancing_history
+                if datetime.fromisoformat(entry["timestamp"]) > cutoff_time
+            ),
+            maxlen=self.config.decision_log_size
+        )
         
         logger.debug("Performed periodic cleanup of agent pool data")
     
@@ -977,6 +1356,8 @@ class AgentPool:
         # Clear all data structures
         self.agents.clear()
         self.agent_types.clear()
+        self._idle_agents.clear()
+        self._running_by_cycle.clear()
         self.active_tasks.clear()
         self.task_queue.clear()
     
@@ -996,7 +1377,7 @@ class AgentPool:
         """Calculate optimal agent count based on workload"""
         current_count = len(self.agent_types[agent_type])
         utilization = await self._calculate_type_utilization(agent_type)
-        queued_tasks = len([t for t in self.task_queue if t.agent_type == agent_type])
+        queued_tasks = self.task_queue.queued_for(agent_type)
         
         # Simple heuristic: scale based on utilization and queue length
         if utilization > 0.8 or queued_tasks > 2:
@@ -1058,4 +1439,47 @@ class AgentPool:
                 results["errors"].append(error_msg)
                 logger.error(error_msg)
         
+        return results
+    
+    async def prewarm_for_upcoming_phases(
+        self,
+        state_machine: TDDStateMachine,
+        starting_cycles: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Pre-warm agents for the phase transitions the TDD state machine expects.
+        
+        The tasks each agent type will receive are counted as expected arrivals,
+        and agent types are scaled up to drain them within the target queue wait.
+        Expected arrivals are consumed as the tasks are submitted.
+        
+        Args:
+            state_machine: State machine tracking the parallel cycles
+            starting_cycles: Cycles about to start work in their current phase
+            
+        Returns:
+            Dictionary with pre-warming results
+        """
+        forecast = forecast_phase_demand(state_machine, starting_cycles)
+        self._scaling_predictions = dict(forecast)
+        
+        results = {
+            "forecast": forecast,
+            "prewarmed_agents": {},
+            "total_prewarmed": 0
+        }
+        
+        if not self.enable_predictive_scaling:
+            return results
+        
+        for agent_type in forecast:
+            decision = self._predict_scaling(agent_type)
+            if decision.target_agents > decision.current_agents:
+                scaling_result = await self.scale_pool(agent_type, decision.target_agents)
+                results["prewarmed_agents"][agent_type] = scaling_result["agents_added"]
+                results["total_prewarmed"] += scaling_result["agents_added"]
+        
+        if results["total_prewarmed"]:
+            logger.info(f"Pre-warmed {results['total_prewarmed']} agents for upcoming phases: {forecast}")
+        
         return results
\ No newline at end of file
@@ -0,0 +1,408 @@
+"""
+Async Test Runner
+
+Runs pytest in a subprocess without blocking the event loop, so a long test
+suite does not stall the other agents, the coordinator or the Discord bot
+while it runs. Results come from pytest's JUnit XML report rather than from
+scraping its console output, and coverage from the JSON report of
+pytest-cov. Runs are limited to a number at a time, so parallel TDD cycles
+validating their tests share the CPU instead of all starting pytest at once.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import signal
+import sys
+import tempfile
+import time
+import weakref
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT_SECONDS = 300.0
+DETAILS_MAX_CHARS = 2000  # Traceback text kept per failing test
+
+# pytest exit code when no tests were collected
+EXIT_NO_TESTS_COLLECTED = 5
+
+# Failures caused by the test code itself rather than by missing or wrong
+# implementation; tests failing with these are not a valid RED state
+TEST_DEFECT_MARKERS = ("SyntaxError", "IndentationError", "TabError", "NameError", "fixture '")
+
+
+@dataclass
+class TestCaseResult:
+    """Outcome of one test from the JUnit report"""
+    classname: str
+    name: str
+    outcome: str  # "passed", "failed", "error" or "skipped"
+    file: str = ""
+    duration: float = 0.0
+    message: str = ""
+    details: str = ""
+    
+    @property
+    def nodeid(self) -> str:
+        return f"{self.classname}::{self.name}" if self.classname else self.name
+    
+    @property
+    def is_test_defect(self) -> bool:
+        """Whether the test failed because of a defect in the test code"""
+        text = f"{self.message}\n{self.details}"
+        return self.outcome in ("failed", "error") and any(marker in text for marker in TEST_DEFECT_MARKERS)
+
+
+@dataclass
+class CoverageReport:
+    """Line coverage from a coverage.py JSON report"""
+    percent_covered: float
+    num_statements: int
+    covered_lines: int
+    missing_lines: int
+    files: Dict[str, Dict[str, Any]] = field(default_factory=dict)  # path -> summary and missing line numbers
+    test_files: Dict[str, List[str]] = field(default_factory=dict)  # test file -> source files it executed
+    
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> 'CoverageReport':
+        totals = data.get("totals", {})
+        files = {}
+        for path, file_data in data.get("files", {}).items():
+            summary = file_data.get("summary", {})
+            files[os.path.normpath(path)] = {
+                "percent_covered": summary.get("percent_covered", 0.0),
+                "num_statements": summary.get("num_statements", 0),
+                "covered_lines": summary.get("covered_lines", 0),
+                "missing_lines": file_data.get("missing_lines", [])
+            }
+        return cls(
+            percent_covered=totals.get("percent_covered", 0.0),
+            num_statements=totals.get("num_statements", 0),
+            covered_lines=totals.get("covered_lines", 0),
+            missing_lines=totals.get("missing_lines", 0),
+            files=files
+        )
+    
+    def file_coverage(self, path: str) -> Optional[Dict[str, Any]]:
+        """Coverage of a file, by path relative to the run directory or absolute"""
+        path = os.path.normpath(path)
+        if path in self.files:
+            return self.files[path]
+        absolute = os.path.abspath(path)
+        for candidate, summary in self.files.items():
+            if os.path.abspath(candidate) == absolute:
+                return summary
+        return None
+
+
+@dataclass
+class TestRunResult:
+    """Outcome of one pytest run"""
+    returncode: Optional[int]  # None if the run was killed
+    cases: List[TestCaseResult] = field(default_factory=list)
+    output: str = ""
+    errors: str = ""
+    duration: float = 0.0
+    timed_out: bool = False
+    coverage: Optional[CoverageReport] = None
+    
+    @property
+    def total(self) -> int:
+        return len(self.cases)
+    
+    @property
+    def passed(self) -> int:
+        return self._count("passed")
+    
+    @property
+    def failed(self) -> int:
+        return self._count("failed")
+    
+    @property
+    def errored(self) -> int:
+        return self._count("error")
+    
+    @property
+    def skipped(self) -> int:
+        return self._count("skipped")
+    
+    @property
+    def crashed(self) -> bool:
+        """Whether pytest ended without reporting any test: interrupted, usage error or timeout"""
+        return not self.cases and self.returncode not in (0, EXIT_NO_TESTS_COLLECTED)
+    
+    @property
+    def failures(self) -> List[TestCaseResult]:
+        """Failed and errored tests"""
+        return [case for case in self.cases if case.outcome in ("failed", "error")]
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary in the shape QAAgent reports test results"""
+        return {
+            "total": self.total,
+            "passed": self.passed,
+            "failed": self.failed + self.errored + (1 if self.crashed else 0),
+            "skipped": self.skipped,
+            "test_errors": self.errored,
+            "duration": self.duration,
+            "timed_out": self.timed_out,
+            "returncode": self.returncode,
+            "failures": [{"test": case.nodeid, "message": case.message} for case in self.failures],
+            "output": self.output,
+            "errors": self.errors
+        }
+    
+    def _count(self, outcome: str) -> int:
+        return sum(1 for case in self.cases if case.outcome == outcome)
+
+
+def parse_junit_xml(path: str) -> List[TestCaseResult]:
+    """
+    Read test outcomes from a pytest JUnit XML report.
+    
+    Collection errors appear as errored cases named after the module that
+    could not be collected.
+    """
+    cases = []
+    for element in ET.parse(path).getroot().iter("testcase"):
+        outcome, message, details = "passed", "", ""
+        for child in element:
+            if child.tag in ("failure", "error", "skipped"):
+                outcome = {"failure": "failed", "error": "error", "skipped": "skipped"}[child.tag]
+                message = child.get("message", "")
+                details = (child.text or "")[-DETAILS_MAX_CHARS:]
+                break
+        cases.append(TestCaseResult(
+            classname=element.get("classname", ""),
+            name=element.get("name", ""),
+            outcome=outcome,
+            file=element.get("file", ""),
+            duration=float(element.get("time", 0) or 0),
+            message=message,
+            details=details
+        ))
+    return cases
+
+
+def read_test_coverage(data_file: str, cwd: Optional[str] = None) -> Dict[str, List[str]]:
+    """
+    Source files executed by each test file, from coverage data recorded
+    with --cov-context=test.
+    
+    Test contexts are node IDs relative to the pytest rootdir, taken to be
+    the directory of the run.
+    """
+    from coverage import CoverageData
+    
+    data = CoverageData(data_file)
+    data.read()
+    executed: Dict[str, Set[str]] = defaultdict(set)
+    for source in data.measured_files():
+        for contexts in data.contexts_by_lineno(source).values():
+            for context in contexts:
+                if "::" in context:
+                    test_file = os.path.join(cwd or os.getcwd(), context.split("::", 1)[0])
+                    executed[os.path.normpath(test_file)].add(source)
+    return {test_file: sorted(sources) for test_file, sources in executed.items()}
+
+
+class AsyncTestRunner:
+    """
+    Runs pytest as an asyncio subprocess, a limited number at a time.
+    
+    Each run writes its JUnit and coverage reports, and coverage data, to its
+    own temporary directory, so concurrent runs in one project do not
+    overwrite each other's results. The limit applies to the runs of each
+    event loop.
+    """
+    
+    def __init__(self, max_concurrent: Optional[int] = None, timeout: float = DEFAULT_TIMEOUT_SECONDS, python: str = None):
+        """
+        Initialize the runner.
+        
+        Args:
+            max_concurrent: pytest runs allowed at once; defaults to
+                TEST_RUNNER_MAX_CONCURRENT or half the CPUs
+            timeout: Seconds before a run is killed
+            python: Interpreter running pytest (default: the current one)
+        """
+        if max_concurrent is None:
+            max_concurrent = int(os.getenv("TEST_RUNNER_MAX_CONCURRENT", "0")) or max(1, (os.cpu_count() or 1) // 2)
+        self.max_concurrent = max(1, max_concurrent)
+        self.timeout = timeout
+        self.python = python or sys.executable
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self.running = 0
+        self.waiting = 0
+        self.completed = 0
+    
+    async def run(
+        self,
+        paths: List[str],
+        cwd: Optional[str] = None,
+        pattern: Optional[str] = None,
+        coverage_sources: Optional[List[str]] = None,
+        extra_args: Optional[List[str]] = None,
+        timeout: Optional[float] = None,
+        coverage_contexts: bool = False
+    ) -> TestRunResult:
+        """
+        Run pytest and collect its results.
+        
+        Args:
+            paths: Test files or directories
+            cwd: Directory to run in (default: the current directory)
+            pattern: Glob of test file names, overriding python_files
+            coverage_sources: Packages or directories to measure coverage of
+            extra_args: Further pytest arguments
+            timeout: Seconds before the run is killed (default: the runner's)
+            coverage_contexts: Also record which test files executed each
+                source file, in the coverage report's test_files
+        
+        Returns:
+            Outcomes of the tests that ran
+        """
+        if not paths:
+            # pytest would fall back to the project's whole test suite
+            return TestRunResult(returncode=EXIT_NO_TESTS_COLLECTED)
+        
+        semaphore = self._semaphore()
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        
+        self.running += 1
+        try:
+            with tempfile.TemporaryDirectory(prefix="pytest-run-") as report_dir:
+                return await self._run(paths, cwd, pattern, coverage_sources, extra_args,
+                                       self.timeout if timeout is None else timeout, report_dir,
+                                       coverage_contexts)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            semaphore.release()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Current load of the runner"""
+        return {
+            "max_concurrent": self.max_concurrent,
+            "running": self.running,
+            "waiting": self.waiting,
+            "completed": self.completed
+        }
+    
+    async def _run(
+        self,
+        paths: List[str],
+        cwd: Optional[str],
+        pattern: Optional[str],
+        coverage_sources: Optional[List[str]],
+        extra_args: Optional[List[str]],
+        timeout: float,
+        report_dir: str,
+        coverage_contexts: bool = False
+    ) -> TestRunResult:
+        """Spawn pytest, wait for it with a timeout and read its reports"""
+        junit_path = os.path.join(report_dir, "junit.xml")
+        coverage_path = os.path.join(report_dir, "coverage.json")
+        
+        cmd_args = [
+            self.python, "-m", "pytest", *paths,
+            "-p", "no:cacheprovider",
+            "--tb=short",
+            f"--junitxml={junit_path}",
+            "-o", "junit_family=xunit1"  # Includes the file of each test
+        ]
+        if pattern:
+            cmd_args.extend(["-o", f"python_files={pattern}"])
+        env = dict(os.environ)
+        if coverage_sources:
+            cmd_args.extend(f"--cov={source}" for source in coverage_sources)
+            cmd_args.append(f"--cov-report=json:{coverage_path}")
+            if coverage_contexts:
+                cmd_args.append("--cov-context=test")
+            env["COVERAGE_FILE"] = os.path.join(report_dir, ".coverage")
+        cmd_args.extend(extra_args or [])
+        
+        started = time.monotonic()
+        process = await asyncio.create_subprocess_exec(
+            *cmd_args,
+            cwd=cwd,
+            env=env,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=(os.name == "posix")
+        )
+        
+        timed_out = False
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"pytest run of {paths} timed out after {timeout}s")
+            timed_out = True
+            await self._kill(process)
+            stdout, stderr = b"", f"Test run timed out after {timeout} seconds".encode()
+        except asyncio.CancelledError:
+            await self._kill(process)
+            raise
+        
+        result = TestRunResult(
+            returncode=None if timed_out else process.returncode,
+            output=stdout.decode(errors="replace"),
+            errors=stderr.decode(errors="replace"),
+            duration=time.monotonic() - started,
+            timed_out=timed_out
+        )
+        
+        if os.path.exists(junit_path):
+            try:
+                result.cases = parse_junit_xml(junit_path)
+            except (ET.ParseError, OSError) as e:
+                logger.warning(f"Could not read JUnit report of pytest run: {str(e)}")
+        
+        if coverage_sources and os.path.exists(coverage_path):
+            try:
+                with open(coverage_path) as f:
+                    result.coverage = CoverageReport.from_json(json.load(f))
+            except (ValueError, OSError) as e:
+                logger.warning(f"Could not read coverage report of pytest run: {str(e)}")
+        
+        if coverage_contexts and result.coverage is not None:
+            try:
+                result.coverage.test_files = read_test_coverage(env["COVERAGE_FILE"], cwd)
+            except Exception as e:
+                logger.warning(f"Could not read per-test coverage of pytest run: {str(e)}")
+        
+        return result
+    
+    async def _kill(self, process) -> None:
+        """Kill pytest together with any processes its tests started"""
+        if process.returncode is not None:
+            return
+        try:
+            if os.name == "posix":
+                os.killpg(process.pid, signal.SIGKILL)
+            else:
+                process.kill()
+        except (ProcessLookupError, PermissionError):
+            pass
+        await process.wait()
+    
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+
+# Runner shared by all agents in the process
+test_runner = AsyncTestRunner()
@@ -0,0 +1,151 @@
+"""
+Change Analysis
+
+Extracts what a cycle actually changed in a file by diffing it against the
+cycle's base snapshot and mapping the changed hunks onto Python AST node
+spans. Used by the conflict resolver so that two cycles editing different
+functions of the same module are no longer reported as conflicting.
+"""
+
+import ast
+import difflib
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Set, Tuple
+
+
+@dataclass
+class ChangeSet:
+    """Changes made to a file relative to its base snapshot"""
+    line_ranges: List[Tuple[int, int]] = field(default_factory=list)  # 1-based, inclusive, base coordinates
+    functions: List[str] = field(default_factory=list)  # Qualified names, e.g. "Parser.parse"
+    classes: List[str] = field(default_factory=list)
+    imports: List[str] = field(default_factory=list)
+
+
+@dataclass
+class _Scope:
+    """A function or class and the lines it spans (decorators included)"""
+    name: str
+    kind: str  # function, class
+    start: int
+    end: int
+
+
+def diff_hunks(base_lines: List[str], current_lines: List[str]) -> List[Tuple[str, int, int, int, int]]:
+    """Get the non-equal opcodes (tag, i1, i2, j1, j2) turning base into current"""
+    matcher = difflib.SequenceMatcher(None, base_lines, current_lines, autojunk=False)
+    return [opcode for opcode in matcher.get_opcodes() if opcode[0] != "equal"]
+
+
+def analyze_changes(base: Optional[str], current: str, is_python: bool = False) -> ChangeSet:
+    """
+    Describe how current differs from base.
+    
+    Without a base snapshot the whole file is treated as changed. Line ranges
+    are reported in base-file coordinates so that ranges from cycles sharing a
+    base can be compared directly. For Python sources, changed lines are
+    attributed to the innermost enclosing class or top-level function (methods
+    are attributed to the method, nested functions to their outer function)
+    and to any import statement they touch.
+    """
+    current_lines = current.split('\n')
+    
+    if base is None:
+        line_ranges = [(1, len(current_lines))]
+        current_changed = set(range(1, len(current_lines) + 1))
+        base_changed: Set[int] = set()
+        base_lines: List[str] = []
+    else:
+        base_lines = base.split('\n')
+        line_ranges = []
+        current_changed = set()
+        base_changed = set()
+        
+        for tag, i1, i2, j1, j2 in diff_hunks(base_lines, current_lines):
+            if i2 > i1:
+                line_ranges.append((i1 + 1, i2))
+                base_changed.update(range(i1 + 1, i2 + 1))
+            else:
+                # Pure insertion: anchor on the base lines either side of it
+                last_line = max(len(base_lines), 1)
+                line_ranges.append((min(max(i1, 1), last_line), min(i1 + 1, last_line)))
+            current_changed.update(range(j1 + 1, j2 + 1))
+        
+        line_ranges = _merge_ranges(line_ranges)
+    
+    change_set = ChangeSet(line_ranges=line_ranges)
+    if not is_python or not (current_changed or base_changed):
+        return change_set
+    
+    functions: Dict[str, None] = {}
+    classes: Dict[str, None] = {}
+    imports: Dict[str, None] = {}
+    
+    # Added and modified code lives in the current version, deleted code in the base
+    for source, changed in ((current, current_changed), ("\n".join(base_lines), base_changed)):
+        if not changed:
+            continue
+        try:
+            tree = ast.parse(source)
+        except (SyntaxError, ValueError):
+            continue
+        
+        scopes, import_spans = _collect_scopes(tree, source)
+        owner = _innermost_scopes(scopes, changed)
+        for line in sorted(changed):
+            scope = owner.get(line)
+            if scope is not None:
+                (functions if scope.kind == "function" else classes)[scope.name] = None
+        for start, end, text in import_spans:
+            if any(line in changed for line in range(start, end + 1)):
+                imports[text] = None
+    
+    change_set.functions = list(functions)
+    change_set.classes = list(classes)
+    change_set.imports = list(imports)
+    return change_set
+
+
+def _merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """Merge overlapping line ranges"""
+    merged: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _collect_scopes(tree: ast.AST, source: str) -> Tuple[List[_Scope], List[Tuple[int, int, str]]]:
+    """Collect class and function scopes (outermost first) and import statements"""
+    scopes: List[_Scope] = []
+    import_spans: List[Tuple[int, int, str]] = []
+    
+    def visit(node: ast.AST, prefix: str, in_function: bool) -> None:
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.Import, ast.ImportFrom)):
+                text = ast.get_source_segment(source, child) or ""
+                import_spans.append((child.lineno, child.end_lineno or child.lineno, " ".join(text.split())))
+            elif not in_function and isinstance(child, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+                name = f"{prefix}{child.name}"
+                start = min([child.lineno] + [d.lineno for d in child.decorator_list])
+                kind = "class" if isinstance(child, ast.ClassDef) else "function"
+                scopes.append(_Scope(name, kind, start, child.end_lineno or child.lineno))
+                visit(child, f"{name}.", kind == "function")
+            else:
+                visit(child, prefix, in_function)
+    
+    visit(tree, "", False)
+    return scopes, import_spans
+
+
+def _innermost_scopes(scopes: List[_Scope], lines: Set[int]) -> Dict[int, _Scope]:
+    """Map each changed line to the innermost scope containing it"""
+    owner: Dict[int, _Scope] = {}
+    # Scopes are collected outermost first, so inner scopes overwrite outer ones
+    for scope in scopes:
+        for line in range(scope.start, scope.end + 1):
+            if line in lines:
+                owner[line] = scope
+    return owner
@@ -4,23 +4,159 @@ Claude Code Integration Client
 Provides integration with Claude Code for AI agent capabilities.
 Uses subprocess to execute claude commands for AI-powered tasks.
 Includes security boundaries through tool access restrictions per agent type.
+Calls run through the process-wide ClaudeProcessExecutor, which limits how
+many claude processes run at once, and can be answered from an opt-in
+ClaudeResponseCache when the same prompt was sent before. Whether the CLI
+works is probed once per process and cached, so creating clients is cheap.
+Responses can also be streamed as they are produced, with throttled progress
+events and an idle timeout instead of a limit on total run time.
 """
 
 import subprocess
 import asyncio
+import codecs
 import logging
 import json
-from typing import Dict, Any, Optional, List
+import shutil
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator, Callable
 from pathlib import Path
 
 # Handle both relative and absolute imports
 try:
     from .agent_tool_config import AgentType, get_claude_tool_args
+    from .claude_executor import CallPriority, ClaudeProcessExecutor, claude_executor, priority_for
+    from .claude_response_cache import ClaudeResponseCache, default_response_cache
 except ImportError:
     from agent_tool_config import AgentType, get_claude_tool_args
+    from claude_executor import CallPriority, ClaudeProcessExecutor, claude_executor, priority_for
+    from claude_response_cache import ClaudeResponseCache, default_response_cache
 
 logger = logging.getLogger(__name__)
 
+AVAILABILITY_TTL_SECONDS = 300.0
+VERSION_CHECK_TIMEOUT = 10
+STREAM_CHUNK_BYTES = 64 * 1024  # Read size, and the pipe buffer high-water mark, when streaming
+STDERR_TAIL_BYTES = 64 * 1024  # stderr kept for error messages when streaming
+PROGRESS_INTERVAL_SECONDS = 1.0
+
+
+@dataclass
+class ClaudeProgress:
+    """Progress of a streaming claude call"""
+    status: str  # "started", "streaming", "completed", "failed" or "cancelled"
+    bytes_received: int
+    chunks: int
+    elapsed_seconds: float
+
+
+class ClaudeAvailabilityProbe:
+    """
+    Process-wide, cached answer to whether the claude CLI works.
+    
+    The first check runs `claude --version`; later checks within the TTL
+    cost nothing. Once the answer is stale, a check made on a running event
+    loop returns the last answer and re-probes in the background, so clients
+    created by agents and pools on the loop never wait for a subprocess.
+    """
+    
+    def __init__(self, ttl_seconds: float = AVAILABILITY_TTL_SECONDS):
+        """
+        Initialize the probe.
+        
+        Args:
+            ttl_seconds: How long an answer is used before re-probing
+        """
+        self.ttl_seconds = ttl_seconds
+        self.path: Optional[str] = None
+        self.version = ""
+        self.probe_count = 0
+        self._available: Optional[bool] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+    
+    def is_available(self) -> bool:
+        """Cached availability, probing on first use and re-probing when stale"""
+        if self._available is None:
+            with self._lock:
+                if self._available is None:
+                    self._record(*self._run_version_check())
+            return self._available
+        
+        if time.monotonic() - self._checked_at > self.ttl_seconds:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                loop = None
+            
+            if loop is None:
+                with self._lock:
+                    self._record(*self._run_version_check())
+            elif (self._refresh_task is None or self._refresh_task.done()
+                  or self._refresh_task.get_loop() is not loop):
+                # A refresh pending on another loop may never finish if that loop closed
+                self._refresh_task = loop.create_task(self.refresh())
+        
+        return self._available
+    
+    async def refresh(self) -> bool:
+        """Re-probe without blocking the event loop"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "claude", "--version",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                stdout, _ = await asyncio.wait_for(process.communicate(), timeout=VERSION_CHECK_TIMEOUT)
+                result = (process.returncode == 0, stdout.decode().strip())
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                result = (False, "")
+        except OSError:
+            result = (False, "")
+        
+        self._record(*result)
+        return self._available
+    
+    def invalidate(self) -> None:
+        """Forget the cached answer so the next check probes again"""
+        self._available = None
+        self._checked_at = 0.0
+    
+    def _run_version_check(self) -> Tuple[bool, str]:
+        """Run `claude --version`, blocking"""
+        try:
+            result = subprocess.run(
+                ["claude", "--version"],
+                capture_output=True,
+                text=True,
+                timeout=VERSION_CHECK_TIMEOUT
+            )
+            version = result.stdout.strip() if isinstance(result.stdout, str) else ""
+            return result.returncode == 0, version
+        except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.CalledProcessError):
+            return False, ""
+    
+    def _record(self, available: bool, version: str) -> None:
+        """Store a probe result, resolving the CLI path once per answer"""
+        if available != self._available:
+            self.path = shutil.which("claude") if available else None
+            if self._available is not None:
+                logger.info(f"Claude Code availability changed: {'available' if available else 'not available'}")
+        self._available = available
+        self.version = version
+        self._checked_at = time.monotonic()
+        self.probe_count += 1
+
+
+# Availability shared by all clients in the process
+claude_availability = ClaudeAvailabilityProbe()
+
 
 class ClaudeCodeClient:
     """
@@ -30,37 +166,46 @@ class ClaudeCodeClient:
     for the agent workflow system with security boundaries per agent type.
     """
     
-    def __init__(self, timeout: int = 300, agent_type: Optional[AgentType] = None):
+    def __init__(
+        self,
+        timeout: int = 300,
+        agent_type: Optional[AgentType] = None,
+        priority: Optional[CallPriority] = None,
+        executor: Optional[ClaudeProcessExecutor] = None,
+        cache: Optional[ClaudeResponseCache] = None
+    ):
         """
         Initialize Claude Code client.
         
         Args:
-            timeout: Command timeout in seconds (default: 5 minutes)
+            timeout: Command run time limit in seconds, not counting time queued (default: 5 minutes)
             agent_type: Type of agent using this client (for tool restrictions)
+            priority: Queue priority of this client's calls (default: by agent type)
+            executor: Executor limiting concurrent claude processes (default: shared executor)
+            cache: Cache of responses to repeated prompts (default: the one set up by
+                CLAUDE_RESPONSE_CACHE_DIR, if any)
         """
         self.timeout = timeout
         self.agent_type = agent_type
-        self.available = self._check_claude_availability()
+        self.priority = priority or priority_for(agent_type)
+        self.executor = executor or claude_executor
+        self.cache = cache or default_response_cache()
         
-        if self.available:
+        if self._check_claude_availability():
             logger.info("Claude Code integration available")
             if agent_type:
                 logger.info(f"Tool restrictions enabled for {agent_type.value}")
         else:
             logger.warning("Claude Code not available - using placeholder implementations")
     
+    @property
+    def available(self) -> bool:
+        """Whether the claude CLI works, from the process-wide probe"""
+        return self._check_claude_availability()
+    
     def _check_claude_availability(self) -> bool:
         """Check if claude command is available"""
-        try:
-            result = subprocess.run(
-                ["claude", "--version"],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            return result.returncode == 0
-        except (subprocess.TimeoutExpired, FileNotFoundError, subprocess.CalledProcessError):
-            return False
+        return claude_availability.is_available()
     
     async def generate_code(self, prompt: str, context: Dict[str, Any] = None) -> str:
         """
@@ -80,8 +225,10 @@ class ClaudeCodeClient:
             # Prepare the prompt with context
             full_prompt = self._prepare_code_prompt(prompt, context or {})
             
-            # Execute claude command
-            result = await self._execute_claude_command(full_prompt)
+            # Execute claude command, ahead of other work in the GREEN phase
+            tdd_phase = (context or {}).get("tdd_phase")
+            priority = priority_for(self.agent_type, tdd_phase) if tdd_phase is not None else None
+            result = await self._execute_claude_command(full_prompt, priority, method="generate_code")
             
             return result
             
@@ -105,7 +252,7 @@ class ClaudeCodeClient:
         
         try:
             prompt = self._prepare_analysis_prompt(code, analysis_type)
-            result = await self._execute_claude_command(prompt)
+            result = await self._execute_claude_command(prompt, method="analyze_code")
             return result
             
         except Exception as e:
@@ -128,7 +275,7 @@ class ClaudeCodeClient:
         
         try:
             prompt = self._prepare_test_prompt(code, test_type)
-            result = await self._execute_claude_command(prompt)
+            result = await self._execute_claude_command(prompt, method="generate_tests")
             return result
             
         except Exception as e:
@@ -150,7 +297,7 @@ class ClaudeCodeClient:
         
         try:
             prompt = self._prepare_architecture_prompt(requirements)
-            result = await self._execute_claude_command(prompt)
+            result = await self._execute_claude_command(prompt, method="create_architecture")
             return result
             
         except Exception as e:
@@ -173,44 +320,231 @@ class ClaudeCodeClient:
         
         try:
             prompt = self._prepare_data_prompt(data_description, analysis_goals)
-            result = await self._execute_claude_command(prompt)
+            result = await self._execute_claude_command(prompt, method="analyze_data")
             return result
             
         except Exception as e:
             logger.error(f"Claude Code data analysis failed: {e}")
             return self._placeholder_data_analysis(data_description, analysis_goals)
     
-    async def _execute_claude_command(self, prompt: str) -> str:
+    async def stream_code(
+        self,
+        prompt: str,
+        context: Dict[str, Any] = None,
+        on_progress: Optional[Callable[[ClaudeProgress], None]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate code using Claude Code, yielding it as it is produced.
+        
+        Unlike generate_code, failures after output has started are raised
+        rather than replaced by placeholder code, since callers may already
+        have consumed part of the response.
+        
+        Args:
+            prompt: Description of what code to generate
+            context: Additional context for code generation
+            on_progress: Called with throttled progress of the call
+            
+        Yields:
+            Chunks of generated code
+        """
+        if not self.available:
+            yield self._placeholder_code_generation(prompt)
+            return
+        
+        context = context or {}
+        tdd_phase = context.get("tdd_phase")
+        priority = priority_for(self.agent_type, tdd_phase) if tdd_phase is not None else None
+        full_prompt = self._prepare_code_prompt(prompt, context)
+        async for chunk in self.stream_claude_command(full_prompt, priority, on_progress=on_progress):
+            yield chunk
+    
+    async def _execute_claude_command(
+        self,
+        prompt: str,
+        priority: Optional[CallPriority] = None,
+        method: Optional[str] = None
+    ) -> str:
         """
         Execute claude command with given prompt and tool restrictions.
         
+        Answers from the response cache if enabled and the method's responses
+        are cacheable. Otherwise waits for a process slot; the timeout covers
+        only the run. Cancelling the call while it runs kills the claude process.
+        
         Args:
             prompt: Prompt to send to Claude
+            priority: Queue priority (default: the client's)
+            method: Client method making the call, for its caching rule
             
         Returns:
             Claude's response
         """
-        try:
-            # Build command with tool restrictions if agent type is set
-            cmd_args = ['claude']
+        cache_key = None
+        if self.cache is not None and method is not None and self.cache.is_cacheable(method):
+            tool_args = get_claude_tool_args(self.agent_type) if self.agent_type else []
+            cache_key = self.cache.make_key(tool_args, prompt)
+            cached = await asyncio.to_thread(self.cache.get, method, cache_key)
+            if cached is not None:
+                logger.debug(f"Claude response for {method} served from cache")
+                return cached
+        
+        async with self.executor.slot(self.agent_type, priority or self.priority):
+            started = time.monotonic()
+            result = await self._run_claude_process(prompt)
+        
+        if cache_key is not None:
+            run_seconds = time.monotonic() - started
+            await asyncio.to_thread(self.cache.put, method, cache_key, result, run_seconds)
+        return result
+    
+    async def stream_claude_command(
+        self,
+        prompt: str,
+        priority: Optional[CallPriority] = None,
+        idle_timeout: Optional[float] = None,
+        on_progress: Optional[Callable[[ClaudeProgress], None]] = None,
+        progress_interval: float = PROGRESS_INTERVAL_SECONDS
+    ) -> AsyncIterator[str]:
+        """
+        Execute claude command, yielding stdout text as it arrives.
+        
+        At most one chunk is buffered between claude and the consumer, so a
+        slow consumer pauses claude through the pipe rather than growing
+        memory. The process slot is held until the iteration ends; stopping
+        early (break or aclose) kills the process. Responses are not cached.
+        
+        Args:
+            prompt: Prompt to send to Claude
+            priority: Queue priority (default: the client's)
+            idle_timeout: Seconds without output before giving up (default: the client timeout)
+            on_progress: Called on start, at most every progress_interval
+                seconds while output arrives, and at the end
+            progress_interval: Minimum seconds between streaming progress events
             
-            if self.agent_type:
-                tool_args = get_claude_tool_args(self.agent_type)
-                cmd_args.extend(tool_args)
-                logger.debug(f"Using tool restrictions for {self.agent_type.value}: {tool_args}")
+        Yields:
+            Decoded chunks of Claude's response
+        """
+        idle_timeout = self.timeout if idle_timeout is None else idle_timeout
+        
+        async with self.executor.slot(self.agent_type, priority or self.priority):
+            started = time.monotonic()
+            received = chunks = 0
+            
+            def report(status: str) -> None:
+                if on_progress is not None:
+                    try:
+                        on_progress(ClaudeProgress(status, received, chunks, time.monotonic() - started))
+                    except Exception as e:
+                        logger.debug(f"Claude progress callback failed: {e}")
             
+            process = await asyncio.create_subprocess_exec(
+                *self._command_args(),
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                limit=STREAM_CHUNK_BYTES
+            )
+            stdin_task = asyncio.create_task(self._feed_stdin(process, prompt))
+            stderr_task = asyncio.create_task(self._read_stderr_tail(process))
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            last_report = started
+            report("started")
+            
+            try:
+                while True:
+                    try:
+                        data = await asyncio.wait_for(process.stdout.read(STREAM_CHUNK_BYTES), timeout=idle_timeout)
+                    except asyncio.TimeoutError:
+                        logger.error(f"Claude command produced no output for {idle_timeout}s")
+                        raise
+                    if not data:
+                        break
+                    
+                    received += len(data)
+                    chunks += 1
+                    now = time.monotonic()
+                    if now - last_report >= progress_interval:
+                        last_report = now
+                        report("streaming")
+                    
+                    text = decoder.decode(data)
+                    if text:
+                        yield text
+                
+                text = decoder.decode(b"", final=True)
+                if text:
+                    yield text
+                
+                await asyncio.wait_for(process.wait(), timeout=idle_timeout)
+                await stdin_task
+                stderr = await stderr_task
+                if process.returncode != 0:
+                    logger.error(f"Claude command failed: {stderr.decode(errors='replace')}")
+                    raise subprocess.CalledProcessError(process.returncode, 'claude')
+                report("completed")
+                
+            except (GeneratorExit, asyncio.CancelledError):
+                report("cancelled")
+                raise
+            except Exception:
+                report("failed")
+                raise
+            finally:
+                stdin_task.cancel()
+                stderr_task.cancel()
+                await self._kill_process(process)
+    
+    def _command_args(self) -> List[str]:
+        """claude command line with the agent type's tool restrictions"""
+        cmd_args = ['claude']
+            
+        if self.agent_type:
+            tool_args = get_claude_tool_args(self.agent_type)
+            cmd_args.extend(tool_args)
+            logger.debug(f"Using tool restrictions for {self.agent_type.value}: {tool_args}")
+            
+        return cmd_args
+    
+    async def _feed_stdin(self, process, prompt: str) -> None:
+        """Write the prompt to claude's stdin and close it"""
+        try:
+            process.stdin.write(prompt.encode())
+            await process.stdin.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        finally:
+            process.stdin.close()
+    
+    async def _read_stderr_tail(self, process) -> bytes:
+        """Drain claude's stderr, keeping only its end"""
+        tail = bytearray()
+        while True:
+            data = await process.stderr.read(STREAM_CHUNK_BYTES)
+            if not data:
+                return bytes(tail)
+            tail.extend(data)
+            del tail[:-STDERR_TAIL_BYTES]
+    
+    async def _run_claude_process(self, prompt: str) -> str:
+        """Spawn claude with the prompt on stdin and wait for its output"""
+        try:
             # Execute claude command with prompt as stdin
             process = await asyncio.create_subprocess_exec(
-                *cmd_args,
+                *self._command_args(),
                 stdin=asyncio.subprocess.PIPE,
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE
             )
             
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(input=prompt.encode()),
-                timeout=self.timeout
-            )
+            try:
+                stdout, stderr = await asyncio.wait_for(
+                    process.communicate(input=prompt.encode()),
+                    timeout=self.timeout
+                )
+            except (asyncio.TimeoutError, asyncio.CancelledError):
+                await self._kill_process(process)
+                raise
             
             if process.returncode != 0:
                 logger.error(f"Claude command failed: {stderr.decode()}")
@@ -225,6 +559,16 @@ class ClaudeCodeClient:
             logger.error(f"Error executing claude command: {e}")
             raise
     
+    async def _kill_process(self, process) -> None:
+        """Kill a claude process that is still running and reap it"""
+        if process.returncode is not None:
+            return
+        try:
+            process.kill()
+        except ProcessLookupError:
+            return
+        await process.wait()
+    
     def _prepare_code_prompt(self, prompt: str, context: Dict[str, Any]) -> str:
         """Prepare prompt for code generation"""
         context_str = ""
@@ -474,6 +818,11 @@ This is a placeholder analysis report. Claude Code integration is not available.
 claude_client = ClaudeCodeClient()
 
 # Factory function to create agent-specific clients
-def create_agent_client(agent_type: AgentType, timeout: int = 300) -> ClaudeCodeClient:
-    """Create a Claude client with agent-specific tool restrictions"""
-    return ClaudeCodeClient(timeout=timeout, agent_type=agent_type)
\ No newline at end of file
+def create_agent_client(
+    agent_type: AgentType,
+    timeout: int = 300,
+    priority: Optional[CallPriority] = None,
+    cache: Optional[ClaudeResponseCache] = None
+) -> ClaudeCodeClient:
+    """Create a Claude client with agent-specific tool restrictions, queue priority and response cache"""
+    return ClaudeCodeClient(timeout=timeout, agent_type=agent_type, priority=priority, cache=cache)
\ No newline at end of file
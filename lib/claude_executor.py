@@ -0,0 +1,347 @@
+"""
+Claude Process Executor
+
+Process-wide admission control for claude CLI subprocesses. Every agent's
+ClaudeCodeClient runs its calls through one executor, which caps how many
+claude processes run at once overall and per agent type. Calls beyond the
+cap wait in a priority queue, so implementation work in the GREEN phase is
+started before documentation or design work that arrived earlier. Queue
+wait and run time are recorded in histograms, and waiting calls can be
+cancelled without ever starting a process; they fail with ClaudeCallCancelled.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# Handle both relative and absolute imports
+try:
+    from .agent_tool_config import AgentType
+except ImportError:
+    from agent_tool_config import AgentType
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0, float("inf"))
+
+UNRESTRICTED = "unrestricted"  # Key of clients created without an agent type
+
+
+class ClaudeCallCancelled(Exception):
+    """A queued claude call was dropped by cancel_pending before it started"""
+
+
+class CallPriority(Enum):
+    """Queue priority of a claude call; lower values start first"""
+    CRITICAL = 1
+    HIGH = 2        # GREEN phase implementation, failing tests waiting on it
+    NORMAL = 3
+    LOW = 4         # Documentation, design and other work nothing waits on
+
+
+# Default priority of each agent type's calls
+AGENT_PRIORITIES = {
+    AgentType.ORCHESTRATOR: CallPriority.NORMAL,
+    AgentType.CODE: CallPriority.HIGH,
+    AgentType.QA: CallPriority.NORMAL,
+    AgentType.DATA: CallPriority.NORMAL,
+    AgentType.DESIGN: CallPriority.LOW,
+}
+
+# Priority of calls made for a TDD phase, keyed by TDDState value
+TDD_PHASE_PRIORITIES = {
+    "code_green": CallPriority.HIGH,
+    "test_red": CallPriority.NORMAL,
+    "refactor": CallPriority.NORMAL,
+    "design": CallPriority.LOW,
+    "commit": CallPriority.LOW,
+}
+
+
+def priority_for(agent_type: Optional[AgentType] = None, tdd_phase: Any = None) -> CallPriority:
+    """
+    Priority of a call, from its TDD phase if known and else its agent type.
+    
+    Args:
+        agent_type: Type of agent making the call
+        tdd_phase: TDDState or its value
+    """
+    if tdd_phase is not None:
+        phase = getattr(tdd_phase, "value", tdd_phase)
+        if phase in TDD_PHASE_PRIORITIES:
+            return TDD_PHASE_PRIORITIES[phase]
+    return AGENT_PRIORITIES.get(agent_type, CallPriority.NORMAL)
+
+
+class LatencyHistogram:
+    """Cumulative histogram of durations with fixed buckets"""
+    
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+    
+    def observe(self, seconds: float) -> None:
+        """Record one duration"""
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+    
+    def percentile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th percentile, capped at the maximum seen"""
+        if self.count == 0:
+            return 0.0
+        rank = q / 100.0 * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary and bucket counts for status reports"""
+        return {
+            "count": self.count,
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": self.max,
+            "buckets": {
+                ("+Inf" if bound == float("inf") else str(bound)): count
+                for bound, count in zip(self.buckets, self.counts)
+            }
+        }
+
+
+@dataclass
+class _Waiter:
+    """A call waiting for a process slot"""
+    agent_key: str
+    priority: CallPriority
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+    enqueued_at: float = field(default_factory=time.monotonic)
+    granted: bool = False
+    cancelled: bool = False
+
+
+class ClaudeProcessExecutor:
+    """
+    Limits concurrent claude processes across all clients in the process.
+    
+    A call holds a slot from before its process is spawned until the process
+    has exited. Slots are granted in priority order, first come first served
+    within a priority, skipping calls whose agent type is at its sub-limit so
+    they do not hold up other types. State is guarded by a lock and waiters
+    are woken on their own event loop, so clients on different loops or
+    threads share the limits.
+    """
+    
+    def __init__(self, max_concurrent: Optional[int] = None, agent_limits: Optional[Dict[AgentType, int]] = None):
+        """
+        Initialize the executor.
+        
+        Args:
+            max_concurrent: Claude processes allowed at once; defaults to
+                CLAUDE_MAX_CONCURRENT or the number of CPUs, at most 8
+            agent_limits: Processes allowed at once per agent type; by default
+                design and data work may use at most half the slots
+        """
+        if max_concurrent is None:
+            max_concurrent = int(os.getenv("CLAUDE_MAX_CONCURRENT", "0")) or min(8, os.cpu_count() or 1)
+        self.max_concurrent = max(1, max_concurrent)
+        if agent_limits is None:
+            half = max(1, self.max_concurrent // 2)
+            agent_limits = {AgentType.DESIGN: half, AgentType.DATA: half}
+        self.agent_limits = {self._key(agent_type): max(1, limit) for agent_type, limit in agent_limits.items()}
+        
+        self._lock = threading.Lock()
+        self._sequence = itertools.count()
+        self._queue: List[Tuple[int, int, _Waiter]] = []
+        self._running = 0
+        self._running_by_agent: Dict[str, int] = {}
+        self.queue_wait = LatencyHistogram()
+        self.run_time = LatencyHistogram()
+        self.completed = 0
+        self.cancelled = 0
+    
+    @asynccontextmanager
+    async def slot(
+        self,
+        agent_type: Optional[AgentType] = None,
+        priority: CallPriority = CallPriority.NORMAL
+    ) -> AsyncIterator[None]:
+        """
+        Hold a process slot for the body of the block.
+        
+        Waits in the queue until a slot is free. Time spent waiting is not
+        part of the block, so callers apply their timeouts to run time only.
+        
+        Args:
+            agent_type: Type of agent making the call, for its sub-limit
+            priority: Queue priority of the call
+        """
+        agent_key = self._key(agent_type)
+        await self._acquire(agent_key, priority)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.run_time.observe(time.monotonic() - started)
+            self._release(agent_key)
+    
+    def cancel_pending(self, agent_type: Optional[AgentType] = None) -> int:
+        """
+        Cancel calls still waiting for a slot.
+        
+        The cancelled calls raise ClaudeCallCancelled, an ordinary exception,
+        so callers' error handling covers them and their tasks are not left
+        looking cancelled.
+        
+        Args:
+            agent_type: Only cancel calls of this agent type
+        
+        Returns:
+            Number of calls cancelled
+        """
+        agent_key = self._key(agent_type) if agent_type is not None else None
+        cancelled = []
+        with self._lock:
+            for _, _, waiter in self._queue:
+                if not waiter.granted and not waiter.cancelled and agent_key in (None, waiter.agent_key):
+                    waiter.cancelled = True
+                    cancelled.append(waiter)
+            self._queue = [entry for entry in self._queue if not entry[2].cancelled]
+            heapq.heapify(self._queue)
+            self.cancelled += len(cancelled)
+        
+        for waiter in cancelled:
+            self._wake(waiter, cancel=True)
+        return len(cancelled)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Current load and latency histograms"""
+        with self._lock:
+            queued_by_priority: Dict[str, int] = {}
+            for _, _, waiter in self._queue:
+                name = waiter.priority.name.lower()
+                queued_by_priority[name] = queued_by_priority.get(name, 0) + 1
+            return {
+                "max_concurrent": self.max_concurrent,
+                "agent_limits": dict(self.agent_limits),
+                "running": self._running,
+                "running_by_agent": dict(self._running_by_agent),
+                "queued": len(self._queue),
+                "queued_by_priority": queued_by_priority,
+                "completed": self.completed,
+                "cancelled": self.cancelled,
+                "queue_wait_seconds": self.queue_wait.to_dict(),
+                "run_time_seconds": self.run_time.to_dict()
+            }
+    
+    async def _acquire(self, agent_key: str, priority: CallPriority) -> None:
+        """Wait until a slot is granted"""
+        loop = asyncio.get_running_loop()
+        waiter = _Waiter(agent_key=agent_key, priority=priority, loop=loop, future=loop.create_future())
+        with self._lock:
+            heapq.heappush(self._queue, (priority.value, next(self._sequence), waiter))
+            granted = self._dispatch_locked()
+        for other in granted:
+            self._wake(other)
+        
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            with self._lock:
+                waiter.cancelled = True
+                self.cancelled += 1
+                if waiter.granted:
+                    # Granted while being cancelled: hand the slot on
+                    self._running -= 1
+                    self._running_by_agent[agent_key] -= 1
+                else:
+                    self._queue = [entry for entry in self._queue if entry[2] is not waiter]
+                    heapq.heapify(self._queue)
+                granted = self._dispatch_locked()
+            for other in granted:
+                self._wake(other)
+            raise
+        
+        wait = time.monotonic() - waiter.enqueued_at
+        self.queue_wait.observe(wait)
+        if wait > 1.0:
+            logger.debug(f"Claude call ({agent_key}, {priority.name}) waited {wait:.1f}s for a process slot")
+    
+    def _release(self, agent_key: str) -> None:
+        """Free a slot and start the next waiting calls"""
+        with self._lock:
+            self._running -= 1
+            self._running_by_agent[agent_key] -= 1
+            self.completed += 1
+            granted = self._dispatch_locked()
+        for waiter in granted:
+            self._wake(waiter)
+    
+    def _dispatch_locked(self) -> List[_Waiter]:
+        """Grant free slots to waiting calls in priority order; caller holds the lock"""
+        if self._running >= self.max_concurrent or not self._queue:
+            return []
+        
+        granted = []
+        remaining = []
+        for entry in sorted(self._queue):
+            waiter = entry[2]
+            limit = self.agent_limits.get(waiter.agent_key, self.max_concurrent)
+            if self._running < self.max_concurrent and self._running_by_agent.get(waiter.agent_key, 0) < limit:
+                waiter.granted = True
+                self._running += 1
+                self._running_by_agent[waiter.agent_key] = self._running_by_agent.get(waiter.agent_key, 0) + 1
+                granted.append(waiter)
+            else:
+                remaining.append(entry)
+        
+        if granted:
+            self._queue = remaining  # Sorted, so already a heap
+        return granted
+    
+    def _wake(self, waiter: _Waiter, cancel: bool = False) -> None:
+        """Resolve a waiter's future on its own event loop"""
+        def resolve() -> None:
+            if not waiter.future.done():
+                if cancel:
+                    waiter.future.set_exception(ClaudeCallCancelled(
+                        f"Queued {waiter.agent_key} call cancelled before it started"
+                    ))
+                else:
+                    waiter.future.set_result(None)
+        
+        try:
+            waiter.loop.call_soon_threadsafe(resolve)
+        except RuntimeError:
+            # The waiter's loop is closed; it will never run the call
+            if not cancel:
+                self._release(waiter.agent_key)
+    
+    @staticmethod
+    def _key(agent_type: Optional[AgentType]) -> str:
+        return agent_type.value if agent_type is not None else UNRESTRICTED
+
+
+# Executor shared by all clients in the process
+claude_executor = ClaudeProcessExecutor()
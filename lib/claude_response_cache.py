@@ -0,0 +1,291 @@
+"""
+Claude Response Cache
+
+Opt-in, content-addressed disk cache of claude CLI responses. Agents retry
+failed tasks, recovered pool agents redo their last task and parallel cycles
+ask for the same reviews, all with byte-identical prompts. Responses are
+keyed by the tool-restriction arguments and the prompt, so a cached answer
+is only reused by a client with the same tool access. Entries expire after
+a per-method TTL and the least recently used are evicted once the cache
+exceeds its size limit. Last use is the file's modification time, so
+recency survives restarts and is shared by processes using the same
+directory.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CacheRule:
+    """Whether and for how long responses of a client method are reused"""
+    cacheable: bool = True
+    ttl_seconds: float = 3600.0
+
+
+# Reviews and analyses of unchanged input stay valid for a day; generated
+# code and tests are reused within an hour, which covers retries and recovery
+DEFAULT_CACHE_RULES = {
+    "generate_code": CacheRule(ttl_seconds=3600.0),
+    "generate_tests": CacheRule(ttl_seconds=3600.0),
+    "analyze_code": CacheRule(ttl_seconds=86400.0),
+    "create_architecture": CacheRule(ttl_seconds=86400.0),
+    "analyze_data": CacheRule(ttl_seconds=86400.0),
+}
+
+
+@dataclass
+class ResponseCacheStatistics:
+    """Response cache effectiveness"""
+    hits: int = 0
+    misses: int = 0
+    stores: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    saved_seconds: float = 0.0  # claude run time the hits did not spend again
+    
+    @property
+    def hit_rate(self) -> float:
+        """Fraction of lookups answered from the cache"""
+        total = self.hits + self.misses
+        return self.hits / total if total > 0 else 0.0
+
+
+class ClaudeResponseCache:
+    """
+    Size-bounded LRU cache of claude responses on disk.
+    
+    Each entry is a JSON file named by its key under a two-character fan-out
+    directory. The index of sizes and last use is built once, by the first
+    call, from a scan of the directory. Lookups and stores read and write
+    files, so all methods are synchronous and thread-safe and async callers
+    run them via asyncio.to_thread.
+    """
+    
+    def __init__(
+        self,
+        cache_dir: str,
+        max_size_mb: float = 100.0,
+        rules: Optional[Dict[str, CacheRule]] = None
+    ):
+        """
+        Initialize the response cache.
+        
+        Args:
+            cache_dir: Directory holding the cache entries
+            max_size_mb: Total size of entries kept before evicting
+            rules: Cacheability and TTL per client method; methods without a
+                rule are not cached
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        self.rules = dict(DEFAULT_CACHE_RULES if rules is None else rules)
+        self.stats = ResponseCacheStatistics()
+        
+        self._lock = threading.Lock()
+        self._index: Optional[OrderedDict] = None  # key -> size in bytes, least recently used first
+        self._total_size = 0
+    
+    def is_cacheable(self, method: str) -> bool:
+        """Whether responses of a client method are cached"""
+        rule = self.rules.get(method)
+        return rule is not None and rule.cacheable
+    
+    def make_key(self, tool_args: List[str], prompt: str) -> str:
+        """Content address of a call: the tool restrictions and the prompt"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(list(tool_args)).encode())
+        digest.update(b"\0")
+        digest.update(prompt.encode())
+        return digest.hexdigest()
+    
+    def get(self, method: str, key: str) -> Optional[str]:
+        """
+        Look up a response.
+        
+        Args:
+            method: Client method making the call, for its TTL
+            key: Key from make_key
+        
+        Returns:
+            Cached response, or None on a miss or expired entry
+        """
+        if not self.is_cacheable(method):
+            return None
+        
+        with self._lock:
+            self._load_index()
+            entry = self._read_entry(key)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            
+            if time.time() - entry.get("created_at", 0) > self.rules[method].ttl_seconds:
+                self._remove(key)
+                self.stats.expirations += 1
+                self.stats.misses += 1
+                return None
+            
+            # Mark as most recently used, on disk for other processes too
+            self._index.move_to_end(key)
+            try:
+                os.utime(self._path(key))
+            except OSError:
+                pass
+            
+            self.stats.hits += 1
+            self.stats.saved_seconds += entry.get("run_seconds", 0.0)
+            return entry["response"]
+    
+    def put(self, method: str, key: str, response: str, run_seconds: float = 0.0) -> bool:
+        """
+        Store a response.
+        
+        Args:
+            method: Client method that made the call
+            key: Key from make_key
+            response: Response to cache
+            run_seconds: How long claude took, credited to later hits
+        
+        Returns:
+            True if the response was stored
+        """
+        if not self.is_cacheable(method) or not response:
+            return False
+        
+        data = json.dumps({
+            "method": method,
+            "created_at": time.time(),
+            "run_seconds": run_seconds,
+            "response": response
+        }).encode()
+        if len(data) > self.max_size_bytes:
+            return False
+        
+        with self._lock:
+            self._load_index()
+            path = self._path(key)
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # Write then rename so readers never see a partial entry
+                tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+                tmp_path.write_bytes(data)
+                os.replace(tmp_path, path)
+            except OSError as e:
+                logger.warning(f"Could not write claude response cache entry: {str(e)}")
+                return False
+            
+            self._total_size += len(data) - self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self.stats.stores += 1
+            self._evict_to_size()
+            return True
+    
+    def clear(self) -> None:
+        """Remove all entries"""
+        with self._lock:
+            self._load_index()
+            for key in list(self._index):
+                self._remove(key)
+    
+    def get_statistics(self) -> Dict[str, float]:
+        """Hit rate, saved time and size of the cache"""
+        with self._lock:
+            self._load_index()
+            return {
+                "hits": self.stats.hits,
+                "misses": self.stats.misses,
+                "hit_rate": self.stats.hit_rate,
+                "saved_seconds": self.stats.saved_seconds,
+                "stores": self.stats.stores,
+                "evictions": self.stats.evictions,
+                "expirations": self.stats.expirations,
+                "entries": len(self._index),
+                "size_bytes": self._total_size
+            }
+    
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.json"
+    
+    def _load_index(self) -> None:
+        """Build the LRU index from the entries on disk, oldest use first"""
+        if self._index is not None:
+            return
+        
+        entries: List[Tuple[float, str, int]] = []
+        if self.cache_dir.is_dir():
+            for path in self.cache_dir.glob("*/*.json"):
+                try:
+                    stat = path.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, path.stem, stat.st_size))
+        
+        entries.sort()
+        self._index = OrderedDict((key, size) for _, key, size in entries)
+        self._total_size = sum(self._index.values())
+        self._evict_to_size()
+    
+    def _read_entry(self, key: str) -> Optional[dict]:
+        """Read an entry, dropping it from the index if it is gone or corrupt"""
+        try:
+            data = self._path(key).read_bytes()
+            entry = json.loads(data)
+            if isinstance(entry, dict) and isinstance(entry.get("response"), str):
+                if key not in self._index:
+                    # Written by another process sharing the directory
+                    self._index[key] = len(data)
+                    self._total_size += len(data)
+                return entry
+        except FileNotFoundError:
+            self._total_size -= self._index.pop(key, 0)
+            return None
+        except (OSError, ValueError):
+            pass
+        self._remove(key)
+        return None
+    
+    def _remove(self, key: str) -> None:
+        self._total_size -= self._index.pop(key, 0)
+        try:
+            self._path(key).unlink()
+        except OSError:
+            pass
+    
+    def _evict_to_size(self) -> None:
+        """Evict least recently used entries until the cache fits its size limit"""
+        while self._total_size > self.max_size_bytes and self._index:
+            key = next(iter(self._index))
+            self._remove(key)
+            self.stats.evictions += 1
+
+
+_default_cache: Optional[ClaudeResponseCache] = None
+
+
+def default_response_cache() -> Optional[ClaudeResponseCache]:
+    """
+    Process-wide cache for clients created without one.
+    
+    Enabled by setting CLAUDE_RESPONSE_CACHE_DIR; CLAUDE_RESPONSE_CACHE_MB
+    sets its size limit.
+    """
+    global _default_cache
+    cache_dir = os.getenv("CLAUDE_RESPONSE_CACHE_DIR")
+    if not cache_dir:
+        return None
+    if _default_cache is None or _default_cache.cache_dir != Path(cache_dir):
+        _default_cache = ClaudeResponseCache(
+            cache_dir, max_size_mb=float(os.getenv("CLAUDE_RESPONSE_CACHE_MB", "100"))
+        )
+    return _default_cache
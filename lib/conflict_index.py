@@ -0,0 +1,231 @@
+"""
+Conflict Index
+
+Inverted indexes used by the conflict resolver to find conflicting cycles
+without comparing every pair of modifications. Each file keeps a map from
+modified symbol (function, class or import) to the cycles touching it and an
+interval tree of modified line ranges, so checking a new modification costs
+O(touched symbols + log n) instead of a scan over all earlier modifications.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class _IntervalNode:
+    """Node of an augmented AVL interval tree"""
+    __slots__ = ("start", "end", "value", "max_end", "height", "left", "right")
+    
+    def __init__(self, start: int, end: int, value: Any):
+        self.start = start
+        self.end = end
+        self.value = value
+        self.max_end = end
+        self.height = 1
+        self.left: Optional["_IntervalNode"] = None
+        self.right: Optional["_IntervalNode"] = None
+
+
+class IntervalTree:
+    """
+    Interval tree over closed integer intervals.
+    
+    An AVL tree ordered by interval start where every node also records the
+    largest end in its subtree, giving O(log n) insertion and O(log n + k)
+    overlap queries.
+    """
+    
+    def __init__(self):
+        self._root: Optional[_IntervalNode] = None
+        self._size = 0
+    
+    def __len__(self) -> int:
+        return self._size
+    
+    def insert(self, start: int, end: int, value: Any) -> None:
+        """Insert the closed interval [start, end]"""
+        if end < start:
+            start, end = end, start
+        self._root = self._insert(self._root, start, end, value)
+        self._size += 1
+    
+    def overlapping(self, start: int, end: int) -> List[Any]:
+        """Get the values of intervals overlapping [start, end]"""
+        if end < start:
+            start, end = end, start
+        
+        values = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            # Nothing in this subtree reaches the query start
+            if node is None or node.max_end < start:
+                continue
+            stack.append(node.left)
+            # Nodes to the right start even later than this one
+            if node.start <= end:
+                if node.end >= start:
+                    values.append(node.value)
+                stack.append(node.right)
+        return values
+    
+    def _insert(self, node: Optional[_IntervalNode], start: int, end: int, value: Any) -> _IntervalNode:
+        if node is None:
+            return _IntervalNode(start, end, value)
+        
+        if start < node.start:
+            node.left = self._insert(node.left, start, end, value)
+        else:
+            node.right = self._insert(node.right, start, end, value)
+        
+        return self._rebalance(node)
+    
+    @staticmethod
+    def _height(node: Optional[_IntervalNode]) -> int:
+        return node.height if node else 0
+    
+    def _update(self, node: _IntervalNode) -> None:
+        node.height = 1 + max(self._height(node.left), self._height(node.right))
+        node.max_end = node.end
+        if node.left and node.left.max_end > node.max_end:
+            node.max_end = node.left.max_end
+        if node.right and node.right.max_end > node.max_end:
+            node.max_end = node.right.max_end
+    
+    def _rotate_left(self, node: _IntervalNode) -> _IntervalNode:
+        pivot = node.right
+        node.right = pivot.left
+        pivot.left = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+    
+    def _rotate_right(self, node: _IntervalNode) -> _IntervalNode:
+        pivot = node.left
+        node.left = pivot.right
+        pivot.right = node
+        self._update(node)
+        self._update(pivot)
+        return pivot
+    
+    def _rebalance(self, node: _IntervalNode) -> _IntervalNode:
+        self._update(node)
+        balance = self._height(node.left) - self._height(node.right)
+        
+        if balance > 1:
+            if self._height(node.left.left) < self._height(node.left.right):
+                node.left = self._rotate_left(node.left)
+            return self._rotate_right(node)
+        
+        if balance < -1:
+            if self._height(node.right.right) < self._height(node.right.left):
+                node.right = self._rotate_right(node.right)
+            return self._rotate_left(node)
+        
+        return node
+
+
+class FileConflictIndex:
+    """
+    Conflict index for the modifications of one file.
+    
+    Wraps the file's modification list (the same list object the resolver
+    stores) and indexes each modification as it is added. Two cycles conflict
+    on the file when any of their modifications overlap in line range or
+    modify the same function, class or import.
+    """
+    
+    def __init__(self, modifications: Optional[List[Any]] = None):
+        self.modifications: List[Any] = modifications if modifications is not None else []
+        
+        # (kind, name) -> cycle IDs modifying it (dicts used as ordered sets)
+        self._symbols: Dict[Tuple[str, str], Dict[str, None]] = {}
+        self._lines = IntervalTree()
+        
+        # Cycle -> order of its first modification; conflicting pairs in that order
+        self._cycle_order: Dict[str, int] = {}
+        self._pairs: Dict[Tuple[str, str], None] = {}
+        
+        self._indexed = 0
+        for modification in self.modifications:
+            self._index(modification)
+    
+    def tracks(self, modifications: List[Any]) -> bool:
+        """Check if the index is still built over the given modification list"""
+        return (
+            modifications is self.modifications
+            and len(modifications) >= self._indexed
+        )
+    
+    def sync(self) -> None:
+        """Index modifications appended to the list since the last call"""
+        while self._indexed < len(self.modifications):
+            self._index(self.modifications[self._indexed])
+    
+    def add(self, modification: Any) -> List[str]:
+        """
+        Append and index a modification.
+        
+        Returns:
+            IDs of other cycles whose modifications conflict with this one
+        """
+        self.sync()
+        self.modifications.append(modification)
+        return self._index(modification)
+    
+    def conflicting_cycles(self, modification: Any) -> List[str]:
+        """Get the other cycles with modifications conflicting with one modification"""
+        cycles: Dict[str, None] = {}
+        
+        for start, end in modification.line_ranges:
+            for cycle_id in self._lines.overlapping(start, end):
+                cycles[cycle_id] = None
+        
+        for key in self._symbol_keys(modification):
+            cycles.update(self._symbols.get(key, {}))
+        
+        cycles.pop(modification.cycle_id, None)
+        return list(cycles)
+    
+    def cycles_conflict(self, cycle1: str, cycle2: str) -> bool:
+        """Check if two cycles conflict on this file"""
+        return self.ordered_pair(cycle1, cycle2) in self._pairs
+    
+    def conflict_pairs(self) -> List[Tuple[str, str]]:
+        """Get conflicting cycle pairs, ordered by each cycle's first modification"""
+        return sorted(
+            self._pairs,
+            key=lambda pair: (self._cycle_order[pair[0]], self._cycle_order[pair[1]])
+        )
+    
+    def ordered_pair(self, cycle1: str, cycle2: str) -> Tuple[str, str]:
+        """Order two cycles by their first modification of the file"""
+        order = self._cycle_order
+        if order.get(cycle1, len(order)) <= order.get(cycle2, len(order)):
+            return cycle1, cycle2
+        return cycle2, cycle1
+    
+    def _index(self, modification: Any) -> List[str]:
+        """Record a modification, returning the cycles it conflicts with"""
+        conflicting = self.conflicting_cycles(modification)
+        
+        cycle_id = modification.cycle_id
+        self._cycle_order.setdefault(cycle_id, len(self._cycle_order))
+        for other_cycle_id in conflicting:
+            self._pairs[self.ordered_pair(cycle_id, other_cycle_id)] = None
+        
+        for start, end in modification.line_ranges:
+            self._lines.insert(start, end, cycle_id)
+        for key in self._symbol_keys(modification):
+            self._symbols.setdefault(key, {})[cycle_id] = None
+        
+        self._indexed += 1
+        return conflicting
+    
+    @staticmethod
+    def _symbol_keys(modification: Any) -> Iterable[Tuple[str, str]]:
+        for name in modification.functions_modified:
+            yield ("function", name)
+        for name in modification.classes_modified:
+            yield ("class", name)
+        for name in modification.imports_modified:
+            yield ("import", name)
@@ -24,10 +24,18 @@ try:
     from .tdd_models import TDDState, TDDCycle, TDDTask
     from .context_manager import ContextManager
     from .agents import BaseAgent
+    from .file_lock_manager import FileLockManager, LockMode, LockTimeoutError, DeadlockError
+    from .conflict_index import FileConflictIndex
+    from .change_analysis import analyze_changes
+    from .three_way_merge import three_way_merge
 except ImportError:
     from tdd_models import TDDState, TDDCycle, TDDTask
     from context_manager import ContextManager
     from agents import BaseAgent
+    from file_lock_manager import FileLockManager, LockMode, LockTimeoutError, DeadlockError
+    from conflict_index import FileConflictIndex
+    from change_analysis import analyze_changes
+    from three_way_merge import three_way_merge
 
 logger = logging.getLogger(__name__)
 
@@ -142,7 +150,9 @@ class ConflictResolver:
         enable_auto_resolution: bool = True,
         enable_semantic_analysis: bool = True,
         resolution_timeout_seconds: int = 300,
-        max_resolution_attempts: int = 3
+        max_resolution_attempts: int = 3,
+        lock_manager: Optional[FileLockManager] = None,
+        merge_lock_timeout_seconds: float = 30.0
     ):
         """
         Initialize Conflict Resolver.
@@ -155,6 +165,9 @@ class ConflictResolver:
             enable_semantic_analysis: Enable semantic conflict analysis
             resolution_timeout_seconds: Timeout for resolution attempts
             max_resolution_attempts: Maximum resolution attempts per conflict
+            lock_manager: File lock manager shared with the parallel coordinator
+            merge_lock_timeout_seconds: Time to wait for a file lock before an
+                automatic merge gives up
         """
         self.context_manager = context_manager
         self.project_path = Path(project_path)
@@ -163,19 +176,24 @@ class ConflictResolver:
         self.enable_semantic_analysis = enable_semantic_analysis
         self.resolution_timeout = resolution_timeout_seconds
         self.max_resolution_attempts = max_resolution_attempts
+        self.lock_manager = lock_manager
+        self.merge_lock_timeout = merge_lock_timeout_seconds
         
         # Conflict tracking
         self.active_conflicts: Dict[str, Conflict] = {}
         self.resolved_conflicts: Dict[str, Conflict] = {}
         self.file_modifications: Dict[str, List[FileModification]] = {}  # file_path -> modifications
+        self._conflict_indexes: Dict[str, FileConflictIndex] = {}  # file_path -> symbol/line index
+        self._base_snapshots: Dict[str, Dict[str, str]] = {}  # file_path -> cycle_id -> base content
+        self._cycle_versions: Dict[str, Dict[str, str]] = {}  # file_path -> cycle_id -> content as last recorded
         self.cycle_dependencies: Dict[str, Set[str]] = {}  # cycle_id -> dependency cycle_ids
         
         # Resolution strategies
         self.resolution_strategies: Dict[ConflictType, List[ResolutionStrategy]] = {
             ConflictType.FILE_MODIFICATION: [
+                ResolutionStrategy.AUTO_RESOLVE,
                 ResolutionStrategy.COORDINATION,
-                ResolutionStrategy.SERIALIZATION,
-                ResolutionStrategy.AUTO_RESOLVE
+                ResolutionStrategy.SERIALIZATION
             ],
             ConflictType.DEPENDENCY_VIOLATION: [
                 ResolutionStrategy.SERIALIZATION,
@@ -282,21 +300,110 @@ class ConflictResolver:
         )
         
         # Analyze file content for detailed modification info
-        if self.enable_semantic_analysis and Path(file_path).exists():
+        if self.enable_semantic_analysis:
             await self._analyze_file_modifications(modification)
         
-        # Store modification
+        # Store and index the modification
         if file_path not in self.file_modifications:
             self.file_modifications[file_path] = []
-        self.file_modifications[file_path].append(modification)
+        conflict_index = self._get_conflict_index(file_path)
+        conflicting_cycles = conflict_index.add(modification)
         
-        # Check for immediate conflicts
-        conflicts = await self._detect_file_conflicts(file_path)
-        for conflict in conflicts:
+        # Check for immediate conflicts (only cycles touching the same symbols or lines)
+        for other_cycle_id in conflicting_cycles:
+            conflict = await self._create_file_conflict(
+                file_path, *conflict_index.ordered_pair(cycle_id, other_cycle_id)
+            )
             await self._handle_detected_conflict(conflict)
         
         logger.debug(f"Registered {modification_type} for {file_path} by cycle {cycle_id}")
     
+    async def capture_base_snapshots(self, cycle_id: str, file_paths: List[str]) -> None:
+        """
+        Record the content of files before a cycle modifies them.
+        
+        Modifications registered later are diffed against these snapshots so
+        that only the lines and symbols the cycle actually changed are tracked.
+        A snapshot already taken for the cycle is kept.
+        
+        Args:
+            cycle_id: ID of the TDD cycle about to modify the files
+            file_paths: Paths of the files the cycle will modify
+        """
+        for file_path in file_paths:
+            snapshots = self._base_snapshots.setdefault(file_path, {})
+            if cycle_id in snapshots:
+                continue
+            
+            try:
+                if Path(file_path).exists():
+                    with open(file_path, 'r', encoding='utf-8', newline='') as f:
+                        snapshots[cycle_id] = f.read()
+                else:
+                    snapshots[cycle_id] = ""  # File will be created
+            except Exception as e:
+                logger.debug(f"Failed to snapshot file {file_path}: {str(e)}")
+    
+    async def record_cycle_version(self, cycle_id: str, file_path: str) -> None:
+        """
+        Record a cycle's version of a file after a phase that wrote it.
+        
+        The version becomes the cycle's input to three-way merges, and the
+        cycle's modification of the file is re-analyzed against its base
+        snapshot, so conflicts reflect the lines and symbols it actually
+        changed rather than the whole file it declared. A file left unchanged
+        is dropped from the cycle's modifications. Versions of other cycles
+        that do not conflict with this one are merged straight away, so
+        writing the file does not discard their changes.
+        
+        Args:
+            cycle_id: ID of the TDD cycle that completed a phase
+            file_path: Path of a file the cycle declared it would modify
+        """
+        base = self._base_snapshots.get(file_path, {}).get(cycle_id)
+        content = self._read_text(file_path) if Path(file_path).exists() else ""
+        if base is None or content is None:
+            return
+        
+        modifications = self.file_modifications.get(file_path, [])
+        previous = [m for m in modifications if m.cycle_id == cycle_id]
+        if previous:
+            # A replaced list makes the conflict index rebuild without the old entries
+            self.file_modifications[file_path] = [m for m in modifications if m.cycle_id != cycle_id]
+        
+        if content == base:
+            self._cycle_versions.get(file_path, {}).pop(cycle_id, None)
+            return
+        
+        self._cycle_versions.setdefault(file_path, {})[cycle_id] = content
+        await self.register_file_modification(
+            file_path,
+            cycle_id,
+            previous[0].story_id if previous else "",
+            previous[-1].modification_type if previous else "modify"
+        )
+        
+        conflict_index = self._get_conflict_index(file_path)
+        compatible = {
+            other_cycle_id for other_cycle_id in self._cycle_versions.get(file_path, {})
+            if other_cycle_id != cycle_id and not conflict_index.cycles_conflict(cycle_id, other_cycle_id)
+        }
+        if compatible and not await self._auto_merge_file(file_path, compatible | {cycle_id}):
+            logger.info(f"Could not merge cycle {cycle_id}'s version of {file_path} with {sorted(compatible)}")
+    
+    def cycle_files(self, cycle_id: str) -> List[str]:
+        """Get the files a cycle has base snapshots for"""
+        return [file_path for file_path, snapshots in self._base_snapshots.items() if cycle_id in snapshots]
+    
+    def release_base_snapshots(self, cycle_id: str) -> None:
+        """Drop the base snapshots and recorded versions of a finished cycle"""
+        for snapshot_map in (self._base_snapshots, self._cycle_versions):
+            for file_path in list(snapshot_map):
+                snapshots = snapshot_map[file_path]
+                snapshots.pop(cycle_id, None)
+                if not snapshots:
+                    del snapshot_map[file_path]
+    
     async def register_cycle_dependency(self, cycle_id: str, dependency_cycle_id: str) -> None:
         """Register a dependency between cycles"""
         if cycle_id not in self.cycle_dependencies:
@@ -512,53 +619,35 @@ class ConflictResolver:
     
     # Private conflict detection methods
     
-    async def _detect_file_conflicts(self, file_path: str) -> List[Conflict]:
-        """Detect conflicts for a specific file"""
-        conflicts = []
+    def _get_conflict_index(self, file_path: str) -> FileConflictIndex:
+        """Get the conflict index of a file, synced with its modification list"""
         modifications = self.file_modifications.get(file_path, [])
+        conflict_index = self._conflict_indexes.get(file_path)
         
-        if len(modifications) < 2:
-            return conflicts
+        # Rebuild if the modification list was replaced rather than appended to
+        if conflict_index is None or not conflict_index.tracks(modifications):
+            conflict_index = FileConflictIndex(modifications)
+            if file_path in self.file_modifications:
+                self._conflict_indexes[file_path] = conflict_index
+        else:
+            conflict_index.sync()
         
-        # Group modifications by cycle
-        cycle_modifications = {}
-        for mod in modifications:
-            if mod.cycle_id not in cycle_modifications:
-                cycle_modifications[mod.cycle_id] = []
-            cycle_modifications[mod.cycle_id].append(mod)
+        return conflict_index
+    
+    async def _detect_file_conflicts(self, file_path: str) -> List[Conflict]:
+        """Detect conflicts for a specific file"""
+        conflicts = []
         
-        # Check for conflicts between different cycles
-        cycle_ids = list(cycle_modifications.keys())
-        for i, cycle1 in enumerate(cycle_ids):
-            for cycle2 in cycle_ids[i+1:]:
-                if await self._cycles_conflict_on_file(file_path, cycle1, cycle2):
-                    conflict = await self._create_file_conflict(file_path, cycle1, cycle2)
-                    conflicts.append(conflict)
+        # Pairs of cycles whose modifications overlap in lines or symbols
+        for cycle1, cycle2 in self._get_conflict_index(file_path).conflict_pairs():
+            conflict = await self._create_file_conflict(file_path, cycle1, cycle2)
+            conflicts.append(conflict)
         
         return conflicts
     
     async def _cycles_conflict_on_file(self, file_path: str, cycle1: str, cycle2: str) -> bool:
         """Check if two cycles conflict on a specific file"""
-        mods1 = [m for m in self.file_modifications[file_path] if m.cycle_id == cycle1]
-        mods2 = [m for m in self.file_modifications[file_path] if m.cycle_id == cycle2]
-        
-        # Check for overlapping modifications
-        for mod1 in mods1:
-            for mod2 in mods2:
-                # Check for line range overlaps
-                if await self._line_ranges_overlap(mod1.line_ranges, mod2.line_ranges):
-                    return True
-                
-                # Check for function/class conflicts
-                if (set(mod1.functions_modified) & set(mod2.functions_modified) or
-                    set(mod1.classes_modified) & set(mod2.classes_modified)):
-                    return True
-                
-                # Check for import conflicts
-                if set(mod1.imports_modified) & set(mod2.imports_modified):
-                    return True
-        
-        return False
+        return self._get_conflict_index(file_path).cycles_conflict(cycle1, cycle2)
     
     async def _line_ranges_overlap(
         self, 
@@ -910,35 +999,23 @@ class ConflictResolver:
     async def _analyze_file_modifications(self, modification: FileModification) -> None:
         """Analyze file for detailed modification information"""
         try:
-            if not Path(modification.file_path).exists():
-                return
+            content = ""
+            if Path(modification.file_path).exists():
+                with open(modification.file_path, 'r', encoding='utf-8', newline='') as f:
+                    content = f.read()
             
-            with open(modification.file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            # Diff against the cycle's base snapshot and map changed hunks onto
+            # AST spans; without a snapshot the whole file counts as modified
+            base = self._base_snapshots.get(modification.file_path, {}).get(modification.cycle_id)
+            if base == content:
+                # Not written yet: a file the cycle only declared counts as modified as a whole
+                base = None
+            changes = analyze_changes(base, content, is_python=modification.file_path.endswith('.py'))
             
-            # Simple analysis for Python files
-            if modification.file_path.endswith('.py'):
-                lines = content.split('\n')
-                
-                for i, line in enumerate(lines):
-                    line = line.strip()
-                    
-                    # Detect function definitions
-                    if line.startswith('def '):
-                        func_name = line.split('(')[0].replace('def ', '')
-                        modification.functions_modified.append(func_name)
-                    
-                    # Detect class definitions
-                    elif line.startswith('class '):
-                        class_name = line.split('(')[0].split(':')[0].replace('class ', '')
-                        modification.classes_modified.append(class_name)
-                    
-                    # Detect imports
-                    elif line.startswith('import ') or line.startswith('from '):
-                        modification.imports_modified.append(line)
-                
-                # For now, assume entire file is modified
-                modification.line_ranges = [(1, len(lines))]
+            modification.line_ranges = changes.line_ranges
+            modification.functions_modified.extend(changes.functions)
+            modification.classes_modified.extend(changes.classes)
+            modification.imports_modified.extend(changes.imports)
         
         except Exception as e:
             logger.debug(f"Failed to analyze file {modification.file_path}: {str(e)}")
@@ -969,19 +1046,96 @@ class ConflictResolver:
     
     async def _auto_merge_file(self, file_path: str, cycle_ids: Set[str]) -> bool:
         """Attempt to automatically merge file changes"""
-        # This is a simplified implementation
-        # In a real system, this would use sophisticated merge algorithms
+        # A merge runs under an exclusive lock unless one of the merged cycles
+        # already holds the file exclusively, which keeps other writers out
+        merge_owner = None
+        if self.lock_manager is not None and not any(
+            hold.owner in cycle_ids and hold.mode == LockMode.EXCLUSIVE
+            for hold in self.lock_manager.holders(file_path)
+        ):
+            merge_owner = f"merge:{file_path}"
+            try:
+                await self.lock_manager.acquire(
+                    merge_owner, file_path, LockMode.EXCLUSIVE, timeout=self.merge_lock_timeout
+                )
+            except (LockTimeoutError, DeadlockError) as e:
+                logger.warning(f"Auto-merge of {file_path} skipped: {e}")
+                return False
         
-        modifications = [
-            m for m in self.file_modifications.get(file_path, [])
-            if m.cycle_id in cycle_ids
-        ]
+        try:
+            bases = self._base_snapshots.get(file_path, {})
+            if not any(cycle_id in bases for cycle_id in cycle_ids):
+                # Nothing to merge against: the cycles edited the file in place,
+                # which is only accepted for a single pair of modifications
+                modifications = [
+                    m for m in self.file_modifications.get(file_path, [])
+                    if m.cycle_id in cycle_ids
+                ]
+                return len(modifications) <= 2
+            
+            return self._three_way_merge_file(file_path, cycle_ids)
+        finally:
+            if merge_owner is not None:
+                self.lock_manager.release(merge_owner, file_path)
+    
+    def _three_way_merge_file(self, file_path: str, cycle_ids: Set[str]) -> bool:
+        """
+        Merge each cycle's version of a file into its current content.
         
-        # For now, just check if modifications don't overlap significantly
-        if len(modifications) <= 2:
-            return True
+        Every version is merged against the base snapshot of the cycle that
+        produced it, so changes lost when another cycle overwrote the file are
+        restored. The file is only rewritten if every merge is clean.
+        """
+        bases = self._base_snapshots.get(file_path, {})
+        versions = self._cycle_versions.get(file_path, {})
+        
+        # Merge in the order the cycles registered their modifications
+        ordered_cycles: List[str] = []
+        for modification in self.file_modifications.get(file_path, []):
+            if modification.cycle_id in cycle_ids and modification.cycle_id not in ordered_cycles:
+                ordered_cycles.append(modification.cycle_id)
+        ordered_cycles.extend(sorted(set(cycle_ids) - set(ordered_cycles)))
+        
+        current = self._read_text(file_path)
+        if current is None:
+            return False
         
-        return False
+        merged = current
+        for cycle_id in ordered_cycles:
+            if cycle_id not in bases or cycle_id not in versions:
+                logger.debug(f"Cannot merge {file_path}: no base or version for cycle {cycle_id}")
+                return False
+            
+            result = three_way_merge(
+                bases[cycle_id], merged, versions[cycle_id], is_python=file_path.endswith('.py')
+            )
+            if not result.clean:
+                logger.info(
+                    f"Auto-merge of {file_path} failed for cycle {cycle_id}: "
+                    f"conflicting lines {result.conflicts}"
+                )
+                return False
+            merged = result.content
+        
+        if merged != current:
+            temp_path = f"{file_path}.merge-tmp"
+            with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+                f.write(merged)
+            os.replace(temp_path, file_path)
+        
+        for cycle_id in ordered_cycles:
+            versions[cycle_id] = merged
+        
+        logger.info(f"Auto-merged {len(ordered_cycles)} cycle versions of {file_path}")
+        return True
+    
+    def _read_text(self, file_path: str) -> Optional[str]:
+        """Read a text file, returning None if it cannot be read"""
+        try:
+            with open(file_path, 'r', encoding='utf-8', newline='') as f:
+                return f.read()
+        except Exception:
+            return None
     
     async def _handle_detected_conflict(self, conflict: Conflict) -> None:
         """Handle a newly detected conflict"""
@@ -9,6 +9,7 @@ from dataclasses import dataclass, field
 from typing import Dict, List, Optional, Any, Union
 from enum import Enum
 from datetime import datetime
+import heapq
 import json
 import uuid
 
@@ -317,8 +318,8 @@ class AgentMemory:
         self.updated_at = datetime.utcnow()
     
     def get_recent_decisions(self, limit: int = 10) -> List[Decision]:
-        """Get recent decisions"""
-        return sorted(self.decisions, key=lambda d: d.timestamp, reverse=True)[:limit]
+        """Get recent decisions (top-k selection, no full sort)"""
+        return heapq.nlargest(limit, self.decisions, key=lambda d: d.timestamp)
     
     def get_patterns_by_type(self, pattern_type: str) -> List[Pattern]:
         """Get patterns by type"""
@@ -183,6 +183,46 @@ class ContextIndex:
             logger.error(f"Error building index: {str(e)}")
             raise
     
+    async def update_files(self, file_paths: List[str]) -> None:
+        """
+        Re-index the given files and their dependency edges, without
+        rescanning the project.
+        
+        Files modified since they were indexed are processed again, new files
+        are added and deleted ones removed. Search indices and the cache are
+        brought up to date by the next build_index.
+        
+        Args:
+            file_paths: Files in the project, as keyed in file_nodes
+        """
+        updated = []
+        modules_changed = False
+        for file_path in file_paths:
+            path = Path(file_path)
+            node = self.file_nodes.get(file_path)
+            if self.project_path not in path.parents:
+                continue
+            if not path.is_file() or not self._should_index_file(path):
+                if node is not None:
+                    del self.file_nodes[file_path]
+                    modules_changed = True
+                continue
+            if node is not None and node.last_modified == datetime.fromtimestamp(path.stat().st_mtime):
+                continue
+            
+            await self._process_file(file_path)
+            if file_path in self.file_nodes:
+                updated.append(file_path)
+                modules_changed |= node is None
+        
+        if modules_changed:
+            # A new or removed module can change what other files' imports resolve to
+            await self._build_dependency_graph()
+        elif updated:
+            module_to_file = self._module_to_file()
+            for file_path in updated:
+                self._update_file_dependencies(file_path, module_to_file)
+    
     async def search_files(
         self,
         query: str,
@@ -754,39 +794,13 @@ class ContextIndex:
         self.dependency_graph.clear()
         self.reverse_dependency_graph.clear()
         
-        # Create mapping from module names to file paths
-        module_to_file = {}
-        for file_path, node in self.file_nodes.items():
-            if node.file_type in [FileType.PYTHON, FileType.TEST]:
-                # Extract module name from file path
-                rel_path = Path(file_path).relative_to(self.project_path)
-                module_parts = list(rel_path.parts[:-1])  # Exclude filename
-                if rel_path.name != '__init__.py':
-                    module_parts.append(rel_path.stem)
-                
-                if module_parts:
-                    module_name = '.'.join(module_parts)
-                    module_to_file[module_name] = file_path
-                
-                # Also map direct filename without extension
-                module_to_file[rel_path.stem] = file_path
+        module_to_file = self._module_to_file()
         
         # Build dependencies
         for file_path, node in self.file_nodes.items():
             if node.file_type in [FileType.PYTHON, FileType.TEST]:
                 for import_name in node.imports:
-                    # Find corresponding file
-                    target_file = None
-                    
-                    # Try exact match first
-                    if import_name in module_to_file:
-                        target_file = module_to_file[import_name]
-                    else:
-                        # Try partial matches
-                        for module_name, module_file in module_to_file.items():
-                            if import_name.startswith(module_name) or module_name.startswith(import_name):
-                                target_file = module_file
-                                break
+                    target_file = self._resolve_import(import_name, module_to_file)
                     
                     if target_file and target_file != file_path:
                         # Create dependency edge
@@ -807,6 +821,65 @@ class ContextIndex:
             node.dependencies = list(self.dependency_graph.get(file_path, set()))
             node.reverse_dependencies = list(self.reverse_dependency_graph.get(file_path, set()))
     
+    def _module_to_file(self) -> Dict[str, str]:
+        """Mapping from module names to file paths"""
+        module_to_file = {}
+        for file_path, node in self.file_nodes.items():
+            if node.file_type in [FileType.PYTHON, FileType.TEST]:
+                # Extract module name from file path
+                rel_path = Path(file_path).relative_to(self.project_path)
+                module_parts = list(rel_path.parts[:-1])  # Exclude filename
+                if rel_path.name != '__init__.py':
+                    module_parts.append(rel_path.stem)
+                
+                if module_parts:
+                    module_name = '.'.join(module_parts)
+                    module_to_file[module_name] = file_path
+                
+                # Also map direct filename without extension
+                module_to_file[rel_path.stem] = file_path
+        return module_to_file
+    
+    def _resolve_import(self, import_name: str, module_to_file: Dict[str, str]) -> Optional[str]:
+        """File an import refers to, if it is in the project"""
+        # Try exact match first
+        if import_name in module_to_file:
+            return module_to_file[import_name]
+        
+        # Try partial matches
+        for module_name, module_file in module_to_file.items():
+            if import_name.startswith(module_name) or module_name.startswith(import_name):
+                return module_file
+        return None
+    
+    def _update_file_dependencies(self, file_path: str, module_to_file: Dict[str, str]) -> None:
+        """Replace the dependency edges of one file after its imports changed"""
+        previous_targets = self.dependency_graph.pop(file_path, set())
+        for target_file in previous_targets:
+            self.reverse_dependency_graph[target_file].discard(file_path)
+        self.dependencies = [edge for edge in self.dependencies if edge.source != file_path]
+        
+        node = self.file_nodes[file_path]
+        if node.file_type in [FileType.PYTHON, FileType.TEST]:
+            for import_name in node.imports:
+                target_file = self._resolve_import(import_name, module_to_file)
+                if target_file and target_file != file_path:
+                    self.dependencies.append(DependencyEdge(
+                        source=file_path,
+                        target=target_file,
+                        import_type='import',
+                        line_number=0,
+                        strength=1.0
+                    ))
+                    self.dependency_graph[file_path].add(target_file)
+                    self.reverse_dependency_graph[target_file].add(file_path)
+        
+        node.dependencies = list(self.dependency_graph.get(file_path, set()))
+        node.reverse_dependencies = list(self.reverse_dependency_graph.get(file_path, set()))
+        for target_file in previous_targets | self.dependency_graph.get(file_path, set()):
+            if target_file in self.file_nodes:
+                self.file_nodes[target_file].reverse_dependencies = list(self.reverse_dependency_graph[target_file])
+    
     async def _build_search_indices(self) -> None:
         """Build search indices for fast lookup"""
         self.function_index.clear()
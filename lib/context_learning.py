@@ -8,13 +8,16 @@ pattern recognition, feedback analysis, and adaptive filtering strategies.
 import asyncio
 import logging
 import json
-import pickle
+import multiprocessing
+import os
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from typing import Dict, List, Optional, Any, Tuple, Set
 from datetime import datetime, timedelta
 from pathlib import Path
 from dataclasses import dataclass, field
-from collections import defaultdict, deque
+from collections import deque
 from enum import Enum
 
 try:
@@ -26,6 +29,13 @@ try:
         FileType
     )
     from .context.exceptions import ContextLearningError
+    from .context_learning_store import (
+        FeatureMatrixStore,
+        FeatureRecord,
+        FeedbackLog,
+        LazyFeatureMap,
+        PatternFile
+    )
 except ImportError:
     from context.models import (
         ContextRequest,
@@ -35,6 +45,13 @@ except ImportError:
         FileType
     )
     from context.exceptions import ContextLearningError
+    from context_learning_store import (
+        FeatureMatrixStore,
+        FeatureRecord,
+        FeedbackLog,
+        LazyFeatureMap,
+        PatternFile
+    )
 
 logger = logging.getLogger(__name__)
 
@@ -81,10 +98,38 @@ class LearningFeedback:
         """Calculate prediction error"""
         return abs(self.predicted_relevance - self.actual_relevance)
     
-    @property
     def is_accurate(self, threshold: float = 0.2) -> bool:
         """Check if prediction was accurate within threshold"""
         return self.relevance_error <= threshold
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization"""
+        return {
+            'context_id': self.context_id,
+            'agent_type': self.agent_type,
+            'story_id': self.story_id,
+            'file_path': self.file_path,
+            'predicted_relevance': self.predicted_relevance,
+            'actual_relevance': self.actual_relevance,
+            'feedback_type': self.feedback_type,
+            'timestamp': self.timestamp.isoformat(),
+            'metadata': self.metadata
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LearningFeedback':
+        """Create from dictionary"""
+        return cls(
+            context_id=data['context_id'],
+            agent_type=data['agent_type'],
+            story_id=data['story_id'],
+            file_path=data['file_path'],
+            predicted_relevance=data['predicted_relevance'],
+            actual_relevance=data['actual_relevance'],
+            feedback_type=data['feedback_type'],
+            timestamp=datetime.fromisoformat(data['timestamp']),
+            metadata=data.get('metadata', {})
+        )
 
 
 @dataclass
@@ -107,6 +152,27 @@ class FileFeatures:
     def average_relevance(self) -> float:
         """Calculate average relevance score"""
         return sum(self.relevance_history) / len(self.relevance_history) if self.relevance_history else 0.0
+    
+    def to_record(self) -> FeatureRecord:
+        """Convert to the feature store record format"""
+        return FeatureRecord(
+            file_path=self.file_path,
+            features=dict(self.features),
+            last_updated=self.last_updated,
+            access_count=self.access_count,
+            relevance_history=list(self.relevance_history)
+        )
+    
+    @classmethod
+    def from_record(cls, record: FeatureRecord) -> 'FileFeatures':
+        """Create from a feature store record"""
+        return cls(
+            file_path=record.file_path,
+            features=record.features,
+            last_updated=record.last_updated,
+            access_count=record.access_count,
+            relevance_history=record.relevance_history
+        )
 
 
 @dataclass
@@ -140,6 +206,135 @@ class LearningPattern:
                 total_weight += abs(weight)
         
         return score / total_weight if total_weight > 0 else 0.0
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for serialization"""
+        return {
+            "pattern_id": self.pattern_id,
+            "pattern_type": self.pattern_type,
+            "agent_types": sorted(self.agent_types),
+            "tdd_phases": sorted(
+                (p.value if isinstance(p, TDDState) else p for p in self.tdd_phases),
+                key=str
+            ),
+            "feature_weights": self.feature_weights,
+            "success_rate": self.success_rate,
+            "usage_count": self.usage_count,
+            "last_used": self.last_used.isoformat(),
+            "confidence": self.confidence
+        }
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'LearningPattern':
+        """Create from dictionary"""
+        tdd_phases = set()
+        for phase in data.get("tdd_phases", []):
+            try:
+                tdd_phases.add(TDDState(phase))
+            except ValueError:
+                tdd_phases.add(phase)
+        
+        return cls(
+            pattern_id=data["pattern_id"],
+            pattern_type=data["pattern_type"],
+            agent_types=set(data.get("agent_types", [])),
+            tdd_phases=tdd_phases,
+            feature_weights=data.get("feature_weights", {}),
+            success_rate=data.get("success_rate", 0.0),
+            usage_count=data.get("usage_count", 0),
+            last_used=datetime.fromisoformat(data["last_used"]) if data.get("last_used") else datetime.utcnow(),
+            confidence=data.get("confidence", 0.0)
+        )
+
+
+@dataclass
+class FeedbackGroupStats:
+    """Streaming statistics for one (agent_type, tdd_phase) feedback group"""
+
+    agent_type: str
+    tdd_phase: Optional[TDDState]
+    sample_count: int = 0
+    accurate_count: int = 0
+    feature_sums: Dict[str, float] = field(default_factory=dict)
+    feature_counts: Dict[str, int] = field(default_factory=dict)
+    # Feedback received since the group's pattern was last re-fitted
+    pending_refit: deque = field(default_factory=lambda: deque(maxlen=10000))
+
+    def add(self, feedback: LearningFeedback, features: Dict[str, float]) -> None:
+        """Fold one feedback sample into the group"""
+        self.sample_count += 1
+        self.pending_refit.append(feedback)
+        if feedback.is_accurate():
+            self.accurate_count += 1
+            for feature_name, feature_value in features.items():
+                self.feature_sums[feature_name] = (
+                    self.feature_sums.get(feature_name, 0.0) +
+                    feature_value * feedback.actual_relevance
+                )
+                self.feature_counts[feature_name] = self.feature_counts.get(feature_name, 0) + 1
+
+    @property
+    def success_rate(self) -> float:
+        """Fraction of accurate predictions in the group"""
+        return self.accurate_count / self.sample_count if self.sample_count else 0.0
+
+    @property
+    def pattern_id(self) -> str:
+        """Identifier of the pattern discovered from this group"""
+        phase = self.tdd_phase.value if self.tdd_phase else "general"
+        return f"discovered_{self.agent_type}_{phase}"
+
+    def to_candidate(self) -> Dict[str, Any]:
+        """Build a pattern candidate from the accumulated statistics"""
+        feature_weights = {
+            feature_name: total / self.feature_counts[feature_name]
+            for feature_name, total in self.feature_sums.items()
+        }
+        return {
+            "pattern_id": self.pattern_id,
+            "agent_types": [self.agent_type],
+            "tdd_phases": [self.tdd_phase] if self.tdd_phase else [],
+            "feature_weights": feature_weights,
+            "success_rate": self.success_rate,
+            "confidence": min(self.success_rate * (self.accurate_count / 50.0), 1.0),
+            "sample_count": self.sample_count
+        }
+
+
+def _refit_pattern_weights(
+    feature_weights: Dict[str, float],
+    samples: List[Tuple[Dict[str, float], float, float]],
+    learning_rate: float
+) -> Tuple[Dict[str, float], int, int]:
+    """
+    Re-fit pattern weights over a batch of feedback samples.
+
+    Module-level so it can run in a worker process.
+
+    Args:
+        feature_weights: Current pattern weights
+        samples: (features, predicted_relevance, actual_relevance) tuples
+        learning_rate: Gradient step size
+
+    Returns:
+        Tuple of (new weights, number of weight updates, accurate sample count)
+    """
+    weights = dict(feature_weights)
+    updates = 0
+    accurate = 0
+
+    for features, predicted_relevance, actual_relevance in samples:
+        prediction_error = predicted_relevance - actual_relevance
+        if abs(prediction_error) <= 0.2:
+            accurate += 1
+
+        if prediction_error != 0:
+            for feature_name, feature_value in features.items():
+                if feature_name in weights:
+                    weights[feature_name] -= learning_rate * prediction_error * feature_value
+            updates += 1
+
+    return weights, updates, accurate
 
 
 class ContextLearningSystem:
@@ -149,7 +344,8 @@ class ContextLearningSystem:
     Features:
     - Feature extraction from files and contexts
     - Pattern learning from usage feedback
-    - Adaptive weight adjustment
+    - Online weight adjustment as feedback arrives
+    - Streaming pattern discovery per agent type and TDD phase
     - Multi-strategy ensemble learning
     - Performance tracking and optimization
     """
@@ -161,7 +357,9 @@ class ContextLearningSystem:
         strategy: LearningStrategy = LearningStrategy.ENSEMBLE,
         feature_decay_days: int = 30,
         pattern_confidence_threshold: float = 0.7,
-        enable_persistence: bool = True
+        enable_persistence: bool = True,
+        success_rate_smoothing: float = 0.1,
+        refit_process_threshold: int = 200
     ):
         """
         Initialize the context learning system.
@@ -173,6 +371,9 @@ class ContextLearningSystem:
             feature_decay_days: Days after which to decay old features
             pattern_confidence_threshold: Minimum confidence for pattern usage
             enable_persistence: Whether to persist learned patterns
+            success_rate_smoothing: EMA factor for online success rate updates
+            refit_process_threshold: Minimum samples before a pattern re-fit
+                is offloaded to the worker process
         """
         self.project_path = Path(project_path)
         self.learning_rate = learning_rate
@@ -180,12 +381,23 @@ class ContextLearningSystem:
         self.feature_decay_days = feature_decay_days
         self.pattern_confidence_threshold = pattern_confidence_threshold
         self.enable_persistence = enable_persistence
+        self.success_rate_smoothing = success_rate_smoothing
+        self.refit_process_threshold = refit_process_threshold
         
         # Learning data storage
         self.file_features: Dict[str, FileFeatures] = {}
         self.learning_patterns: Dict[str, LearningPattern] = {}
         self.feedback_history: deque[LearningFeedback] = deque(maxlen=10000)
         
+        # Streaming discovery statistics per (agent_type, tdd_phase)
+        self.feedback_groups: Dict[Tuple[str, Optional[TDDState]], FeedbackGroupStats] = {}
+        self._dirty_groups: Set[Tuple[str, Optional[TDDState]]] = set()
+        self._last_ingested_feedback: Optional[LearningFeedback] = None
+        
+        # Worker process for periodic pattern re-fits (created on first use)
+        self._refit_executor: Optional[ProcessPoolExecutor] = None
+        self._refit_executor_disabled = False
+        
         # Feature extractors
         self.feature_extractors = self._initialize_feature_extractors()
         
@@ -199,9 +411,17 @@ class ContextLearningSystem:
         if self.enable_persistence:
             self.persistence_dir = self.project_path / ".orch-state" / "context_learning"
             self.persistence_dir.mkdir(parents=True, exist_ok=True)
-            self.patterns_file = self.persistence_dir / "patterns.pkl"
-            self.features_file = self.persistence_dir / "features.pkl"
-            self.feedback_file = self.persistence_dir / "feedback.json"
+            self.patterns_file = self.persistence_dir / "patterns.json"
+            self.features_file = self.persistence_dir / "features.npy"
+            self.feedback_file = self.persistence_dir / "feedback.jsonl"
+            
+            # Columnar feature store (memory-mapped) with delta log, versioned
+            # pattern document and append-only feedback log
+            self.feature_store = FeatureMatrixStore(self.persistence_dir)
+            self.file_features = self._new_feature_map()
+            self._feedback_log = FeedbackLog(self.feedback_file, max_entries=self.feedback_history.maxlen)
+            self._pattern_file = PatternFile(self.patterns_file)
+            self._last_persisted_feedback: Optional[LearningFeedback] = None
         
         logger.info(f"ContextLearningSystem initialized with strategy: {strategy.value}")
     
@@ -302,24 +522,105 @@ class ContextLearningSystem:
         except Exception as e:
             logger.error(f"Error predicting relevance for {file_path}: {str(e)}")
             return 0.0
-    
+
+    async def predict_relevance_batch(
+        self,
+        file_paths: List[str],
+        request: ContextRequest
+    ) -> Dict[str, float]:
+        """
+        Predict relevance scores for many files given one context request.
+
+        Produces the same scores as calling predict_relevance per file, but
+        checks staleness with a single stat pass, resolves context features
+        and applicable patterns once, and scores all files against all
+        pattern weights as one matrix product.
+
+        Args:
+            file_paths: Paths of the candidate files
+            request: Context request
+
+        Returns:
+            Dictionary of file path to predicted relevance score (0.0 to 1.0)
+        """
+        unique_paths = list(dict.fromkeys(file_paths))
+        self.total_predictions += len(unique_paths)
+        scores = {path: 0.0 for path in unique_paths}
+
+        if not unique_paths:
+            return scores
+
+        try:
+            feature_sets = await self._collect_features_batch(unique_paths)
+
+            context_features = self._extract_context_features(request)
+            applicable_patterns = self._find_applicable_patterns(
+                request.agent_type,
+                self._extract_tdd_phase(request.task)
+            )
+
+            scored_paths = [path for path in unique_paths if feature_sets.get(path)]
+            if not scored_paths:
+                return scores
+
+            if not applicable_patterns:
+                for path in scored_paths:
+                    combined_features = {**feature_sets[path], **context_features}
+                    scores[path] = self._calculate_baseline_relevance(combined_features, request)
+                return scores
+
+            use_ensemble = self.strategy == LearningStrategy.ENSEMBLE
+            if not use_ensemble:
+                # Use best pattern (list is sorted by confidence)
+                applicable_patterns = applicable_patterns[:1]
+
+            relevance = self._calculate_relevance_matrix(
+                [feature_sets[path] for path in scored_paths],
+                context_features,
+                applicable_patterns
+            )
+
+            if not use_ensemble:
+                batch_scores = relevance[:, 0]
+            else:
+                pattern_weights = np.array(
+                    [p.confidence * p.success_rate for p in applicable_patterns]
+                )
+                total_weight = pattern_weights.sum()
+                if total_weight > 0:
+                    batch_scores = relevance @ pattern_weights / total_weight
+                else:
+                    batch_scores = np.zeros(len(scored_paths))
+
+            scores.update(zip(scored_paths, (float(s) for s in batch_scores)))
+            return scores
+
+        except Exception as e:
+            logger.error(f"Error predicting batch relevance for {len(unique_paths)} files: {str(e)}")
+            return scores
+
     async def record_feedback(
         self,
         context_id: str,
         agent_type: str,
         story_id: str,
         file_relevance_scores: Dict[str, float],
-        feedback_type: str = "usage"
+        feedback_type: str = "usage",
+        tdd_phase: Optional[TDDState] = None
     ) -> None:
         """
         Record feedback for learning system.
         
+        Matching patterns are updated online from each feedback sample, and
+        the samples are folded into the streaming discovery statistics.
+        
         Args:
             context_id: Context identifier
             agent_type: Agent type
             story_id: Story identifier
             file_relevance_scores: Actual relevance scores for files
             feedback_type: Type of feedback
+            tdd_phase: TDD phase the context was used in
         """
         try:
             for file_path, actual_relevance in file_relevance_scores.items():
@@ -334,7 +635,8 @@ class ContextLearningSystem:
                     predicted_relevance=predicted_relevance,
                     actual_relevance=actual_relevance,
                     feedback_type=feedback_type,
-                    timestamp=datetime.utcnow()
+                    timestamp=datetime.utcnow(),
+                    metadata={"tdd_phase": tdd_phase} if tdd_phase else {}
                 )
                 
                 self.feedback_history.append(feedback)
@@ -347,9 +649,10 @@ class ContextLearningSystem:
                 # Check prediction accuracy
                 if feedback.is_accurate():
                     self.accurate_predictions += 1
+                
+                await self._apply_online_update(feedback)
             
-            # Trigger learning update
-            await self._update_learning_patterns(agent_type, story_id)
+            await self._ingest_feedback()
             
         except Exception as e:
             logger.error(f"Error recording feedback: {str(e)}")
@@ -358,32 +661,42 @@ class ContextLearningSystem:
         """
         Update learning patterns based on recent feedback.
         
+        This is the periodic batch re-fit that complements the online
+        updates in record_feedback. Each group is re-fitted on the feedback
+        it received since its previous re-fit, taken from the streaming
+        group statistics; large batches are re-fitted in a worker process so
+        the event loop stays free for context requests.
+        
         Returns:
             Number of patterns updated
         """
         try:
             updated_count = 0
             
-            # Analyze recent feedback for pattern updates
-            recent_feedback = [
-                f for f in self.feedback_history 
-                if (datetime.utcnow() - f.timestamp).days <= 7
-            ]
+            # Fold feedback added since the last call into the groups
+            await self._ingest_feedback()
             
-            if len(recent_feedback) < 10:  # Need sufficient data
+            # Recent feedback each group received since its last re-fit
+            cutoff = datetime.utcnow() - timedelta(days=7)
+            pending = {
+                key: [f for f in stats.pending_refit if f.timestamp >= cutoff]
+                for key, stats in self.feedback_groups.items()
+                if stats.pending_refit
+            }
+            
+            if sum(len(group_feedback) for group_feedback in pending.values()) < 10:  # Need sufficient data
                 return 0
             
-            # Group feedback by agent type and TDD phase
-            feedback_groups = defaultdict(list)
-            for feedback in recent_feedback:
-                key = (feedback.agent_type, self._extract_phase_from_metadata(feedback))
-                feedback_groups[key].append(feedback)
+            # Take the batches before re-fitting, so feedback arriving during
+            # a re-fit waits for the next one
+            batches = {key: group_feedback for key, group_feedback in pending.items() if len(group_feedback) >= 5}
+            for key in batches:
+                self.feedback_groups[key].pending_refit.clear()
             
             # Update patterns for each group
-            for (agent_type, tdd_phase), group_feedback in feedback_groups.items():
-                if len(group_feedback) >= 5:  # Minimum feedback for pattern update
-                    await self._update_pattern_for_group(agent_type, tdd_phase, group_feedback)
-                    updated_count += 1
+            for (agent_type, tdd_phase), group_feedback in batches.items():
+                await self._update_pattern_for_group(agent_type, tdd_phase, group_feedback)
+                updated_count += 1
             
             self.learning_updates += updated_count
             
@@ -402,6 +715,10 @@ class ContextLearningSystem:
         """
         Discover new patterns from feedback data.
         
+        Only feedback groups that received samples since the previous run
+        are re-evaluated; a group that was already promoted to a pattern
+        has that pattern refreshed in place.
+        
         Returns:
             Number of new patterns discovered
         """
@@ -413,8 +730,15 @@ class ContextLearningSystem:
             
             for candidate in pattern_candidates:
                 if candidate["confidence"] >= self.pattern_confidence_threshold:
+                    existing = self.learning_patterns.get(candidate["pattern_id"])
+                    if existing:
+                        existing.feature_weights = candidate["feature_weights"]
+                        existing.success_rate = candidate["success_rate"]
+                        existing.confidence = candidate["confidence"]
+                        continue
+                    
                     pattern = LearningPattern(
-                        pattern_id=f"discovered_{len(self.learning_patterns)}_{int(datetime.utcnow().timestamp())}",
+                        pattern_id=candidate["pattern_id"],
                         pattern_type="discovered",
                         agent_types=set(candidate["agent_types"]),
                         tdd_phases=set(candidate["tdd_phases"]),
@@ -463,6 +787,7 @@ class ContextLearningSystem:
             "active_patterns": len(self.learning_patterns),
             "tracked_files": len(self.file_features),
             "feedback_samples": len(self.feedback_history),
+            "feedback_groups": len(self.feedback_groups),
             "pattern_details": pattern_stats
         }
     
@@ -520,6 +845,12 @@ class ContextLearningSystem:
             logger.error(f"Error optimizing performance: {str(e)}")
             return optimizations
     
+    async def shutdown(self) -> None:
+        """Stop the re-fit worker process, if one was started"""
+        if self._refit_executor is not None:
+            executor, self._refit_executor = self._refit_executor, None
+            await asyncio.to_thread(executor.shutdown, True, cancel_futures=True)
+    
     # Private methods
     
     def _initialize_feature_extractors(self) -> Dict[str, Any]:
@@ -682,7 +1013,14 @@ class ContextLearningSystem:
     
     def _extract_phase_from_metadata(self, feedback: LearningFeedback) -> Optional[TDDState]:
         """Extract TDD phase from feedback metadata"""
-        return feedback.metadata.get('tdd_phase')
+        phase = feedback.metadata.get('tdd_phase')
+        if isinstance(phase, str):
+            # Phases read back from the feedback log are plain strings
+            try:
+                return TDDState(phase)
+            except ValueError:
+                return None
+        return phase
     
     def _find_applicable_patterns(
         self,
@@ -744,57 +1082,211 @@ class ContextLearningSystem:
             total_weight += weight
         
         return weighted_sum / total_weight if total_weight > 0 else 0.0
-    
+
+    def _calculate_relevance_matrix(
+        self,
+        feature_sets: List[Dict[str, float]],
+        context_features: Dict[str, float],
+        patterns: List[LearningPattern]
+    ) -> np.ndarray:
+        """
+        Score every file against every pattern at once.
+
+        Equivalent to LearningPattern.calculate_relevance for each
+        (file, pattern) pair: weights only count towards the normalizer when
+        the feature is present, and context features override file features.
+
+        Returns:
+            Array of shape (len(feature_sets), len(patterns))
+        """
+        columns = list(dict.fromkeys(
+            name for pattern in patterns for name in pattern.feature_weights
+        ))
+        column_index = {name: i for i, name in enumerate(columns)}
+
+        weights = np.zeros((len(columns), len(patterns)))
+        for j, pattern in enumerate(patterns):
+            for name, weight in pattern.feature_weights.items():
+                weights[column_index[name], j] = weight
+
+        values = np.zeros((len(feature_sets), len(columns)))
+        present = np.zeros((len(feature_sets), len(columns)))
+        for i, features in enumerate(feature_sets):
+            for j, name in enumerate(columns):
+                value = features.get(name)
+                if value is not None:
+                    values[i, j] = value
+                    present[i, j] = 1.0
+
+        for name, value in context_features.items():
+            j = column_index.get(name)
+            if j is not None:
+                values[:, j] = value
+                present[:, j] = 1.0
+
+        numerator = values @ weights
+        denominator = present @ np.abs(weights)
+        return np.divide(
+            numerator, denominator,
+            out=np.zeros_like(numerator),
+            where=denominator > 0
+        )
+
+    async def _collect_features_batch(self, file_paths: List[str]) -> Dict[str, Dict[str, float]]:
+        """Get feature vectors for many files, re-extracting only stale or unknown ones"""
+        mtimes = await asyncio.to_thread(self._stat_files, file_paths)
+
+        feature_sets: Dict[str, Dict[str, float]] = {}
+        to_extract: List[str] = []
+
+        for file_path in file_paths:
+            cached = self.file_features.get(file_path)
+            if cached is None:
+                to_extract.append(file_path)
+                continue
+
+            mtime = mtimes.get(file_path)
+            if mtime is None:
+                # Tracked file that can no longer be stat'ed
+                feature_sets[file_path] = {}
+            elif cached.last_updated.timestamp() < mtime:
+                to_extract.append(file_path)
+            else:
+                feature_sets[file_path] = cached.features
+
+        if to_extract:
+            extracted = await asyncio.gather(
+                *(self._extract_features_internal(file_path) for file_path in to_extract)
+            )
+            now = datetime.utcnow()
+            for file_path, feature_vector in zip(to_extract, extracted):
+                cached = self.file_features.get(file_path)
+                if cached is not None:
+                    cached.features = feature_vector
+                    cached.last_updated = now
+                else:
+                    self.file_features[file_path] = FileFeatures(
+                        file_path=file_path,
+                        features=feature_vector,
+                        last_updated=now
+                    )
+                feature_sets[file_path] = feature_vector
+
+        return feature_sets
+
+    def _stat_files(self, file_paths: List[str]) -> Dict[str, Optional[float]]:
+        """Get modification times for many files in one pass (None if missing)"""
+        mtimes: Dict[str, Optional[float]] = {}
+        for file_path in file_paths:
+            try:
+                mtimes[file_path] = os.stat(file_path).st_mtime
+            except OSError:
+                mtimes[file_path] = None
+        return mtimes
+
     async def _get_cached_prediction(self, context_id: str, file_path: str) -> float:
         """Get cached prediction for feedback comparison"""
         # This would be implemented with a prediction cache
         return 0.5  # Placeholder
     
-    async def _update_learning_patterns(self, agent_type: str, story_id: str) -> None:
-        """Update learning patterns based on recent feedback"""
-        # Find recent feedback for this context
-        recent_feedback = [
-            f for f in self.feedback_history
-            if (f.agent_type == agent_type and
-                f.story_id == story_id and
-                (datetime.utcnow() - f.timestamp).hours < 24)
+    async def _apply_online_update(self, feedback: LearningFeedback) -> None:
+        """Apply one SGD step to every pattern matching the feedback context"""
+        tdd_phase = self._extract_phase_from_metadata(feedback)
+        patterns = [
+            pattern for pattern in self.learning_patterns.values()
+            if pattern.matches_context(feedback.agent_type, tdd_phase)
         ]
-        
-        if len(recent_feedback) < 5:
+        if not patterns:
             return
         
-        # Update pattern weights based on feedback
-        for pattern in self.learning_patterns.values():
-            if pattern.matches_context(agent_type, None):
-                await self._adjust_pattern_weights(pattern, recent_feedback)
+        features = await self.extract_file_features(feedback.file_path)
+        
+        for pattern in patterns:
+            # Gradient of the squared error of this pattern's own prediction
+            prediction_error = pattern.calculate_relevance(features) - feedback.actual_relevance
+            for feature_name, feature_value in features.items():
+                if feature_name in pattern.feature_weights:
+                    pattern.feature_weights[feature_name] -= (
+                        self.learning_rate * prediction_error * feature_value
+                    )
+            
+            # Exponential moving average of accuracy
+            accurate = 1.0 if abs(prediction_error) <= 0.2 else 0.0
+            pattern.success_rate += self.success_rate_smoothing * (accurate - pattern.success_rate)
+            pattern.usage_count += 1
+            pattern.last_used = feedback.timestamp
+            pattern.confidence = min(pattern.success_rate * (pattern.usage_count / 100.0), 1.0)
     
     async def _adjust_pattern_weights(
         self,
         pattern: LearningPattern,
         feedback: List[LearningFeedback]
     ) -> None:
-        """Adjust pattern weights based on feedback"""
-        for fb in feedback:
-            if fb.relevance_error > 0:
-                # Extract features for this file
-                features = await self.extract_file_features(fb.file_path)
-                
-                # Calculate gradient
-                prediction_error = fb.predicted_relevance - fb.actual_relevance
-                
-                # Update weights
-                for feature_name, feature_value in features.items():
-                    if feature_name in pattern.feature_weights:
-                        gradient = prediction_error * feature_value
-                        pattern.feature_weights[feature_name] -= self.learning_rate * gradient
-                
-                pattern.usage_count += 1
+        """Re-fit pattern weights over a batch of feedback"""
+        if not feedback:
+            return
+        
+        samples = await self._feedback_samples(feedback)
+        snapshot = dict(pattern.feature_weights)
         
-        # Update success rate
-        accurate_count = sum(1 for fb in feedback if fb.is_accurate())
-        pattern.success_rate = accurate_count / len(feedback)
+        if len(samples) >= self.refit_process_threshold:
+            weights, updates, accurate = await self._run_refit(snapshot, samples)
+        else:
+            weights, updates, accurate = _refit_pattern_weights(snapshot, samples, self.learning_rate)
+        
+        # Apply as a delta so online updates made during the re-fit are kept
+        for feature_name, weight in weights.items():
+            if feature_name in pattern.feature_weights:
+                pattern.feature_weights[feature_name] += weight - snapshot[feature_name]
+        
+        pattern.usage_count += updates
+        pattern.success_rate = accurate / len(samples)
         pattern.confidence = min(pattern.success_rate * (pattern.usage_count / 100.0), 1.0)
     
+    async def _run_refit(
+        self,
+        feature_weights: Dict[str, float],
+        samples: List[Tuple[Dict[str, float], float, float]]
+    ) -> Tuple[Dict[str, float], int, int]:
+        """Run a re-fit in the worker process, falling back to inline"""
+        executor = self._get_refit_executor()
+        if executor is not None:
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(
+                    executor, _refit_pattern_weights, feature_weights, samples, self.learning_rate
+                )
+            except BrokenProcessPool as e:
+                logger.warning(f"Refit worker failed, re-fitting inline: {str(e)}")
+                self._refit_executor = None
+        
+        return _refit_pattern_weights(feature_weights, samples, self.learning_rate)
+    
+    def _get_refit_executor(self) -> Optional[ProcessPoolExecutor]:
+        """Get the re-fit worker process pool, creating it on first use"""
+        if self._refit_executor is None and not self._refit_executor_disabled:
+            try:
+                # Spawn rather than fork: the event loop process has threads
+                self._refit_executor = ProcessPoolExecutor(
+                    max_workers=1,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            except (OSError, NotImplementedError) as e:
+                logger.warning(f"Process pool unavailable, re-fitting inline: {str(e)}")
+                self._refit_executor_disabled = True
+        return self._refit_executor
+    
+    async def _feedback_samples(
+        self,
+        feedback: List[LearningFeedback]
+    ) -> List[Tuple[Dict[str, float], float, float]]:
+        """Resolve feedback into (features, predicted, actual) samples"""
+        samples = []
+        for fb in feedback:
+            features = await self.extract_file_features(fb.file_path)
+            samples.append((dict(features), fb.predicted_relevance, fb.actual_relevance))
+        return samples
+    
     async def _update_pattern_for_group(
         self,
         agent_type: str,
@@ -819,73 +1311,50 @@ class ContextLearningSystem:
         await self._adjust_pattern_weights(pattern, feedback_list)
     
     async def _analyze_pattern_candidates(self) -> List[Dict[str, Any]]:
-        """Analyze feedback for potential new patterns"""
-        candidates = []
-        
-        # Group feedback by various criteria
-        groups = defaultdict(list)
+        """Analyze feedback groups changed since the last run for new patterns"""
+        await self._ingest_feedback()
         
-        for feedback in self.feedback_history:
-            # Group by agent type and accuracy
-            if feedback.is_accurate():
-                key = (feedback.agent_type, "accurate")
-                groups[key].append(feedback)
-        
-        # Analyze each group for pattern potential
-        for (agent_type, accuracy), group_feedback in groups.items():
-            if len(group_feedback) >= 10:  # Minimum size for pattern
-                candidate = await self._analyze_feedback_group(agent_type, group_feedback)
-                if candidate:
-                    candidates.append(candidate)
+        candidates = []
+        for key in self._dirty_groups:
+            stats = self.feedback_groups[key]
+            if stats.accurate_count >= 10:  # Minimum size for pattern
+                candidates.append(stats.to_candidate())
         
+        self._dirty_groups.clear()
         return candidates
     
-    async def _analyze_feedback_group(
-        self,
-        agent_type: str,
-        feedback_list: List[LearningFeedback]
-    ) -> Optional[Dict[str, Any]]:
-        """Analyze a group of feedback for pattern extraction"""
-        try:
-            # Calculate feature importance
-            feature_weights = defaultdict(float)
-            feature_counts = defaultdict(int)
-            
-            for feedback in feedback_list:
-                features = await self.extract_file_features(feedback.file_path)
-                
-                for feature_name, feature_value in features.items():
-                    feature_weights[feature_name] += feature_value * feedback.actual_relevance
-                    feature_counts[feature_name] += 1
-            
-            # Normalize weights
-            normalized_weights = {}
-            for feature_name, total_weight in feature_weights.items():
-                if feature_counts[feature_name] > 0:
-                    normalized_weights[feature_name] = total_weight / feature_counts[feature_name]
-            
-            # Calculate success rate
-            success_rate = sum(1 for fb in feedback_list if fb.is_accurate()) / len(feedback_list)
-            
-            # Extract TDD phases
-            tdd_phases = set()
-            for feedback in feedback_list:
-                phase = self._extract_phase_from_metadata(feedback)
-                if phase:
-                    tdd_phases.add(phase)
+    async def _ingest_feedback(self) -> int:
+        """Fold feedback added since the last call into the group statistics"""
+        new_feedback = self._feedback_since(self._last_ingested_feedback)
+        if not new_feedback:
+            return 0
+        
+        # Advance the cursor first so a concurrent call does not re-ingest
+        self._last_ingested_feedback = new_feedback[-1]
+        
+        for feedback in new_feedback:
+            features = await self.extract_file_features(feedback.file_path)
+            key = (feedback.agent_type, self._extract_phase_from_metadata(feedback))
             
-            return {
-                "agent_types": [agent_type],
-                "tdd_phases": list(tdd_phases),
-                "feature_weights": normalized_weights,
-                "success_rate": success_rate,
-                "confidence": min(success_rate * (len(feedback_list) / 50.0), 1.0),
-                "sample_count": len(feedback_list)
-            }
+            stats = self.feedback_groups.get(key)
+            if stats is None:
+                stats = FeedbackGroupStats(agent_type=key[0], tdd_phase=key[1])
+                self.feedback_groups[key] = stats
             
-        except Exception as e:
-            logger.error(f"Error analyzing feedback group: {str(e)}")
-            return None
+            stats.add(feedback, features)
+            self._dirty_groups.add(key)
+        
+        return len(new_feedback)
+    
+    def _feedback_since(self, marker: Optional[LearningFeedback]) -> List[LearningFeedback]:
+        """Get feedback recorded after the marker entry, oldest first"""
+        new_feedback = []
+        for feedback in reversed(self.feedback_history):
+            if feedback is marker:
+                break
+            new_feedback.append(feedback)
+        new_feedback.reverse()
+        return new_feedback
     
     async def _initialize_base_patterns(self) -> None:
         """Initialize base patterns for different agent types"""
@@ -936,72 +1405,83 @@ class ContextLearningSystem:
     
     async def _load_persisted_data(self) -> None:
         """Load persisted learning data"""
+        # Legacy pickle dumps are never unpickled: loading pickles from a
+        # shared state directory can execute arbitrary code
+        for legacy_file in ("patterns.pkl", "features.pkl"):
+            if (self.persistence_dir / legacy_file).exists():
+                logger.warning(
+                    f"Ignoring legacy pickle {legacy_file}; learning data will be rebuilt"
+                )
+        
+        # Load patterns
         try:
-            # Load patterns
-            if self.patterns_file.exists():
-                with open(self.patterns_file, 'rb') as f:
-                    self.learning_patterns = pickle.load(f)
-            
-            # Load features
-            if self.features_file.exists():
-                with open(self.features_file, 'rb') as f:
-                    self.file_features = pickle.load(f)
-            
-            # Load feedback
-            if self.feedback_file.exists():
-                with open(self.feedback_file, 'r') as f:
+            self._pattern_file.path = self.patterns_file
+            pattern_data = await asyncio.to_thread(self._pattern_file.read)
+            if pattern_data:
+                self.learning_patterns = {
+                    data["pattern_id"]: LearningPattern.from_dict(data)
+                    for data in pattern_data
+                }
+        except Exception as e:
+            logger.warning(f"Error loading persisted patterns: {str(e)}")
+        
+        # Open features lazily (rows are materialized on first access)
+        try:
+            loaded_store = self.feature_store.snapshot()
+            await asyncio.to_thread(loaded_store.load)
+            self.feature_store.adopt(loaded_store)
+            self.file_features = self._new_feature_map()
+        except Exception as e:
+            logger.warning(f"Error loading persisted features: {str(e)}")
+        
+        # Load feedback
+        try:
+            feedback_data = await asyncio.to_thread(self._feedback_log.read)
+            legacy_feedback_file = self.persistence_dir / "feedback.json"
+            if not feedback_data and legacy_feedback_file.exists():
+                with open(legacy_feedback_file, 'r') as f:
                     feedback_data = json.load(f)
-                    for fb_data in feedback_data:
-                        feedback = LearningFeedback(
-                            context_id=fb_data['context_id'],
-                            agent_type=fb_data['agent_type'],
-                            story_id=fb_data['story_id'],
-                            file_path=fb_data['file_path'],
-                            predicted_relevance=fb_data['predicted_relevance'],
-                            actual_relevance=fb_data['actual_relevance'],
-                            feedback_type=fb_data['feedback_type'],
-                            timestamp=datetime.fromisoformat(fb_data['timestamp']),
-                            metadata=fb_data.get('metadata', {})
-                        )
-                        self.feedback_history.append(feedback)
-            
-            logger.info("Loaded persisted learning data")
+                await asyncio.to_thread(self._feedback_log.append, feedback_data)
             
+            for fb_data in feedback_data:
+                self.feedback_history.append(LearningFeedback.from_dict(fb_data))
+            if self.feedback_history:
+                self._last_persisted_feedback = self.feedback_history[-1]
         except Exception as e:
-            logger.warning(f"Error loading persisted data: {str(e)}")
+            logger.warning(f"Error loading persisted feedback: {str(e)}")
+        
+        logger.info("Loaded persisted learning data")
     
     async def _persist_patterns(self) -> None:
-        """Persist learning patterns to disk"""
+        """Persist changes to learning data (patterns, feature deltas, new feedback)"""
         try:
             if self.enable_persistence:
-                # Persist patterns
-                with open(self.patterns_file, 'wb') as f:
-                    pickle.dump(self.learning_patterns, f)
+                # Patterns are a small document, rewritten only when changed
+                pattern_data = [p.to_dict() for p in self.learning_patterns.values()]
+                await asyncio.to_thread(self._pattern_file.write, pattern_data)
                 
-                # Persist features
-                with open(self.features_file, 'wb') as f:
-                    pickle.dump(self.file_features, f)
+                # Features: append changed rows to the delta log
+                if isinstance(self.file_features, LazyFeatureMap):
+                    await self.file_features.persist()
                 
-                # Persist recent feedback
-                recent_feedback = [
-                    {
-                        'context_id': fb.context_id,
-                        'agent_type': fb.agent_type,
-                        'story_id': fb.story_id,
-                        'file_path': fb.file_path,
-                        'predicted_relevance': fb.predicted_relevance,
-                        'actual_relevance': fb.actual_relevance,
-                        'feedback_type': fb.feedback_type,
-                        'timestamp': fb.timestamp.isoformat(),
-                        'metadata': fb.metadata
-                    }
-                    for fb in list(self.feedback_history)[-1000:]  # Keep last 1000
-                ]
+                # Feedback: append records added since the last persist
+                new_feedback = self._feedback_since(self._last_persisted_feedback)
                 
-                with open(self.feedback_file, 'w') as f:
-                    json.dump(recent_feedback, f, indent=2)
+                if new_feedback:
+                    await asyncio.to_thread(
+                        self._feedback_log.append, [fb.to_dict() for fb in new_feedback]
+                    )
+                    self._last_persisted_feedback = new_feedback[-1]
                 
                 logger.debug("Persisted learning data")
                 
         except Exception as e:
-            logger.error(f"Error persisting learning data: {str(e)}")
\ No newline at end of file
+            logger.error(f"Error persisting learning data: {str(e)}")
+    
+    def _new_feature_map(self) -> LazyFeatureMap:
+        """Create a feature map backed by the persistent feature store"""
+        return LazyFeatureMap(
+            self.feature_store,
+            to_object=FileFeatures.from_record,
+            to_record=FileFeatures.to_record
+        )
\ No newline at end of file
@@ -0,0 +1,616 @@
+"""
+Context Learning Store - Columnar persistence for the context learning system
+
+Replaces whole-state pickle dumps with formats that are safe to load from
+shared state directories and cheap to update:
+- File feature vectors in a NumPy matrix (memory-mapped on load) with a JSON
+  path index, plus an append-only delta log compacted in the background of
+  normal persistence
+- Learning patterns in a compact, versioned JSON document rewritten only
+  when changed
+- Feedback as an append-only JSON-lines log
+"""
+
+import asyncio
+import copy
+import json
+import logging
+import os
+import uuid
+from collections.abc import MutableMapping
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+STORE_FORMAT_VERSION = 1
+
+# Maximum relevance scores kept per file (mirrors FileFeatures history bound)
+RELEVANCE_HISTORY_SIZE = 100
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize enums and datetimes found in metadata"""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, set):
+        return sorted(value, key=str)
+    return str(value)
+
+
+def _atomic_write_text(path: Path, text: str) -> None:
+    """Write text to a file atomically"""
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+def _atomic_save_array(path: Path, array: np.ndarray) -> None:
+    """Save a NumPy array atomically"""
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with open(temp_path, 'wb') as f:
+            np.save(f, array, allow_pickle=False)
+        os.replace(temp_path, path)
+    finally:
+        if temp_path.exists():
+            temp_path.unlink()
+
+
+class FeatureRecord:
+    """Plain persisted form of a file's features"""
+
+    __slots__ = ("file_path", "features", "last_updated", "access_count", "relevance_history")
+
+    def __init__(
+        self,
+        file_path: str,
+        features: Dict[str, float],
+        last_updated: datetime,
+        access_count: int = 0,
+        relevance_history: Optional[List[float]] = None
+    ):
+        self.file_path = file_path
+        self.features = features
+        self.last_updated = last_updated
+        self.access_count = access_count
+        self.relevance_history = relevance_history or []
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for the delta log"""
+        return {
+            "path": self.file_path,
+            "features": self.features,
+            "last_updated": self.last_updated.isoformat(),
+            "access_count": self.access_count,
+            "relevance_history": self.relevance_history
+        }
+
+    def copy(self) -> 'FeatureRecord':
+        """Copy that shares no mutable state with this record"""
+        return FeatureRecord(
+            file_path=self.file_path,
+            features=dict(self.features),
+            last_updated=self.last_updated,
+            access_count=self.access_count,
+            relevance_history=list(self.relevance_history)
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FeatureRecord':
+        """Create from a delta log entry"""
+        return cls(
+            file_path=data["path"],
+            features={k: float(v) for k, v in data.get("features", {}).items()},
+            last_updated=datetime.fromisoformat(data["last_updated"]),
+            access_count=int(data.get("access_count", 0)),
+            relevance_history=[float(v) for v in data.get("relevance_history", [])]
+        )
+
+
+class FeatureMatrixStore:
+    """
+    Columnar on-disk store for per-file feature vectors.
+
+    The base snapshot is a dense float64 matrix (one row per file, one column
+    per feature name, NaN where a file lacks a feature) opened with mmap, so
+    startup cost is independent of the number of files. Changes are appended
+    to a JSON-lines delta log and folded into a new base by compact().
+
+    A store is not thread-safe. To load or compact in a worker thread, run
+    the operation on a snapshot() and adopt() the snapshot afterwards.
+    """
+
+    # Attributes making up the loaded state, replaced together by adopt()
+    _STATE_ATTRIBUTES = (
+        "feature_names", "row_index", "_last_updated", "_access_counts",
+        "_matrix", "_relevance", "overrides", "delta_entries"
+    )
+
+    def __init__(self, directory: Path, compaction_min_entries: int = 1000):
+        """
+        Initialize FeatureMatrixStore.
+
+        Args:
+            directory: Directory holding the store files
+            compaction_min_entries: Minimum delta log size before compaction
+        """
+        self.directory = Path(directory)
+        self.matrix_file = self.directory / "features.npy"
+        self.relevance_file = self.directory / "relevance.npy"
+        self.index_file = self.directory / "features_index.json"
+        self.delta_file = self.directory / "features_delta.jsonl"
+        self.compaction_min_entries = compaction_min_entries
+
+        self.feature_names: List[str] = []
+        self.row_index: Dict[str, int] = {}
+        self._last_updated: List[float] = []
+        self._access_counts: List[int] = []
+        self._matrix: Optional[np.ndarray] = None
+        self._relevance: Optional[np.ndarray] = None
+
+        # Latest delta entry per path (None marks a deletion)
+        self.overrides: Dict[str, Optional[FeatureRecord]] = {}
+        self.delta_entries = 0
+
+    def load(self) -> None:
+        """Open the base snapshot lazily and replay the delta log"""
+        self.feature_names = []
+        self.row_index = {}
+        self._last_updated = []
+        self._access_counts = []
+        self._matrix = None
+        self._relevance = None
+        self.overrides = {}
+        self.delta_entries = 0
+
+        if self.index_file.exists():
+            with open(self.index_file, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get("version") != STORE_FORMAT_VERSION:
+                raise ValueError(f"Unsupported feature store version: {index.get('version')}")
+            self.feature_names = index["feature_names"]
+            self.row_index = {path: row for row, path in enumerate(index["paths"])}
+            self._last_updated = index["last_updated"]
+            self._access_counts = index["access_counts"]
+            if self.row_index:
+                self._matrix = np.load(self.matrix_file, mmap_mode='r', allow_pickle=False)
+                self._relevance = np.load(self.relevance_file, mmap_mode='r', allow_pickle=False)
+
+        if self.delta_file.exists():
+            with open(self.delta_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final write only loses that entry
+                        logger.warning("Skipping corrupt feature delta entry")
+                        continue
+                    self.delta_entries += 1
+                    if entry.get("deleted"):
+                        self.overrides[entry["path"]] = None
+                    else:
+                        self.overrides[entry["path"]] = FeatureRecord.from_dict(entry)
+
+    def snapshot(self) -> 'FeatureMatrixStore':
+        """
+        Detached copy of the store, for loading or compacting off the event loop.
+
+        The memory-mapped base is shared read-only; delta records are copied.
+        """
+        snapshot = copy.copy(self)
+        snapshot.overrides = {
+            path: record.copy() if record is not None else None
+            for path, record in self.overrides.items()
+        }
+        return snapshot
+
+    def adopt(self, other: 'FeatureMatrixStore') -> None:
+        """Take over the state of a snapshot that was loaded or compacted"""
+        for attribute in self._STATE_ATTRIBUTES:
+            setattr(self, attribute, getattr(other, attribute))
+
+    def paths(self) -> Iterator[str]:
+        """Iterate over all live file paths"""
+        for path in self.row_index:
+            if path not in self.overrides:
+                yield path
+        for path, record in self.overrides.items():
+            if record is not None:
+                yield path
+
+    def contains(self, file_path: str) -> bool:
+        """Check whether a file has stored features"""
+        if file_path in self.overrides:
+            return self.overrides[file_path] is not None
+        return file_path in self.row_index
+
+    def count(self) -> int:
+        """Number of live file entries"""
+        base = sum(1 for path in self.row_index if path not in self.overrides)
+        return base + sum(1 for record in self.overrides.values() if record is not None)
+
+    def read(self, file_path: str) -> Optional[FeatureRecord]:
+        """Read one file's record from the delta overrides or the mmapped base"""
+        if file_path in self.overrides:
+            return self.overrides[file_path]
+        row = self.row_index.get(file_path)
+        if row is None:
+            return None
+
+        values = np.asarray(self._matrix[row])
+        present = ~np.isnan(values)
+        features = {
+            self.feature_names[col]: float(values[col])
+            for col in np.flatnonzero(present)
+        }
+        history = np.asarray(self._relevance[row])
+        return FeatureRecord(
+            file_path=file_path,
+            features=features,
+            last_updated=datetime.fromtimestamp(self._last_updated[row]),
+            access_count=int(self._access_counts[row]),
+            relevance_history=[float(v) for v in history[~np.isnan(history)]]
+        )
+
+    def append_deltas(
+        self,
+        records: List[FeatureRecord],
+        deleted_paths: List[str]
+    ) -> None:
+        """Append changed and deleted entries to the delta log"""
+        self.write_deltas(records, deleted_paths)
+        self.apply_deltas(records, deleted_paths)
+
+    def write_deltas(
+        self,
+        records: List[FeatureRecord],
+        deleted_paths: List[str]
+    ) -> None:
+        """
+        Write entries to the delta log without changing the loaded state.
+
+        Only touches the log file, so it may run in a worker thread given
+        records nothing else modifies; apply_deltas() then updates the state.
+        """
+        if not records and not deleted_paths:
+            return
+
+        lines = [json.dumps(r.to_dict(), separators=(',', ':')) for r in records]
+        lines.extend(
+            json.dumps({"path": path, "deleted": True}, separators=(',', ':'))
+            for path in deleted_paths
+        )
+        with open(self.delta_file, 'a', encoding='utf-8') as f:
+            f.write("\n".join(lines) + "\n")
+
+    def apply_deltas(
+        self,
+        records: List[FeatureRecord],
+        deleted_paths: List[str]
+    ) -> None:
+        """Update the loaded state with entries written to the delta log"""
+        for record in records:
+            self.overrides[record.file_path] = record
+        for path in deleted_paths:
+            self.overrides[path] = None
+        self.delta_entries += len(records) + len(deleted_paths)
+
+    def needs_compaction(self) -> bool:
+        """Check whether the delta log has outgrown the base snapshot"""
+        threshold = max(self.compaction_min_entries, len(self.row_index) // 4)
+        return self.delta_entries > threshold
+
+    def compact(self) -> None:
+        """Fold the delta log into a new base snapshot"""
+        records = [self.read(path) for path in list(self.paths())]
+        records = [r for r in records if r is not None]
+
+        names = sorted({name for r in records for name in r.features})
+        columns = {name: col for col, name in enumerate(names)}
+        matrix = np.full((len(records), len(names)), np.nan, dtype=np.float64)
+        relevance = np.full((len(records), RELEVANCE_HISTORY_SIZE), np.nan, dtype=np.float64)
+
+        for row, record in enumerate(records):
+            for name, value in record.features.items():
+                matrix[row, columns[name]] = value
+            history = record.relevance_history[-RELEVANCE_HISTORY_SIZE:]
+            relevance[row, :len(history)] = history
+
+        # Drop the mmaps before replacing the files underneath them
+        self._matrix = None
+        self._relevance = None
+
+        if records:
+            _atomic_save_array(self.matrix_file, matrix)
+            _atomic_save_array(self.relevance_file, relevance)
+        index = {
+            "version": STORE_FORMAT_VERSION,
+            "feature_names": names,
+            "paths": [r.file_path for r in records],
+            "last_updated": [r.last_updated.timestamp() for r in records],
+            "access_counts": [r.access_count for r in records]
+        }
+        _atomic_write_text(self.index_file, json.dumps(index, separators=(',', ':')))
+        if self.delta_file.exists():
+            self.delta_file.unlink()
+
+        self.load()
+        logger.debug(f"Compacted feature store to {len(records)} rows")
+
+
+class LazyFeatureMap(MutableMapping):
+    """
+    Dictionary of file path to feature objects backed by a FeatureMatrixStore.
+
+    Entries are materialized from the memory-mapped store on first access, so
+    loading persisted features does not parse every row up front. Tracks
+    which entries changed since the last flush so only deltas are written.
+    """
+
+    def __init__(
+        self,
+        store: Optional[FeatureMatrixStore],
+        to_object: Callable[[FeatureRecord], Any],
+        to_record: Callable[[Any], FeatureRecord]
+    ):
+        """
+        Initialize LazyFeatureMap.
+
+        Args:
+            store: Backing store (None for a purely in-memory map)
+            to_object: Converts a stored record into the in-memory object
+            to_record: Converts an in-memory object into a record
+        """
+        self.store = store
+        self._to_object = to_object
+        self._to_record = to_record
+        self._loaded: Dict[str, Any] = {}
+        self._signatures: Dict[str, Tuple] = {}
+        self._deleted: set = set()
+        self._persist_lock: Optional[asyncio.Lock] = None  # Created on the loop of the first persist()
+
+    def __getitem__(self, file_path: str) -> Any:
+        if file_path in self._loaded:
+            return self._loaded[file_path]
+        if file_path in self._deleted or self.store is None:
+            raise KeyError(file_path)
+        record = self.store.read(file_path)
+        if record is None:
+            raise KeyError(file_path)
+        obj = self._to_object(record)
+        self._loaded[file_path] = obj
+        self._signatures[file_path] = self._signature(record)
+        return obj
+
+    def __setitem__(self, file_path: str, value: Any) -> None:
+        self._loaded[file_path] = value
+        self._deleted.discard(file_path)
+        # New objects are always written on the next flush
+        self._signatures.pop(file_path, None)
+
+    def __delitem__(self, file_path: str) -> None:
+        if file_path not in self:
+            raise KeyError(file_path)
+        self._loaded.pop(file_path, None)
+        self._signatures.pop(file_path, None)
+        self._deleted.add(file_path)
+
+    def __contains__(self, file_path: object) -> bool:
+        if file_path in self._loaded:
+            return True
+        if file_path in self._deleted or self.store is None:
+            return False
+        return self.store.contains(file_path)
+
+    def __iter__(self) -> Iterator[str]:
+        # Snapshot keys so callers may delete while iterating items()
+        keys = list(self._loaded)
+        if self.store is not None:
+            keys.extend(
+                path for path in self.store.paths()
+                if path not in self._loaded and path not in self._deleted
+            )
+        return iter(keys)
+
+    def __len__(self) -> int:
+        if self.store is None:
+            return len(self._loaded)
+        stored = sum(1 for path in self.store.paths() if path not in self._deleted)
+        new = sum(1 for path in self._loaded if not self.store.contains(path))
+        return stored + new
+
+    def clear(self) -> None:
+        for file_path in list(self):
+            del self[file_path]
+
+    def flush(self) -> int:
+        """
+        Write changed and deleted entries to the store's delta log.
+
+        Returns:
+            Number of entries written
+        """
+        if self.store is None:
+            return 0
+
+        changed, deleted, pending_deletes = self._collect_changes()
+        self.store.append_deltas(changed, deleted)
+        self._deleted.difference_update(pending_deletes)
+
+        if self.store.needs_compaction():
+            self.store.compact()
+
+        return len(changed) + len(deleted)
+
+    async def persist(self) -> int:
+        """
+        Like flush(), with the file writes and compaction in a worker thread.
+
+        Changes are collected, and the store's state updated, on the event
+        loop; the worker only writes records copied for it and compacts a
+        snapshot of the store, which is adopted once done. Entries changed
+        meanwhile are written by the next call.
+
+        Returns:
+            Number of entries written
+        """
+        if self.store is None:
+            return 0
+
+        if self._persist_lock is None:
+            self._persist_lock = asyncio.Lock()
+        async with self._persist_lock:
+            changed, deleted, pending_deletes = self._collect_changes()
+            await asyncio.to_thread(self.store.write_deltas, changed, deleted)
+            self.store.apply_deltas(changed, deleted)
+            self._deleted.difference_update(pending_deletes)
+
+            if self.store.needs_compaction():
+                snapshot = self.store.snapshot()
+                await asyncio.to_thread(snapshot.compact)
+                self.store.adopt(snapshot)
+
+            return len(changed) + len(deleted)
+
+    def _collect_changes(self) -> Tuple[List[FeatureRecord], List[str], List[str]]:
+        """Records changed since the last flush, stored paths to delete, and all pending deletes"""
+        changed = []
+        for file_path, obj in list(self._loaded.items()):
+            record = self._to_record(obj)
+            signature = self._signature(record)
+            if self._signatures.get(file_path) != signature:
+                changed.append(record)
+                self._signatures[file_path] = signature
+
+        pending_deletes = list(self._deleted)
+        deleted = [path for path in pending_deletes if self.store.contains(path)]
+        return changed, deleted, pending_deletes
+
+    @staticmethod
+    def _signature(record: FeatureRecord) -> Tuple:
+        """Cheap change signature for a record"""
+        return (
+            record.last_updated,
+            record.access_count,
+            len(record.relevance_history),
+            record.relevance_history[-1] if record.relevance_history else None,
+            tuple(sorted(record.features.items()))
+        )
+
+
+class FeedbackLog:
+    """Append-only JSON-lines log of learning feedback"""
+
+    def __init__(self, log_file: Path, max_entries: int = 10000):
+        """
+        Initialize FeedbackLog.
+
+        Args:
+            log_file: Path to the JSON-lines log
+            max_entries: Entries retained when the log is compacted
+        """
+        self.log_file = Path(log_file)
+        self.max_entries = max_entries
+        self.line_count = 0
+
+    def read(self) -> List[Dict[str, Any]]:
+        """Read the most recent max_entries records"""
+        records: List[Dict[str, Any]] = []
+        self.line_count = 0
+        if not self.log_file.exists():
+            return records
+
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                self.line_count += 1
+                try:
+                    records.append(json.loads(line))
+                except json.JSONDecodeError:
+                    logger.warning("Skipping corrupt feedback log entry")
+        return records[-self.max_entries:]
+
+    def append(self, records: List[Dict[str, Any]]) -> None:
+        """Append records to the log, compacting it when it grows too long"""
+        if not records:
+            return
+        with open(self.log_file, 'a', encoding='utf-8') as f:
+            for record in records:
+                f.write(json.dumps(record, separators=(',', ':'), default=_json_default) + "\n")
+        self.line_count += len(records)
+
+        if self.line_count > 2 * self.max_entries:
+            self.compact()
+
+    def compact(self) -> None:
+        """Rewrite the log keeping only the most recent entries"""
+        records = self.read()
+        _atomic_write_text(
+            self.log_file,
+            "".join(
+                json.dumps(r, separators=(',', ':'), default=_json_default) + "\n"
+                for r in records
+            )
+        )
+        self.line_count = len(records)
+
+
+class PatternFile:
+    """Versioned JSON document of learning patterns, rewritten only on change"""
+
+    def __init__(self, path: Path):
+        """
+        Initialize PatternFile.
+
+        Args:
+            path: Path to the patterns document
+        """
+        self.path = Path(path)
+        self._last_written: Optional[str] = None
+
+    def read(self) -> List[Dict[str, Any]]:
+        """Read pattern dictionaries"""
+        if not self.path.exists():
+            return []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            text = f.read()
+        document = json.loads(text)
+        if document.get("version") != STORE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported pattern file version: {document.get('version')}")
+        self._last_written = text
+        return document["patterns"]
+
+    def write(self, patterns: List[Dict[str, Any]]) -> bool:
+        """
+        Write pattern dictionaries if they changed.
+
+        Returns:
+            True if the file was rewritten
+        """
+        text = json.dumps(
+            {"version": STORE_FORMAT_VERSION, "patterns": patterns},
+            separators=(',', ':'),
+            default=_json_default
+        )
+        if text == self._last_written:
+            return False
+        _atomic_write_text(self.path, text)
+        self._last_written = text
+        return True
@@ -593,18 +593,24 @@ class ContextManager:
     async def analyze_agent_learning(
         self,
         agent_type: str,
-        story_id: str
+        story_id: Optional[str] = None,
+        since: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """
         Analyze learning patterns for an agent.
         
         Args:
             agent_type: Type of agent
-            story_id: Story ID
+            story_id: Story ID (if None, analyzes across all stories)
+            since: Only include records at or after this time (cross-story only)
             
         Returns:
             Analysis of agent learning patterns
         """
+        if story_id is None:
+            return await self.agent_memory.analyze_agent_patterns_across_stories(
+                agent_type, since=since
+            )
         return await self.agent_memory.analyze_agent_patterns(agent_type, story_id)
     
     async def optimize_token_budget(
@@ -1666,33 +1672,56 @@ class ContextManager:
         """Format agent memory for context"""
         memory = await self.agent_memory.get_memory(agent_type, story_id)
         
-        if not memory:
+        # Successful patterns this agent learned on other recent stories,
+        # served top-k from the memory index
+        cross_story_patterns = []
+        try:
+            cross_story_patterns = await self.agent_memory.query_patterns(
+                agent_type=agent_type,
+                since=datetime.utcnow() - timedelta(days=30),
+                min_success_rate=0.7,
+                exclude_story_id=story_id,
+                limit=3
+            )
+        except Exception as e:
+            logger.warning(f"Error querying cross-story patterns: {str(e)}")
+        
+        if not memory and not cross_story_patterns:
             return ""
         
         memory_parts = []
         memory_parts.append("### Agent Memory")
         
-        # Recent decisions
-        recent_decisions = memory.get_recent_decisions(limit=5)
-        if recent_decisions:
-            memory_parts.append("#### Recent Decisions:")
-            for decision in recent_decisions:
-                memory_parts.append(f"- {decision.description}: {decision.outcome}")
-        
-        # Learned patterns
-        if memory.learned_patterns:
-            memory_parts.append("#### Learned Patterns:")
-            for pattern in memory.learned_patterns[:3]:  # Top 3 patterns
-                memory_parts.append(f"- {pattern.pattern_type}: {pattern.description}")
-        
-        # Recent handoffs
-        recent_handoffs = [h for h in memory.phase_handoffs[-3:]]
-        if recent_handoffs:
-            memory_parts.append("#### Recent Phase Handoffs:")
-            for handoff in recent_handoffs:
+        if memory:
+            # Recent decisions
+            recent_decisions = memory.get_recent_decisions(limit=5)
+            if recent_decisions:
+                memory_parts.append("#### Recent Decisions:")
+                for decision in recent_decisions:
+                    memory_parts.append(f"- {decision.description}: {decision.outcome}")
+            
+            # Learned patterns
+            if memory.learned_patterns:
+                memory_parts.append("#### Learned Patterns:")
+                for pattern in memory.learned_patterns[:3]:  # Top 3 patterns
+                    memory_parts.append(f"- {pattern.pattern_type}: {pattern.description}")
+            
+            # Recent handoffs
+            recent_handoffs = [h for h in memory.phase_handoffs[-3:]]
+            if recent_handoffs:
+                memory_parts.append("#### Recent Phase Handoffs:")
+                for handoff in recent_handoffs:
+                    memory_parts.append(
+                        f"- {handoff.from_phase.value if handoff.from_phase else 'none'} -> "
+                        f"{handoff.to_phase.value if handoff.to_phase else 'none'}: {handoff.context_summary}"
+                    )
+        
+        if cross_story_patterns:
+            memory_parts.append("#### Patterns From Other Stories:")
+            for pattern in cross_story_patterns:
                 memory_parts.append(
-                    f"- {handoff.from_phase.value if handoff.from_phase else 'none'} -> "
-                    f"{handoff.to_phase.value if handoff.to_phase else 'none'}: {handoff.context_summary}"
+                    f"- {pattern.pattern_type}: {pattern.description} "
+                    f"(success {pattern.success_rate:.0%})"
                 )
         
         memory_content = "\n".join(memory_parts)
@@ -0,0 +1,629 @@
+"""
+File Lock Manager
+
+Shared/exclusive locking of files and directories for parallel TDD execution.
+A single manager is shared by the parallel coordinator, the TDD state machine
+and the conflict resolver so that every component sees one lock table.
+
+Lock targets are repository-relative paths; a trailing "/" denotes a
+directory lock, which covers every path below it.
+"""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import posixpath
+import threading
+import time
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LockMode(Enum):
+    """Lock modes"""
+    SHARED = "shared"        # Read access, compatible with other shared holders
+    EXCLUSIVE = "exclusive"  # Write access, compatible with no other holder
+
+
+class LockTimeoutError(Exception):
+    """Raised when a lock cannot be acquired before its timeout"""
+    pass
+
+
+class DeadlockError(Exception):
+    """Raised when waiting for a lock would close a cycle in the wait-for graph"""
+    
+    def __init__(self, message: str, cycle: List[str]):
+        super().__init__(message)
+        self.cycle = cycle
+
+
+@dataclass
+class LockHold:
+    """A lock held by an owner (typically a TDD cycle ID) on a path"""
+    path: str
+    owner: str
+    mode: LockMode
+    is_directory: bool = False
+    story_id: Optional[str] = None
+    acquired_at: float = field(default_factory=time.monotonic)
+    expires_at: Optional[float] = None  # time.monotonic() deadline
+    count: int = 1                      # Re-entrant acquisitions by the same owner
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    
+    @property
+    def hold_time(self) -> float:
+        """Seconds the lock has been held"""
+        return time.monotonic() - self.acquired_at
+    
+    @property
+    def target(self) -> str:
+        """Path as passed to the manager, with "/" marking directories"""
+        return f"{self.path}/" if self.is_directory and self.path != "." else self.path
+
+
+@dataclass
+class LockRequest:
+    """A queued request waiting for a lock"""
+    path: str
+    owner: str
+    mode: LockMode
+    is_directory: bool = False
+    story_id: Optional[str] = None
+    ttl: Optional[float] = None
+    enqueued_at: float = field(default_factory=time.monotonic)
+    future: Optional[asyncio.Future] = None
+    loop: Optional[asyncio.AbstractEventLoop] = None
+    granted: bool = False
+
+
+def parse_lock_target(path: str) -> Tuple[str, bool]:
+    """Normalize a lock target into (path, is_directory)"""
+    raw = str(path).replace("\\", "/")
+    is_directory = raw.endswith("/") or raw in ("", ".")
+    normalized = posixpath.normpath(raw) if raw else "."
+    if normalized.startswith("./"):
+        normalized = normalized[2:]
+    return normalized, is_directory
+
+
+def _ancestors(path: str) -> Iterable[str]:
+    """Yield the parent directories of a path, ending with the root "." """
+    parent = posixpath.dirname(path)
+    while parent and parent != "/":
+        yield parent
+        parent = posixpath.dirname(parent)
+    if path != ".":
+        yield "."
+
+
+def _is_below(path: str, directory: str) -> bool:
+    """Check if a path lies strictly below a directory"""
+    if directory == ".":
+        return path != "."
+    return path.startswith(directory + "/")
+
+
+def _compatible(requested: LockMode, held: LockMode) -> bool:
+    return requested == LockMode.SHARED and held == LockMode.SHARED
+
+
+class FileLockManager:
+    """
+    Shared/exclusive lock manager for files and directories.
+    
+    Provides non-blocking acquisition for schedulers that park work instead
+    of waiting, FIFO wait queues with timeouts for callers that do wait,
+    deadlock detection over the wait-for graph, optional lock TTLs and
+    lock hold-time metrics. Safe to use from several threads; waiters are
+    woken on the event loop they are waiting on.
+    """
+    
+    def __init__(self, default_ttl: Optional[float] = None, metrics_window: int = 1000):
+        """
+        Initialize File Lock Manager.
+        
+        Args:
+            default_ttl: Seconds after which locks expire unless a TTL is given
+            metrics_window: Number of recent hold and wait times kept for metrics
+        """
+        self.default_ttl = default_ttl
+        
+        self._lock = threading.RLock()
+        
+        # Lock table: path -> owner -> hold, and owner -> paths
+        self._holds: Dict[str, Dict[str, LockHold]] = {}
+        self._owner_paths: Dict[str, Set[str]] = defaultdict(set)
+        
+        # Directory holds per path, and number of held paths below each directory
+        self._directory_holds: Dict[str, int] = defaultdict(int)
+        self._descendant_holds: Dict[str, int] = defaultdict(int)
+        
+        # FIFO wait queues per path, and pending requests per owner
+        self._queues: Dict[str, Deque[LockRequest]] = {}
+        self._waiting: Dict[str, List[LockRequest]] = defaultdict(list)
+        
+        # Expiry deadlines: (expires_at, seq, path, owner, hold), lazily invalidated
+        self._deadlines: List[Tuple[float, int, str, str, LockHold]] = []
+        self._deadline_sequence = itertools.count()
+        
+        self._release_listeners: List[Callable[[str, str], None]] = []
+        
+        # Metrics
+        self.stats = {
+            "acquired": 0,
+            "released": 0,
+            "contended": 0,
+            "timeouts": 0,
+            "deadlocks": 0,
+            "expired": 0
+        }
+        self._hold_times: Dict[LockMode, Deque[float]] = {
+            mode: deque(maxlen=metrics_window) for mode in LockMode
+        }
+        self._wait_times: Deque[float] = deque(maxlen=metrics_window)
+        self._max_hold_time = {mode: 0.0 for mode in LockMode}
+    
+    # Acquisition
+    
+    def try_acquire(
+        self,
+        owner: str,
+        path: str,
+        mode: LockMode = LockMode.EXCLUSIVE,
+        ttl: Optional[float] = None,
+        story_id: Optional[str] = None
+    ) -> bool:
+        """Acquire a lock without waiting; fails if it conflicts or others queue for it"""
+        return self.try_acquire_all(owner, [(path, mode)], ttl=ttl, story_id=story_id)
+    
+    def try_acquire_all(
+        self,
+        owner: str,
+        targets: Iterable[Tuple[str, LockMode]],
+        ttl: Optional[float] = None,
+        story_id: Optional[str] = None
+    ) -> bool:
+        """Acquire several locks atomically without waiting (all or none)"""
+        parsed = [(*parse_lock_target(path), mode) for path, mode in targets]
+        
+        with self._lock:
+            for path, is_directory, mode in parsed:
+                if self._conflicting_holds(owner, path, is_directory, mode) or self._has_queued_waiters(owner, path):
+                    self.stats["contended"] += 1
+                    return False
+            
+            for path, is_directory, mode in parsed:
+                self._grant(owner, path, is_directory, mode, ttl, story_id)
+        
+        return True
+    
+    async def acquire(
+        self,
+        owner: str,
+        path: str,
+        mode: LockMode = LockMode.EXCLUSIVE,
+        timeout: Optional[float] = None,
+        ttl: Optional[float] = None,
+        story_id: Optional[str] = None
+    ) -> LockHold:
+        """
+        Acquire a lock, waiting in FIFO order behind earlier requests.
+        
+        Raises:
+            LockTimeoutError: The lock was not granted within the timeout
+            DeadlockError: Waiting would deadlock with the current holders
+        """
+        target, is_directory = parse_lock_target(path)
+        
+        with self._lock:
+            if not self._conflicting_holds(owner, target, is_directory, mode) and not self._has_queued_waiters(owner, target):
+                return self._grant(owner, target, is_directory, mode, ttl, story_id)
+            
+            self.stats["contended"] += 1
+            loop = asyncio.get_running_loop()
+            request = LockRequest(
+                path=target,
+                owner=owner,
+                mode=mode,
+                is_directory=is_directory,
+                story_id=story_id,
+                ttl=ttl,
+                future=loop.create_future(),
+                loop=loop
+            )
+            self._queues.setdefault(target, deque()).append(request)
+            self._waiting[owner].append(request)
+            
+            cycle = self._find_wait_cycle(owner)
+            if cycle:
+                self._remove_request(request)
+                self.stats["deadlocks"] += 1
+                raise DeadlockError(
+                    f"Waiting for {mode.value} lock on {path} would deadlock: {' -> '.join(cycle)}",
+                    cycle
+                )
+        
+        try:
+            await asyncio.wait_for(asyncio.shield(request.future), timeout=timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            with self._lock:
+                if not request.granted:
+                    self._remove_request(request)
+                    if isinstance(e, asyncio.CancelledError):
+                        raise
+                    self.stats["timeouts"] += 1
+                    raise LockTimeoutError(
+                        f"Timed out after {timeout}s waiting for {mode.value} lock on {path}"
+                    ) from None
+            if isinstance(e, asyncio.CancelledError):
+                self.release(owner, path)
+                raise
+        
+        self._wait_times.append(time.monotonic() - request.enqueued_at)
+        with self._lock:
+            return self._holds[target][owner]
+    
+    async def acquire_all(
+        self,
+        owner: str,
+        targets: Iterable[Tuple[str, LockMode]],
+        timeout: Optional[float] = None,
+        ttl: Optional[float] = None,
+        story_id: Optional[str] = None
+    ) -> List[LockHold]:
+        """
+        Acquire several locks, waiting as needed.
+        
+        Locks are taken in path order so that owners using acquire_all cannot
+        deadlock each other; on failure every lock taken so far is released.
+        """
+        ordered = sorted(
+            {parse_lock_target(path): mode for path, mode in targets}.items(),
+            key=lambda item: item[0][0]
+        )
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        holds = []
+        
+        try:
+            for (path, is_directory), mode in ordered:
+                remaining = max(deadline - time.monotonic(), 0.0) if deadline is not None else None
+                target = f"{path}/" if is_directory and path != "." else path
+                holds.append(await self.acquire(owner, target, mode, remaining, ttl, story_id))
+        except BaseException:
+            for hold in holds:
+                self.release(owner, hold.target)
+            raise
+        
+        return holds
+    
+    # Release
+    
+    def release(self, owner: str, path: str) -> bool:
+        """Release one acquisition of a lock; returns True if the lock was freed"""
+        target, _ = parse_lock_target(path)
+        
+        with self._lock:
+            hold = self._holds.get(target, {}).get(owner)
+            if hold is None:
+                return False
+            
+            hold.count -= 1
+            if hold.count > 0:
+                return False
+            
+            self._remove_hold(hold)
+            self._grant_waiters(target)
+        
+        self._notify_released([hold])
+        return True
+    
+    def release_owner(self, owner: str) -> List[LockHold]:
+        """Release every lock held by an owner"""
+        with self._lock:
+            released = [self._holds[path][owner] for path in list(self._owner_paths.get(owner, ()))]
+            for hold in released:
+                self._remove_hold(hold)
+            for hold in released:
+                self._grant_waiters(hold.path)
+        
+        self._notify_released(released)
+        return released
+    
+    def expire_locks(self) -> List[LockHold]:
+        """Release locks whose TTL has passed (only due deadlines are visited)"""
+        now = time.monotonic()
+        expired = []
+        
+        with self._lock:
+            while self._deadlines and self._deadlines[0][0] <= now:
+                _, _, path, owner, hold = heapq.heappop(self._deadlines)
+                
+                # Skip entries for holds that were released or replaced since
+                if self._holds.get(path, {}).get(owner) is not hold:
+                    continue
+                
+                self._remove_hold(hold)
+                self._grant_waiters(path)
+                expired.append(hold)
+                logger.warning(f"Released expired {hold.mode.value} lock on {hold.target} held by {owner}")
+            
+            self.stats["expired"] += len(expired)
+        
+        self._notify_released(expired)
+        return expired
+    
+    def next_expiry(self) -> Optional[float]:
+        """Seconds until the next lock expires, if any lock has a TTL"""
+        with self._lock:
+            while self._deadlines:
+                _, _, path, owner, hold = self._deadlines[0]
+                if self._holds.get(path, {}).get(owner) is hold:
+                    return max(self._deadlines[0][0] - time.monotonic(), 0.0)
+                heapq.heappop(self._deadlines)
+        return None
+    
+    def add_release_listener(self, listener: Callable[[str, str], None]) -> None:
+        """Register a callback invoked with (path, owner) whenever a lock is freed"""
+        self._release_listeners.append(listener)
+    
+    # Queries
+    
+    def find_conflicts(self, owner: str, targets: Iterable[Tuple[str, LockMode]]) -> List[LockHold]:
+        """Get the holds that currently prevent an owner from taking the given locks"""
+        conflicts = []
+        with self._lock:
+            for path, mode in targets:
+                target, is_directory = parse_lock_target(path)
+                conflicts.extend(self._conflicting_holds(owner, target, is_directory, mode))
+        return conflicts
+    
+    def held_mode(self, owner: str, path: str) -> Optional[LockMode]:
+        """Get the mode in which an owner holds a path, if at all"""
+        target, _ = parse_lock_target(path)
+        with self._lock:
+            hold = self._holds.get(target, {}).get(owner)
+            return hold.mode if hold else None
+    
+    def holders(self, path: str) -> List[LockHold]:
+        """Get the holds on a path"""
+        target, _ = parse_lock_target(path)
+        with self._lock:
+            return list(self._holds.get(target, {}).values())
+    
+    def owner_locks(self, owner: str) -> List[LockHold]:
+        """Get the holds of an owner"""
+        with self._lock:
+            return [self._holds[path][owner] for path in self._owner_paths.get(owner, ())]
+    
+    def waiting_owners(self) -> List[str]:
+        """Owners with lock requests queued"""
+        with self._lock:
+            return list(self._waiting)
+    
+    def blocked_by(self, owner: str) -> Set[str]:
+        """Owners a waiting owner is blocked by in the wait-for graph (holders and earlier waiters)"""
+        with self._lock:
+            return self._waits_for(owner)
+    
+    def lock_count(self) -> int:
+        """Get the number of held locks"""
+        with self._lock:
+            return sum(len(holds) for holds in self._holds.values())
+    
+    def waiter_count(self) -> int:
+        """Get the number of queued lock requests"""
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get lock contention and hold-time metrics"""
+        def summarize(samples: Deque[float]) -> Dict[str, float]:
+            if not samples:
+                return {"count": 0, "average": 0.0, "p95": 0.0}
+            ordered = sorted(samples)
+            return {
+                "count": len(ordered),
+                "average": sum(ordered) / len(ordered),
+                "p95": ordered[min(int(len(ordered) * 0.95), len(ordered) - 1)]
+            }
+        
+        with self._lock:
+            hold_times = {}
+            for mode in LockMode:
+                hold_times[mode.value] = summarize(self._hold_times[mode])
+                hold_times[mode.value]["max"] = self._max_hold_time[mode]
+            
+            return {
+                **self.stats,
+                "held_locks": sum(len(holds) for holds in self._holds.values()),
+                "waiting_requests": sum(len(queue) for queue in self._queues.values()),
+                "hold_times": hold_times,
+                "wait_times": summarize(self._wait_times)
+            }
+    
+    # Internal helpers (callers hold self._lock)
+    
+    def _conflicting_holds(self, owner: str, path: str, is_directory: bool, mode: LockMode) -> List[LockHold]:
+        """Find holds by other owners incompatible with the requested lock"""
+        conflicts = []
+        
+        def collect(holds: Dict[str, LockHold], directories_only: bool = False) -> None:
+            for hold in holds.values():
+                if hold.owner == owner or (directories_only and not hold.is_directory):
+                    continue
+                if not _compatible(mode, hold.mode):
+                    conflicts.append(hold)
+        
+        collect(self._holds.get(path, {}))
+        
+        # Directory locks cover every path below them
+        for ancestor in _ancestors(path):
+            if self._directory_holds.get(ancestor):
+                collect(self._holds[ancestor], directories_only=True)
+        
+        if is_directory and self._descendant_holds.get(path):
+            for held_path, holds in self._holds.items():
+                if _is_below(held_path, path):
+                    collect(holds)
+        
+        return conflicts
+    
+    def _has_queued_waiters(self, owner: str, path: str) -> bool:
+        """Check if other owners already queue for a path (FIFO fairness)"""
+        return any(request.owner != owner for request in self._queues.get(path, ()))
+    
+    def _grant(
+        self,
+        owner: str,
+        path: str,
+        is_directory: bool,
+        mode: LockMode,
+        ttl: Optional[float],
+        story_id: Optional[str]
+    ) -> LockHold:
+        """Record a granted lock (re-entrant; upgrades shared to exclusive)"""
+        ttl = ttl if ttl is not None else self.default_ttl
+        hold = self._holds.get(path, {}).get(owner)
+        
+        if hold is not None:
+            hold.count += 1
+            if mode == LockMode.EXCLUSIVE:
+                hold.mode = LockMode.EXCLUSIVE
+            hold.is_directory = hold.is_directory or is_directory
+        else:
+            hold = LockHold(path=path, owner=owner, mode=mode, is_directory=is_directory, story_id=story_id)
+            self._holds.setdefault(path, {})[owner] = hold
+            self._owner_paths[owner].add(path)
+            if is_directory:
+                self._directory_holds[path] += 1
+            for ancestor in _ancestors(path):
+                self._descendant_holds[ancestor] += 1
+            self.stats["acquired"] += 1
+        
+        if ttl:
+            hold.expires_at = time.monotonic() + ttl
+            heapq.heappush(self._deadlines, (hold.expires_at, next(self._deadline_sequence), path, owner, hold))
+        
+        return hold
+    
+    def _remove_hold(self, hold: LockHold) -> None:
+        """Remove a hold from the lock table and record its hold time"""
+        holds = self._holds[hold.path]
+        del holds[hold.owner]
+        if not holds:
+            del self._holds[hold.path]
+        
+        owner_paths = self._owner_paths[hold.owner]
+        owner_paths.discard(hold.path)
+        if not owner_paths:
+            del self._owner_paths[hold.owner]
+        
+        if hold.is_directory:
+            self._directory_holds[hold.path] -= 1
+            if not self._directory_holds[hold.path]:
+                del self._directory_holds[hold.path]
+        for ancestor in _ancestors(hold.path):
+            self._descendant_holds[ancestor] -= 1
+            if not self._descendant_holds[ancestor]:
+                del self._descendant_holds[ancestor]
+        
+        hold_time = hold.hold_time
+        self._hold_times[hold.mode].append(hold_time)
+        self._max_hold_time[hold.mode] = max(self._max_hold_time[hold.mode], hold_time)
+        self.stats["released"] += 1
+    
+    def _grant_waiters(self, released_path: str) -> None:
+        """Grant queued requests, in FIFO order per path, that the release unblocked"""
+        for path in list(self._queues):
+            if not (path == released_path or _is_below(path, released_path) or _is_below(released_path, path)):
+                continue
+            
+            queue = self._queues[path]
+            while queue:
+                request = queue[0]
+                if self._conflicting_holds(request.owner, request.path, request.is_directory, request.mode):
+                    break
+                queue.popleft()
+                self._waiting[request.owner].remove(request)
+                if not self._waiting[request.owner]:
+                    del self._waiting[request.owner]
+                
+                self._grant(request.owner, request.path, request.is_directory, request.mode, request.ttl, request.story_id)
+                request.granted = True
+                request.loop.call_soon_threadsafe(_resolve_future, request.future)
+            
+            if not queue:
+                del self._queues[path]
+    
+    def _remove_request(self, request: LockRequest) -> None:
+        """Withdraw a queued request"""
+        queue = self._queues.get(request.path)
+        if queue is not None and request in queue:
+            queue.remove(request)
+            if not queue:
+                del self._queues[request.path]
+        
+        pending = self._waiting.get(request.owner)
+        if pending is not None and request in pending:
+            pending.remove(request)
+            if not pending:
+                del self._waiting[request.owner]
+        
+        # Requests queued behind a withdrawn one may now be grantable
+        self._grant_waiters(request.path)
+    
+    def _waits_for(self, owner: str) -> Set[str]:
+        """Owners that a waiting owner is blocked by (holders and earlier waiters)"""
+        blockers = set()
+        for request in self._waiting.get(owner, ()):
+            for hold in self._conflicting_holds(owner, request.path, request.is_directory, request.mode):
+                blockers.add(hold.owner)
+            for earlier in self._queues.get(request.path, ()):
+                if earlier is request:
+                    break
+                if earlier.owner != owner and not (
+                    _compatible(request.mode, earlier.mode) and _compatible(earlier.mode, request.mode)
+                ):
+                    blockers.add(earlier.owner)
+        return blockers
+    
+    def _find_wait_cycle(self, owner: str) -> Optional[List[str]]:
+        """Depth-first search of the wait-for graph for a cycle through an owner"""
+        path = [owner]
+        visited = set()
+        
+        def visit(current: str) -> bool:
+            for blocker in self._waits_for(current):
+                if blocker == owner:
+                    path.append(owner)
+                    return True
+                if blocker in visited or blocker not in self._waiting:
+                    continue
+                visited.add(blocker)
+                path.append(blocker)
+                if visit(blocker):
+                    return True
+                path.pop()
+            return False
+        
+        return path if visit(owner) else None
+    
+    def _notify_released(self, holds: List[LockHold]) -> None:
+        """Invoke release listeners outside the manager lock"""
+        for hold in holds:
+            for listener in self._release_listeners:
+                try:
+                    listener(hold.path, hold.owner)
+                except Exception as e:
+                    logger.warning(f"Lock release listener failed for {hold.target}: {e}")
+
+
+def _resolve_future(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(True)
@@ -28,6 +28,9 @@ from .multi_project_config import (
     MultiProjectConfigManager, ProjectConfig, GlobalOrchestratorConfig,
     ProjectStatus, ProjectPriority, ResourceLimits
 )
+from .process_resource_limiter import ProcessLimits, ProcessResourceLimiter
+from .process_resource_sampler import ProcessTreeSampler
+from .resource_scheduler import ResourceScheduler, ResourceUsage
 
 # Import existing components
 try:
@@ -80,6 +83,7 @@ class ResourceAllocation:
     allocated_memory_mb: int
     allocated_cpu_percent: float
     priority_weight: float
+    allocated_io_mbps: float = 0.0  # 0 for unlimited
     usage_history: List[Tuple[datetime, Dict[str, float]]] = field(default_factory=list)
 
 
@@ -120,6 +124,17 @@ class GlobalOrchestrator:
         self.orchestrators: Dict[str, ProjectOrchestrator] = {}
         self.resource_allocations: Dict[str, ResourceAllocation] = {}
         
+        # Measured usage of each project's process tree, reported to the
+        # resource scheduler when one is attached
+        self.resource_scheduler: Optional[ResourceScheduler] = None
+        self.resource_sampler = ProcessTreeSampler()
+        
+        # Enforcement of each project's CPU, memory and disk I/O allocation
+        self.resource_limiter = ProcessResourceLimiter(
+            cpu_budget_cores=self.global_config.global_cpu_cores,
+            enabled=self.global_config.enforce_resource_limits
+        )
+        
         # Global state and coordination
         self.status = OrchestratorStatus.STOPPED
         self.start_time: Optional[datetime] = None
@@ -250,6 +265,11 @@ class GlobalOrchestrator:
             # Prepare orchestrator command
             orchestrator_cmd = await self._prepare_orchestrator_command(project_config, allocation)
             
+            # Confine the orchestrator and everything it spawns to its allocation
+            preexec_fn = self.resource_limiter.prepare(
+                project_name, project_config.path, self._process_limits(allocation)
+            )
+            
             # Start project orchestrator subprocess
             process = subprocess.Popen(
                 orchestrator_cmd,
@@ -257,7 +277,8 @@ class GlobalOrchestrator:
                 stdout=subprocess.PIPE,
                 stderr=subprocess.PIPE,
                 text=True,
-                env=await self._prepare_project_environment(project_config, allocation)
+                env=await self._prepare_project_environment(project_config, allocation),
+                preexec_fn=preexec_fn
             )
             
             # Create orchestrator tracking object
@@ -335,6 +356,7 @@ class GlobalOrchestrator:
             # Clean up resource allocation
             if project_name in self.resource_allocations:
                 del self.resource_allocations[project_name]
+            self.resource_limiter.release(project_name)
             
             logger.info(f"Stopped project orchestrator for '{project_name}'")
             return True
@@ -397,7 +419,8 @@ class GlobalOrchestrator:
                 "configuration": {
                     "max_total_agents": self.global_config.max_total_agents,
                     "max_concurrent_projects": self.global_config.max_concurrent_projects,
-                    "resource_allocation_strategy": self.global_config.resource_allocation_strategy
+                    "resource_allocation_strategy": self.global_config.resource_allocation_strategy,
+                    "resource_limit_mode": self.resource_limiter.mode
                 }
             },
             "projects": {
@@ -420,6 +443,7 @@ class GlobalOrchestrator:
                     "allocated_agents": alloc.allocated_agents,
                     "allocated_memory_mb": alloc.allocated_memory_mb,
                     "allocated_cpu_percent": alloc.allocated_cpu_percent,
+                    "allocated_io_mbps": alloc.allocated_io_mbps,
                     "priority_weight": alloc.priority_weight
                 }
                 for name, alloc in self.resource_allocations.items()
@@ -468,6 +492,7 @@ class GlobalOrchestrator:
         while self.status in [OrchestratorStatus.RUNNING, OrchestratorStatus.PAUSED]:
             try:
                 await self._update_orchestrator_status()
+                await self._sample_project_resources()
                 await self._collect_metrics()
                 await self._detect_cross_project_patterns()
                 await asyncio.sleep(self.global_config.scheduling_interval_seconds)
@@ -537,12 +562,14 @@ class GlobalOrchestrator:
             base_agents = self.global_config.max_total_agents // max(total_active, 1)
             base_memory = (self.global_config.global_memory_limit_gb * 1024) // max(total_active, 1)
             base_cpu = 100.0 / max(total_active, 1)
+            base_io = self.global_config.global_io_bandwidth_mbps / max(total_active, 1)
         else:  # priority_based
             total_weight = sum(priority_weights.get(p.priority, 1.0) for p in self.config_manager.get_active_projects())
             weight_ratio = priority_weight / max(total_weight, 1.0)
             base_agents = int(self.global_config.max_total_agents * weight_ratio)
             base_memory = int(self.global_config.global_memory_limit_gb * 1024 * weight_ratio)
             base_cpu = 100.0 * weight_ratio
+            base_io = self.global_config.global_io_bandwidth_mbps * weight_ratio
         
         # Apply project-specific limits
         allocated_agents = min(base_agents, project_config.resource_limits.max_parallel_agents)
@@ -554,7 +581,16 @@ class GlobalOrchestrator:
             allocated_agents=allocated_agents,
             allocated_memory_mb=allocated_memory,
             allocated_cpu_percent=allocated_cpu,
-            priority_weight=priority_weight
+            priority_weight=priority_weight,
+            allocated_io_mbps=base_io
+        )
+    
+    def _process_limits(self, allocation: ResourceAllocation) -> ProcessLimits:
+        """Host limits for a project orchestrator; CPU percent is of the global core budget"""
+        return ProcessLimits(
+            cpu_cores=allocation.allocated_cpu_percent / 100.0 * self.global_config.global_cpu_cores,
+            memory_mb=allocation.allocated_memory_mb,
+            io_mbps=allocation.allocated_io_mbps
         )
     
     async def _prepare_orchestrator_command(
@@ -588,6 +624,7 @@ class GlobalOrchestrator:
             "ORCH_MAX_AGENTS": str(allocation.allocated_agents),
             "ORCH_MEMORY_LIMIT": str(allocation.allocated_memory_mb),
             "ORCH_CPU_LIMIT": str(allocation.allocated_cpu_percent),
+            "ORCH_CPU_CORES": str(self._process_limits(allocation).cpu_cores),
             "ORCH_GLOBAL_MODE": "true"
         })
         
@@ -628,6 +665,31 @@ class GlobalOrchestrator:
                         # Fallback when psutil is not available
                         orchestrator.last_heartbeat = datetime.utcnow()
     
+    async def _sample_project_resources(self) -> None:
+        """Measure each project's process tree and report it to the resource scheduler"""
+        roots = {
+            name: orchestrator.pid
+            for name, orchestrator in self.orchestrators.items()
+            if orchestrator.pid and orchestrator.status in [OrchestratorStatus.RUNNING, OrchestratorStatus.PAUSED]
+        }
+        
+        for name, usage in self.resource_sampler.sample(roots).items():
+            orchestrator = self.orchestrators[name]
+            orchestrator.cpu_usage = usage.cpu_cores * 100  # Percent of one core, as psutil reports
+            orchestrator.memory_usage = usage.memory_mb
+            
+            if self.resource_scheduler and name in self.resource_scheduler.project_schedules:
+                # Agent counts and disk space are tracked by the scheduler, not measured here
+                previous = self.resource_scheduler.project_schedules[name].current_usage
+                self.resource_scheduler.update_resource_usage(name, ResourceUsage(
+                    cpu_usage=usage.cpu_cores,
+                    memory_usage_mb=int(usage.memory_mb),
+                    active_agents=previous.active_agents,
+                    disk_usage_mb=previous.disk_usage_mb,
+                    network_usage_mbps=previous.network_usage_mbps,
+                    disk_io_mbps=usage.read_mb_per_second + usage.write_mb_per_second
+                ))
+    
     async def _collect_metrics(self) -> None:
         """Collect global metrics"""
         self.metrics.total_projects = len(self.config_manager.projects)
@@ -656,9 +718,38 @@ class GlobalOrchestrator:
         pass
     
     async def _rebalance_resources(self) -> None:
-        """Rebalance resources across projects"""
-        # This would dynamically adjust resource allocations based on usage patterns
-        pass
+        """Recompute allocations of running projects and apply changed limits live"""
+        for name, orchestrator in self.orchestrators.items():
+            if orchestrator.status not in [OrchestratorStatus.RUNNING, OrchestratorStatus.PAUSED] or not orchestrator.pid:
+                continue
+            
+            project_config = self.config_manager.get_project(name)
+            current = self.resource_allocations.get(name)
+            if not project_config or not current:
+                continue
+            
+            # Shares change as projects start, stop or change priority
+            allocation = await self._calculate_resource_allocation(project_config)
+            if (
+                allocation.allocated_agents == current.allocated_agents and
+                allocation.allocated_memory_mb == current.allocated_memory_mb and
+                allocation.allocated_cpu_percent == current.allocated_cpu_percent and
+                allocation.allocated_io_mbps == current.allocated_io_mbps
+            ):
+                continue
+            
+            # The agent count is passed at start and takes effect on restart
+            current.allocated_agents = allocation.allocated_agents
+            current.allocated_memory_mb = allocation.allocated_memory_mb
+            current.allocated_cpu_percent = allocation.allocated_cpu_percent
+            current.allocated_io_mbps = allocation.allocated_io_mbps
+            current.priority_weight = allocation.priority_weight
+            
+            if self.resource_limiter.update(name, orchestrator.pid, self._process_limits(current)):
+                logger.info(
+                    f"Rebalanced project '{name}': {current.allocated_cpu_percent:.1f}% CPU, "
+                    f"{current.allocated_memory_mb}MB memory"
+                )
     
     async def _check_orchestrator_health(self) -> None:
         """Check health of all orchestrators"""
@@ -105,12 +105,14 @@ class GlobalOrchestratorConfig:
     # Global settings
     max_total_agents: int = 20
     max_concurrent_projects: int = 10
-    resource_allocation_strategy: str = "fair_share"  # "fair_share", "priority_based", "dynamic"
+    resource_allocation_strategy: str = "fair_share"  # "fair_share", "priority_based", "dynamic", "drf"
     
     # Global resource limits
     global_memory_limit_gb: int = 8
     global_cpu_cores: int = 4
     global_disk_limit_gb: int = 50
+    global_io_bandwidth_mbps: int = 0  # Disk read/write rate shared by projects, 0 for unlimited
+    enforce_resource_limits: bool = True  # Confine project orchestrators with cgroup v2 or setrlimit/nice
     
     # Scheduling and coordination
     scheduling_interval_seconds: int = 30
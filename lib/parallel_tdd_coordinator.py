@@ -1,13 +1,16 @@
 """
 Parallel TDD Coordinator - Core Coordination Engine
 
-Central coordination engine for handling 3-5 concurrent TDD cycles with intelligent
+Central coordination engine for handling concurrent TDD cycles with intelligent
 resource allocation, conflict detection, and optimal scheduling. Leverages the
 Context Management System for cross-story insights and coordination.
 """
 
 import asyncio
+import heapq
+import itertools
 import logging
+import os
 import time
 import uuid
 from typing import Dict, List, Optional, Any, Set, Tuple, Union
@@ -23,11 +26,13 @@ try:
     from .tdd_state_machine import TDDStateMachine, TDDCommandResult
     from .context_manager import ContextManager
     from .state_broadcaster import emit_tdd_transition, emit_parallel_status
+    from .file_lock_manager import FileLockManager, LockMode, parse_lock_target
 except ImportError:
     from tdd_models import TDDState, TDDCycle, TDDTask, TestResult, TestStatus
     from tdd_state_machine import TDDStateMachine, TDDCommandResult
     from context_manager import ContextManager
     from state_broadcaster import emit_tdd_transition, emit_parallel_status
+    from file_lock_manager import FileLockManager, LockMode, parse_lock_target
 
 logger = logging.getLogger(__name__)
 
@@ -59,26 +64,6 @@ class ResourceType(Enum):
     REPOSITORY = "repository"
 
 
-@dataclass
-class ResourceLock:
-    """Resource lock for preventing conflicts"""
-    resource_id: str
-    resource_type: ResourceType
-    cycle_id: str
-    story_id: str
-    locked_at: datetime
-    lock_duration: Optional[timedelta] = None
-    exclusive: bool = True
-    metadata: Dict[str, Any] = field(default_factory=dict)
-    
-    @property
-    def is_expired(self) -> bool:
-        """Check if lock has expired"""
-        if not self.lock_duration:
-            return False
-        return datetime.utcnow() - self.locked_at > self.lock_duration
-
-
 @dataclass
 class ParallelCycle:
     """Enhanced TDD cycle for parallel execution"""
@@ -87,7 +72,8 @@ class ParallelCycle:
     priority: int = 5  # 1-10, lower is higher priority
     dependencies: Set[str] = field(default_factory=set)  # Story IDs this depends on
     conflicts: Set[str] = field(default_factory=set)     # Story IDs in conflict
-    resource_locks: Set[str] = field(default_factory=set)  # Resource IDs locked
+    resource_locks: Set[str] = field(default_factory=set)  # Paths locked in the lock manager
+    read_paths: Set[str] = field(default_factory=set)      # Paths only read (locked shared)
     agent_assignments: Dict[TDDState, str] = field(default_factory=dict)  # Agent assignments
     estimated_duration: Optional[timedelta] = None
     started_at: Optional[datetime] = None
@@ -95,6 +81,7 @@ class ParallelCycle:
     last_activity: datetime = field(default_factory=datetime.utcnow)
     execution_metrics: Dict[str, Any] = field(default_factory=dict)
     context_preparation_time: float = 0.0
+    recorded_state: Optional[TDDState] = None  # State whose written files were last recorded
     
     @property
     def id(self) -> str:
@@ -130,6 +117,8 @@ class ParallelExecutionStats:
     """Statistics for parallel execution"""
     total_cycles: int = 0
     active_cycles: int = 0
+    peak_active_cycles: int = 0
+    started_cycles: int = 0
     completed_cycles: int = 0
     failed_cycles: int = 0
     blocked_cycles: int = 0
@@ -143,41 +132,194 @@ class ParallelExecutionStats:
     failed_parallel_transitions: int = 0
 
 
+class AdmissionController:
+    """
+    Capacity-aware admission control for parallel cycles.
+    
+    Sizes the number of concurrently active cycles from the resource quota
+    granted to the project, the agent pool's task capacity and the observed
+    per-cycle CPU and memory footprint. Admission backs off when context
+    preparation or agent latency degrades relative to its long-run baseline.
+    """
+    
+    def __init__(
+        self,
+        max_cycles: Optional[int] = None,
+        min_cycles: int = 1,
+        resource_quota: Optional[Any] = None,
+        cycle_cpu_estimate: float = 0.5,
+        cycle_memory_estimate_mb: float = 256.0,
+        quota_headroom: float = 0.9,
+        latency_tolerance: float = 2.0,
+        fast_smoothing: float = 0.2,
+        slow_smoothing: float = 0.02,
+        warmup_samples: int = 5
+    ):
+        """
+        Initialize admission controller.
+        
+        Args:
+            max_cycles: Concurrency ceiling used when no resource quota is
+                granted (None to size against the host)
+            min_cycles: Concurrency that is always admitted, even under pressure
+            resource_quota: ResourceQuota granted by the resource scheduler;
+                when set it replaces max_cycles
+            cycle_cpu_estimate: CPU cores per cycle until usage is observed
+            cycle_memory_estimate_mb: Memory per cycle until usage is observed
+            quota_headroom: Fraction of the quota that cycles may occupy
+            latency_tolerance: Allowed ratio of recent to baseline latency
+            fast_smoothing: EWMA factor for recent observations
+            slow_smoothing: EWMA factor for the latency baseline
+            warmup_samples: Latency samples required before back-pressure applies
+        """
+        self.max_cycles = max(max_cycles, 1) if max_cycles else None
+        self.min_cycles = max(min_cycles, 1)
+        self.resource_quota = resource_quota
+        self.quota_headroom = quota_headroom
+        self.latency_tolerance = latency_tolerance
+        self.fast_smoothing = fast_smoothing
+        self.slow_smoothing = slow_smoothing
+        self.warmup_samples = warmup_samples
+        
+        # Observed per-cycle footprint (EWMA)
+        self.cycle_cpu = cycle_cpu_estimate
+        self.cycle_memory_mb = cycle_memory_estimate_mb
+        
+        # Task slots offered by the agent pool (None when no pool is attached)
+        self.agent_capacity: Optional[int] = None
+        
+        # Latency signal -> [recent EWMA, baseline EWMA, samples]
+        self._latency: Dict[str, List[float]] = {}
+        
+        self.current_limit = self.compute_limit()
+    
+    def update_quota(self, resource_quota: Optional[Any]) -> None:
+        """Set the resource quota granted to the project"""
+        self.resource_quota = resource_quota
+    
+    def update_agent_capacity(self, task_slots: Optional[int]) -> None:
+        """Set the number of concurrent tasks the agent pool can serve"""
+        self.agent_capacity = task_slots
+    
+    def observe_usage(self, cpu_cores: float, memory_mb: float, active_cycles: int) -> None:
+        """Fold a project-wide resource usage sample into the per-cycle footprint"""
+        if active_cycles <= 0:
+            return
+        
+        alpha = self.fast_smoothing
+        self.cycle_cpu = self.cycle_cpu * (1 - alpha) + (cpu_cores / active_cycles) * alpha
+        self.cycle_memory_mb = self.cycle_memory_mb * (1 - alpha) + (memory_mb / active_cycles) * alpha
+    
+    def observe_latency(self, signal: str, seconds: float) -> None:
+        """Record a latency sample for a signal (context preparation, agent tasks)"""
+        if seconds < 0:
+            return
+        
+        state = self._latency.get(signal)
+        if state is None:
+            self._latency[signal] = [seconds, seconds, 1]
+            return
+        
+        state[0] = state[0] * (1 - self.fast_smoothing) + seconds * self.fast_smoothing
+        
+        # Clip baseline updates so sustained degradation is not absorbed as normal
+        baseline_sample = min(seconds, state[1] * self.latency_tolerance)
+        state[1] = state[1] * (1 - self.slow_smoothing) + baseline_sample * self.slow_smoothing
+        state[2] += 1
+    
+    def latency_degradation(self) -> float:
+        """Worst ratio of recent to baseline latency across warmed-up signals"""
+        degradation = 1.0
+        for recent, baseline, samples in self._latency.values():
+            if samples >= self.warmup_samples and baseline > 0:
+                degradation = max(degradation, recent / baseline)
+        return degradation
+    
+    def compute_limit(self) -> int:
+        """Compute the current concurrency limit"""
+        limits = []
+        
+        if self.resource_quota is not None:
+            limits.append(self.resource_quota.cpu_cores * self.quota_headroom / max(self.cycle_cpu, 0.01))
+            limits.append(self.resource_quota.memory_mb * self.quota_headroom / max(self.cycle_memory_mb, 1.0))
+        elif self.max_cycles is not None:
+            limits.append(self.max_cycles)
+        else:
+            # No quota granted: size against the host
+            limits.append((os.cpu_count() or 1) * self.quota_headroom / max(self.cycle_cpu, 0.01))
+        
+        if self.agent_capacity is not None:
+            limits.append(self.agent_capacity)
+        
+        limit = min(limits)
+        
+        # Back-pressure: shrink admission in proportion to latency degradation
+        degradation = self.latency_degradation()
+        if degradation > self.latency_tolerance:
+            limit *= self.latency_tolerance / degradation
+        
+        self.current_limit = max(int(limit), self.min_cycles)
+        return self.current_limit
+    
+    def get_status(self) -> Dict[str, Any]:
+        """Get admission control status"""
+        return {
+            "limit": self.current_limit,
+            "max_cycles": self.max_cycles,
+            "agent_capacity": self.agent_capacity,
+            "cycle_cpu": self.cycle_cpu,
+            "cycle_memory_mb": self.cycle_memory_mb,
+            "latency_degradation": self.latency_degradation(),
+            "latency": {
+                signal: {"recent": recent, "baseline": baseline, "samples": int(samples)}
+                for signal, (recent, baseline, samples) in self._latency.items()
+            }
+        }
+
+
 class ParallelTDDCoordinator:
     """
     Central coordination engine for parallel TDD execution.
     
-    Manages 3-5 concurrent TDD cycles with intelligent resource allocation,
-    conflict detection, and performance optimization. Integrates with the
+    Manages concurrent TDD cycles with capacity-aware admission, intelligent
+    resource allocation, conflict detection, and performance optimization. Integrates with the
     Context Management System for cross-story insights and coordination.
     """
     
     def __init__(
         self,
         context_manager: ContextManager,
-        max_parallel_cycles: int = 4,
+        max_parallel_cycles: Optional[int] = 4,
         execution_mode: ParallelExecutionMode = ParallelExecutionMode.BALANCED,
         enable_predictive_scheduling: bool = True,
         enable_conflict_prevention: bool = True,
         resource_timeout_minutes: int = 30,
         coordination_check_interval: float = 5.0,
-        performance_monitoring: bool = True
+        performance_monitoring: bool = True,
+        resource_quota: Optional[Any] = None,
+        lock_manager: Optional[FileLockManager] = None
     ):
         """
         Initialize Parallel TDD Coordinator.
         
         Args:
             context_manager: Context manager for intelligent coordination
-            max_parallel_cycles: Maximum number of concurrent cycles (3-5)
+            max_parallel_cycles: Concurrency ceiling used when no resource
+                quota is granted (None to size against the host)
             execution_mode: Parallel execution mode
             enable_predictive_scheduling: Enable ML-based scheduling
             enable_conflict_prevention: Enable proactive conflict avoidance
             resource_timeout_minutes: Timeout for resource locks
-            coordination_check_interval: Interval for coordination checks
+            coordination_check_interval: Maximum idle time between coordination
+                passes (passes also run immediately on cycle and lock events)
             performance_monitoring: Enable performance monitoring
+            resource_quota: ResourceQuota granted by the resource scheduler;
+                admission is sized from it instead of max_parallel_cycles
+            lock_manager: File lock manager shared with the state machine and
+                conflict resolver (a private one is created if omitted)
         """
         self.context_manager = context_manager
-        self.max_parallel_cycles = min(max(max_parallel_cycles, 2), 5)  # Enforce 2-5 range
+        self.max_parallel_cycles = max(max_parallel_cycles, 1) if max_parallel_cycles else None
         self.execution_mode = execution_mode
         self.enable_predictive_scheduling = enable_predictive_scheduling
         self.enable_conflict_prevention = enable_conflict_prevention
@@ -187,15 +329,41 @@ class ParallelTDDCoordinator:
         
         # Core state
         self.parallel_cycles: Dict[str, ParallelCycle] = {}  # cycle_id -> ParallelCycle
-        self.resource_locks: Dict[str, ResourceLock] = {}   # resource_id -> ResourceLock
-        self.execution_queue: List[str] = []                # Queue of cycle IDs to execute
+        self.lock_manager = lock_manager or FileLockManager()
+        self.execution_queue: List[Tuple[int, int, str]] = []  # Heap of (priority, seq, cycle_id)
         self.agent_pool: Optional[Any] = None               # Will be set by agent pool manager
         self.conflict_resolver: Optional[Any] = None        # Will be set by conflict resolver
         
+        # Admission control sizes concurrency from quota, agents and observed load
+        self.admission = AdmissionController(
+            max_cycles=self.max_parallel_cycles,
+            resource_quota=resource_quota
+        )
+        
         # Coordination state
         self._coordination_task: Optional[asyncio.Task] = None
         self._running = False
-        self._paused = False
+        self._coordination_paused = False
+        self._wake_event = asyncio.Event()
+        
+        # Ready queue bookkeeping: heap entries are lazily invalidated, so the
+        # valid members are tracked separately
+        self._queued_cycles: Dict[str, None] = {}
+        self._queue_keys: Dict[str, Tuple[int, int]] = {}  # cycle_id -> (priority, seq)
+        self._queue_sequence = itertools.count()
+        
+        # Cycles parked until a resource frees or a story finishes:
+        # wait key ("resource:<id>" / "story:<id>") -> cycle IDs, and the reverse
+        self._blocked_waiters: Dict[str, Set[str]] = defaultdict(set)
+        self._cycle_wait_keys: Dict[str, Set[str]] = {}
+        
+        # Incrementally maintained indexes and counters
+        # (status -> cycle IDs in insertion order; dicts used as ordered sets)
+        self._cycles_by_status: Dict[CycleStatus, Dict[str, None]] = {status: {} for status in CycleStatus}
+        self._active_story_counts: Dict[str, int] = defaultdict(int)
+        self._cycles_with_conflicts = 0
+        self._completed_execution_time = 0.0
+        self._first_started_at: Optional[datetime] = None
         
         # Performance tracking
         self.stats = ParallelExecutionStats()
@@ -207,11 +375,25 @@ class ParallelTDDCoordinator:
         self._conflict_patterns: Dict[str, List[str]] = defaultdict(list)
         self._performance_patterns: Dict[str, float] = {}
         
+        # Locks freed by any component sharing the manager wake parked cycles
+        self.lock_manager.add_release_listener(self._on_lock_released)
+        
         logger.info(
             f"ParallelTDDCoordinator initialized: max_cycles={self.max_parallel_cycles}, "
+            f"admission_limit={self.admission.current_limit}, "
             f"mode={execution_mode.value}, predictive={enable_predictive_scheduling}"
         )
     
+    @property
+    def _paused(self) -> bool:
+        return self._coordination_paused
+    
+    @_paused.setter
+    def _paused(self, paused: bool) -> None:
+        self._coordination_paused = paused
+        if not paused:
+            self._request_coordination()
+    
     async def start(self) -> None:
         """Start the parallel coordination engine"""
         if self._running:
@@ -259,7 +441,8 @@ class ParallelTDDCoordinator:
         tdd_cycle: TDDCycle,
         priority: int = 5,
         dependencies: Optional[List[str]] = None,
-        estimated_duration: Optional[timedelta] = None
+        estimated_duration: Optional[timedelta] = None,
+        read_paths: Optional[List[str]] = None
     ) -> str:
         """
         Submit a TDD cycle for parallel execution.
@@ -269,6 +452,8 @@ class ParallelTDDCoordinator:
             priority: Execution priority (1-10, lower is higher priority)
             dependencies: List of story IDs this cycle depends on
             estimated_duration: Estimated execution duration
+            read_paths: Files or directories (trailing "/") the cycle only reads;
+                these are locked shared so other readers can run concurrently
             
         Returns:
             Parallel cycle ID
@@ -277,11 +462,12 @@ class ParallelTDDCoordinator:
             cycle=tdd_cycle,
             priority=max(1, min(priority, 10)),  # Clamp to 1-10
             dependencies=set(dependencies or []),
-            estimated_duration=estimated_duration
+            estimated_duration=estimated_duration,
+            read_paths=set(read_paths or [])
         )
         
         # Store in parallel cycles
-        self.parallel_cycles[parallel_cycle.id] = parallel_cycle
+        self._track_cycle(parallel_cycle)
         
         # Register with context manager for cross-story tracking
         await self.context_manager.register_story(
@@ -306,6 +492,7 @@ class ParallelTDDCoordinator:
             f"(priority={priority}, dependencies={len(parallel_cycle.dependencies)})"
         )
         
+        self._request_coordination()
         return parallel_cycle.id
     
     async def pause_cycle(self, cycle_id: str) -> bool:
@@ -315,7 +502,7 @@ class ParallelTDDCoordinator:
         
         parallel_cycle = self.parallel_cycles[cycle_id]
         if parallel_cycle.status == CycleStatus.ACTIVE:
-            parallel_cycle.status = CycleStatus.PAUSED
+            self._set_cycle_status(parallel_cycle, CycleStatus.PAUSED)
             logger.info(f"Paused parallel cycle {cycle_id}")
             
             # Emit status update
@@ -331,7 +518,8 @@ class ParallelTDDCoordinator:
         
         parallel_cycle = self.parallel_cycles[cycle_id]
         if parallel_cycle.status == CycleStatus.PAUSED:
-            parallel_cycle.status = CycleStatus.ACTIVE
+            self._set_cycle_status(parallel_cycle, CycleStatus.ACTIVE)
+            self._request_coordination()
             logger.info(f"Resumed parallel cycle {cycle_id}")
             
             # Emit status update
@@ -351,12 +539,11 @@ class ParallelTDDCoordinator:
         await self._release_cycle_locks(parallel_cycle)
         
         # Update status
-        parallel_cycle.status = CycleStatus.CANCELLED
+        self._set_cycle_status(parallel_cycle, CycleStatus.CANCELLED)
         parallel_cycle.completed_at = datetime.utcnow()
         
-        # Remove from execution queue
-        if cycle_id in self.execution_queue:
-            self.execution_queue.remove(cycle_id)
+        # Remove from execution queue and wait lists
+        self._unqueue_cycle(cycle_id)
         
         # Unregister from context manager
         await self.context_manager.unregister_story(parallel_cycle.story_id)
@@ -367,6 +554,40 @@ class ParallelTDDCoordinator:
         await self._emit_parallel_status_update()
         return True
     
+    def notify_cycle_updated(self, cycle_id: str) -> None:
+        """
+        Report that a cycle's TDD state changed outside the coordinator.
+        
+        Wakes the coordinator so completion, failure and freed resources are
+        handled immediately instead of at the next idle check.
+        """
+        if cycle_id in self.parallel_cycles:
+            self.parallel_cycles[cycle_id].last_activity = datetime.utcnow()
+            self._request_coordination()
+    
+    def set_resource_quota(self, resource_quota: Optional[Any]) -> None:
+        """Apply the ResourceQuota currently granted to the project"""
+        self.admission.update_quota(resource_quota)
+        self._request_coordination()
+    
+    def update_resource_usage(self, usage: Any) -> None:
+        """
+        Report project-wide ResourceUsage so admission learns the per-cycle footprint.
+        
+        Args:
+            usage: ResourceUsage sample covering all active cycles
+        """
+        self.admission.observe_usage(
+            usage.cpu_usage,
+            usage.memory_usage_mb,
+            len(self._cycles_by_status[CycleStatus.ACTIVE])
+        )
+        self._request_coordination()
+    
+    def record_agent_latency(self, seconds: float) -> None:
+        """Report the latency of an agent task serving a parallel cycle"""
+        self.admission.observe_latency("agent", seconds)
+    
     async def get_cycle_status(self, cycle_id: str) -> Optional[Dict[str, Any]]:
         """Get detailed status of a specific cycle"""
         if cycle_id not in self.parallel_cycles:
@@ -394,14 +615,15 @@ class ParallelTDDCoordinator:
     
     async def get_parallel_status(self) -> Dict[str, Any]:
         """Get comprehensive parallel execution status"""
-        active_cycles = [pc for pc in self.parallel_cycles.values() if pc.is_active]
-        blocked_cycles = [pc for pc in self.parallel_cycles.values() if pc.is_blocked]
+        active_cycles = self._cycles_with_status(CycleStatus.ACTIVE)
+        blocked_cycles = self._cycles_with_status(CycleStatus.BLOCKED)
         
         return {
             "coordinator_status": {
                 "running": self._running,
                 "paused": self._paused,
                 "max_parallel_cycles": self.max_parallel_cycles,
+                "admission_limit": self.admission.current_limit,
                 "execution_mode": self.execution_mode.value,
                 "coordination_interval": self.coordination_check_interval
             },
@@ -409,8 +631,9 @@ class ParallelTDDCoordinator:
                 "total_cycles": len(self.parallel_cycles),
                 "active_cycles": len(active_cycles),
                 "blocked_cycles": len(blocked_cycles),
-                "queued_cycles": len(self.execution_queue),
-                "resource_locks": len(self.resource_locks)
+                "queued_cycles": len(self._queued_cycles),
+                "waiting_cycles": len(self._cycle_wait_keys),
+                "resource_locks": self.lock_manager.lock_count()
             },
             "active_cycles": [
                 {
@@ -433,7 +656,9 @@ class ParallelTDDCoordinator:
             ],
             "performance_stats": self._get_performance_summary(),
             "resource_utilization": await self._calculate_resource_utilization(),
-            "next_scheduled": self._get_next_scheduled_cycles()
+            "next_scheduled": self._get_next_scheduled_cycles(),
+            "admission": self.admission.get_status(),
+            "locks": self.lock_manager.get_metrics()
         }
     
     async def optimize_scheduling(self) -> Dict[str, Any]:
@@ -461,7 +686,7 @@ class ParallelTDDCoordinator:
             "bottlenecks_identified": bottlenecks,
             "resource_optimizations": resource_optimizations,
             "predictive_optimizations": predictive_optimizations,
-            "queue_reordered": len(self.execution_queue),
+            "queue_reordered": len(self._queued_cycles),
             "performance_improvement_estimate": await self._estimate_performance_improvement()
         }
         
@@ -471,18 +696,25 @@ class ParallelTDDCoordinator:
     # Private coordination methods
     
     async def _coordination_loop(self) -> None:
-        """Main coordination loop for parallel execution"""
+        """
+        Main coordination loop for parallel execution.
+        
+        Sleeps until an event wakes it (submission, completion, lock release,
+        conflict resolution), the next lock expires, or the idle interval
+        elapses, whichever comes first.
+        """
         logger.info("Started parallel coordination loop")
         
         while self._running:
             try:
-                coordination_start = time.time()
+                await self._wait_for_coordination_event()
                 
                 # Skip coordination if paused
                 if self._paused:
-                    await asyncio.sleep(self.coordination_check_interval)
                     continue
                 
+                coordination_start = time.time()
+                
                 # Perform coordination tasks
                 await self._coordinate_parallel_execution()
                 
@@ -493,9 +725,6 @@ class ParallelTDDCoordinator:
                     coordination_time * 0.1
                 )
                 
-                # Sleep until next coordination cycle
-                await asyncio.sleep(self.coordination_check_interval)
-                
             except asyncio.CancelledError:
                 logger.info("Coordination loop cancelled")
                 break
@@ -503,6 +732,25 @@ class ParallelTDDCoordinator:
                 logger.error(f"Error in coordination loop: {str(e)}")
                 await asyncio.sleep(self.coordination_check_interval * 2)  # Back-off on error
     
+    def _request_coordination(self) -> None:
+        """Wake the coordination loop for an immediate pass"""
+        self._wake_event.set()
+    
+    async def _wait_for_coordination_event(self) -> None:
+        """Wait for a wake-up event, the next lock deadline or the idle interval"""
+        timeout = self.coordination_check_interval
+        until_expiry = self.lock_manager.next_expiry()
+        if until_expiry is not None:
+            timeout = min(timeout, until_expiry)
+        
+        try:
+            await asyncio.wait_for(self._wake_event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+        
+        # Events raised while the pass runs trigger another pass
+        self._wake_event.clear()
+    
     async def _coordinate_parallel_execution(self) -> None:
         """Coordinate one cycle of parallel execution"""
         # 1. Clean up expired locks
@@ -537,6 +785,8 @@ class ParallelTDDCoordinator:
         if file_paths:
             # Check for conflicts with context manager
             conflicts = await self.context_manager.detect_story_conflicts(story_id, file_paths)
+            if conflicts and not parallel_cycle.conflicts:
+                self._cycles_with_conflicts += 1
             parallel_cycle.conflicts.update(conflicts)
             
             if conflicts:
@@ -546,56 +796,64 @@ class ParallelTDDCoordinator:
                 
                 # Mark as blocked if conflicts are unresolvable
                 if await self._are_conflicts_blocking(parallel_cycle, conflicts):
-                    parallel_cycle.status = CycleStatus.BLOCKED
+                    self._set_cycle_status(parallel_cycle, CycleStatus.BLOCKED)
     
     async def _schedule_cycle(self, parallel_cycle: ParallelCycle) -> None:
-        """Add cycle to execution queue with intelligent scheduling"""
-        # Check dependencies
-        unmet_dependencies = await self._check_dependencies(parallel_cycle)
-        if unmet_dependencies:
-            parallel_cycle.dependencies.update(unmet_dependencies)
-            parallel_cycle.status = CycleStatus.BLOCKED
-            logger.info(f"Cycle {parallel_cycle.id} blocked by dependencies: {unmet_dependencies}")
+        """Add cycle to the ready queue, or park it until what it waits on frees"""
+        wait_keys = await self._blocking_wait_keys(parallel_cycle, include_resources=False)
+        if wait_keys:
+            self._park_cycle(parallel_cycle, wait_keys)
+            logger.info(f"Cycle {parallel_cycle.id} waiting on: {sorted(wait_keys)}")
             return
         
-        # Add to queue with priority-based insertion
-        insertion_index = 0
-        for i, queued_cycle_id in enumerate(self.execution_queue):
-            queued_cycle = self.parallel_cycles[queued_cycle_id]
-            if parallel_cycle.priority < queued_cycle.priority:
-                insertion_index = i
-                break
-            insertion_index = i + 1
-        
-        self.execution_queue.insert(insertion_index, parallel_cycle.id)
-        logger.info(f"Scheduled cycle {parallel_cycle.id} at position {insertion_index}")
+        self._enqueue_cycle(parallel_cycle)
+        logger.info(f"Scheduled cycle {parallel_cycle.id} (priority={parallel_cycle.priority})")
     
     async def _start_pending_cycles(self) -> None:
-        """Start pending cycles up to maximum capacity"""
-        active_count = len([pc for pc in self.parallel_cycles.values() if pc.is_active])
+        """
+        Start runnable cycles up to the admission limit.
+        
+        Cycles are taken in priority order; one that cannot start is parked on
+        the locks or stories it waits for instead of blocking the cycles
+        behind it, and is re-queued when one of them frees.
+        """
+        active_count = len(self._cycles_by_status[CycleStatus.ACTIVE])
+        admission_limit = self._refresh_admission_limit()
         
-        if active_count >= self.max_parallel_cycles:
+        if active_count >= admission_limit:
             return
         
-        cycles_to_start = self.max_parallel_cycles - active_count
+        cycles_to_start = admission_limit - active_count
         started_cycles = []
+        self._compact_execution_queue()
         
-        # Start cycles from the queue
-        for _ in range(cycles_to_start):
-            if not self.execution_queue:
-                break
+        while self.execution_queue and len(started_cycles) < cycles_to_start:
+            _, _, cycle_id = heapq.heappop(self.execution_queue)
+            
+            # Skip entries invalidated by cancellation or re-queueing
+            if cycle_id not in self._queued_cycles:
+                continue
+            del self._queued_cycles[cycle_id]
             
-            cycle_id = self.execution_queue.pop(0)
             parallel_cycle = self.parallel_cycles[cycle_id]
+            if parallel_cycle.status != CycleStatus.PENDING:
+                continue
             
-            # Check if cycle can be started
-            if await self._can_start_cycle(parallel_cycle):
-                await self._start_cycle(parallel_cycle)
-                started_cycles.append(cycle_id)
-            else:
-                # Put back in queue if can't start yet
-                self.execution_queue.insert(0, cycle_id)
-                break
+            wait_keys = await self._blocking_wait_keys(parallel_cycle)
+            if wait_keys:
+                self._park_cycle(parallel_cycle, wait_keys)
+                continue
+            
+            if not await self._start_cycle(parallel_cycle):
+                # Another component sharing the lock manager holds or queues for a lock
+                required_resources = await self._identify_required_resources(parallel_cycle)
+                self._park_cycle(parallel_cycle, {
+                    f"resource:{parse_lock_target(path)[0]}" for path, _ in required_resources
+                })
+                continue
+            
+            self._queue_keys.pop(cycle_id, None)
+            started_cycles.append(cycle_id)
         
         if started_cycles:
             logger.info(f"Started {len(started_cycles)} parallel cycles: {started_cycles}")
@@ -606,42 +864,67 @@ class ParallelTDDCoordinator:
         if parallel_cycle.status not in [CycleStatus.PENDING]:
             return False
         
-        # Check dependencies
-        unmet_dependencies = await self._check_dependencies(parallel_cycle)
-        if unmet_dependencies:
-            return False
+        # Check dependencies, blocking conflicts and resource availability
+        return not await self._blocking_wait_keys(parallel_cycle)
+    
+    async def _blocking_wait_keys(
+        self,
+        parallel_cycle: ParallelCycle,
+        include_resources: bool = True
+    ) -> Set[str]:
+        """
+        Get wait keys for everything currently preventing a cycle from starting.
         
-        # Check for blocking conflicts
-        if parallel_cycle.conflicts:
-            blocking_conflicts = await self._are_conflicts_blocking(parallel_cycle, parallel_cycle.conflicts)
-            if blocking_conflicts:
-                return False
+        Stories are checked first; resources are only examined once no story
+        blocks the cycle, so a parked cycle is woken by its nearest obstacle.
+        """
+        wait_keys = {
+            f"story:{story_id}" for story_id in await self._check_dependencies(parallel_cycle)
+        }
+        for conflict_story_id in parallel_cycle.conflicts:
+            if self._active_story_counts.get(conflict_story_id):
+                wait_keys.add(f"story:{conflict_story_id}")
+        
+        if include_resources and not wait_keys:
+            required_resources = await self._identify_required_resources(parallel_cycle)
+            wait_keys.update(
+                f"resource:{path}"
+                for path in self._unavailable_resources(parallel_cycle, required_resources)
+            )
         
-        # Check resource availability
+        return wait_keys
+    
+    async def _start_cycle(self, parallel_cycle: ParallelCycle) -> bool:
+        """Start execution of a parallel cycle; returns False if its locks are taken"""
+        # Acquire necessary resource locks
         required_resources = await self._identify_required_resources(parallel_cycle)
-        if not await self._are_resources_available(required_resources):
+        if not await self._acquire_resource_locks(parallel_cycle, required_resources):
             return False
         
-        return True
-    
-    async def _start_cycle(self, parallel_cycle: ParallelCycle) -> None:
-        """Start execution of a parallel cycle"""
+        # Snapshot the files the cycle writes so its changes can be diffed precisely
+        if self.conflict_resolver is not None:
+            try:
+                await self.conflict_resolver.capture_base_snapshots(
+                    parallel_cycle.id,
+                    [path for path, mode in required_resources if mode == LockMode.EXCLUSIVE]
+                )
+            except Exception as e:
+                logger.warning(f"Failed to snapshot files for cycle {parallel_cycle.id}: {e}")
+        parallel_cycle.recorded_state = parallel_cycle.current_state
+        
         # Update status
-        parallel_cycle.status = CycleStatus.ACTIVE
+        self._set_cycle_status(parallel_cycle, CycleStatus.ACTIVE)
+        self.stats.started_cycles += 1
         parallel_cycle.started_at = datetime.utcnow()
         parallel_cycle.last_activity = datetime.utcnow()
-        
-        # Acquire necessary resource locks
-        required_resources = await self._identify_required_resources(parallel_cycle)
-        await self._acquire_resource_locks(parallel_cycle, required_resources)
+        if self._first_started_at is None:
+            self._first_started_at = parallel_cycle.started_at
         
         # Prepare context for the cycle
         context_start_time = time.time()
         await self._prepare_cycle_context(parallel_cycle)
         parallel_cycle.context_preparation_time = time.time() - context_start_time
-        
-        # Update statistics
-        self.stats.active_cycles += 1
+        self.admission.observe_latency("context", parallel_cycle.context_preparation_time)
         
         logger.info(f"Started parallel cycle {parallel_cycle.id} for story {parallel_cycle.story_id}")
         
@@ -655,38 +938,78 @@ class ParallelTDDCoordinator:
             )
         except Exception as e:
             logger.warning(f"Failed to emit transition event: {e}")
+        
+        return True
     
     async def _update_cycle_statuses(self) -> None:
         """Update status of all active cycles"""
-        for parallel_cycle in self.parallel_cycles.values():
-            if parallel_cycle.is_active:
-                # Update last activity if cycle has made progress
-                if await self._has_cycle_progressed(parallel_cycle):
-                    parallel_cycle.last_activity = datetime.utcnow()
-                
-                # Check if cycle is completed
-                if await self._is_cycle_completed(parallel_cycle):
-                    await self._complete_cycle(parallel_cycle)
-                
-                # Check if cycle has failed
-                elif await self._has_cycle_failed(parallel_cycle):
-                    await self._fail_cycle(parallel_cycle)
-                
-                # Check if cycle is stuck
-                elif await self._is_cycle_stuck(parallel_cycle):
-                    await self._handle_stuck_cycle(parallel_cycle)
+        for parallel_cycle in self._cycles_with_status(CycleStatus.ACTIVE):
+            # Update last activity if cycle has made progress
+            if await self._has_cycle_progressed(parallel_cycle):
+                parallel_cycle.last_activity = datetime.utcnow()
+            
+            # A phase completed: record the files the cycle wrote during it
+            if parallel_cycle.current_state != parallel_cycle.recorded_state:
+                parallel_cycle.recorded_state = parallel_cycle.current_state
+                await self._record_phase_outputs(parallel_cycle)
+            
+            # Check if cycle is completed
+            if await self._is_cycle_completed(parallel_cycle):
+                await self._complete_cycle(parallel_cycle)
+            
+            # Check if cycle has failed
+            elif await self._has_cycle_failed(parallel_cycle):
+                await self._fail_cycle(parallel_cycle)
+            
+            # Check if cycle is stuck
+            elif await self._is_cycle_stuck(parallel_cycle):
+                await self._handle_stuck_cycle(parallel_cycle)
+    
+    async def _record_phase_outputs(self, parallel_cycle: ParallelCycle) -> None:
+        """Record the cycle's versions of its files with the conflict resolver"""
+        if self.conflict_resolver is None:
+            return
+        
+        for file_path in self.conflict_resolver.cycle_files(parallel_cycle.id):
+            try:
+                await self.conflict_resolver.record_cycle_version(parallel_cycle.id, file_path)
+            except Exception as e:
+                logger.warning(f"Failed to record {file_path} for cycle {parallel_cycle.id}: {e}")
     
     async def _check_and_resolve_conflicts(self) -> None:
         """Check for conflicts and attempt resolution"""
-        active_cycles = [pc for pc in self.parallel_cycles.values() if pc.is_active]
+        for cycle1, cycle2 in self._blocked_cycle_pairs():
+            # Check for file conflicts
+            conflict_detected = await self._detect_cycle_conflict(cycle1, cycle2)
+            
+            if conflict_detected:
+                await self._handle_cycle_conflict(cycle1, cycle2)
+    
+    def _blocked_cycle_pairs(self) -> List[Tuple[ParallelCycle, ParallelCycle]]:
+        """
+        Get pairs of active cycles where one waits for a lock the other holds
+        or requested first.
         
-        for i, cycle1 in enumerate(active_cycles):
-            for cycle2 in active_cycles[i+1:]:
-                # Check for file conflicts
-                conflict_detected = await self._detect_cycle_conflict(cycle1, cycle2)
-                
-                if conflict_detected:
-                    await self._handle_cycle_conflict(cycle1, cycle2)
+        Active cycles took their initial locks together, so they can only
+        contend through requests still queued; the lock manager's wait-for
+        graph yields those pairs instead of comparing every pair of active
+        cycles.
+        """
+        active = self._cycles_by_status[CycleStatus.ACTIVE]
+        order = {cycle_id: position for position, cycle_id in enumerate(active)}
+        pairs: Dict[Tuple[str, str], None] = {}
+        
+        for waiter in self.lock_manager.waiting_owners():
+            if waiter not in order:
+                continue
+            for blocker in self.lock_manager.blocked_by(waiter):
+                if blocker in order and blocker != waiter:
+                    pairs[tuple(sorted((waiter, blocker), key=order.get))] = None
+        
+        return [
+            (self.parallel_cycles[cycle1], self.parallel_cycles[cycle2])
+            for cycle1, cycle2 in sorted(pairs, key=lambda pair: (order[pair[0]], order[pair[1]]))
+        ]
     
     async def _monitor_resource_usage(self) -> None:
         """Monitor and optimize resource usage"""
@@ -700,37 +1023,28 @@ class ParallelTDDCoordinator:
                 await self._optimize_resource_usage(resource_type)
     
     async def _update_performance_stats(self) -> None:
-        """Update performance statistics"""
-        active_cycles = [pc for pc in self.parallel_cycles.values() if pc.is_active]
-        completed_cycles = [pc for pc in self.parallel_cycles.values() 
-                          if pc.status == CycleStatus.COMPLETED]
-        failed_cycles = [pc for pc in self.parallel_cycles.values() 
-                        if pc.status == CycleStatus.FAILED]
-        blocked_cycles = [pc for pc in self.parallel_cycles.values() if pc.is_blocked]
-        
+        """Update performance statistics from incrementally maintained counters"""
         self.stats.total_cycles = len(self.parallel_cycles)
-        self.stats.active_cycles = len(active_cycles)
-        self.stats.completed_cycles = len(completed_cycles)
-        self.stats.failed_cycles = len(failed_cycles)
-        self.stats.blocked_cycles = len(blocked_cycles)
+        self.stats.active_cycles = len(self._cycles_by_status[CycleStatus.ACTIVE])
+        self.stats.completed_cycles = len(self._cycles_by_status[CycleStatus.COMPLETED])
+        self.stats.failed_cycles = len(self._cycles_by_status[CycleStatus.FAILED])
+        self.stats.blocked_cycles = len(self._cycles_by_status[CycleStatus.BLOCKED])
         
         # Calculate average execution time
-        if completed_cycles:
-            total_time = sum(pc.execution_time.total_seconds() for pc in completed_cycles 
-                           if pc.execution_time)
-            self.stats.average_execution_time = total_time / len(completed_cycles)
+        if self.stats.completed_cycles:
+            self.stats.average_execution_time = (
+                self._completed_execution_time / self.stats.completed_cycles
+            )
         
         # Calculate throughput
-        if self.stats.total_cycles > 0:
-            total_runtime = datetime.utcnow() - min(pc.started_at for pc in self.parallel_cycles.values() 
-                                                  if pc.started_at)
+        if self._first_started_at is not None:
+            total_runtime = datetime.utcnow() - self._first_started_at
             hours = total_runtime.total_seconds() / 3600
             self.stats.throughput_cycles_per_hour = self.stats.completed_cycles / max(hours, 0.1)
         
         # Calculate conflict rate
         if self.stats.total_cycles > 0:
-            cycles_with_conflicts = len([pc for pc in self.parallel_cycles.values() if pc.conflicts])
-            self.stats.conflict_rate = cycles_with_conflicts / self.stats.total_cycles
+            self.stats.conflict_rate = self._cycles_with_conflicts / self.stats.total_cycles
         
         # Update coordination overhead
         self.stats.coordination_overhead = self._coordination_metrics.get("average_coordination_time", 0)
@@ -740,65 +1054,175 @@ class ParallelTDDCoordinator:
     async def _acquire_resource_locks(
         self, 
         parallel_cycle: ParallelCycle, 
-        resources: List[Tuple[str, ResourceType]]
-    ) -> None:
-        """Acquire resource locks for a cycle"""
-        for resource_id, resource_type in resources:
-            lock = ResourceLock(
-                resource_id=resource_id,
-                resource_type=resource_type,
-                cycle_id=parallel_cycle.id,
-                story_id=parallel_cycle.story_id,
-                locked_at=datetime.utcnow(),
-                lock_duration=self.resource_timeout,
-                exclusive=True
-            )
-            
-            self.resource_locks[resource_id] = lock
-            parallel_cycle.resource_locks.add(resource_id)
+        resources: List[Tuple[str, LockMode]]
+    ) -> bool:
+        """Acquire all resource locks for a cycle at once (all or none)"""
+        acquired = self.lock_manager.try_acquire_all(
+            parallel_cycle.id,
+            resources,
+            ttl=self.resource_timeout.total_seconds() if self.resource_timeout else None,
+            story_id=parallel_cycle.story_id
+        )
+        if acquired:
+            parallel_cycle.resource_locks.update(parse_lock_target(path)[0] for path, _ in resources)
+        return acquired
     
     async def _release_cycle_locks(self, parallel_cycle: ParallelCycle) -> None:
-        """Release all locks held by a cycle"""
-        locks_to_release = list(parallel_cycle.resource_locks)
+        """Release all locks held by a cycle, and its base snapshots"""
+        released = self.lock_manager.release_owner(parallel_cycle.id)
+        parallel_cycle.resource_locks.clear()
         
-        for resource_id in locks_to_release:
-            if resource_id in self.resource_locks:
-                del self.resource_locks[resource_id]
-            parallel_cycle.resource_locks.discard(resource_id)
+        if self.conflict_resolver is not None:
+            try:
+                self.conflict_resolver.release_base_snapshots(parallel_cycle.id)
+            except Exception as e:
+                logger.warning(f"Failed to release snapshots for cycle {parallel_cycle.id}: {e}")
         
-        if locks_to_release:
-            logger.debug(f"Released {len(locks_to_release)} locks for cycle {parallel_cycle.id}")
+        if released:
+            logger.debug(f"Released {len(released)} locks for cycle {parallel_cycle.id}")
+            self._request_coordination()
     
     async def _release_all_locks(self) -> None:
-        """Release all resource locks"""
-        lock_count = len(self.resource_locks)
-        self.resource_locks.clear()
-        
+        """Release all resource locks held by this coordinator's cycles"""
+        lock_count = 0
         for parallel_cycle in self.parallel_cycles.values():
+            lock_count += len(self.lock_manager.release_owner(parallel_cycle.id))
             parallel_cycle.resource_locks.clear()
         
+        for wait_key in [key for key in self._blocked_waiters if key.startswith("resource:")]:
+            self._wake_waiters(wait_key)
+        
         if lock_count > 0:
             logger.info(f"Released all {lock_count} resource locks")
     
     async def _cleanup_expired_locks(self) -> None:
-        """Clean up expired resource locks"""
-        expired_locks = []
+        """Clean up expired resource locks (waiters are woken by the release listener)"""
+        self.lock_manager.expire_locks()
+    
+    def _on_lock_released(self, path: str, owner: str) -> None:
+        """Lock manager callback: drop the lock from its cycle and wake cycles waiting on it"""
+        parallel_cycle = self.parallel_cycles.get(owner)
+        if parallel_cycle is not None:
+            parallel_cycle.resource_locks.discard(path)
+        self._wake_waiters(f"resource:{path}")
+    
+    # Helper methods for cycle management
+    
+    def _refresh_admission_limit(self) -> int:
+        """Feed agent pool capacity into admission control"""
+        if self.agent_pool:
+            self.admission.update_agent_capacity(self.agent_pool.get_task_capacity())
         
-        for resource_id, lock in self.resource_locks.items():
-            if lock.is_expired:
-                expired_locks.append(resource_id)
+        return self.admission.compute_limit()
+    
+    def _track_cycle(self, parallel_cycle: ParallelCycle) -> None:
+        """Register a cycle in the cycle table and status indexes"""
+        previous = self.parallel_cycles.get(parallel_cycle.id)
+        if previous is not None:
+            self._untrack_status(previous)
         
-        for resource_id in expired_locks:
-            lock = self.resource_locks[resource_id]
-            del self.resource_locks[resource_id]
-            
-            # Remove from cycle's lock set
-            if lock.cycle_id in self.parallel_cycles:
-                self.parallel_cycles[lock.cycle_id].resource_locks.discard(resource_id)
+        self.parallel_cycles[parallel_cycle.id] = parallel_cycle
+        self._cycles_by_status[parallel_cycle.status][parallel_cycle.id] = None
+        if parallel_cycle.is_active:
+            self._active_story_counts[parallel_cycle.story_id] += 1
+            self._record_peak_active()
+    
+    def _set_cycle_status(self, parallel_cycle: ParallelCycle, status: CycleStatus) -> None:
+        """Change a cycle's status, keeping the status indexes in sync"""
+        if parallel_cycle.status == status:
+            return
+        
+        self._untrack_status(parallel_cycle)
+        parallel_cycle.status = status
+        self._cycles_by_status[status][parallel_cycle.id] = None
+        if status == CycleStatus.ACTIVE:
+            self._active_story_counts[parallel_cycle.story_id] += 1
+            self._record_peak_active()
+    
+    def _record_peak_active(self) -> None:
+        """Track the highest number of cycles active at the same time"""
+        active_count = len(self._cycles_by_status[CycleStatus.ACTIVE])
+        self.stats.peak_active_cycles = max(self.stats.peak_active_cycles, active_count)
+    
+    def _untrack_status(self, parallel_cycle: ParallelCycle) -> None:
+        """Remove a cycle from the index of its current status"""
+        self._cycles_by_status[parallel_cycle.status].pop(parallel_cycle.id, None)
+        if parallel_cycle.is_active:
+            story_id = parallel_cycle.story_id
+            self._active_story_counts[story_id] -= 1
+            if self._active_story_counts[story_id] <= 0:
+                del self._active_story_counts[story_id]
+                self._wake_waiters(f"story:{story_id}")
+    
+    def _cycles_with_status(self, status: CycleStatus) -> List[ParallelCycle]:
+        """Get cycles currently in the given status"""
+        return [self.parallel_cycles[cycle_id] for cycle_id in self._cycles_by_status[status]]
+    
+    def _enqueue_cycle(self, parallel_cycle: ParallelCycle) -> None:
+        """Push a cycle onto the ready heap, keeping its original queue position"""
+        if parallel_cycle.id in self._queued_cycles:
+            return
+        
+        queue_key = self._queue_keys.setdefault(
+            parallel_cycle.id, (parallel_cycle.priority, next(self._queue_sequence))
+        )
+        heapq.heappush(self.execution_queue, (*queue_key, parallel_cycle.id))
+        self._queued_cycles[parallel_cycle.id] = None
+    
+    def _unqueue_cycle(self, cycle_id: str) -> None:
+        """Remove a cycle from the ready queue and every wait list"""
+        self._queued_cycles.pop(cycle_id, None)
+        self._queue_keys.pop(cycle_id, None)
+        
+        for wait_key in self._cycle_wait_keys.pop(cycle_id, ()):
+            waiters = self._blocked_waiters.get(wait_key)
+            if waiters is not None:
+                waiters.discard(cycle_id)
+                if not waiters:
+                    del self._blocked_waiters[wait_key]
+    
+    def _compact_execution_queue(self) -> None:
+        """Rebuild the ready heap once invalidated entries dominate it"""
+        if len(self.execution_queue) > 2 * len(self._queued_cycles) + 64:
+            self.execution_queue = [
+                (*self._queue_keys[cycle_id], cycle_id) for cycle_id in self._queued_cycles
+            ]
+            heapq.heapify(self.execution_queue)
+    
+    def _park_cycle(self, parallel_cycle: ParallelCycle, wait_keys: Set[str]) -> None:
+        """Park a cycle until one of the resources or stories it waits on frees"""
+        self._queued_cycles.pop(parallel_cycle.id, None)
+        self._cycle_wait_keys[parallel_cycle.id] = set(wait_keys)
+        for wait_key in wait_keys:
+            self._blocked_waiters[wait_key].add(parallel_cycle.id)
+        
+        # Waiting on another story (dependency or conflict) is reported as blocked
+        if any(wait_key.startswith("story:") for wait_key in wait_keys):
+            self._set_cycle_status(parallel_cycle, CycleStatus.BLOCKED)
+    
+    def _wake_waiters(self, wait_key: str) -> None:
+        """Re-queue only the cycles waiting on a released resource or finished story"""
+        waiters = self._blocked_waiters.pop(wait_key, None)
+        if not waiters:
+            return
+        
+        for cycle_id in waiters:
+            for other_key in self._cycle_wait_keys.pop(cycle_id, set()) - {wait_key}:
+                other_waiters = self._blocked_waiters.get(other_key)
+                if other_waiters is not None:
+                    other_waiters.discard(cycle_id)
+                    if not other_waiters:
+                        del self._blocked_waiters[other_key]
             
-            logger.warning(f"Released expired lock for resource {resource_id}")
-    
-    # Helper methods for cycle management
+            parallel_cycle = self.parallel_cycles.get(cycle_id)
+            if parallel_cycle is None:
+                continue
+            if parallel_cycle.status == CycleStatus.BLOCKED:
+                self._set_cycle_status(parallel_cycle, CycleStatus.PENDING)
+            if parallel_cycle.status == CycleStatus.PENDING:
+                self._enqueue_cycle(parallel_cycle)
+        
+        self._request_coordination()
     
     async def _extract_file_paths_from_cycle(self, cycle: TDDCycle) -> List[str]:
         """Extract file paths that will be modified by a TDD cycle"""
@@ -824,12 +1248,7 @@ class ParallelTDDCoordinator:
         
         for dependency_story_id in parallel_cycle.dependencies:
             # Check if dependency story is still active
-            dependency_active = any(
-                pc.story_id == dependency_story_id and pc.is_active
-                for pc in self.parallel_cycles.values()
-            )
-            
-            if dependency_active:
+            if self._active_story_counts.get(dependency_story_id):
                 unmet_dependencies.add(dependency_story_id)
         
         return unmet_dependencies
@@ -842,12 +1261,7 @@ class ParallelTDDCoordinator:
         """Check if conflicts are blocking for a cycle"""
         for conflict_story_id in conflicts:
             # Check if conflicting story is currently active
-            conflict_active = any(
-                pc.story_id == conflict_story_id and pc.is_active
-                for pc in self.parallel_cycles.values()
-            )
-            
-            if conflict_active:
+            if self._active_story_counts.get(conflict_story_id):
                 return True
         
         return False
@@ -855,33 +1269,36 @@ class ParallelTDDCoordinator:
     async def _identify_required_resources(
         self, 
         parallel_cycle: ParallelCycle
-    ) -> List[Tuple[str, ResourceType]]:
-        """Identify resources required by a cycle"""
-        resources = []
-        
-        # File resources
+    ) -> List[Tuple[str, LockMode]]:
+        """Identify file locks required by a cycle (written files exclusive, read files shared)"""
         file_paths = await self._extract_file_paths_from_cycle(parallel_cycle.cycle)
-        for file_path in file_paths:
-            resources.append((file_path, ResourceType.FILE))
+        resources = [(file_path, LockMode.EXCLUSIVE) for file_path in file_paths]
         
-        # Agent resources (will be managed by agent pool)
-        # Test runner resources
-        resources.append(("test_runner", ResourceType.TEST_RUNNER))
+        written = set(file_paths)
+        resources.extend(
+            (read_path, LockMode.SHARED) for read_path in sorted(parallel_cycle.read_paths)
+            if read_path not in written
+        )
         
+        # Agent and test runner capacity is governed by admission control
         return resources
     
     async def _are_resources_available(
         self, 
-        resources: List[Tuple[str, ResourceType]]
+        parallel_cycle: ParallelCycle,
+        resources: List[Tuple[str, LockMode]]
     ) -> bool:
         """Check if required resources are available"""
-        for resource_id, resource_type in resources:
-            if resource_id in self.resource_locks:
-                lock = self.resource_locks[resource_id]
-                if lock.exclusive and not lock.is_expired:
-                    return False
-        
-        return True
+        return not self._unavailable_resources(parallel_cycle, resources)
+    
+    def _unavailable_resources(
+        self,
+        parallel_cycle: ParallelCycle,
+        resources: List[Tuple[str, LockMode]]
+    ) -> List[str]:
+        """Get the paths of locks held by others that conflict with the required ones"""
+        conflicts = self.lock_manager.find_conflicts(parallel_cycle.id, resources)
+        return list(dict.fromkeys(hold.path for hold in conflicts))
     
     # Status and monitoring methods
     
@@ -901,6 +1318,8 @@ class ParallelTDDCoordinator:
             "conflict_rate": self.stats.conflict_rate,
             "coordination_overhead": self.stats.coordination_overhead,
             "context_preparation_time": self.stats.context_preparation_time,
+            "started_cycles": self.stats.started_cycles,
+            "peak_active_cycles": self.stats.peak_active_cycles,
             "success_rate": (
                 self.stats.completed_cycles / max(self.stats.total_cycles, 1) * 100
             )
@@ -911,8 +1330,7 @@ class ParallelTDDCoordinator:
         utilization = {}
         
         # Calculate file utilization
-        total_files = len(set(resource_id for resource_id, lock in self.resource_locks.items() 
-                            if lock.resource_type == ResourceType.FILE))
+        total_files = self.lock_manager.lock_count()
         max_files = 100  # Estimated max files in use
         utilization["files"] = min(total_files / max_files, 1.0)
         
@@ -921,8 +1339,9 @@ class ParallelTDDCoordinator:
             utilization["agents"] = await self.agent_pool.get_utilization()
         
         # Calculate parallel capacity utilization
-        utilization["parallel_capacity"] = len([pc for pc in self.parallel_cycles.values() 
-                                              if pc.is_active]) / self.max_parallel_cycles
+        utilization["parallel_capacity"] = (
+            len(self._cycles_by_status[CycleStatus.ACTIVE]) / self.admission.current_limit
+        )
         
         return utilization
     
@@ -930,7 +1349,10 @@ class ParallelTDDCoordinator:
         """Get information about next scheduled cycles"""
         next_cycles = []
         
-        for cycle_id in self.execution_queue[:3]:  # Show next 3
+        next_entries = heapq.nsmallest(
+            3, ((*self._queue_keys[cycle_id], cycle_id) for cycle_id in self._queued_cycles)
+        )
+        for _, _, cycle_id in next_entries:  # Show next 3
             if cycle_id in self.parallel_cycles:
                 pc = self.parallel_cycles[cycle_id]
                 next_cycles.append({
@@ -960,7 +1382,7 @@ class ParallelTDDCoordinator:
                 bottlenecks.append(f"High {resource} utilization: {usage:.1%}")
         
         # Check for dependency bottlenecks
-        blocked_count = len([pc for pc in self.parallel_cycles.values() if pc.is_blocked])
+        blocked_count = len(self._cycles_by_status[CycleStatus.BLOCKED])
         if blocked_count > 2:
             bottlenecks.append(f"Multiple cycles blocked: {blocked_count}")
         
@@ -968,12 +1390,11 @@ class ParallelTDDCoordinator:
     
     async def _optimize_execution_queue(self) -> None:
         """Optimize the execution queue based on current state"""
-        # Sort by priority and dependencies
-        def sort_key(cycle_id):
-            pc = self.parallel_cycles[cycle_id]
-            return (len(pc.dependencies), pc.priority, pc.last_activity)
-        
-        self.execution_queue.sort(key=sort_key)
+        # Drop invalidated heap entries; blocked cycles already wait off-queue
+        self.execution_queue = [
+            (*self._queue_keys[cycle_id], cycle_id) for cycle_id in self._queued_cycles
+        ]
+        heapq.heapify(self.execution_queue)
     
     async def _optimize_resource_allocation(self) -> Dict[str, Any]:
         """Optimize resource allocation"""
@@ -1003,9 +1424,8 @@ class ParallelTDDCoordinator:
     
     async def _cleanup_active_cycles(self) -> None:
         """Clean up active cycles during shutdown"""
-        active_cycles = [pc for pc in self.parallel_cycles.values() if pc.is_active]
-        for pc in active_cycles:
-            pc.status = CycleStatus.CANCELLED
+        for pc in self._cycles_with_status(CycleStatus.ACTIVE):
+            self._set_cycle_status(pc, CycleStatus.CANCELLED)
             await self._release_cycle_locks(pc)
     
     async def _prepare_cycle_context(self, parallel_cycle: ParallelCycle) -> None:
@@ -1034,14 +1454,16 @@ class ParallelTDDCoordinator:
     
     async def _complete_cycle(self, parallel_cycle: ParallelCycle) -> None:
         """Mark cycle as completed"""
-        parallel_cycle.status = CycleStatus.COMPLETED
+        self._set_cycle_status(parallel_cycle, CycleStatus.COMPLETED)
         parallel_cycle.completed_at = datetime.utcnow()
+        if parallel_cycle.execution_time:
+            self._completed_execution_time += parallel_cycle.execution_time.total_seconds()
         await self._release_cycle_locks(parallel_cycle)
         logger.info(f"Completed parallel cycle {parallel_cycle.id}")
     
     async def _fail_cycle(self, parallel_cycle: ParallelCycle) -> None:
         """Mark cycle as failed"""
-        parallel_cycle.status = CycleStatus.FAILED
+        self._set_cycle_status(parallel_cycle, CycleStatus.FAILED)
         parallel_cycle.completed_at = datetime.utcnow()
         await self._release_cycle_locks(parallel_cycle)
         logger.error(f"Failed parallel cycle {parallel_cycle.id}")
@@ -1049,16 +1471,18 @@ class ParallelTDDCoordinator:
     async def _handle_stuck_cycle(self, parallel_cycle: ParallelCycle) -> None:
         """Handle a stuck cycle"""
         logger.warning(f"Cycle {parallel_cycle.id} appears stuck, pausing for review")
-        parallel_cycle.status = CycleStatus.PAUSED
+        self._set_cycle_status(parallel_cycle, CycleStatus.PAUSED)
     
     async def _detect_cycle_conflict(
         self, 
         cycle1: ParallelCycle, 
         cycle2: ParallelCycle
     ) -> bool:
-        """Detect conflict between two cycles"""
-        # Check for overlapping resource locks
-        return bool(cycle1.resource_locks.intersection(cycle2.resource_locks))
+        """Detect whether either cycle waits for a lock held or requested first by the other"""
+        return (
+            cycle2.id in self.lock_manager.blocked_by(cycle1.id)
+            or cycle1.id in self.lock_manager.blocked_by(cycle2.id)
+        )
     
     async def _handle_cycle_conflict(
         self, 
@@ -1071,6 +1495,9 @@ class ParallelTDDCoordinator:
             await self.pause_cycle(cycle1.id)
         else:
             await self.pause_cycle(cycle2.id)
+        
+        # Capacity was freed; let the scheduler fill it
+        self._request_coordination()
     
     async def _optimize_resource_usage(self, resource_type: str) -> None:
         """Optimize usage of a specific resource type"""
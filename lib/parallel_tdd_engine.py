@@ -13,6 +13,7 @@ Provides a unified interface for parallel TDD execution with intelligent coordin
 
 import asyncio
 import logging
+import os
 import time
 import uuid
 from typing import Dict, List, Optional, Any, Set, Union
@@ -30,9 +31,12 @@ try:
     from .agent_pool import AgentPool, AgentPoolStrategy, LoadBalancingAlgorithm
     from .conflict_resolver import ConflictResolver, ConflictType, ConflictSeverity
     from .tdd_state_machine import TDDStateMachine, TDDCommandResult
+    from .file_lock_manager import FileLockManager
     from .context_manager import ContextManager
     from .tdd_models import TDDState, TDDCycle, TDDTask
     from .state_broadcaster import emit_parallel_status
+    from .resource_scheduler import ResourceQuota, ResourceUsage
+    from .process_resource_sampler import ProcessTreeSampler
 except ImportError:
     from parallel_tdd_coordinator import (
         ParallelTDDCoordinator, ParallelExecutionMode, ParallelCycle, 
@@ -41,9 +45,12 @@ except ImportError:
     from agent_pool import AgentPool, AgentPoolStrategy, LoadBalancingAlgorithm
     from conflict_resolver import ConflictResolver, ConflictType, ConflictSeverity
     from tdd_state_machine import TDDStateMachine, TDDCommandResult
+    from file_lock_manager import FileLockManager
     from context_manager import ContextManager
     from tdd_models import TDDState, TDDCycle, TDDTask
     from state_broadcaster import emit_parallel_status
+    from resource_scheduler import ResourceQuota, ResourceUsage
+    from process_resource_sampler import ProcessTreeSampler
 
 logger = logging.getLogger(__name__)
 
@@ -62,7 +69,8 @@ class ParallelExecutionStatus(Enum):
 @dataclass
 class ParallelTDDConfiguration:
     """Configuration for parallel TDD execution"""
-    max_parallel_cycles: int = 4
+    max_parallel_cycles: int = 4  # Used when no resource quota is granted
+    resource_quota: Optional[ResourceQuota] = None  # Defaults to the quota in the orchestrator environment
     execution_mode: ParallelExecutionMode = ParallelExecutionMode.BALANCED
     enable_predictive_scheduling: bool = True
     enable_conflict_prevention: bool = True
@@ -171,16 +179,25 @@ class ParallelTDDEngine:
     
     def _initialize_components(self) -> None:
         """Initialize all parallel TDD components"""
+        # One lock table shared by the coordinator, conflict resolver and state machine
+        self.lock_manager = FileLockManager()
+        
+        # Admission is sized from the granted quota and the measured usage of this process tree
+        self.resource_quota = self.config.resource_quota or ResourceQuota.from_environment()
+        self.resource_sampler = ProcessTreeSampler()
+        
         # Initialize parallel coordinator
         self.coordinator = ParallelTDDCoordinator(
             context_manager=self.context_manager,
             max_parallel_cycles=self.config.max_parallel_cycles,
+            resource_quota=self.resource_quota,
             execution_mode=self.config.execution_mode,
             enable_predictive_scheduling=self.config.enable_predictive_scheduling,
             enable_conflict_prevention=self.config.enable_conflict_prevention,
             resource_timeout_minutes=self.config.resource_timeout_minutes,
             coordination_check_interval=self.config.coordination_check_interval,
-            performance_monitoring=self.config.enable_performance_monitoring
+            performance_monitoring=self.config.enable_performance_monitoring,
+            lock_manager=self.lock_manager
         )
         
         # Initialize agent pool
@@ -198,7 +215,8 @@ class ParallelTDDEngine:
             project_path=self.project_path,
             enable_proactive_detection=self.config.enable_conflict_prevention,
             enable_auto_resolution=self.config.enable_auto_resolution,
-            enable_semantic_analysis=True
+            enable_semantic_analysis=True,
+            lock_manager=self.lock_manager
         )
         
         # Initialize enhanced TDD state machine
@@ -206,7 +224,8 @@ class ParallelTDDEngine:
             enable_parallel_execution=True,
             enable_resource_locking=self.config.enable_resource_locking,
             enable_coordination_events=self.config.enable_coordination_events,
-            resource_lock_timeout=self.config.resource_timeout_minutes * 60
+            resource_lock_timeout=self.config.resource_timeout_minutes * 60,
+            lock_manager=self.lock_manager
         )
     
     def _setup_component_integration(self) -> None:
@@ -215,15 +234,16 @@ class ParallelTDDEngine:
         self.coordinator.agent_pool = self.agent_pool
         self.coordinator.conflict_resolver = self.conflict_resolver
         
+        # Per-task agent latency drives admission back-pressure
+        self.agent_pool.add_completion_listener(self._on_agent_task_completed)
+        
         # Setup cross-component event handling
         self._setup_event_handlers()
     
     def _setup_event_handlers(self) -> None:
         """Setup event handlers for cross-component coordination"""
-        # Placeholder for event handler setup
-        # In a full implementation, this would wire up event handlers
-        # between components for real-time coordination
-        pass
+        # Phase changes and COMMIT wake the coordinator instead of waiting for its idle check
+        self.state_machine.add_transition_listener(self._on_cycle_transition)
     
     async def start(self) -> None:
         """Start the parallel TDD execution engine"""
@@ -353,13 +373,25 @@ class ParallelTDDEngine:
             # Register with state machine for parallel tracking
             self.state_machine.register_parallel_cycle(cycle)
             
-            # Register file modifications for conflict detection
+            # Declare the files the cycle will modify; each counts as modified
+            # as a whole until the coordinator records the cycle's version of
+            # it on phase completion and the resolver diffs it against the
+            # snapshot taken here
             if hasattr(cycle, 'file_paths'):
+                await self.conflict_resolver.capture_base_snapshots(cycle.id, cycle.file_paths)
                 for file_path in cycle.file_paths:
                     await self.conflict_resolver.register_file_modification(
                         file_path, cycle.id, cycle.story_id, "modify"
                     )
         
+        # Pre-warm agents for the phases the new cycles start and move into
+        try:
+            await self.agent_pool.prewarm_for_upcoming_phases(
+                self.state_machine, [cycle.id for cycle in cycles]
+            )
+        except Exception as e:
+            logger.warning(f"Agent pre-warming failed: {e}")
+        
         # Setup cycle dependencies in state machine
         if dependencies:
             for cycle_id, deps in dependencies.items():
@@ -646,6 +678,27 @@ class ParallelTDDEngine:
         # Update peak parallel cycles
         active_cycles = coordinator_status.get("cycle_summary", {}).get("active_cycles", 0)
         self.metrics.peak_parallel_cycles = max(self.metrics.peak_parallel_cycles, active_cycles)
+        
+        self._sample_resource_usage()
+    
+    def _sample_resource_usage(self) -> None:
+        """Report the measured usage of this process and its agents to admission control"""
+        usage = self.resource_sampler.sample({"engine": os.getpid()}).get("engine")
+        if usage is None:
+            return
+        
+        self.coordinator.update_resource_usage(ResourceUsage(
+            cpu_usage=usage.cpu_cores,
+            memory_usage_mb=int(usage.memory_mb)
+        ))
+    
+    def _on_agent_task_completed(self, agent_type: str, task: Any, execution_time: float, success: bool) -> None:
+        """Feed the latency of each finished agent task into admission control"""
+        self.coordinator.record_agent_latency(execution_time)
+    
+    def _on_cycle_transition(self, cycle: TDDCycle, old_state: TDDState, new_state: TDDState) -> None:
+        """Let the coordinator handle a cycle's completed phase right away"""
+        self.coordinator.notify_cycle_updated(cycle.id)
     
     async def _check_engine_health(self) -> None:
         """Check overall engine health"""
@@ -0,0 +1,298 @@
+"""
+Process Resource Limiter
+
+Enforces each project orchestrator's CPU, memory and disk I/O allocation on
+the host so a runaway project cannot starve the others. When the cgroup v2
+hierarchy is writable, every project gets its own cgroup with cpu.max,
+memory.max and io.max, and the orchestrator joins it before it executes so
+all agents it spawns are confined too. Otherwise the orchestrator is started
+with a data segment rlimit and a niceness matching its CPU share, which
+child processes inherit. Limits can be changed while the project runs.
+"""
+
+import logging
+import math
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+CPU_PERIOD_US = 100000
+MIN_CPU_QUOTA_US = 1000  # Smallest quota the kernel accepts
+CONTROLLERS = ("cpu", "memory", "io")
+NICE_WEIGHT_STEP = 1.25  # Each nice level changes the scheduler weight by about 25%
+
+
+@dataclass
+class ProcessLimits:
+    """Resource limits of one project orchestrator and its descendants"""
+    cpu_cores: float  # CPU time per wall second; 0 for unlimited
+    memory_mb: int  # 0 for unlimited
+    io_mbps: float = 0.0  # Disk read and write rate each; 0 for unlimited
+
+
+class ProcessResourceLimiter:
+    """
+    Applies ProcessLimits through cgroup v2, or through setrlimit and nice.
+    
+    The cgroup mode needs the cgroup2 filesystem mounted at cgroup_root and
+    permission to create cgroups under it. The fallback limits each process
+    rather than the whole tree and can only weight, not cap, CPU time.
+    """
+    
+    def __init__(
+        self,
+        cpu_budget_cores: float,
+        cgroup_root: str = "/sys/fs/cgroup",
+        cgroup_name: str = "agent-workflow",
+        enabled: bool = True
+    ):
+        """
+        Initialize the limiter.
+        
+        Args:
+            cpu_budget_cores: Cores shared by all projects, for niceness in the fallback
+            cgroup_root: Mount point of the cgroup2 filesystem
+            cgroup_name: Parent cgroup of the project cgroups
+            enabled: Whether to apply limits at all
+        """
+        self.cpu_budget_cores = cpu_budget_cores
+        self.cgroup_root = Path(cgroup_root)
+        self.cgroup_parent = self.cgroup_root / cgroup_name
+        self.enabled = enabled
+        self._cgroup_ready: Optional[bool] = None
+        self._cgroups: Dict[str, Path] = {}
+        self._devices: Dict[str, Optional[Tuple[int, int]]] = {}
+    
+    @property
+    def mode(self) -> str:
+        """Enforcement mechanism in use: cgroup, rlimit or disabled"""
+        if not self.enabled:
+            return "disabled"
+        if self._cgroup_ready is None:
+            writable = (self.cgroup_root / "cgroup.controllers").is_file() and os.access(self.cgroup_root, os.W_OK)
+            return "cgroup" if writable else "rlimit"
+        return "cgroup" if self._cgroup_ready else "rlimit"
+    
+    def prepare(self, project_name: str, project_path: str, limits: ProcessLimits) -> Optional[Callable[[], None]]:
+        """
+        Set up limits for a project orchestrator that is about to start.
+        
+        Args:
+            project_name: Name of the project
+            project_path: Project directory, whose disk the I/O limit applies to
+            limits: Limits to enforce
+        
+        Returns:
+            Function to pass as preexec_fn when starting the orchestrator, or
+            None when limits are disabled
+        """
+        if not self.enabled:
+            return None
+        
+        cgroup = self._create_cgroup(project_name, project_path) if self._cgroups_available() else None
+        if cgroup is not None:
+            self._write_cgroup_limits(project_name, limits)
+            procs_file = str(cgroup / "cgroup.procs")
+            fallback = self._rlimit_preexec(limits)
+            
+            def join_cgroup() -> None:
+                # Runs in the child before exec, so every descendant starts inside the cgroup
+                try:
+                    with open(procs_file, "w") as f:
+                        f.write(str(os.getpid()))
+                except OSError:
+                    fallback()
+            
+            return join_cgroup
+        
+        return self._rlimit_preexec(limits)
+    
+    def update(self, project_name: str, pid: int, limits: ProcessLimits) -> bool:
+        """
+        Change the limits of a running project orchestrator.
+        
+        Args:
+            project_name: Name of the project
+            pid: PID of the project orchestrator
+            limits: New limits
+        
+        Returns:
+            True if the new limits were applied
+        """
+        if not self.enabled:
+            return False
+        
+        if project_name in self._cgroups:
+            return self._write_cgroup_limits(project_name, limits)
+        
+        # Processes started later inherit the orchestrator's niceness and rlimits.
+        # Niceness is relative to ours, as os.nice() in the child applies it.
+        applied = True
+        try:
+            niceness = min(19, os.getpriority(os.PRIO_PROCESS, 0) + self._niceness(limits.cpu_cores))
+            os.setpriority(os.PRIO_PROCESS, pid, niceness)
+        except (AttributeError, OSError) as e:
+            logger.debug(f"Could not renice project '{project_name}' (PID {pid}): {str(e)}")
+            applied = False
+        
+        memory_limit = self._memory_rlimit()
+        if memory_limit is not None and hasattr(resource, "prlimit"):
+            try:
+                _, hard = resource.prlimit(pid, memory_limit)
+                resource.prlimit(pid, memory_limit, (self._memory_bytes(limits, hard), hard))
+            except (OSError, ValueError) as e:
+                logger.debug(f"Could not change memory limit of project '{project_name}': {str(e)}")
+                applied = False
+        
+        return applied
+    
+    def release(self, project_name: str) -> None:
+        """Remove a stopped project's cgroup"""
+        self._devices.pop(project_name, None)
+        cgroup = self._cgroups.pop(project_name, None)
+        if cgroup is not None:
+            try:
+                cgroup.rmdir()
+            except OSError as e:
+                logger.debug(f"Could not remove cgroup {cgroup}: {str(e)}")
+    
+    # cgroup v2
+    
+    def _cgroups_available(self) -> bool:
+        """Create the parent cgroup with the controllers delegated, once"""
+        if self._cgroup_ready is not None:
+            return self._cgroup_ready
+        
+        self._cgroup_ready = False
+        try:
+            available = set((self.cgroup_root / "cgroup.controllers").read_text().split())
+            self.cgroup_parent.mkdir(exist_ok=True)
+        except OSError as e:
+            logger.info(f"cgroup v2 not usable, limiting projects with setrlimit and nice: {str(e)}")
+            return False
+        
+        for cgroup in (self.cgroup_root, self.cgroup_parent):
+            for controller in CONTROLLERS:
+                if controller in available:
+                    try:
+                        (cgroup / "cgroup.subtree_control").write_text(f"+{controller}")
+                    except OSError as e:
+                        logger.warning(f"Could not enable the {controller} controller in {cgroup}: {str(e)}")
+        
+        self._cgroup_ready = True
+        return True
+    
+    def _create_cgroup(self, project_name: str, project_path: str) -> Optional[Path]:
+        """Create a project's cgroup and remember the disk its I/O limit applies to"""
+        cgroup = self.cgroup_parent / re.sub(r"[^A-Za-z0-9_.-]", "_", project_name)
+        try:
+            cgroup.mkdir(exist_ok=True)
+        except OSError as e:
+            logger.warning(f"Could not create cgroup for project '{project_name}': {str(e)}")
+            return None
+        
+        self._cgroups[project_name] = cgroup
+        self._devices[project_name] = self._block_device(project_path)
+        return cgroup
+    
+    def _write_cgroup_limits(self, project_name: str, limits: ProcessLimits) -> bool:
+        """Write cpu.max, memory.max and io.max of a project's cgroup"""
+        cgroup = self._cgroups[project_name]
+        values = {
+            "cpu.max": self._cpu_max(limits.cpu_cores),
+            "memory.max": str(limits.memory_mb * 1024 * 1024) if limits.memory_mb > 0 else "max"
+        }
+        
+        device = self._devices.get(project_name)
+        if device is not None and (cgroup / "io.max").exists():
+            rate = str(int(limits.io_mbps * 1024 * 1024)) if limits.io_mbps > 0 else "max"
+            values["io.max"] = f"{device[0]}:{device[1]} rbps={rate} wbps={rate}"
+        
+        applied = True
+        for filename, value in values.items():
+            try:
+                (cgroup / filename).write_text(value)
+            except OSError as e:
+                logger.warning(f"Could not set {filename}={value} in {cgroup}: {str(e)}")
+                applied = False
+        return applied
+    
+    def _cpu_max(self, cpu_cores: float) -> str:
+        """cpu.max value granting the given number of cores"""
+        if cpu_cores <= 0:
+            return f"max {CPU_PERIOD_US}"
+        return f"{max(MIN_CPU_QUOTA_US, int(cpu_cores * CPU_PERIOD_US))} {CPU_PERIOD_US}"
+    
+    def _block_device(self, path: str) -> Optional[Tuple[int, int]]:
+        """Whole-disk device holding a path, since io.max does not accept partitions"""
+        try:
+            st_dev = os.stat(path).st_dev
+        except OSError:
+            return None
+        
+        sysfs = Path(f"/sys/dev/block/{os.major(st_dev)}:{os.minor(st_dev)}")
+        if not sysfs.exists():
+            return None  # Not backed by a block device (tmpfs, overlay, network)
+        if (sysfs / "partition").exists():
+            try:
+                major, minor = (sysfs.resolve().parent / "dev").read_text().strip().split(":")
+                return int(major), int(minor)
+            except (OSError, ValueError):
+                return None
+        return os.major(st_dev), os.minor(st_dev)
+    
+    # setrlimit and nice fallback
+    
+    def _rlimit_preexec(self, limits: ProcessLimits) -> Callable[[], None]:
+        """Function run in the child before exec to limit memory and lower its priority"""
+        niceness = self._niceness(limits.cpu_cores)
+        memory_limit = self._memory_rlimit()
+        
+        def apply_limits() -> None:
+            if memory_limit is not None:
+                try:
+                    _, hard = resource.getrlimit(memory_limit)
+                    resource.setrlimit(memory_limit, (self._memory_bytes(limits, hard), hard))
+                except (OSError, ValueError):
+                    pass
+            if niceness > 0:
+                try:
+                    os.nice(niceness)
+                except OSError:
+                    pass
+        
+        return apply_limits
+    
+    def _niceness(self, cpu_cores: float) -> int:
+        """Nice level giving a process about its share of the CPU budget in scheduler weight"""
+        if cpu_cores <= 0 or self.cpu_budget_cores <= 0:
+            return 0
+        share = min(1.0, cpu_cores / self.cpu_budget_cores)
+        return min(19, round(-math.log(share) / math.log(NICE_WEIGHT_STEP)))
+    
+    def _memory_rlimit(self) -> Optional[int]:
+        """
+        Rlimit capping a process's memory.
+        
+        RLIMIT_DATA counts writable private mappings (heap and anonymous
+        memory) without counting address space that runtimes only reserve.
+        """
+        if resource is None:
+            return None
+        return getattr(resource, "RLIMIT_DATA", getattr(resource, "RLIMIT_AS", None))
+    
+    def _memory_bytes(self, limits: ProcessLimits, hard: int) -> int:
+        """Soft memory limit in bytes, never above the hard limit"""
+        if limits.memory_mb <= 0:
+            return hard
+        limit = limits.memory_mb * 1024 * 1024
+        return limit if hard == resource.RLIM_INFINITY else min(limit, hard)
@@ -0,0 +1,268 @@
+"""
+Process Tree Resource Sampler
+
+Measures what each project's orchestrator actually uses by summing CPU time,
+resident memory and disk I/O over its whole process tree: the orchestrator
+and every agent or tool process it spawned. Counters come from psutil when it
+is installed and from /proc otherwise. Usage is the change in these cumulative
+counters between two samples, so one pass per monitoring interval is enough
+and nothing polls the processes in between.
+"""
+
+import logging
+import os
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Graceful fallback for psutil
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ProcessTreeCounters:
+    """Cumulative counters of a process tree at one point in time"""
+    root_pid: int
+    timestamp: float
+    cpu_seconds: float = 0.0  # user + system, including waited-for children
+    rss_bytes: int = 0
+    read_bytes: int = 0
+    write_bytes: int = 0
+    process_count: int = 0
+    pids: List[int] = field(default_factory=list)
+
+
+@dataclass
+class ProcessTreeUsage:
+    """Resource usage of a process tree over the last sampling interval"""
+    root_pid: int
+    cpu_cores: float  # Average number of cores busy
+    memory_mb: float
+    read_mb_per_second: float
+    write_mb_per_second: float
+    process_count: int
+    interval_seconds: float
+    pids: List[int] = field(default_factory=list)  # Processes in the tree at the latest sample
+
+
+class ProcessTreeSampler:
+    """
+    Samples the resource usage of one process tree per project.
+    
+    CPU time and I/O of a process include its children that already exited
+    and were waited for, so a tree's counters only grow while its root runs
+    and work done by short-lived agent processes between two samples is not
+    lost. A tree is reported from its second sample on.
+    """
+    
+    def __init__(
+        self,
+        use_psutil: Optional[bool] = None,
+        proc_root: str = "/proc",
+        clock: Callable[[], float] = time.monotonic
+    ):
+        """
+        Initialize the sampler.
+        
+        Args:
+            use_psutil: Read counters through psutil; defaults to whether it is installed
+            proc_root: Mount point of procfs for the fallback reader
+            clock: Monotonic time source
+        """
+        self.use_psutil = psutil is not None if use_psutil is None else bool(use_psutil and psutil)
+        self.proc_root = proc_root
+        self.clock = clock
+        self._previous: Dict[str, ProcessTreeCounters] = {}
+        
+        try:
+            self._clock_ticks = os.sysconf("SC_CLK_TCK")
+            self._page_size = os.sysconf("SC_PAGE_SIZE")
+        except (AttributeError, ValueError, OSError):
+            self._clock_ticks, self._page_size = 100, 4096
+    
+    @property
+    def is_available(self) -> bool:
+        """Whether process counters can be read on this system"""
+        return self.use_psutil or os.path.isdir(self.proc_root)
+    
+    def sample(self, roots: Dict[str, int]) -> Dict[str, ProcessTreeUsage]:
+        """
+        Sample the process trees rooted at the given PIDs.
+        
+        Args:
+            roots: Project name -> PID of the project's root process
+        
+        Returns:
+            Usage since the previous sample for each tree sampled before
+        """
+        if not self.is_available:
+            return {}
+        
+        # Without psutil, one pass over /proc serves every tree
+        proc_stats: Dict[int, Tuple[int, float, int]] = {}
+        children: Dict[int, List[int]] = defaultdict(list)
+        if not self.use_psutil:
+            proc_stats = self._scan_proc()
+            for child, (ppid, _, _) in proc_stats.items():
+                children[ppid].append(child)
+        
+        usage = {}
+        for name, pid in roots.items():
+            if self.use_psutil:
+                counters = self._read_tree_psutil(pid)
+            else:
+                counters = self._read_tree_proc(pid, proc_stats, children)
+            
+            previous = self._previous.get(name)
+            if counters is None:
+                self._previous.pop(name, None)
+                continue
+            self._previous[name] = counters
+            
+            # A restarted orchestrator starts a new series
+            if previous is None or previous.root_pid != pid:
+                continue
+            
+            interval = counters.timestamp - previous.timestamp
+            if interval <= 0:
+                continue
+            usage[name] = ProcessTreeUsage(
+                root_pid=pid,
+                cpu_cores=max(0.0, counters.cpu_seconds - previous.cpu_seconds) / interval,
+                memory_mb=counters.rss_bytes / (1024 * 1024),
+                read_mb_per_second=max(0, counters.read_bytes - previous.read_bytes) / interval / (1024 * 1024),
+                write_mb_per_second=max(0, counters.write_bytes - previous.write_bytes) / interval / (1024 * 1024),
+                process_count=counters.process_count,
+                interval_seconds=interval,
+                pids=counters.pids
+            )
+        
+        # Forget trees that are no longer sampled
+        for name in list(self._previous):
+            if name not in roots:
+                del self._previous[name]
+        
+        return usage
+    
+    def forget(self, name: str) -> None:
+        """Drop the previous sample of a tree"""
+        self._previous.pop(name, None)
+    
+    # psutil reader
+    
+    def _read_tree_psutil(self, pid: int) -> Optional[ProcessTreeCounters]:
+        """Sum the counters of a process and its descendants through psutil"""
+        try:
+            root = psutil.Process(pid)
+            processes = [root] + root.children(recursive=True)
+        except (psutil.NoSuchProcess, psutil.AccessDenied, ValueError):
+            return None
+        
+        counters = ProcessTreeCounters(root_pid=pid, timestamp=self.clock())
+        for process in processes:
+            try:
+                with process.oneshot():
+                    cpu = process.cpu_times()
+                    rss = process.memory_info().rss
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                continue
+            counters.cpu_seconds += (
+                cpu.user + cpu.system + getattr(cpu, "children_user", 0.0) + getattr(cpu, "children_system", 0.0)
+            )
+            counters.rss_bytes += rss
+            counters.process_count += 1
+            counters.pids.append(process.pid)
+            
+            # I/O counters are not available on every platform or for every process
+            try:
+                io = process.io_counters()
+                counters.read_bytes += io.read_bytes
+                counters.write_bytes += io.write_bytes
+            except (AttributeError, NotImplementedError, psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        
+        return counters
+    
+    # /proc reader
+    
+    def _scan_proc(self) -> Dict[int, Tuple[int, float, int]]:
+        """Read parent PID, CPU seconds and RSS bytes of every process in one pass"""
+        stats = {}
+        try:
+            entries = os.listdir(self.proc_root)
+        except OSError:
+            return stats
+        
+        for entry in entries:
+            if entry.isdigit():
+                stat = self._read_proc_stat(int(entry))
+                if stat is not None:
+                    stats[int(entry)] = stat
+        return stats
+    
+    def _read_proc_stat(self, pid: int) -> Optional[Tuple[int, float, int]]:
+        """Parse /proc/<pid>/stat into parent PID, CPU seconds and RSS bytes"""
+        try:
+            with open(os.path.join(self.proc_root, str(pid), "stat")) as f:
+                data = f.read()
+        except OSError:
+            return None
+        
+        # The command name is in parentheses and may itself contain spaces or parentheses
+        fields = data[data.rfind(")") + 2:].split()
+        try:
+            ppid = int(fields[1])
+            utime, stime, cutime, cstime = (int(value) for value in fields[11:15])
+            rss_pages = int(fields[21])
+        except (IndexError, ValueError):
+            return None
+        
+        cpu_seconds = (utime + stime + cutime + cstime) / self._clock_ticks
+        return ppid, cpu_seconds, max(0, rss_pages) * self._page_size
+    
+    def _read_proc_io(self, pid: int) -> Tuple[int, int]:
+        """Read bytes read from and written to storage by a process, if permitted"""
+        read_bytes = write_bytes = 0
+        try:
+            with open(os.path.join(self.proc_root, str(pid), "io")) as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    if key == "read_bytes":
+                        read_bytes = int(value)
+                    elif key == "write_bytes":
+                        write_bytes = int(value)
+        except (OSError, ValueError):
+            pass
+        return read_bytes, write_bytes
+    
+    def _read_tree_proc(
+        self,
+        pid: int,
+        proc_stats: Dict[int, Tuple[int, float, int]],
+        children: Dict[int, List[int]]
+    ) -> Optional[ProcessTreeCounters]:
+        """Sum the counters of a process and its descendants from a /proc scan"""
+        if pid not in proc_stats:
+            return None
+        
+        counters = ProcessTreeCounters(root_pid=pid, timestamp=self.clock())
+        stack = [pid]
+        while stack:
+            current = stack.pop()
+            _, cpu_seconds, rss_bytes = proc_stats[current]
+            read_bytes, write_bytes = self._read_proc_io(current)
+            counters.cpu_seconds += cpu_seconds
+            counters.rss_bytes += rss_bytes
+            counters.read_bytes += read_bytes
+            counters.write_bytes += write_bytes
+            counters.process_count += 1
+            counters.pids.append(current)
+            stack.extend(children.get(current, ()))
+        
+        return counters
@@ -7,6 +7,7 @@ intelligent scheduling, load balancing, and dynamic resource allocation.
 
 import asyncio
 import logging
+import os
 import time
 import heapq
 from typing import Dict, List, Optional, Any, Set, Tuple, Callable
@@ -15,6 +16,7 @@ from datetime import datetime, timedelta
 from enum import Enum
 import json
 import math
+import itertools
 
 from .multi_project_config import ProjectConfig, ProjectPriority, ProjectStatus, ResourceLimits
 
@@ -28,6 +30,7 @@ class SchedulingStrategy(Enum):
     DYNAMIC = "dynamic"                 # Adaptive based on usage
     DEADLINE_AWARE = "deadline_aware"   # Consider project deadlines
     EFFICIENCY_OPTIMIZED = "efficiency_optimized"  # Optimize for resource efficiency
+    DOMINANT_RESOURCE_FAIRNESS = "drf"  # Equalize weighted dominant shares of CPU, memory and agents
 
 
 class ResourceType(Enum):
@@ -48,6 +51,18 @@ class TaskPriority(Enum):
     BACKGROUND = 5  # Cleanup, optimization
 
 
+# Resource entitlement of a project relative to a NORMAL priority project
+PRIORITY_WEIGHTS = {
+    ProjectPriority.CRITICAL: 1.5,
+    ProjectPriority.HIGH: 1.2,
+    ProjectPriority.NORMAL: 1.0,
+    ProjectPriority.LOW: 0.7
+}
+
+# Resources that tasks request and dominant resource fairness divides
+DRF_RESOURCES = ("cpu_cores", "memory_mb", "max_agents")
+
+
 @dataclass
 class ResourceQuota:
     """Resource quota for a project"""
@@ -71,6 +86,30 @@ class ResourceQuota:
         if self.max_agents <= 0:
             raise ValueError("Max agents must be positive")
     
+    @classmethod
+    def from_environment(cls, environ: Optional[Dict[str, str]] = None) -> Optional["ResourceQuota"]:
+        """
+        Read the quota the global orchestrator granted a project orchestrator.
+        
+        Args:
+            environ: Environment to read (defaults to os.environ)
+        
+        Returns:
+            Quota from ORCH_CPU_CORES, ORCH_MEMORY_LIMIT and ORCH_MAX_AGENTS,
+            or None when the process was not started with a quota
+        """
+        environ = os.environ if environ is None else environ
+        try:
+            return cls(
+                cpu_cores=float(environ["ORCH_CPU_CORES"]),
+                memory_mb=int(float(environ["ORCH_MEMORY_LIMIT"])),
+                max_agents=int(environ.get("ORCH_MAX_AGENTS", cls.max_agents))
+            )
+        except (KeyError, ValueError) as e:
+            if "ORCH_CPU_CORES" in environ:
+                logger.warning(f"Ignoring invalid resource quota in environment: {str(e)}")
+            return None
+    
     @classmethod
     def create_unvalidated(cls, cpu_cores=0.0, memory_mb=0, max_agents=0, disk_mb=0, network_bandwidth_mbps=0.0):
         """Create a ResourceQuota without validation for internal calculations"""
@@ -92,6 +131,7 @@ class ResourceUsage:
     active_agents: int = 0      # Currently active agents
     disk_usage_mb: int = 0      # Current disk usage in MB
     network_usage_mbps: float = 0.0  # Current network usage
+    disk_io_mbps: float = 0.0   # Current disk read + write throughput
     
     timestamp: datetime = field(default_factory=datetime.utcnow)
     
@@ -176,9 +216,25 @@ class ResourceScheduler:
         
         # Project scheduling state
         self.project_schedules: Dict[str, ProjectSchedule] = {}
-        self.global_task_queue: List[ScheduledTask] = []
         self.completed_tasks: Set[str] = set()
         
+        # Task queue indexes: queued and running tasks by ID, a ready heap of
+        # (priority, created_at, sequence, task) per project, and a countdown of
+        # unfinished dependencies for tasks that are not ready yet. Started or
+        # cancelled tasks stay in the ready heaps until popped (lazy deletion).
+        self._queued_tasks: Dict[str, ScheduledTask] = {}
+        self._running_tasks: Dict[str, ScheduledTask] = {}
+        self._ready_queues: Dict[str, List[Tuple[int, datetime, int, ScheduledTask]]] = {}
+        self._pending_dependencies: Dict[str, int] = {}
+        self._dependents: Dict[str, List[str]] = {}
+        self._list_positions: Dict[str, int] = {}  # task_id -> index in pending/running list
+        self._sequence = itertools.count()
+        
+        # Resources held by each project's running tasks, and each project's
+        # priority weight, for dominant resource fairness
+        self._running_allocations: Dict[str, ResourceQuota] = {}
+        self._project_weights: Dict[str, float] = {}
+        
         # Resource allocation tracking
         self.allocated_resources: Dict[str, ResourceQuota] = {}
         self.available_resources = ResourceQuota(
@@ -250,6 +306,8 @@ class ResourceScheduler:
         
         self.project_schedules[project_config.name] = schedule
         self.allocated_resources[project_config.name] = initial_quota
+        self._running_allocations[project_config.name] = ResourceQuota.create_unvalidated()
+        self._project_weights[project_config.name] = PRIORITY_WEIGHTS.get(project_config.priority, 1.0)
         self._update_available_resources()
         
         logger.info(f"Registered project '{project_config.name}' with quota: {asdict(initial_quota)}")
@@ -270,12 +328,15 @@ class ResourceScheduler:
             return False
         
         # Cancel all pending tasks for this project
-        # Note: global_task_queue stores tuples (priority, created_at, task)
-        self.global_task_queue = [
-            task_tuple for task_tuple in self.global_task_queue
-            if task_tuple[2].project_name != project_name
-        ]
-        heapq.heapify(self.global_task_queue)  # Restore heap property
+        schedule = self.project_schedules[project_name]
+        for task in schedule.pending_tasks + schedule.running_tasks:
+            self._queued_tasks.pop(task.task_id, None)
+            self._running_tasks.pop(task.task_id, None)
+            self._pending_dependencies.pop(task.task_id, None)
+            self._list_positions.pop(task.task_id, None)
+        self._ready_queues.pop(project_name, None)
+        self._running_allocations.pop(project_name, None)
+        self._project_weights.pop(project_name, None)
         
         # Free up allocated resources
         if project_name in self.allocated_resources:
@@ -301,16 +362,97 @@ class ResourceScheduler:
             logger.error(f"Project '{task.project_name}' not registered")
             return False
         
+        if task.task_id in self._queued_tasks or task.task_id in self._running_tasks:
+            logger.warning(f"Task '{task.task_id}' already scheduled")
+            return False
+        
         # Add to project's pending tasks
         schedule = self.project_schedules[task.project_name]
-        schedule.pending_tasks.append(task)
+        self._append_to(schedule.pending_tasks, task)
+        self._queued_tasks[task.task_id] = task
         
-        # Add to global queue for scheduling
-        heapq.heappush(self.global_task_queue, (task.priority.value, task.created_at, task))
+        # Queue as ready, or wait for the dependencies that have not completed
+        waiting_on = {dep for dep in task.dependencies if dep not in self.completed_tasks}
+        if waiting_on:
+            self._pending_dependencies[task.task_id] = len(waiting_on)
+            for dep in waiting_on:
+                self._dependents.setdefault(dep, []).append(task.task_id)
+        else:
+            self._push_ready(task)
         
         logger.debug(f"Submitted task '{task.task_id}' for project '{task.project_name}'")
         return True
     
+    def complete_task(self, task_id: str) -> bool:
+        """
+        Mark a running task as completed and release tasks waiting on it.
+        
+        Args:
+            task_id: ID of the completed task
+            
+        Returns:
+            True if the task was running, False otherwise
+        """
+        task = self._running_tasks.pop(task_id, None)
+        if task is None:
+            logger.warning(f"Task '{task_id}' is not running")
+            return False
+        
+        task.completed_at = datetime.utcnow()
+        schedule = self.project_schedules.get(task.project_name)
+        if schedule:
+            self._remove_from(schedule.running_tasks, task)
+            schedule.completed_tasks.append(task)
+        self._update_running_allocation(task, -1)
+        self.completed_tasks.add(task_id)
+        
+        # Count down the dependents; those with no dependencies left become ready
+        for dependent_id in self._dependents.pop(task_id, []):
+            remaining = self._pending_dependencies.get(dependent_id)
+            if remaining is None:
+                continue
+            if remaining > 1:
+                self._pending_dependencies[dependent_id] = remaining - 1
+                continue
+            del self._pending_dependencies[dependent_id]
+            dependent = self._queued_tasks.get(dependent_id)
+            if dependent is not None:
+                self._push_ready(dependent)
+        
+        logger.info(f"Completed task '{task_id}' for project '{task.project_name}'")
+        return True
+    
+    def cancel_task(self, task_id: str) -> bool:
+        """
+        Cancel a queued task.
+        
+        Args:
+            task_id: ID of the task to cancel
+            
+        Returns:
+            True if the task was queued, False otherwise
+        """
+        task = self._queued_tasks.pop(task_id, None)
+        if task is None:
+            return False
+        
+        # The ready heap entry, if any, is skipped when it reaches the top
+        self._pending_dependencies.pop(task_id, None)
+        schedule = self.project_schedules.get(task.project_name)
+        if schedule:
+            self._remove_from(schedule.pending_tasks, task)
+        
+        logger.info(f"Cancelled task '{task_id}' for project '{task.project_name}'")
+        return True
+    
+    @property
+    def global_task_queue(self) -> List[Tuple[int, datetime, ScheduledTask]]:
+        """Snapshot of all queued tasks as (priority, created_at, task) tuples, in heap order"""
+        return sorted(
+            ((task.priority.value, task.created_at, task) for task in self._queued_tasks.values()),
+            key=lambda entry: entry[:2]
+        )
+    
     def update_resource_usage(self, project_name: str, usage: ResourceUsage) -> None:
         """
         Update current resource usage for a project.
@@ -360,7 +502,7 @@ class ResourceScheduler:
             "available_resources": asdict(self.available_resources),
             "system_utilization": self.get_system_utilization(),
             "active_projects": len(self.project_schedules),
-            "pending_tasks": len(self.global_task_queue),
+            "pending_tasks": len(self._queued_tasks),
             "completed_tasks": len(self.completed_tasks),
             "projects": {
                 name: {
@@ -404,6 +546,8 @@ class ResourceScheduler:
             changes_made = await self._optimize_dynamic()
         elif self.strategy == SchedulingStrategy.EFFICIENCY_OPTIMIZED:
             changes_made = await self._optimize_efficiency()
+        elif self.strategy == SchedulingStrategy.DOMINANT_RESOURCE_FAIRNESS:
+            changes_made = await self._optimize_drf()
         
         optimization_time = time.time() - optimization_start
         
@@ -426,14 +570,7 @@ class ResourceScheduler:
     def _calculate_initial_allocation(self, project_config: ProjectConfig) -> ResourceQuota:
         """Calculate initial resource allocation for a project"""
         # Base allocation on project priority and resource limits
-        priority_multipliers = {
-            ProjectPriority.CRITICAL: 1.5,
-            ProjectPriority.HIGH: 1.2,
-            ProjectPriority.NORMAL: 1.0,
-            ProjectPriority.LOW: 0.7
-        }
-        
-        multiplier = priority_multipliers.get(project_config.priority, 1.0)
+        multiplier = PRIORITY_WEIGHTS.get(project_config.priority, 1.0)
         limits = project_config.resource_limits
         
         # Calculate initial allocation, ensuring minimum valid values
@@ -563,50 +700,166 @@ class ResourceScheduler:
                 await asyncio.sleep(120)
     
     async def _process_task_queue(self) -> None:
-        """Process the global task queue"""
+        """Start ready tasks of each project in priority order while they fit its quota"""
+        if self.strategy == SchedulingStrategy.DOMINANT_RESOURCE_FAIRNESS:
+            await self._dispatch_drf()
+            return
+        
         ready_tasks = []
         
         # Find tasks that are ready to run
-        for _, _, task in self.global_task_queue:
-            if task.is_ready(self.completed_tasks):
-                schedule = self.project_schedules.get(task.project_name)
-                if schedule and self._can_run_task(task, schedule):
-                    ready_tasks.append(task)
+        for project_name in self._ready_queues:
+            schedule = self.project_schedules.get(project_name)
+            if schedule is None:
+                continue
+            
+            # Resources of the tasks started for this project in this pass
+            starting = ResourceQuota.create_unvalidated()
+            while True:
+                task = self._peek_ready(project_name)
+                if task is None or not self._can_run_task(task, schedule, starting):
+                    break
+                heapq.heappop(self._ready_queues[project_name])
+                ready_tasks.append(task)
+                starting.cpu_cores += task.resource_requirements.cpu_cores
+                starting.memory_mb += task.resource_requirements.memory_mb
+                starting.max_agents += task.resource_requirements.max_agents
         
         # Start ready tasks
         for task in ready_tasks:
             await self._start_task(task)
     
-    def _can_run_task(self, task: ScheduledTask, schedule: ProjectSchedule) -> bool:
-        """Check if a task can run given current resource usage"""
+    def _can_run_task(
+        self,
+        task: ScheduledTask,
+        schedule: ProjectSchedule,
+        starting: Optional[ResourceQuota] = None
+    ) -> bool:
+        """Check if a task can run given current resource usage and tasks already starting"""
         current = schedule.current_usage
         quota = schedule.current_quota
         required = task.resource_requirements
+        starting = starting or ResourceQuota.create_unvalidated()
         
         return (
-            current.cpu_usage + required.cpu_cores <= quota.cpu_cores and
-            current.memory_usage_mb + required.memory_mb <= quota.memory_mb and
-            current.active_agents + required.max_agents <= quota.max_agents
+            current.cpu_usage + starting.cpu_cores + required.cpu_cores <= quota.cpu_cores and
+            current.memory_usage_mb + starting.memory_mb + required.memory_mb <= quota.memory_mb and
+            current.active_agents + starting.max_agents + required.max_agents <= quota.max_agents
         )
     
     async def _start_task(self, task: ScheduledTask) -> None:
         """Start executing a task"""
         schedule = self.project_schedules[task.project_name]
         
-        # Move from pending to running
-        if task in schedule.pending_tasks:
-            schedule.pending_tasks.remove(task)
-        schedule.running_tasks.append(task)
-        
-        # Remove from global queue
-        self.global_task_queue = [
-            (priority, created, t) for priority, created, t in self.global_task_queue
-            if t.task_id != task.task_id
-        ]
+        # Move from pending to running; a ready heap entry is dropped when popped
+        self._remove_from(schedule.pending_tasks, task)
+        self._append_to(schedule.running_tasks, task)
+        self._queued_tasks.pop(task.task_id, None)
+        self._running_tasks[task.task_id] = task
+        self._update_running_allocation(task, 1)
         
         task.started_at = datetime.utcnow()
         logger.info(f"Started task '{task.task_id}' for project '{task.project_name}'")
     
+    async def _dispatch_drf(self) -> None:
+        """
+        Start ready tasks by dominant resource fairness.
+        
+        The next task always comes from the project with the smallest dominant
+        share (its largest fraction of any system resource held by running
+        tasks) divided by its priority weight, as long as the task fits the
+        capacity left. A project whose next task does not fit is passed over
+        for the rest of this pass.
+        """
+        free = {
+            resource: getattr(self.total_resources, resource) - sum(
+                getattr(allocation, resource) for allocation in self._running_allocations.values()
+            )
+            for resource in DRF_RESOURCES
+        }
+        candidates = [
+            (self._weighted_dominant_share(project_name), next(self._sequence), project_name)
+            for project_name in self._ready_queues
+            if project_name in self.project_schedules
+        ]
+        heapq.heapify(candidates)
+        
+        while candidates:
+            _, _, project_name = heapq.heappop(candidates)
+            task = self._peek_ready(project_name)
+            if task is None:
+                continue
+            
+            required = task.resource_requirements
+            if any(getattr(required, resource) > free[resource] for resource in DRF_RESOURCES):
+                continue
+            
+            heapq.heappop(self._ready_queues[project_name])
+            await self._start_task(task)
+            for resource in DRF_RESOURCES:
+                free[resource] -= getattr(required, resource)
+            heapq.heappush(
+                candidates,
+                (self._weighted_dominant_share(project_name), next(self._sequence), project_name)
+            )
+    
+    def _weighted_dominant_share(self, project_name: str) -> float:
+        """Largest fraction of any system resource held by a project, divided by its weight"""
+        allocation = self._running_allocations.get(project_name)
+        if allocation is None:
+            return 0.0
+        
+        share = max(
+            getattr(allocation, resource) / getattr(self.total_resources, resource)
+            for resource in DRF_RESOURCES
+            if getattr(self.total_resources, resource) > 0
+        )
+        return share / self._project_weights.get(project_name, 1.0)
+    
+    def _update_running_allocation(self, task: ScheduledTask, sign: int) -> None:
+        """Add (sign=1) or release (sign=-1) a task's resources in its project's running allocation"""
+        allocation = self._running_allocations.get(task.project_name)
+        if allocation is None:
+            return
+        
+        for resource in DRF_RESOURCES:
+            value = getattr(allocation, resource) + sign * getattr(task.resource_requirements, resource)
+            setattr(allocation, resource, max(0, value))
+    
+    def _peek_ready(self, project_name: str) -> Optional[ScheduledTask]:
+        """Next ready task of a project, discarding started or cancelled heap entries"""
+        ready_queue = self._ready_queues.get(project_name)
+        while ready_queue:
+            task = ready_queue[0][-1]
+            if self._queued_tasks.get(task.task_id) is task:
+                return task
+            heapq.heappop(ready_queue)
+        return None
+    
+    def _push_ready(self, task: ScheduledTask) -> None:
+        """Add a task whose dependencies have completed to its project's ready heap"""
+        ready_queue = self._ready_queues.setdefault(task.project_name, [])
+        heapq.heappush(ready_queue, (task.priority.value, task.created_at, next(self._sequence), task))
+    
+    def _append_to(self, tasks: List[ScheduledTask], task: ScheduledTask) -> None:
+        """Append a task to a pending or running list, remembering its position"""
+        self._list_positions[task.task_id] = len(tasks)
+        tasks.append(task)
+    
+    def _remove_from(self, tasks: List[ScheduledTask], task: ScheduledTask) -> None:
+        """Remove a task from a pending or running list by moving the last task into its place"""
+        index = self._list_positions.pop(task.task_id, None)
+        if index is None or index >= len(tasks) or tasks[index] is not task:
+            # Not added through the scheduler
+            if task in tasks:
+                tasks.remove(task)
+            return
+        
+        last = tasks.pop()
+        if last is not task:
+            tasks[index] = last
+            self._list_positions[last.task_id] = index
+    
     def _collect_performance_metrics(self) -> None:
         """Collect system-wide performance metrics"""
         utilization = self.get_system_utilization()
@@ -617,7 +870,7 @@ class ResourceScheduler:
             "system_utilization": utilization,
             "average_efficiency": sum(efficiency_scores) / len(efficiency_scores) if efficiency_scores else 0.0,
             "resource_fragmentation": self._calculate_fragmentation(),
-            "pending_tasks": len(self.global_task_queue),
+            "pending_tasks": len(self._queued_tasks),
             "active_projects": len([s for s in self.project_schedules.values() if s.running_tasks])
         }
     
@@ -686,8 +939,8 @@ class ResourceScheduler:
                 # Reduce allocation
                 current_quota = self.allocated_resources[project_name]
                 new_quota = ResourceQuota(
-                    cpu_cores=current_quota.cpu_cores * 0.8,
-                    memory_mb=int(current_quota.memory_mb * 0.8),
+                    cpu_cores=max(0.1, current_quota.cpu_cores * 0.8),
+                    memory_mb=max(1, int(current_quota.memory_mb * 0.8)),
                     max_agents=max(1, int(current_quota.max_agents * 0.8)),
                     disk_mb=int(current_quota.disk_mb * 0.8),
                     network_bandwidth_mbps=current_quota.network_bandwidth_mbps * 0.8
@@ -722,6 +975,95 @@ class ResourceScheduler:
         self._update_available_resources()
         return changes
     
+    async def _optimize_drf(self) -> List[str]:
+        """
+        Set quotas to the weighted DRF allocation of each project's outstanding demand.
+        
+        Demand is what a project's running and queued tasks require. Quotas
+        are found by progressive filling: all projects' weighted dominant
+        shares grow together until a project's demand is met or a resource it
+        needs runs out, so no project gains without taking from one with an
+        equal or smaller share.
+        """
+        changes = []
+        demands = {}
+        for project_name, schedule in self.project_schedules.items():
+            demand = {
+                resource: getattr(self._running_allocations[project_name], resource)
+                for resource in DRF_RESOURCES
+            }
+            for task in schedule.pending_tasks:
+                for resource in DRF_RESOURCES:
+                    demand[resource] += getattr(task.resource_requirements, resource)
+            demands[project_name] = demand
+        
+        allocations = self._progressive_filling(demands)
+        
+        for project_name, allocation in allocations.items():
+            current_quota = self.allocated_resources[project_name]
+            new_quota = ResourceQuota(
+                cpu_cores=max(0.1, allocation["cpu_cores"]),
+                memory_mb=max(1, int(allocation["memory_mb"])),
+                max_agents=max(1, int(allocation["max_agents"])),
+                disk_mb=current_quota.disk_mb,
+                network_bandwidth_mbps=current_quota.network_bandwidth_mbps
+            )
+            if new_quota != current_quota:
+                self.allocated_resources[project_name] = new_quota
+                self.project_schedules[project_name].current_quota = new_quota
+                changes.append(f"Adjusted {project_name} to its dominant resource fair share")
+        
+        self._update_available_resources()
+        return changes
+    
+    def _progressive_filling(self, demands: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+        """Weighted DRF allocation of divisible demands over the total resources"""
+        capacity = {resource: float(getattr(self.total_resources, resource)) for resource in DRF_RESOURCES}
+        allocations = {name: {resource: 0.0 for resource in DRF_RESOURCES} for name in demands}
+        
+        # Resources a project uses per unit of dominant share, and the share that meets its demand
+        profiles = {}
+        for name, demand in demands.items():
+            dominant = max(
+                (demand[resource] / capacity[resource] for resource in DRF_RESOURCES if capacity[resource] > 0),
+                default=0.0
+            )
+            if dominant > 0:
+                profiles[name] = (dominant, {resource: demand[resource] / dominant for resource in DRF_RESOURCES})
+        
+        shares = {name: 0.0 for name in profiles}
+        remaining = dict(capacity)
+        active = set(profiles)
+        epsilon = 1e-9
+        
+        while active:
+            weights = {name: self._project_weights.get(name, 1.0) for name in active}
+            rates = {
+                resource: sum(weights[name] * profiles[name][1][resource] for name in active)
+                for resource in DRF_RESOURCES
+            }
+            
+            # Raise all weighted shares until a demand is met or a resource runs out
+            step = min(
+                [(profiles[name][0] - shares[name]) / weights[name] for name in active] +
+                [remaining[resource] / rate for resource, rate in rates.items() if rate > 0]
+            )
+            for name in active:
+                shares[name] += weights[name] * step
+            for resource, rate in rates.items():
+                remaining[resource] -= rate * step
+            
+            exhausted = {resource for resource in DRF_RESOURCES if remaining[resource] <= epsilon * capacity[resource]}
+            active = {
+                name for name in active
+                if profiles[name][0] - shares[name] > epsilon
+                and not any(profiles[name][1][resource] > 0 for resource in exhausted)
+            }
+        
+        for name, (_, per_share) in profiles.items():
+            allocations[name] = {resource: shares[name] * per_share[resource] for resource in DRF_RESOURCES}
+        return allocations
+    
     async def _optimize_efficiency(self) -> List[str]:
         """Optimize for maximum resource efficiency"""
         # This would implement efficiency-focused optimization
@@ -17,8 +17,10 @@ import uuid
 
 try:
     from .tdd_models import TDDState, TDDCycle, TDDTask, TestResult, TestStatus
+    from .file_lock_manager import FileLockManager, LockMode
 except ImportError:
     from tdd_models import TDDState, TDDCycle, TDDTask, TestResult, TestStatus
+    from file_lock_manager import FileLockManager, LockMode
 
 # Import state broadcaster for real-time visualization
 try:
@@ -231,7 +233,8 @@ class TDDStateMachine:
         enable_parallel_execution: bool = False,
         enable_resource_locking: bool = False,
         enable_coordination_events: bool = False,
-        resource_lock_timeout: int = 300  # 5 minutes default
+        resource_lock_timeout: int = 300,  # 5 minutes default
+        lock_manager: Optional[FileLockManager] = None
     ):
         # Sequential execution state (legacy compatibility)
         self.current_state = initial_state
@@ -243,6 +246,13 @@ class TDDStateMachine:
         self.enable_coordination_events = enable_coordination_events
         self.resource_lock_timeout = resource_lock_timeout
         
+        # File locks are shared with the parallel coordinator and conflict resolver
+        self.lock_manager = lock_manager
+        if self.lock_manager is None and enable_resource_locking:
+            self.lock_manager = FileLockManager()
+        if self.lock_manager is not None:
+            self.lock_manager.add_release_listener(self._on_lock_released)
+        
         # Parallel state tracking
         self.parallel_states: Dict[str, ParallelStateInfo] = {}  # cycle_id -> state info
         self.resource_locks: Dict[str, ResourceLock] = {}       # resource_id -> lock
@@ -251,6 +261,7 @@ class TDDStateMachine:
         
         # Event handlers and coordination
         self.coordination_handlers: Dict[str, Callable] = {}
+        self._transition_listeners: List[Callable[[TDDCycle, TDDState, TDDState], None]] = []
         self._coordination_lock = threading.Lock()
         
         # Performance metrics
@@ -275,6 +286,10 @@ class TDDStateMachine:
             self.current_state = cycle.current_state
             logger.info(f"Active TDD cycle set: {cycle.id}, state: {cycle.current_state.value}")
     
+    def add_transition_listener(self, listener: Callable[[TDDCycle, TDDState, TDDState], None]) -> None:
+        """Register a callback invoked with (cycle, old_state, new_state) whenever a cycle changes state"""
+        self._transition_listeners.append(listener)
+    
     def validate_command(self, command: str, cycle: Optional[TDDCycle] = None) -> TDDCommandResult:
         """
         Validate if a TDD command is allowed in the current state.
@@ -366,6 +381,9 @@ class TDDStateMachine:
                 emit_tdd_transition(story_id, old_state, self.current_state, project_name)
             except Exception as e:
                 logger.warning(f"Failed to emit TDD transition: {e}")
+            
+            if target_cycle and old_state != result.new_state:
+                self._notify_transition(target_cycle, old_state, result.new_state)
         
         return result
     
@@ -823,7 +841,10 @@ stateDiagram-v2
         conflicts = []
         
         for resource_id in requested_resources:
-            if resource_id in self.resource_locks:
+            if self.lock_manager is not None:
+                if self.lock_manager.find_conflicts(cycle_id, [(resource_id, LockMode.EXCLUSIVE)]):
+                    conflicts.append(resource_id)
+            elif resource_id in self.resource_locks:
                 existing_lock = self.resource_locks[resource_id]
                 if existing_lock.cycle_id != cycle_id and existing_lock.lock_type == "exclusive":
                     conflicts.append(resource_id)
@@ -863,11 +884,21 @@ stateDiagram-v2
                 if existing_lock.cycle_id != cycle_id:
                     return False
         
+        # Locks this cycle already holds are not taken again
+        new_resources = [resource_id for resource_id in resources if resource_id not in self.resource_locks]
+        if self.lock_manager is not None and not self.lock_manager.try_acquire_all(
+            cycle_id,
+            [(resource_id, LockMode.EXCLUSIVE) for resource_id in new_resources],
+            ttl=self.resource_lock_timeout,
+            story_id=self.parallel_states[cycle_id].story_id if cycle_id in self.parallel_states else None
+        ):
+            return False
+        
         # Acquire locks
         current_time = datetime.utcnow()
         expires_at = current_time + timedelta(seconds=self.resource_lock_timeout)
         
-        for resource_id in resources:
+        for resource_id in new_resources:
             if resource_id not in self.resource_locks:
                 # Get cycle info for story_id
                 story_id = "unknown"
@@ -896,6 +927,17 @@ stateDiagram-v2
             # Update parallel state info
             if lock.cycle_id in self.parallel_states:
                 self.parallel_states[lock.cycle_id].locked_resources.discard(resource_id)
+            
+            if self.lock_manager is not None:
+                self.lock_manager.release(lock.cycle_id, resource_id)
+    
+    def _on_lock_released(self, path: str, owner: str) -> None:
+        """Lock manager callback: forget locks released by another component"""
+        lock = self.resource_locks.get(path)
+        if lock is not None and lock.cycle_id == owner:
+            del self.resource_locks[path]
+            if owner in self.parallel_states:
+                self.parallel_states[owner].locked_resources.discard(path)
     
     def _release_cycle_resources(self, cycle_id: str) -> None:
         """Release all resource locks for a cycle"""
@@ -981,6 +1023,14 @@ stateDiagram-v2
                             )
                             self.coordination_events[event_id] = event
     
+    def _notify_transition(self, cycle: TDDCycle, old_state: TDDState, new_state: TDDState) -> None:
+        """Invoke transition listeners for a cycle that changed state"""
+        for listener in self._transition_listeners:
+            try:
+                listener(cycle, old_state, new_state)
+            except Exception as e:
+                logger.warning(f"Transition listener failed for cycle {cycle.id}: {e}")
+    
     def _would_create_dependency_cycle(self, cycle_id: str, dependency_cycle_id: str) -> bool:
         """Check if adding a dependency would create a circular dependency"""
         # Simple DFS to detect cycles
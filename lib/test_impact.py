@@ -0,0 +1,284 @@
+"""
+Test Impact Analysis
+
+Selects the test files affected by a TDD cycle's changes, so GREEN and QA
+validation run the tests that can observe a change instead of the whole
+test path. A test is affected when it reaches a changed file through the
+import graph of ContextIndex, or when a recorded coverage run shows it
+executing the file. Changes the graph cannot account for, such as
+configuration files, conftest.py, files it has not indexed or changes
+reaching no test, select the full suite, and the full suite also runs on a
+schedule to catch imports the graph misses, such as dynamic imports.
+"""
+
+import json
+import logging
+import os
+from collections import defaultdict, deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+try:
+    from .context_index import ContextIndex
+except ImportError:
+    from context_index import ContextIndex
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FULL_SUITE_EVERY = 5  # Validations per scope between scheduled full runs
+
+
+def is_test_file(path: str) -> bool:
+    """Whether a path names a pytest test module"""
+    name = os.path.basename(path)
+    return name.endswith(".py") and (name.startswith("test_") or name.endswith("_test.py"))
+
+
+def find_test_files(roots: Iterable[str]) -> List[str]:
+    """Test modules in the given files and directories"""
+    found = []
+    for root in roots:
+        if os.path.isfile(root):
+            found.append(root)
+        elif os.path.isdir(root):
+            for path in Path(root).rglob("*.py"):
+                if is_test_file(str(path)) and "__pycache__" not in path.parts:
+                    found.append(str(path))
+    return sorted(set(found))
+
+
+@dataclass
+class TestSelection:
+    """Tests to run for a set of changed files"""
+    tests: List[str]  # Affected tests, run first
+    candidates: List[str]  # The full suite the selection was made from
+    run_full_suite: bool = False  # Run all candidates once the affected tests pass
+    reason: str = ""
+    
+    @property
+    def is_subset(self) -> bool:
+        """Whether the selection skips any of the candidates"""
+        return len(self.tests) < len(self.candidates)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "selected_tests": len(self.tests),
+            "candidate_tests": len(self.candidates),
+            "run_full_suite": self.run_full_suite,
+            "reason": self.reason
+        }
+
+
+class TestImpactSelector:
+    """
+    Maps changed files to the tests they affect.
+    
+    The import graph comes from a ContextIndex, built on the first selection
+    and then updated for the changed files and the candidate tests. The optional coverage map records, per
+    test file, the source files its coverage runs executed; it is kept in a
+    JSON file when a path is given so it survives restarts.
+    """
+    
+    def __init__(
+        self,
+        context_index: Optional[ContextIndex] = None,
+        full_suite_every: int = DEFAULT_FULL_SUITE_EVERY,
+        coverage_map_path: Optional[str] = None
+    ):
+        """
+        Initialize the selector.
+        
+        Args:
+            context_index: Index providing the import graph; without one
+                every selection is the full suite
+            full_suite_every: Run the full suite on every Nth validation of a
+                scope; 0 disables scheduled full runs
+            coverage_map_path: JSON file persisting the coverage map
+        """
+        self.context_index = context_index
+        self.full_suite_every = max(0, full_suite_every)
+        self.coverage_map_path = Path(coverage_map_path) if coverage_map_path else None
+        self.coverage_map: Dict[str, Set[str]] = self._load_coverage_map()
+        self._validations: Dict[str, int] = defaultdict(int)
+        self.selections = 0
+        self.full_runs = 0
+        self.selected_tests = 0
+        self.candidate_tests = 0
+    
+    async def select(
+        self,
+        changed_files: Iterable[str],
+        candidates: Optional[List[str]] = None,
+        test_roots: Optional[List[str]] = None,
+        scope: str = "default"
+    ) -> TestSelection:
+        """
+        Select the tests affected by changed files.
+        
+        Args:
+            changed_files: Source and test files changed since the last validation
+            candidates: Test files of the full suite
+            test_roots: Files or directories to find the candidates in, when
+                candidates are not given
+            scope: What is being validated, e.g. a story; scheduled full runs
+                are counted per scope
+        
+        Returns:
+            Affected tests, and whether the full suite must run as well
+        """
+        if candidates is None:
+            candidates = find_test_files(test_roots or ["tests"])
+        candidates = sorted(set(candidates))
+        changed = sorted({os.path.abspath(path) for path in changed_files})
+        
+        self._validations[scope] += 1
+        scheduled = self.full_suite_every > 0 and self._validations[scope] % self.full_suite_every == 0
+        
+        tests: List[str] = []
+        unsafe = await self._unsafe_change(changed, candidates)
+        if not unsafe:
+            affected = self._affected_files(changed)
+            tests = [test for test in candidates if os.path.abspath(test) in affected]
+            if not tests:
+                # The changes may still break a test the graph cannot see, e.g. through a dynamic import
+                unsafe = f"no tests affected by {len(changed)} changed files"
+        
+        if unsafe:
+            selection = TestSelection(tests=candidates, candidates=candidates, reason=unsafe)
+        else:
+            selection = TestSelection(
+                tests=tests,
+                candidates=candidates,
+                run_full_suite=scheduled and len(tests) < len(candidates),
+                reason=(f"scheduled full run (every {self.full_suite_every} validations)" if scheduled
+                        else f"{len(tests)} of {len(candidates)} tests affected by {len(changed)} changed files")
+            )
+        
+        self.selections += 1
+        self.full_runs += 1 if selection.run_full_suite or not selection.is_subset else 0
+        self.selected_tests += len(selection.tests)
+        self.candidate_tests += len(candidates)
+        logger.info(f"Test impact selection for {scope}: {selection.reason}")
+        return selection
+    
+    def record_coverage(self, coverage: Any) -> None:
+        """
+        Record which source files each test file executed.
+        
+        Args:
+            coverage: CoverageReport of a run with coverage_contexts, whose
+                test_files replace the entries of the tests that ran
+        """
+        if not coverage.test_files:
+            return
+        for test_file, executed in coverage.test_files.items():
+            self.coverage_map[os.path.abspath(test_file)] = {os.path.abspath(path) for path in executed}
+        self._save_coverage_map()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """How much of the candidate suites the selections skipped"""
+        return {
+            "selections": self.selections,
+            "full_runs": self.full_runs,
+            "selected_tests": self.selected_tests,
+            "candidate_tests": self.candidate_tests,
+            "skipped_fraction": (1 - self.selected_tests / self.candidate_tests) if self.candidate_tests else 0.0
+        }
+    
+    async def _unsafe_change(self, changed: List[str], candidates: List[str]) -> Optional[str]:
+        """Reason the changes cannot be traced through the import graph, if any"""
+        if not changed:
+            return "no changed files given"
+        if self.context_index is None:
+            return "no dependency graph available"
+        
+        for path in changed:
+            if not path.endswith(".py") or os.path.basename(path) == "conftest.py":
+                return f"{os.path.basename(path)} can affect any test"
+        
+        await self._refresh_index(changed, candidates)
+        indexed = {os.path.abspath(path) for path in self.context_index.file_nodes}
+        for path in changed:
+            if path not in indexed and path not in self._covered_files():
+                return f"{os.path.basename(path)} is not in the dependency graph"
+        return None
+    
+    async def _refresh_index(self, changed: List[str], candidates: List[str]) -> None:
+        """
+        Build the index on first use, then re-index only the changed files
+        and the candidate tests, which may be new, instead of the project
+        """
+        if self.context_index.last_full_scan is None:
+            await self.context_index.build_index()
+            return
+        
+        indexed = {os.path.abspath(path): path for path in self.context_index.file_nodes}
+        paths = set(changed) | {os.path.abspath(test) for test in candidates}
+        await self.context_index.update_files(sorted(indexed.get(path, path) for path in paths))
+    
+    def _affected_files(self, changed: List[str]) -> Set[str]:
+        """Changed files, files importing them directly or indirectly, and tests covering them"""
+        reverse_graph: Dict[str, Set[str]] = defaultdict(set)
+        for target, sources in self.context_index.reverse_dependency_graph.items():
+            reverse_graph[os.path.abspath(target)].update(os.path.abspath(source) for source in sources)
+        
+        affected = set(changed)
+        queue = deque(changed)
+        while queue:
+            for importer in reverse_graph.get(queue.popleft(), ()):
+                if importer not in affected:
+                    affected.add(importer)
+                    queue.append(importer)
+        
+        for test_file, executed in self.coverage_map.items():
+            if executed & set(changed):
+                affected.add(test_file)
+        return affected
+    
+    def _covered_files(self) -> Set[str]:
+        return set().union(*self.coverage_map.values()) if self.coverage_map else set()
+    
+    def _load_coverage_map(self) -> Dict[str, Set[str]]:
+        if self.coverage_map_path is None or not self.coverage_map_path.exists():
+            return {}
+        try:
+            data = json.loads(self.coverage_map_path.read_text())
+            return {test_file: set(files) for test_file, files in data.items()}
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"Could not read test coverage map: {str(e)}")
+            return {}
+    
+    def _save_coverage_map(self) -> None:
+        if self.coverage_map_path is None:
+            return
+        try:
+            self.coverage_map_path.parent.mkdir(parents=True, exist_ok=True)
+            self.coverage_map_path.write_text(json.dumps(
+                {test_file: sorted(files) for test_file, files in self.coverage_map.items()}, indent=2
+            ))
+        except OSError as e:
+            logger.warning(f"Could not write test coverage map: {str(e)}")
+
+
+_default_selector: Optional[TestImpactSelector] = None
+
+
+def default_test_selector() -> Optional[TestImpactSelector]:
+    """
+    Process-wide selector for agents created without one.
+    
+    Enabled by setting TEST_IMPACT_ANALYSIS=1 for the project in the current
+    directory; TEST_IMPACT_FULL_SUITE_EVERY sets the full run schedule.
+    """
+    global _default_selector
+    if os.getenv("TEST_IMPACT_ANALYSIS", "").lower() not in ("1", "true", "yes"):
+        return None
+    if _default_selector is None:
+        project_path = os.getcwd()
+        _default_selector = TestImpactSelector(
+            context_index=ContextIndex(project_path),
+            full_suite_every=int(os.getenv("TEST_IMPACT_FULL_SUITE_EVERY", str(DEFAULT_FULL_SUITE_EVERY))),
+            coverage_map_path=os.path.join(project_path, ".orch-state", "test_coverage_map.json")
+        )
+    return _default_selector
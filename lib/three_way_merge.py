@@ -0,0 +1,285 @@
+"""
+Three-Way Merge
+
+Merges two versions of a file that were derived from a common base. A
+line-based diff3 handles edits to separate regions of the file; for Python
+sources, edits that touch neighbouring lines but different functions, classes
+or imports are merged by recombining the changed top-level (and class-level)
+definitions. Used by the conflict resolver to auto-merge cycles that modified
+the same file in parallel.
+"""
+
+import ast
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .change_analysis import diff_hunks
+except ImportError:
+    from change_analysis import diff_hunks
+
+
+@dataclass
+class MergeResult:
+    """Outcome of a three-way merge"""
+    content: str
+    strategy: str  # unchanged, line, ast, conflict
+    conflicts: List[Tuple[int, int]] = field(default_factory=list)  # 1-based base line ranges
+    
+    @property
+    def clean(self) -> bool:
+        """Whether every change could be merged"""
+        return not self.conflicts
+
+
+@dataclass
+class _Hunk:
+    """A change one side made to a range of base lines"""
+    start: int  # 0-based, inclusive
+    end: int  # 0-based, exclusive
+    lines: List[str]
+    side: int  # 0 = ours, 1 = theirs
+
+
+@dataclass
+class _Unit:
+    """A statement (with its leading blank lines and comments) in a block"""
+    key: Tuple[str, str]
+    start: int  # 0-based, inclusive
+    end: int  # 0-based, exclusive
+    node: Optional[ast.AST] = None
+
+
+def three_way_merge(base: str, ours: str, theirs: str, is_python: bool = False) -> MergeResult:
+    """
+    Merge ours and theirs, two versions derived from base.
+    
+    Changes to separate line ranges are combined with diff3; identical changes
+    made by both sides are taken once. When the line merge reports conflicts
+    (or produces invalid Python), Python sources fall back to merging changed
+    definitions, which succeeds as long as both sides did not change the same
+    function, class attribute or module-level statement.
+    
+    Returns:
+        MergeResult whose content is the merged text. For unresolved merges
+        the content keeps our side of each conflicting region.
+    """
+    if ours == theirs:
+        return MergeResult(ours, "unchanged")
+    if ours == base:
+        return MergeResult(theirs, "line")
+    if theirs == base:
+        return MergeResult(ours, "line")
+    
+    result = merge_lines(base, ours, theirs)
+    if not is_python or (result.clean and _parses(result.content)):
+        return result
+    
+    merged = merge_python(base, ours, theirs)
+    if merged is not None:
+        return MergeResult(merged, "ast")
+    if result.clean:
+        # The line merge combined the changes but broke the syntax
+        return MergeResult(result.content, "conflict", [(1, max(len(base.split('\n')), 1))])
+    return result
+
+
+def merge_lines(base: str, ours: str, theirs: str) -> MergeResult:
+    """Line-based diff3 merge; adjacent or overlapping changes conflict unless identical"""
+    base_lines = base.split('\n')
+    hunks = []
+    for side, version in enumerate((ours, theirs)):
+        version_lines = version.split('\n')
+        for _tag, i1, i2, j1, j2 in diff_hunks(base_lines, version_lines):
+            hunks.append(_Hunk(i1, i2, version_lines[j1:j2], side))
+    hunks.sort(key=lambda hunk: (hunk.start, hunk.end, hunk.side))
+    
+    merged: List[str] = []
+    conflicts: List[Tuple[int, int]] = []
+    position = 0
+    index = 0
+    while index < len(hunks):
+        # Group hunks whose base ranges overlap or touch
+        group = [hunks[index]]
+        start, end = hunks[index].start, hunks[index].end
+        index += 1
+        while index < len(hunks) and hunks[index].start <= end:
+            group.append(hunks[index])
+            end = max(end, hunks[index].end)
+            index += 1
+        
+        merged.extend(base_lines[position:start])
+        ours_region = _apply_hunks(base_lines, start, end, [h for h in group if h.side == 0])
+        theirs_region = _apply_hunks(base_lines, start, end, [h for h in group if h.side == 1])
+        
+        if len({hunk.side for hunk in group}) == 1:
+            merged.extend(ours_region if group[0].side == 0 else theirs_region)
+        elif ours_region == theirs_region:
+            merged.extend(ours_region)
+        else:
+            conflicts.append((start + 1, max(end, start + 1)))
+            merged.extend(ours_region)
+        position = end
+    
+    merged.extend(base_lines[position:])
+    return MergeResult('\n'.join(merged), "conflict" if conflicts else "line", conflicts)
+
+
+def merge_python(base: str, ours: str, theirs: str) -> Optional[str]:
+    """
+    Merge Python sources by definition.
+    
+    Statements are keyed by what they define (functions and classes by name,
+    assignments by target, imports by their text). A definition changed by
+    only one side is taken from that side; classes changed by both sides are
+    merged member by member. Returns None if both sides changed the same
+    definition, if definitions cannot be told apart, or if the result does not
+    parse.
+    """
+    versions = []
+    for source in (base, ours, theirs):
+        try:
+            tree = ast.parse(source)
+        except (SyntaxError, ValueError):
+            return None
+        lines = source.split('\n')
+        units = _split_block(lines, tree.body, 0, len(lines))
+        if units is None:
+            return None
+        versions.append((lines, units))
+    
+    merged = _merge_block(versions)
+    if merged is None:
+        return None
+    
+    content = '\n'.join(merged)
+    return content if _parses(content) else None
+
+
+def _apply_hunks(base_lines: List[str], start: int, end: int, hunks: List[_Hunk]) -> List[str]:
+    """Apply one side's hunks to base_lines[start:end]"""
+    region: List[str] = []
+    position = start
+    for hunk in hunks:
+        region.extend(base_lines[position:hunk.start])
+        region.extend(hunk.lines)
+        position = hunk.end
+    region.extend(base_lines[position:end])
+    return region
+
+
+def _parses(source: str) -> bool:
+    """Check that source is valid Python"""
+    try:
+        ast.parse(source)
+        return True
+    except (SyntaxError, ValueError):
+        return False
+
+
+def _unit_key(node: ast.stmt, lines: List[str], start: int, end: int) -> Tuple[str, str]:
+    """Identify a statement by what it defines"""
+    if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+        return ("def", node.name)
+    if isinstance(node, ast.ClassDef):
+        return ("class", node.name)
+    if isinstance(node, (ast.Import, ast.ImportFrom)):
+        return ("import", " ".join(" ".join(lines[start:end]).split()))
+    if isinstance(node, ast.Assign) and all(isinstance(t, ast.Name) for t in node.targets):
+        return ("assign", ",".join(t.id for t in node.targets))
+    if isinstance(node, ast.AnnAssign) and isinstance(node.target, ast.Name):
+        return ("assign", node.target.id)
+    return ("stmt", " ".join(" ".join(lines[start:end]).split()))
+
+
+def _split_block(lines: List[str], body: List[ast.stmt], start: int, end: int) -> Optional[List[_Unit]]:
+    """Split lines[start:end] into units, one per statement plus a trailing unit"""
+    units: List[_Unit] = []
+    keys = set()
+    position = start
+    for node in body:
+        node_start = min([node.lineno] + [d.lineno for d in getattr(node, "decorator_list", [])]) - 1
+        node_end = node.end_lineno or node.lineno
+        if node_start < position:
+            return None  # Several statements share a line
+        
+        key = _unit_key(node, lines, node_start, node_end)
+        if key in keys:
+            return None  # Definitions cannot be told apart
+        keys.add(key)
+        units.append(_Unit(key, position, node_end, node))
+        position = node_end
+    
+    units.append(_Unit(("tail", ""), position, end))
+    return units
+
+
+def _split_class(lines: List[str], unit: _Unit) -> Optional[List[_Unit]]:
+    """Split a class unit into its header, members and trailing unit"""
+    node = unit.node
+    first = node.body[0]
+    body_start = min([first.lineno] + [d.lineno for d in getattr(first, "decorator_list", [])]) - 1
+    if body_start < node.lineno:
+        return None  # Body starts on the class line
+    
+    members = _split_block(lines, node.body, body_start, unit.end)
+    if members is None:
+        return None
+    return [_Unit(("header", ""), unit.start, body_start)] + members
+
+
+def _merge_block(versions: List[Tuple[List[str], List[_Unit]]]) -> Optional[List[str]]:
+    """Merge the units of one block given (lines, units) for base, ours and theirs"""
+    (base_lines, base_units), (ours_lines, ours_units), (theirs_lines, theirs_units) = versions
+    base_map = {unit.key: unit for unit in base_units}
+    ours_map = {unit.key: unit for unit in ours_units}
+    theirs_map = {unit.key: unit for unit in theirs_units}
+    
+    def text(lines: List[str], unit: Optional[_Unit]) -> Optional[List[str]]:
+        return None if unit is None else lines[unit.start:unit.end]
+    
+    def changed_statements(lines: List[str], units: Dict[Tuple[str, str], _Unit]) -> bool:
+        keys = {key for key in list(base_map) + list(units) if key[0] == "stmt"}
+        return any(text(lines, units.get(key)) != text(base_lines, base_map.get(key)) for key in keys)
+    
+    # Other statements are keyed by their text, so concurrent edits to them
+    # cannot be matched up; only one side may change them
+    if changed_statements(ours_lines, ours_map) and changed_statements(theirs_lines, theirs_map):
+        return None
+    
+    # Our order, with units only theirs added placed after their predecessor
+    order = [unit.key for unit in ours_units]
+    previous = None
+    for unit in theirs_units:
+        if unit.key not in ours_map and unit.key not in base_map:
+            order.insert(order.index(previous) + 1 if previous in order else 0, unit.key)
+        previous = unit.key
+    order.extend([key for key in base_map if key not in order])
+    
+    merged: List[str] = []
+    for key in order:
+        base_text = text(base_lines, base_map.get(key))
+        ours_text = text(ours_lines, ours_map.get(key))
+        theirs_text = text(theirs_lines, theirs_map.get(key))
+        
+        if ours_text == theirs_text or theirs_text == base_text:
+            chosen = ours_text
+        elif ours_text == base_text:
+            chosen = theirs_text
+        elif key[0] == "class" and None not in (base_text, ours_text, theirs_text):
+            members = []
+            for lines, unit in ((base_lines, base_map[key]), (ours_lines, ours_map[key]), (theirs_lines, theirs_map[key])):
+                split = _split_class(lines, unit)
+                if split is None:
+                    return None
+                members.append((lines, split))
+            chosen = _merge_block(members)
+            if chosen is None:
+                return None
+        else:
+            return None
+        
+        if chosen is not None:
+            merged.extend(chosen)
+    
+    return merged
@@ -402,7 +402,8 @@ class MultiProjectOrchestrator:
         strategy_map = {
             "fair_share": SchedulingStrategy.FAIR_SHARE,
             "priority_based": SchedulingStrategy.PRIORITY_BASED,
-            "dynamic": SchedulingStrategy.DYNAMIC
+            "dynamic": SchedulingStrategy.DYNAMIC,
+            "drf": SchedulingStrategy.DOMINANT_RESOURCE_FAIRNESS
         }
         strategy = strategy_map.get(
             global_config.resource_allocation_strategy,
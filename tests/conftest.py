@@ -720,6 +720,16 @@ def enterprise_test_session_setup():
     logger.info(f"Final test statistics: {stats}")
 
 
+@pytest.fixture(scope="function", autouse=True)
+def reset_claude_availability():
+    """Probe claude availability afresh in each test, as tests patch subprocess.run"""
+    for module_name in ("claude_client", "lib.claude_client"):
+        module = sys.modules.get(module_name)
+        if module is not None and hasattr(module, "claude_availability"):
+            module.claude_availability.invalidate()
+    yield
+
+
 @pytest.fixture(scope="function", autouse=True)
 def enterprise_test_function_wrapper(request, performance_monitor):
     """Wrapper for individual test functions with enterprise monitoring"""
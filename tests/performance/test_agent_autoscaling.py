@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Agent Autoscaling Benchmark.
+
+Discrete-event simulation of bursts of TDD cycles moving through the design,
+test, code and refactor phases, each phase a task for the matching agent
+type. New agents take a while to start, as real agents do. Compares the
+pool's reactive scaling (one agent per unplaced task, one agent removed per
+quiet health check) with the predictive autoscaler, which sizes scale-ups from
+its queueing model, holds agents through short lulls and pre-warms agents for
+the phase transitions the state machine expects.
+"""
+
+import heapq
+import itertools
+import random
+from pathlib import Path
+from typing import Dict, List
+import pytest
+import sys
+
+# Add project root to sys.path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from lib.agent_autoscaler import PHASE_AGENT_TYPES, PredictiveAutoscaler, forecast_phase_demand
+from lib.agent_pool import PoolConfiguration
+from lib.tdd_models import TDDCycle, TDDState
+from lib.tdd_state_machine import TDDStateMachine
+
+
+PHASES = [TDDState.DESIGN, TDDState.TEST_RED, TDDState.CODE_GREEN, TDDState.REFACTOR]
+MEAN_SERVICE_TIMES = {
+    TDDState.DESIGN: 120.0,
+    TDDState.TEST_RED: 90.0,
+    TDDState.CODE_GREEN: 180.0,
+    TDDState.REFACTOR: 90.0
+}
+AGENT_TYPES = sorted(set(PHASE_AGENT_TYPES.values()))
+
+
+class PoolSimulation:
+    """Agents, queues and cycles of one simulated run"""
+    
+    def __init__(
+        self,
+        predictive: bool,
+        seed: int,
+        bursts: int,
+        cycles_per_burst: int,
+        burst_interval: float,
+        startup_time: float,
+        max_agents: int,
+        config: PoolConfiguration
+    ):
+        self.predictive = predictive
+        self.rng = random.Random(seed)
+        self.bursts = bursts
+        self.cycles_per_burst = cycles_per_burst
+        self.burst_interval = burst_interval
+        self.startup_time = startup_time
+        self.max_agents = max_agents
+        self.health_check_interval = config.health_check_interval
+        
+        self.now = 0.0
+        self.events: List = []
+        self.sequence = itertools.count()
+        self.agents: Dict[str, List[Dict]] = {agent_type: [] for agent_type in AGENT_TYPES}
+        self.queues: Dict[str, List] = {agent_type: [] for agent_type in AGENT_TYPES}
+        self.waits: List[float] = []
+        self.agent_seconds = 0.0
+        self.last_accounting = 0.0
+        self.cycles_done = 0
+        
+        self.state_machine = TDDStateMachine(enable_parallel_execution=True)
+        self.autoscaler = PredictiveAutoscaler(
+            target_queue_wait=config.target_queue_wait_seconds,
+            scale_down_delay=config.scale_down_delay_seconds,
+            clock=lambda: self.now
+        )
+        self.expected: Dict[str, int] = {}
+        
+        for agent_type in AGENT_TYPES:
+            self._add_agent(agent_type, ready=True)
+    
+    def run(self) -> Dict[str, float]:
+        """Run until every cycle completed"""
+        for burst in range(self.bursts):
+            self._schedule(burst * self.burst_interval, "burst", burst)
+        self._schedule(self.health_check_interval, "tick", None)
+        
+        total_cycles = self.bursts * self.cycles_per_burst
+        while self.events and self.cycles_done < total_cycles:
+            time, _, kind, payload = heapq.heappop(self.events)
+            self._account(time)
+            self.now = time
+            getattr(self, f"_on_{kind}")(payload)
+        
+        waits = sorted(self.waits)
+        return {
+            "tasks": len(waits),
+            "mean_wait": sum(waits) / len(waits),
+            "p95_wait": waits[int(len(waits) * 0.95) - 1],
+            "max_wait": waits[-1],
+            "agent_hours": self.agent_seconds / 3600,
+            "makespan": self.now
+        }
+    
+    # Events
+    
+    def _on_burst(self, burst: int) -> None:
+        started = []
+        for i in range(self.cycles_per_burst):
+            cycle = TDDCycle(id=f"cycle-{burst}-{i}", story_id=f"STORY-{burst}-{i}")
+            self.state_machine.register_parallel_cycle(cycle)
+            started.append(cycle.id)
+        if self.predictive:
+            self._prewarm(started)
+        for cycle_id in started:
+            self._submit(cycle_id)
+    
+    def _on_agent_ready(self, agent: Dict) -> None:
+        agent["ready"] = True
+        self._dispatch(agent["type"])
+    
+    def _on_task_done(self, payload) -> None:
+        agent, cycle_id, service_time = payload
+        agent["busy"] = False
+        self.autoscaler.record_completion(agent["type"], service_time)
+        
+        info = self.state_machine.parallel_states[cycle_id]
+        index = PHASES.index(info.current_state)
+        if index + 1 == len(PHASES):
+            self.state_machine.unregister_parallel_cycle(cycle_id)
+            self.cycles_done += 1
+        else:
+            info.current_state = PHASES[index + 1]
+            if self.predictive:
+                self._prewarm([])
+            self._submit(cycle_id)
+        self._dispatch(agent["type"])
+    
+    def _on_tick(self, _payload) -> None:
+        for agent_type in AGENT_TYPES:
+            if self.predictive:
+                self._scale_to(agent_type, self._decision(agent_type).target_agents)
+                continue
+            
+            # Reactive pool: utilization and queue thresholds, one agent at a time
+            agents = self.agents[agent_type]
+            utilization = sum(a["busy"] for a in agents) / len(agents)
+            queued = len(self.queues[agent_type])
+            if utilization > 0.8 or queued > 2:
+                self._scale_to(agent_type, len(agents) + 1)
+            elif utilization < 0.3 and queued == 0:
+                self._scale_to(agent_type, len(agents) - 1)
+        self._schedule(self.now + self.health_check_interval, "tick", None)
+    
+    # Pool behaviour
+    
+    def _submit(self, cycle_id: str) -> None:
+        phase = self.state_machine.parallel_states[cycle_id].current_state
+        agent_type = PHASE_AGENT_TYPES[phase]
+        self.queues[agent_type].append((self.now, cycle_id, phase))
+        self.autoscaler.record_arrival(agent_type)
+        if self.expected.get(agent_type, 0) > 0:
+            self.expected[agent_type] -= 1
+        
+        if not self._dispatch(agent_type):
+            # No agent available: auto-scale
+            if self.predictive:
+                self._scale_to(agent_type, self._decision(agent_type).target_agents)
+            else:
+                self._scale_to(agent_type, len(self.agents[agent_type]) + 1)
+    
+    def _dispatch(self, agent_type: str) -> bool:
+        """Start queued tasks on idle agents; False if a task is left waiting"""
+        queue = self.queues[agent_type]
+        for agent in self.agents[agent_type]:
+            if not queue:
+                break
+            if agent["ready"] and not agent["busy"]:
+                enqueued_at, cycle_id, phase = queue.pop(0)
+                self.waits.append(self.now - enqueued_at)
+                service_time = self.rng.expovariate(1 / MEAN_SERVICE_TIMES[phase])
+                agent["busy"] = True
+                self._schedule(self.now + service_time, "task_done", (agent, cycle_id, service_time))
+        return not queue
+    
+    def _prewarm(self, starting: List[str]) -> None:
+        self.expected = forecast_phase_demand(self.state_machine, starting)
+        for agent_type in self.expected:
+            decision = self._decision(agent_type)
+            if decision.target_agents > decision.current_agents:
+                self._scale_to(agent_type, decision.target_agents)
+    
+    def _decision(self, agent_type: str):
+        agents = self.agents[agent_type]
+        return self.autoscaler.recommend(
+            agent_type,
+            current_agents=len(agents),
+            busy_slots=sum(1 for a in agents if a["busy"] or not a["ready"]),
+            queue_length=len(self.queues[agent_type]),
+            expected_arrivals=self.expected.get(agent_type, 0),
+            min_agents=1,
+            max_agents=self.max_agents
+        )
+    
+    def _scale_to(self, agent_type: str, target: int) -> None:
+        target = max(1, min(target, self.max_agents))
+        agents = self.agents[agent_type]
+        while len(agents) < target:
+            self._add_agent(agent_type)
+        for agent in [a for a in agents if a["ready"] and not a["busy"]][:len(agents) - target]:
+            agents.remove(agent)
+    
+    def _add_agent(self, agent_type: str, ready: bool = False) -> None:
+        agent = {"type": agent_type, "ready": ready, "busy": False}
+        self.agents[agent_type].append(agent)
+        if not ready:
+            self._schedule(self.now + self.startup_time, "agent_ready", agent)
+    
+    def _schedule(self, time: float, kind: str, payload) -> None:
+        heapq.heappush(self.events, (time, next(self.sequence), kind, payload))
+    
+    def _account(self, time: float) -> None:
+        count = sum(len(agents) for agents in self.agents.values())
+        self.agent_seconds += count * (time - self.last_accounting)
+        self.last_accounting = time
+
+
+def simulate_bursts(
+    predictive: bool,
+    seed: int = 7,
+    bursts: int = 6,
+    cycles_per_burst: int = 8,
+    burst_interval: float = 900.0,
+    startup_time: float = 45.0,
+    max_agents: int = 12
+) -> Dict[str, float]:
+    """Simulate bursty cycle starts under one scaling policy"""
+    return PoolSimulation(
+        predictive=predictive,
+        seed=seed,
+        bursts=bursts,
+        cycles_per_burst=cycles_per_burst,
+        burst_interval=burst_interval,
+        startup_time=startup_time,
+        max_agents=max_agents,
+        config=PoolConfiguration()
+    ).run()
+
+
+@pytest.mark.performance
+def test_predictive_scaling_reduces_queue_wait():
+    """Predictive scaling cuts queue waits of bursty cycle starts"""
+    reactive = [simulate_bursts(predictive=False, seed=seed) for seed in range(5)]
+    predictive = [simulate_bursts(predictive=True, seed=seed) for seed in range(5)]
+    
+    def average(results, key):
+        return sum(result[key] for result in results) / len(results)
+    
+    print("\nAgent autoscaling (6 bursts of 8 cycles, 45s agent start-up, 5 seeds)")
+    for label, results in [("reactive", reactive), ("predictive", predictive)]:
+        print(
+            f"  {label:10s} mean_wait={average(results, 'mean_wait'):6.1f}s "
+            f"p95_wait={average(results, 'p95_wait'):6.1f}s "
+            f"max_wait={average(results, 'max_wait'):6.1f}s "
+            f"agent_hours={average(results, 'agent_hours'):5.1f}"
+        )
+    
+    # Tasks of the first phase of a burst wait for agents to start under both
+    # policies; pre-warming removes most waits for the later phases
+    assert average(predictive, "mean_wait") < average(reactive, "mean_wait") * 0.7
+    assert average(predictive, "p95_wait") <= average(reactive, "p95_wait")
+    
+    # Holding agents through short lulls costs a bounded number of agent hours
+    assert average(predictive, "agent_hours") < average(reactive, "agent_hours") * 1.5
+    assert all(result["tasks"] == 6 * 8 * len(PHASES) for result in reactive + predictive)
+
+
+if __name__ == "__main__":
+    for predictive in (False, True):
+        print("predictive" if predictive else "reactive", simulate_bursts(predictive))
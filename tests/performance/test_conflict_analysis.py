@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Conflict Analysis Benchmark.
+
+Registers edits from many cycles against one shared module and compares the
+conflicts found when modifications are diffed against base snapshots with the
+whole-file analysis used when no snapshot exists. Conflicting cycles have to
+be serialized, so the number of serialization waves (a greedy colouring of the
+conflict graph) bounds how many cycles can run in parallel.
+"""
+
+import asyncio
+import random
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+from unittest.mock import Mock, patch
+import pytest
+import sys
+
+# Add project root to sys.path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from lib.conflict_resolver import ConflictResolver
+
+
+def build_module(function_count: int) -> str:
+    """Build a module with one class holding a method per function slot"""
+    lines = ["import os", "", "", "class Service:"]
+    for i in range(function_count):
+        lines.extend([
+            f"    def handler_{i}(self, value):",
+            f"        result = value + {i}",
+            f"        return result",
+            ""
+        ])
+    return "\n".join(lines) + "\n"
+
+
+def serialization_waves(cycle_ids: List[str], pairs: List[Tuple[str, str]]) -> int:
+    """Greedy colouring of the conflict graph: cycles in one wave may run together"""
+    neighbours: Dict[str, Set[str]] = {cycle_id: set() for cycle_id in cycle_ids}
+    for cycle1, cycle2 in pairs:
+        neighbours[cycle1].add(cycle2)
+        neighbours[cycle2].add(cycle1)
+    
+    wave_of: Dict[str, int] = {}
+    for cycle_id in cycle_ids:
+        taken = {wave_of[other] for other in neighbours[cycle_id] if other in wave_of}
+        wave_of[cycle_id] = next(wave for wave in range(len(cycle_ids)) if wave not in taken)
+    return max(wave_of.values()) + 1 if wave_of else 0
+
+
+async def run_conflict_scenario(
+    cycle_count: int = 40,
+    function_count: int = 60,
+    use_snapshots: bool = True,
+    seed: int = 11
+) -> Dict[str, float]:
+    """Register one method edit per cycle and measure the resulting conflicts"""
+    rng = random.Random(seed)
+    targets = [rng.randrange(function_count) for _ in range(cycle_count)]
+    
+    with tempfile.TemporaryDirectory() as temp_dir:
+        file_path = str(Path(temp_dir) / "service.py")
+        base = build_module(function_count)
+        Path(file_path).write_text(base)
+        
+        resolver = ConflictResolver(
+            context_manager=Mock(),
+            project_path=temp_dir,
+            enable_auto_resolution=False
+        )
+        cycle_ids = [f"cycle-{i}" for i in range(cycle_count)]
+        if use_snapshots:
+            for cycle_id in cycle_ids:
+                await resolver.capture_base_snapshots(cycle_id, [file_path])
+        
+        start_time = time.perf_counter()
+        with patch.object(resolver, "_handle_detected_conflict"):
+            for cycle_id, target in zip(cycle_ids, targets):
+                edited = base.replace(f"result = value + {target}\n", f"result = value * {target}\n")
+                Path(file_path).write_text(edited)
+                await resolver.register_file_modification(file_path, cycle_id, f"STORY-{cycle_id}")
+        elapsed = time.perf_counter() - start_time
+        
+        pairs = [
+            tuple(sorted(conflict.affected_cycles))
+            for conflict in await resolver._detect_file_conflicts(file_path)
+        ]
+    
+    waves = serialization_waves(cycle_ids, pairs)
+    true_pairs = sum(
+        1 for i in range(cycle_count) for j in range(i + 1, cycle_count) if targets[i] == targets[j]
+    )
+    return {
+        "conflict_pairs": len(pairs),
+        "true_conflict_pairs": true_pairs,
+        "waves": waves,
+        "parallelism": cycle_count / waves,
+        "elapsed": elapsed
+    }
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_diff_analysis_recovers_parallelism():
+    """Diffing against base snapshots removes false conflicts between method edits"""
+    whole_file = await run_conflict_scenario(use_snapshots=False)
+    diffed = await run_conflict_scenario(use_snapshots=True)
+    
+    print("\nConflict analysis (40 cycles editing methods of one 60-method module)")
+    for label, result in [("whole-file", whole_file), ("diff+AST", diffed)]:
+        print(
+            f"  {label:10s} conflict_pairs={result['conflict_pairs']:4d} "
+            f"(true {result['true_conflict_pairs']}) waves={result['waves']:3d} "
+            f"parallelism={result['parallelism']:.1f} analysis={result['elapsed'] * 1000:.0f}ms"
+        )
+    
+    # Whole-file analysis makes every pair conflict and serializes all cycles
+    assert whole_file["conflict_pairs"] == 40 * 39 // 2
+    assert whole_file["waves"] == 40
+    
+    # Diff analysis reports exactly the cycles editing the same method
+    assert diffed["conflict_pairs"] == diffed["true_conflict_pairs"]
+    assert diffed["parallelism"] >= 10
+
+
+if __name__ == "__main__":
+    for use_snapshots in (False, True):
+        print(asyncio.run(run_conflict_scenario(use_snapshots=use_snapshots)))
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Resource Scheduler Allocation Simulation.
+
+Runs the same mixed workload through the scheduler under each allocation
+strategy. Build projects submit CPU-heavy tasks and index projects submit
+memory-heavy tasks, with Poisson arrivals and exponential run times, so no
+single per-resource split of the system suits both. Each tick finishes due
+tasks, reports the projects' usage to the scheduler, rebalances quotas every
+few ticks and starts ready tasks. Reports CPU and memory utilization,
+throughput, queue wait of started tasks, the backlog left queued and Jain's
+fairness index over the projects' weighted dominant shares (largest fraction
+of any resource held, divided by the project's priority weight).
+"""
+
+import asyncio
+import logging
+import random
+import warnings
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List
+import pytest
+import sys
+
+# Add project root to sys.path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from lib.multi_project_config import ProjectConfig, ProjectPriority, ResourceLimits
+from lib.resource_scheduler import (
+    ResourceQuota, ResourceScheduler, ResourceUsage, ScheduledTask, SchedulingStrategy, TaskPriority
+)
+
+
+TOTAL_RESOURCES = ResourceQuota(
+    cpu_cores=16.0,
+    memory_mb=32768,
+    max_agents=20,
+    disk_mb=102400,
+    network_bandwidth_mbps=1000.0
+)
+
+# name -> (priority, per-task requirements, arrivals per tick)
+PROJECTS = {
+    "build-api": (ProjectPriority.HIGH, ResourceQuota(cpu_cores=2.0, memory_mb=512, max_agents=1), 0.45),
+    "build-web": (ProjectPriority.NORMAL, ResourceQuota(cpu_cores=2.0, memory_mb=512, max_agents=1), 0.45),
+    "index-docs": (ProjectPriority.NORMAL, ResourceQuota(cpu_cores=0.5, memory_mb=4096, max_agents=1), 0.45),
+    "index-logs": (ProjectPriority.LOW, ResourceQuota(cpu_cores=0.5, memory_mb=4096, max_agents=1), 0.45),
+}
+
+STRATEGIES = [
+    SchedulingStrategy.FAIR_SHARE,
+    SchedulingStrategy.DYNAMIC,
+    SchedulingStrategy.DOMINANT_RESOURCE_FAIRNESS
+]
+
+
+def jain_index(values: List[float]) -> float:
+    """Jain's fairness index: 1.0 when all values are equal, 1/n when one takes all"""
+    total = sum(values)
+    squares = sum(value * value for value in values)
+    return total * total / (len(values) * squares) if squares > 0 else 1.0
+
+
+async def simulate(
+    strategy: SchedulingStrategy,
+    ticks: int = 400,
+    mean_duration: float = 10.0,
+    rebalance_every: int = 5,
+    seed: int = 11
+) -> Dict[str, float]:
+    """Run the workload under one strategy"""
+    rng = random.Random(seed)
+    scheduler = ResourceScheduler(total_resources=TOTAL_RESOURCES, strategy=strategy)
+    for name, (priority, _, _) in PROJECTS.items():
+        scheduler.register_project(ProjectConfig(
+            name, f"/tmp/{name}", priority=priority,
+            resource_limits=ResourceLimits(max_parallel_agents=4, max_memory_mb=8192)
+        ))
+    
+    submitted_at: Dict[str, int] = {}
+    finish_at: Dict[str, int] = {}
+    waits: List[float] = []
+    cpu_used = memory_used = 0.0
+    share_totals = {name: 0.0 for name in PROJECTS}
+    completed = 0
+    
+    for tick in range(ticks):
+        # Finish due tasks
+        for task_id, due in list(finish_at.items()):
+            if due <= tick:
+                del finish_at[task_id]
+                scheduler.complete_task(task_id)
+                completed += 1
+        
+        # New arrivals
+        for name, (_, requirements, rate) in PROJECTS.items():
+            for _ in range(poisson(rng, rate)):
+                task_id = f"{name}-{len(submitted_at)}"
+                submitted_at[task_id] = tick
+                scheduler.submit_task(ScheduledTask(
+                    task_id=task_id,
+                    project_name=name,
+                    priority=TaskPriority.NORMAL,
+                    estimated_duration=timedelta(minutes=mean_duration),
+                    resource_requirements=requirements
+                ))
+        
+        report_usage(scheduler)
+        if (tick + 1) % rebalance_every == 0:
+            await scheduler.optimize_allocation()
+        await scheduler._process_task_queue()
+        
+        for task_id in scheduler._running_tasks:
+            if task_id not in finish_at:
+                waits.append(tick - submitted_at[task_id])
+                finish_at[task_id] = tick + max(1, round(rng.expovariate(1 / mean_duration)))
+        
+        # Sample usage after dispatch
+        allocations = scheduler._running_allocations
+        cpu_used += sum(a.cpu_cores for a in allocations.values()) / TOTAL_RESOURCES.cpu_cores
+        memory_used += sum(a.memory_mb for a in allocations.values()) / TOTAL_RESOURCES.memory_mb
+        for name in PROJECTS:
+            share_totals[name] += scheduler._weighted_dominant_share(name)
+    
+    return {
+        "cpu_utilization": cpu_used / ticks,
+        "memory_utilization": memory_used / ticks,
+        "completed": completed,
+        "mean_wait": sum(waits) / len(waits) if waits else 0.0,
+        "backlog": len(scheduler._queued_tasks),
+        "fairness": jain_index([total / ticks for total in share_totals.values()])
+    }
+
+
+def poisson(rng: random.Random, rate: float) -> int:
+    """Poisson-distributed count with the given mean"""
+    count, gap = 0, rng.expovariate(rate)
+    while gap < 1.0:
+        count += 1
+        gap += rng.expovariate(rate)
+    return count
+
+
+def report_usage(scheduler: ResourceScheduler) -> None:
+    """Report each project's usage as what its running tasks require"""
+    for name, allocation in scheduler._running_allocations.items():
+        scheduler.update_resource_usage(name, ResourceUsage(
+            cpu_usage=allocation.cpu_cores,
+            memory_usage_mb=allocation.memory_mb,
+            active_agents=allocation.max_agents
+        ))
+
+
+async def compare_strategies(seeds=range(3)) -> Dict[str, Dict[str, float]]:
+    """Average the simulation metrics of each strategy over several seeds"""
+    scheduler_logger = logging.getLogger("lib.resource_scheduler")
+    previous_level = scheduler_logger.level
+    scheduler_logger.setLevel(logging.WARNING)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            results = {}
+            for strategy in STRATEGIES:
+                runs = [await simulate(strategy, seed=seed) for seed in seeds]
+                results[strategy.value] = {
+                    key: sum(run[key] for run in runs) / len(runs) for key in runs[0]
+                }
+    finally:
+        scheduler_logger.setLevel(previous_level)
+    return results
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_drf_improves_utilization_and_fairness():
+    """DRF keeps more of both resources busy than static fair shares, with fair dominant shares"""
+    results = await compare_strategies()
+    
+    print("\nAllocation strategies (2 CPU-heavy and 2 memory-heavy projects, 400 ticks, 3 seeds)")
+    for strategy, metrics in results.items():
+        print(
+            f"  {strategy:12s} cpu={metrics['cpu_utilization']:5.1%} "
+            f"memory={metrics['memory_utilization']:5.1%} completed={metrics['completed']:6.1f} "
+            f"mean_wait={metrics['mean_wait']:6.1f} backlog={metrics['backlog']:6.1f} fairness={metrics['fairness']:.3f}"
+        )
+    
+    fair_share = results[SchedulingStrategy.FAIR_SHARE.value]
+    drf = results[SchedulingStrategy.DOMINANT_RESOURCE_FAIRNESS.value]
+    
+    # Equal splits of every resource strand the CPU of memory-heavy projects and vice versa
+    assert drf["cpu_utilization"] > fair_share["cpu_utilization"]
+    assert drf["memory_utilization"] > fair_share["memory_utilization"]
+    assert drf["completed"] > fair_share["completed"]
+    assert drf["mean_wait"] < fair_share["mean_wait"]
+    assert drf["backlog"] < fair_share["backlog"]
+    assert drf["fairness"] > 0.9
+
+
+if __name__ == "__main__":
+    print(asyncio.run(compare_strategies()))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Parallel Cycle Scaling Benchmark.
+
+Measures how many mock TDD cycles the ParallelTDDCoordinator runs at once as
+admission control raises the concurrency limit. Each mock cycle holds its
+slot for a fixed simulated duration, so ideal throughput grows linearly with
+the limit. Assertions use the coordinator's own admission and peak-activity
+counts; wall-clock throughput is only reported, as it depends on machine load.
+"""
+
+import asyncio
+import time
+from pathlib import Path
+from typing import Dict, List
+from unittest.mock import AsyncMock, Mock
+import pytest
+import sys
+
+# Add project root to sys.path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from lib.parallel_tdd_coordinator import ParallelTDDCoordinator, CycleStatus
+from lib.tdd_models import TDDCycle, TDDState
+
+
+class MockCycleCoordinator(ParallelTDDCoordinator):
+    """Coordinator whose cycles complete after a fixed simulated duration"""
+
+    def __init__(self, *args, cycle_duration: float = 0.05, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cycle_duration = cycle_duration
+        self.all_completed = asyncio.Event()
+        self._mock_tasks: List[asyncio.Task] = []
+
+    async def _prepare_cycle_context(self, parallel_cycle) -> None:
+        self._mock_tasks.append(asyncio.create_task(self._run_mock_cycle(parallel_cycle)))
+
+    async def _run_mock_cycle(self, parallel_cycle) -> None:
+        await asyncio.sleep(self.cycle_duration)
+        parallel_cycle.cycle.current_state = TDDState.COMMIT
+        self.notify_cycle_updated(parallel_cycle.id)
+
+    async def _complete_cycle(self, parallel_cycle) -> None:
+        await super()._complete_cycle(parallel_cycle)
+        if len(self._cycles_by_status[CycleStatus.COMPLETED]) == len(self.parallel_cycles):
+            self.all_completed.set()
+
+
+async def run_scaling_scenario(
+    max_parallel_cycles: int,
+    cycle_count: int = 200,
+    cycle_duration: float = 0.05
+) -> Dict[str, float]:
+    """Run mock cycles through the coordinator and report concurrency and throughput"""
+    context_manager = Mock()
+    context_manager.register_story = AsyncMock()
+    context_manager.detect_story_conflicts = AsyncMock(return_value=[])
+
+    coordinator = MockCycleCoordinator(
+        context_manager=context_manager,
+        max_parallel_cycles=max_parallel_cycles,
+        coordination_check_interval=60.0,
+        performance_monitoring=False,
+        cycle_duration=cycle_duration
+    )
+    await coordinator.start()
+
+    try:
+        start_time = time.perf_counter()
+        for i in range(cycle_count):
+            await coordinator.submit_cycle(TDDCycle(story_id=f"STORY-{i}"))
+        await asyncio.wait_for(coordinator.all_completed.wait(), timeout=120)
+        elapsed = time.perf_counter() - start_time
+    finally:
+        await coordinator.stop()
+
+    return {
+        "max_parallel_cycles": max_parallel_cycles,
+        "admission_limit": coordinator.admission.current_limit,
+        "started_cycles": coordinator.stats.started_cycles,
+        "peak_active": coordinator.stats.peak_active_cycles,
+        "elapsed": elapsed,
+        "throughput": cycle_count / elapsed
+    }
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_concurrency_scales_with_admission_limit():
+    """Every mock cycle is admitted and concurrency reaches limits from 5 to 64"""
+    results = {}
+    for limit in [5, 10, 25, 50, 64]:
+        results[limit] = await run_scaling_scenario(limit)
+
+    print("\nParallel cycle scaling (200 mock cycles, 50ms each)")
+    for limit, result in results.items():
+        print(
+            f"  limit={limit:3d} peak_active={result['peak_active']:3d} "
+            f"elapsed={result['elapsed']:.2f}s throughput={result['throughput']:.1f} cycles/s"
+        )
+
+    for limit, result in results.items():
+        # Each cycle is admitted exactly once
+        assert result["started_cycles"] == 200
+        # Admission fills the limit, including limits above the former cap of five, and never exceeds it
+        assert result["peak_active"] == limit
+
+
+if __name__ == "__main__":
+    for limit in [5, 10, 25, 50, 64]:
+        print(asyncio.run(run_scaling_scenario(limit)))
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Resource Scheduler Dispatch Benchmark.
+
+Queues tasks with dependency chains across many projects, then runs
+scheduling ticks until all tasks are done. Each tick starts as many ready
+tasks as each project's agent quota allows, and the started tasks complete
+before the next tick, so most tasks stay queued for many ticks. The indexed
+scheduler only touches the tasks it starts, so the cost per task should stay
+flat from 10k to 100k tasks. As a reference, the same workload is run with a
+full scan of the queue on every tick that checks each task's dependencies.
+"""
+
+import asyncio
+import logging
+import random
+import time
+import warnings
+from collections import defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+import pytest
+import sys
+
+# Add project root to sys.path
+project_root = Path(__file__).parent.parent.parent
+sys.path.insert(0, str(project_root))
+
+from lib.multi_project_config import ProjectConfig
+from lib.resource_scheduler import ResourceQuota, ResourceScheduler, ScheduledTask, TaskPriority
+
+
+def build_tasks(task_count: int, project_count: int, seed: int = 3) -> List[ScheduledTask]:
+    """Tasks spread over projects; half of them wait for an earlier task of their project"""
+    rng = random.Random(seed)
+    created_at = datetime.utcnow()
+    requirements = ResourceQuota(cpu_cores=0.1, memory_mb=1, max_agents=1)
+    tasks = []
+    for i in range(task_count):
+        dependencies = []
+        if i >= project_count and rng.random() < 0.5:
+            back = rng.randint(1, min(3, i // project_count))
+            dependencies = [f"task-{i - project_count * back}"]
+        tasks.append(ScheduledTask(
+            task_id=f"task-{i}",
+            project_name=f"project-{i % project_count}",
+            priority=rng.choice(list(TaskPriority)),
+            estimated_duration=timedelta(minutes=5),
+            resource_requirements=requirements,
+            dependencies=dependencies,
+            created_at=created_at
+        ))
+    return tasks
+
+
+def build_scheduler(project_count: int) -> ResourceScheduler:
+    """Scheduler with room for every project"""
+    scheduler = ResourceScheduler(
+        total_resources=ResourceQuota(
+            cpu_cores=10000.0,
+            memory_mb=10 ** 8,
+            max_agents=10 ** 6,
+            disk_mb=10 ** 9,
+            network_bandwidth_mbps=10 ** 6
+        )
+    )
+    for i in range(project_count):
+        scheduler.register_project(ProjectConfig(name=f"project-{i}", path=f"/tmp/project-{i}"))
+    return scheduler
+
+
+async def run_indexed(task_count: int, project_count: int = 100) -> Dict[str, float]:
+    """Submit and drain tasks through the scheduler's ready heaps"""
+    scheduler = build_scheduler(project_count)
+    tasks = build_tasks(task_count, project_count)
+    
+    start_time = time.perf_counter()
+    for task in tasks:
+        scheduler.submit_task(task)
+    submit_time = time.perf_counter() - start_time
+    
+    ticks = 0
+    start_time = time.perf_counter()
+    while len(scheduler.completed_tasks) < task_count:
+        await scheduler._process_task_queue()
+        ticks += 1
+        for task_id in list(scheduler._running_tasks):
+            scheduler.complete_task(task_id)
+    dispatch_time = time.perf_counter() - start_time
+    
+    return {
+        "tasks": task_count,
+        "ticks": ticks,
+        "submit_time": submit_time,
+        "dispatch_time": dispatch_time,
+        "per_task_us": (submit_time + dispatch_time) / task_count * 1e6
+    }
+
+
+def run_full_scan(task_count: int, project_count: int = 100, quota: int = 3) -> Dict[str, float]:
+    """Reference: scan every queued task on each tick, checking its dependencies"""
+    tasks = build_tasks(task_count, project_count)
+    queue = list(tasks)
+    completed = set()
+    
+    ticks = 0
+    start_time = time.perf_counter()
+    while queue:
+        started: Dict[str, int] = defaultdict(int)
+        ready_ids = set()
+        for task in queue:
+            if task.is_ready(completed) and started[task.project_name] < quota:
+                started[task.project_name] += 1
+                ready_ids.add(task.task_id)
+        queue = [task for task in queue if task.task_id not in ready_ids]
+        completed.update(ready_ids)
+        ticks += 1
+    dispatch_time = time.perf_counter() - start_time
+    
+    return {
+        "tasks": task_count,
+        "ticks": ticks,
+        "dispatch_time": dispatch_time,
+        "per_task_us": dispatch_time / task_count * 1e6
+    }
+
+
+@pytest.mark.performance
+@pytest.mark.asyncio
+async def test_dispatch_cost_per_task_is_flat():
+    """Dispatch cost per task stays flat from 10k to 100k queued tasks"""
+    scheduler_logger = logging.getLogger("lib.resource_scheduler")
+    previous_level = scheduler_logger.level
+    scheduler_logger.setLevel(logging.WARNING)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", DeprecationWarning)
+            small = await run_indexed(10_000)
+            large = await run_indexed(100_000)
+    finally:
+        scheduler_logger.setLevel(previous_level)
+    scan_small = run_full_scan(10_000)
+    scan_large = run_full_scan(30_000)
+    
+    print("\nResource scheduler dispatch (100 projects, 3 agents each, half the tasks chained)")
+    results = [
+        ("indexed 10k", small), ("indexed 100k", large),
+        ("scan 10k", scan_small), ("scan 30k", scan_large)
+    ]
+    for label, result in results:
+        print(
+            f"  {label:13s} ticks={result['ticks']:5d} "
+            f"dispatch={result['dispatch_time']:7.3f}s per_task={result['per_task_us']:7.1f}us"
+        )
+    
+    # Work per task does not grow with the queue, while a full scan per tick does
+    assert large["ticks"] >= 100_000 // 300
+    assert large["per_task_us"] < small["per_task_us"] * 3
+    assert scan_large["per_task_us"] > scan_small["per_task_us"] * 2
+    assert large["per_task_us"] < scan_large["per_task_us"]
+
+
+if __name__ == "__main__":
+    for count in (10_000, 100_000):
+        print(asyncio.run(run_indexed(count)))
+    for count in (10_000, 30_000):
+        print(run_full_scan(count))
@@ -0,0 +1,194 @@
+"""
+Test suite for the predictive agent autoscaler.
+
+Tests the queueing estimates, scale-up step sizing, scale-down hysteresis and
+the phase transition forecast used for pre-warming.
+"""
+
+import math
+import pytest
+from pathlib import Path
+
+# Import the modules under test
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "lib"))
+
+from agent_autoscaler import (
+    PredictiveAutoscaler, erlang_c_wait, servers_for_wait, forecast_phase_demand
+)
+from tdd_models import TDDState, TDDCycle
+from tdd_state_machine import TDDStateMachine
+
+
+class FakeClock:
+    """Manually advanced time source"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestQueueingModel:
+    """Test the M/M/c wait estimate"""
+    
+    def test_single_server_matches_mm1(self):
+        """Test that one server gives the M/M/1 wait rho / (mu - lambda)"""
+        # lambda = 0.5/s, service 1s: Wq = rho * S / (1 - rho) = 1.0
+        assert erlang_c_wait(1, 0.5, 1.0) == pytest.approx(1.0)
+    
+    def test_overloaded_servers_wait_forever(self):
+        """Test that load at or above capacity has unbounded wait"""
+        assert erlang_c_wait(2, 1.0, 2.0) == math.inf
+        assert erlang_c_wait(0, 1.0, 1.0) == math.inf
+    
+    def test_no_load_no_wait(self):
+        """Test that without arrivals nothing waits"""
+        assert erlang_c_wait(1, 0.0, 10.0) == 0.0
+        assert servers_for_wait(0.0, 10.0, 5.0) == 0
+    
+    def test_servers_for_wait_is_smallest_sufficient(self):
+        """Test that the server count meets the target and one fewer does not"""
+        servers = servers_for_wait(1.0, 4.0, 1.0)
+        assert erlang_c_wait(servers, 1.0, 4.0) <= 1.0
+        assert erlang_c_wait(servers - 1, 1.0, 4.0) > 1.0
+
+
+class TestPredictiveAutoscaler:
+    """Test scaling recommendations"""
+    
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+    
+    @pytest.fixture
+    def autoscaler(self, clock):
+        return PredictiveAutoscaler(
+            target_queue_wait=10.0,
+            smoothing=0.5,
+            scale_down_delay=60.0,
+            default_service_time=20.0,
+            clock=clock
+        )
+    
+    def test_arrival_rate_and_decay(self, autoscaler, clock):
+        """Test that the arrival rate follows inter-arrival gaps and decays when idle"""
+        for _ in range(5):
+            autoscaler.record_arrival("CodeAgent")
+            clock.now += 2.0
+        clock.now -= 2.0
+        assert autoscaler.arrival_rate("CodeAgent") == pytest.approx(0.5)
+        
+        clock.now += 20.0
+        assert autoscaler.arrival_rate("CodeAgent") == pytest.approx(1 / 20.0)
+    
+    def test_service_time_smoothing(self, autoscaler):
+        """Test that service times are averaged with the configured weight"""
+        assert autoscaler.service_time("CodeAgent") == 20.0
+        autoscaler.record_completion("CodeAgent", 10.0)
+        autoscaler.record_completion("CodeAgent", 30.0)
+        assert autoscaler.service_time("CodeAgent") == pytest.approx(20.0)
+    
+    def test_backlog_scales_up_in_one_step(self, autoscaler):
+        """Test that a queued burst adds every needed agent at once"""
+        decision = autoscaler.recommend(
+            "CodeAgent", current_agents=1, slots_per_agent=1, busy_slots=1,
+            queue_length=6, min_agents=1, max_agents=10
+        )
+        
+        # Service 20s > target 10s: every queued task needs its own slot
+        assert decision.reason == "scale_up"
+        assert decision.target_agents == 7
+        assert decision.required_slots == 7
+    
+    def test_step_respects_slots_and_limits(self, autoscaler):
+        """Test that slots are packed into agents and capped at max_agents"""
+        decision = autoscaler.recommend(
+            "QAAgent", current_agents=1, slots_per_agent=4, busy_slots=4,
+            queue_length=6, min_agents=1, max_agents=10
+        )
+        assert decision.target_agents == 3
+        
+        capped = autoscaler.recommend(
+            "QAAgent", current_agents=1, slots_per_agent=1, busy_slots=1,
+            queue_length=50, min_agents=1, max_agents=5
+        )
+        assert capped.target_agents == 5
+    
+    def test_short_tasks_share_slots(self, autoscaler):
+        """Test that tasks much shorter than the target wait can queue behind each other"""
+        autoscaler.record_completion("DataAgent", 2.0)
+        decision = autoscaler.recommend(
+            "DataAgent", current_agents=1, slots_per_agent=1, busy_slots=1,
+            queue_length=4, min_agents=1, max_agents=10
+        )
+        
+        # A slot starts 10 / 2 = 5 tasks within the target wait
+        assert decision.target_agents == 2
+    
+    def test_expected_arrivals_prewarm(self, autoscaler):
+        """Test that forecast arrivals count like queued tasks"""
+        decision = autoscaler.recommend(
+            "DesignAgent", current_agents=1, expected_arrivals=3, min_agents=1, max_agents=10
+        )
+        assert decision.target_agents == 3
+    
+    def test_steady_arrivals_sized_by_erlang_c(self, autoscaler, clock):
+        """Test that a steady arrival stream keeps enough agents for the target wait"""
+        autoscaler.record_completion("CodeAgent", 20.0)
+        for _ in range(10):
+            autoscaler.record_arrival("CodeAgent")
+            clock.now += 5.0
+        clock.now -= 5.0
+        
+        decision = autoscaler.recommend("CodeAgent", current_agents=1, max_agents=20)
+        assert decision.target_agents == servers_for_wait(0.2, 20.0, 10.0)
+        assert decision.expected_wait <= 10.0
+    
+    def test_scale_down_waits_for_hold_period(self, autoscaler, clock):
+        """Test that agents are only removed after demand stayed low for the delay"""
+        kwargs = dict(current_agents=5, min_agents=1, max_agents=10)
+        
+        assert autoscaler.recommend("CodeAgent", **kwargs).reason == "hold"
+        clock.now += 30.0
+        assert autoscaler.recommend("CodeAgent", **kwargs).target_agents == 5
+        clock.now += 30.0
+        decision = autoscaler.recommend("CodeAgent", **kwargs)
+        assert decision.reason == "scale_down"
+        assert decision.target_agents == 1
+    
+    def test_demand_spike_resets_hold(self, autoscaler, clock):
+        """Test that a busy interval restarts the scale-down hold"""
+        autoscaler.recommend("CodeAgent", current_agents=3, max_agents=10)
+        clock.now += 50.0
+        assert autoscaler.recommend(
+            "CodeAgent", current_agents=3, busy_slots=3, max_agents=10
+        ).reason == "steady"
+        
+        clock.now += 20.0
+        assert autoscaler.recommend("CodeAgent", current_agents=3, max_agents=10).reason == "hold"
+
+
+class TestPhaseForecast:
+    """Test forecasting agent demand from the TDD state machine"""
+    
+    def test_forecast_counts_next_phase_agents(self):
+        """Test that each cycle contributes the agent type of its next phase"""
+        state_machine = TDDStateMachine(enable_parallel_execution=True)
+        states = [TDDState.DESIGN, TDDState.DESIGN, TDDState.TEST_RED, TDDState.CODE_GREEN, TDDState.COMMIT]
+        for i, state in enumerate(states):
+            cycle = TDDCycle(id=f"cycle-{i}", story_id=f"STORY-{i}", current_state=state)
+            state_machine.register_parallel_cycle(cycle)
+        
+        # Committed cycles move on to designing their next task
+        assert forecast_phase_demand(state_machine) == {"QAAgent": 2, "CodeAgent": 2, "DesignAgent": 1}
+    
+    def test_starting_cycles_need_current_phase_agent(self):
+        """Test that starting cycles also count their current phase"""
+        state_machine = TDDStateMachine(enable_parallel_execution=True)
+        state_machine.register_parallel_cycle(
+            TDDCycle(id="cycle-1", story_id="STORY-1", current_state=TDDState.DESIGN)
+        )
+        
+        assert forecast_phase_demand(state_machine, ["cycle-1"]) == {"QAAgent": 1, "DesignAgent": 1}
@@ -927,6 +927,82 @@ class TestSanitizationAndSecurity:
         assert summary["last_activity"] is None
 
 
+class TestMemoryCacheLRU:
+    """Test O(1) LRU cache bounds and bulk loading"""
+    
+    @pytest.fixture
+    def agent_memory(self):
+        """Create a test agent memory instance with a small cache"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield FileBasedAgentMemory(base_path=temp_dir, max_cache_entries=3)
+    
+    @pytest.mark.asyncio
+    async def test_lru_evicts_least_recently_used(self, agent_memory):
+        """Test that the least recently used entry is evicted when full"""
+        for i in range(3):
+            await agent_memory.store_memory(AgentMemory(agent_type="Agent", story_id=f"story_{i}"))
+        
+        # Touch story_0 so story_1 becomes least recently used
+        await agent_memory.get_memory("Agent", "story_0")
+        await agent_memory.store_memory(AgentMemory(agent_type="Agent", story_id="story_3"))
+        
+        assert list(agent_memory._memory_cache.keys()) == [
+            "Agent:story_2", "Agent:story_0", "Agent:story_3"
+        ]
+        assert agent_memory.get_performance_metrics()["cache_evictions"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_lru_respects_byte_limit(self, agent_memory):
+        """Test that cached bytes never exceed the configured limit"""
+        await agent_memory.store_memory(AgentMemory(agent_type="Agent", story_id="story_0"))
+        entry_size = agent_memory._cache_bytes
+        assert entry_size > 0
+        
+        agent_memory._max_cache_bytes = entry_size * 2
+        for i in range(1, 3):
+            await agent_memory.store_memory(AgentMemory(agent_type="Agent", story_id=f"story_{i}"))
+        
+        assert agent_memory._cache_bytes <= agent_memory._max_cache_bytes
+        assert "Agent:story_0" not in agent_memory._memory_cache
+        assert "Agent:story_2" in agent_memory._memory_cache
+    
+    @pytest.mark.asyncio
+    async def test_restore_same_key_does_not_double_count(self, agent_memory):
+        """Test that re-storing a memory replaces its cached size"""
+        memory = AgentMemory(agent_type="Agent", story_id="story_0")
+        await agent_memory.store_memory(memory)
+        first_size = agent_memory._cache_bytes
+        await agent_memory.store_memory(memory)
+        
+        assert len(agent_memory._memory_cache) == 1
+        assert agent_memory._cache_bytes == first_size
+    
+    @pytest.mark.asyncio
+    async def test_get_memories_bulk(self, agent_memory):
+        """Test concurrent bulk retrieval of several memories"""
+        for i in range(2):
+            await agent_memory.store_memory(AgentMemory(agent_type="Agent", story_id=f"story_{i}"))
+        agent_memory._memory_cache.clear()
+        agent_memory._cache_entry_sizes.clear()
+        agent_memory._cache_bytes = 0
+        
+        keys = [("Agent", "story_0"), ("Agent", "story_1"), ("Agent", "missing"), ("Agent", "story_0")]
+        results = await agent_memory.get_memories(keys)
+        
+        assert set(results.keys()) == {("Agent", "story_0"), ("Agent", "story_1"), ("Agent", "missing")}
+        assert results[("Agent", "story_0")].story_id == "story_0"
+        assert results[("Agent", "story_1")].story_id == "story_1"
+        assert results[("Agent", "missing")] is None
+    
+    @pytest.mark.asyncio
+    async def test_store_leaves_no_temp_files(self, agent_memory):
+        """Test that atomic writes clean up their temporary files"""
+        await agent_memory.store_memory(AgentMemory(agent_type="Agent", story_id="story_0"))
+        
+        files = [p.name for p in (agent_memory.memory_dir / "Agent").iterdir()]
+        assert files == ["story_0.json"]
+
+
 if __name__ == "__main__":
     # Run tests with pytest
     pytest.main([__file__, "-v"])
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""
+Test suite for the SQLite agent memory index.
+
+Tests indexed cross-story queries over agent decisions, patterns and phase
+handoffs, and index maintenance through FileBasedAgentMemory.
+"""
+
+import pytest
+import tempfile
+from pathlib import Path
+from datetime import datetime, timedelta
+
+# Import the modules under test
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "lib"))
+
+from agent_memory import FileBasedAgentMemory
+from agent_memory_index import AgentMemoryIndex
+from context.models import AgentMemory, Decision, PhaseHandoff, Pattern
+from tdd_models import TDDState
+
+
+@pytest.fixture
+def agent_memory():
+    """Create a test agent memory instance"""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        yield FileBasedAgentMemory(base_path=temp_dir)
+
+
+async def _store_story(agent_memory, agent_type, story_id, base_time, decisions=3):
+    """Store a memory with decisions, a pattern and a handoff"""
+    memory = AgentMemory(agent_type=agent_type, story_id=story_id)
+    for i in range(decisions):
+        memory.add_decision(Decision(
+            description=f"{story_id} decision {i}",
+            confidence=0.5,
+            timestamp=base_time + timedelta(minutes=i)
+        ))
+    memory.add_pattern(Pattern(
+        pattern_type="testing",
+        description=f"{story_id} pattern",
+        success_rate=0.9,
+        usage_count=5,
+        timestamp=base_time
+    ))
+    memory.add_phase_handoff(PhaseHandoff(
+        from_phase=TDDState.TEST_RED,
+        to_phase=TDDState.CODE_GREEN,
+        timestamp=base_time
+    ))
+    await agent_memory.store_memory(memory)
+    return memory
+
+
+class TestAgentMemoryIndex:
+    """Test the index directly"""
+
+    def test_index_and_query_roundtrip(self):
+        """Test that indexed rows come back as model objects"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index = AgentMemoryIndex(str(Path(temp_dir) / "index.db"))
+            memory = AgentMemory(agent_type="CodeAgent", story_id="story_1")
+            memory.add_decision(Decision(description="use adapter", confidence=0.8))
+            index.index_memory("CodeAgent", "story_1", memory.to_dict())
+
+            decisions = index.query_decisions(agent_type="CodeAgent")
+            assert len(decisions) == 1
+            assert decisions[0].description == "use adapter"
+            assert index.get_indexed_memories() == [("CodeAgent", "story_1")]
+
+    def test_reindex_replaces_rows(self):
+        """Test that re-indexing a memory does not duplicate rows"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index = AgentMemoryIndex(str(Path(temp_dir) / "index.db"))
+            memory = AgentMemory(agent_type="CodeAgent", story_id="story_1")
+            memory.add_decision(Decision(description="first"))
+            index.index_memory("CodeAgent", "story_1", memory.to_dict())
+            memory.add_decision(Decision(description="second"))
+            index.index_memory("CodeAgent", "story_1", memory.to_dict())
+
+            assert len(index.query_decisions(limit=100)) == 2
+
+    def test_build_marker(self):
+        """Test schema build marker and clearing"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            index = AgentMemoryIndex(str(Path(temp_dir) / "index.db"))
+            assert not index.is_built()
+            index.mark_built()
+            assert index.is_built()
+            index.clear()
+            assert not index.is_built()
+
+
+class TestIndexedQueries:
+    """Test cross-story queries through FileBasedAgentMemory"""
+
+    @pytest.mark.asyncio
+    async def test_query_decisions_top_k_across_stories(self, agent_memory):
+        """Test top-k decisions across stories, newest first"""
+        now = datetime.utcnow()
+        await _store_story(agent_memory, "CodeAgent", "story_1", now - timedelta(hours=2))
+        await _store_story(agent_memory, "CodeAgent", "story_2", now - timedelta(hours=1))
+        await _store_story(agent_memory, "QAAgent", "story_3", now)
+
+        decisions = await agent_memory.query_decisions(agent_type="CodeAgent", limit=2)
+
+        assert [d.description for d in decisions] == [
+            "story_2 decision 2", "story_2 decision 1"
+        ]
+
+    @pytest.mark.asyncio
+    async def test_query_decisions_time_bounded(self, agent_memory):
+        """Test that decisions before the cutoff are excluded"""
+        now = datetime.utcnow()
+        await _store_story(agent_memory, "CodeAgent", "old_story", now - timedelta(days=10))
+        await _store_story(agent_memory, "CodeAgent", "new_story", now)
+
+        decisions = await agent_memory.query_decisions(
+            agent_type="CodeAgent", since=now - timedelta(days=1), limit=100
+        )
+
+        assert len(decisions) == 3
+        assert all(d.description.startswith("new_story") for d in decisions)
+
+    @pytest.mark.asyncio
+    async def test_query_patterns_excludes_story(self, agent_memory):
+        """Test cross-story pattern lookups"""
+        now = datetime.utcnow()
+        await _store_story(agent_memory, "CodeAgent", "story_1", now)
+        await _store_story(agent_memory, "CodeAgent", "story_2", now)
+
+        patterns = await agent_memory.query_patterns(
+            pattern_type="testing", agent_type="CodeAgent", exclude_story_id="story_1"
+        )
+
+        assert [p.description for p in patterns] == ["story_2 pattern"]
+
+    @pytest.mark.asyncio
+    async def test_query_phase_handoffs(self, agent_memory):
+        """Test handoff lookups by transition"""
+        now = datetime.utcnow()
+        await _store_story(agent_memory, "CodeAgent", "story_1", now)
+
+        handoffs = await agent_memory.query_phase_handoffs(
+            from_phase=TDDState.TEST_RED, to_phase=TDDState.CODE_GREEN
+        )
+        assert len(handoffs) == 1
+        assert handoffs[0].to_phase == TDDState.CODE_GREEN
+
+        assert await agent_memory.query_phase_handoffs(from_phase=TDDState.REFACTOR) == []
+
+    @pytest.mark.asyncio
+    async def test_analyze_across_stories(self, agent_memory):
+        """Test aggregated analysis across stories"""
+        now = datetime.utcnow()
+        await _store_story(agent_memory, "CodeAgent", "story_1", now)
+        await _store_story(agent_memory, "CodeAgent", "story_2", now)
+
+        analysis = await agent_memory.analyze_agent_patterns_across_stories("CodeAgent")
+
+        assert analysis["pattern_types"]["testing"]["count"] == 2
+        assert analysis["pattern_types"]["testing"]["total_usage"] == 10
+        assert analysis["decision_confidence_avg"] == pytest.approx(0.5)
+        assert analysis["phase_transitions"] == {"test_red -> code_green": 2}
+        assert len(analysis["successful_patterns"]) == 2
+
+    @pytest.mark.asyncio
+    async def test_clear_memory_removes_from_index(self, agent_memory):
+        """Test that cleared memories disappear from query results"""
+        now = datetime.utcnow()
+        await _store_story(agent_memory, "CodeAgent", "story_1", now)
+        await _store_story(agent_memory, "CodeAgent", "story_2", now)
+
+        await agent_memory.clear_memory("CodeAgent", "story_1")
+        patterns = await agent_memory.query_patterns(agent_type="CodeAgent")
+        assert [p.description for p in patterns] == ["story_2 pattern"]
+
+        await agent_memory.clear_memory("CodeAgent")
+        assert await agent_memory.query_patterns(agent_type="CodeAgent") == []
+
+    @pytest.mark.asyncio
+    async def test_index_rebuilt_from_existing_files(self):
+        """Test that memories written without an index are backfilled"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            writer = FileBasedAgentMemory(base_path=temp_dir, enable_index=False)
+            await _store_story(writer, "CodeAgent", "story_1", datetime.utcnow())
+
+            reader = FileBasedAgentMemory(base_path=temp_dir)
+            decisions = await reader.query_decisions(agent_type="CodeAgent", limit=100)
+
+            assert len(decisions) == 3
+            assert reader.index.is_built()
+
+    @pytest.mark.asyncio
+    async def test_queries_without_index_scan_files(self):
+        """Test the file-scan fallback returns the same results"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            agent_memory = FileBasedAgentMemory(base_path=temp_dir, enable_index=False)
+            now = datetime.utcnow()
+            await _store_story(agent_memory, "CodeAgent", "story_1", now - timedelta(hours=1))
+            await _store_story(agent_memory, "CodeAgent", "story_2", now)
+
+            decisions = await agent_memory.query_decisions(agent_type="CodeAgent", limit=1)
+            analysis = await agent_memory.analyze_agent_patterns_across_stories("CodeAgent")
+
+            assert decisions[0].description == "story_2 decision 2"
+            assert analysis["phase_transitions"] == {"test_red -> code_green": 2}
@@ -12,6 +12,7 @@ import shutil
 import time
 from pathlib import Path
 from datetime import datetime, timedelta
+from collections import deque
 from unittest.mock import Mock, patch, AsyncMock
 
 import sys
@@ -19,7 +20,7 @@ sys.path.append(str(Path(__file__).parent.parent.parent))
 
 from lib.agent_pool import (
     AgentPool, PooledAgent, AgentMetrics, PoolConfiguration, PoolStatistics,
-    AgentPoolStrategy, AgentStatus, LoadBalancingAlgorithm
+    AgentPoolStrategy, AgentStatus, LoadBalancingAlgorithm, ReadyQueues
 )
 from lib.agents import BaseAgent, Task, TaskStatus, AgentResult
 from lib.context_manager import ContextManager
@@ -226,6 +227,73 @@ class TestPoolStatistics:
         assert stats.scaling_events == 0
 
 
+class TestReadyQueues:
+    """Test the per-type priority ready queues."""
+    
+    def _task(self, task_id, priority=5, cycle_id=None, agent_type="TestAgent"):
+        return Task(
+            id=task_id, agent_type=agent_type, command="test",
+            context={"priority": priority, "cycle_id": cycle_id}
+        )
+    
+    def test_priority_order_within_type(self):
+        """Test that more urgent tasks are taken first, FIFO within a priority."""
+        queues = ReadyQueues(aging_seconds=30.0)
+        for task_id, priority in [("docs", 9), ("green", 1), ("refactor", 5), ("red", 1)]:
+            queues.append(self._task(task_id, priority))
+        queues.append(self._task("other", 1, agent_type="OtherAgent"))
+        
+        assert len(queues) == 5
+        assert [queues.pop("TestAgent").task.id for _ in range(4)] == ["green", "red", "refactor", "docs"]
+        assert queues.pop("TestAgent") is None
+        assert queues.waiting_types() == ["OtherAgent"]
+    
+    def test_aging_prevents_starvation(self):
+        """Test that a long-waiting low-priority task overtakes newer urgent tasks."""
+        queues = ReadyQueues(aging_seconds=10.0)
+        with patch('lib.agent_pool.time.monotonic', return_value=1000.0):
+            queues.append(self._task("docs", priority=5))
+        with patch('lib.agent_pool.time.monotonic', return_value=1050.0):
+            queues.append(self._task("green", priority=1))
+        
+        assert queues.pop("TestAgent").task.id == "docs"
+    
+    def test_deadline_caps_sort_key(self):
+        """Test that a task close to its deadline goes ahead of higher priorities."""
+        queues = ReadyQueues(aging_seconds=30.0)
+        with patch('lib.agent_pool.time.monotonic', return_value=1000.0):
+            queues.append(self._task("green", priority=1))
+            queues.append(self._task("release", priority=9), deadline=1010.0, lead_seconds=15.0)
+        
+        assert queues.pop("TestAgent").task.id == "release"
+    
+    def test_remove_is_lazy(self):
+        """Test that removed tasks are skipped and counted out immediately."""
+        queues = ReadyQueues()
+        first, second = self._task("first", 1), self._task("second", 2)
+        queues.append(first)
+        queues.append(second)
+        
+        queues.remove(first)
+        
+        assert len(queues) == 1
+        assert queues.queued_for("TestAgent") == 1
+        assert queues.pop("TestAgent").task is second
+        with pytest.raises(ValueError):
+            queues.remove(first)
+    
+    def test_pop_eligible_falls_back_to_most_urgent(self):
+        """Test that ineligible tasks are skipped but never leave work undispatched."""
+        queues = ReadyQueues()
+        queues.append(self._task("a1", 1, cycle_id="cycle-a"))
+        queues.append(self._task("b1", 2, cycle_id="cycle-b"))
+        
+        not_a = lambda entry: entry.cycle_id != "cycle-a"
+        assert queues.pop("TestAgent", not_a).task.id == "b1"
+        assert queues.pop("TestAgent", not_a).task.id == "a1"
+        assert queues.waiting_cycles("TestAgent") == []
+
+
 class TestAgentPool:
     """Test the AgentPool class."""
     
@@ -690,6 +758,27 @@ class TestAgentPool:
             assert pooled_agent.failure_count == 1
             assert task.status == TaskStatus.FAILED
 
+    @pytest.mark.asyncio
+    async def test_completion_listeners_get_task_latency(self, agent_pool):
+        """Test that completion listeners receive each task's own execution time."""
+        completions = []
+        agent_pool.add_completion_listener(lambda *args: completions.append(args))
+        agent_pool.add_completion_listener(Mock(side_effect=RuntimeError("listener failed")))
+        
+        with patch('lib.agent_pool.create_agent') as mock_create_agent:
+            mock_create_agent.return_value = MockAgent("TestAgent")
+            pooled_agent = await agent_pool._create_agent("TestAgent")
+            
+            task = Task(id="test", agent_type="TestAgent", command="test", context={})
+            agent_pool.active_tasks[task.id] = task
+            await agent_pool._execute_task(pooled_agent, task)
+        
+        assert len(completions) == 1
+        agent_type, completed_task, execution_time, success = completions[0]
+        assert agent_type == "TestAgent" and completed_task is task and success
+        assert execution_time >= 0
+        assert task.status == TaskStatus.COMPLETED
+
     @pytest.mark.asyncio
     async def test_agent_recovery(self, agent_pool):
         """Test agent recovery after failures."""
@@ -839,6 +928,204 @@ class TestAgentPool:
             # Queue should be empty
             assert len(agent_pool.task_queue) == 0
 
+    @pytest.mark.asyncio
+    async def test_queued_tasks_do_not_block_other_types(self, agent_pool):
+        """Test that tasks waiting for one agent type do not hold up another type."""
+        agent_pool.enable_auto_scaling = False
+        
+        with patch('lib.agent_pool.create_agent') as mock_create_agent:
+            mock_create_agent.return_value = MockAgent("OtherAgent")
+            
+            waiting_id = await agent_pool.submit_task("TestAgent", "test", {})
+            await agent_pool._create_agent("OtherAgent")
+            other_id = await agent_pool.submit_task("OtherAgent", "test", {})
+            
+            assert agent_pool.task_queue.queued_for("TestAgent") == 1
+            assert agent_pool.task_queue.queued_for("OtherAgent") == 0
+            assert "assigned_agent_id" in agent_pool.active_tasks[other_id].context
+            assert "assigned_agent_id" not in agent_pool.active_tasks[waiting_id].context
+
+    @pytest.mark.asyncio
+    async def test_freed_agent_drains_queue(self, agent_pool):
+        """Test that every queued task is dispatched as agents free up."""
+        agent_pool.enable_auto_scaling = False
+        
+        with patch('lib.agent_pool.create_agent') as mock_create_agent:
+            mock_agent = MockAgent("TestAgent")
+            mock_agent.delay_seconds = 0.01
+            mock_create_agent.return_value = mock_agent
+            
+            await agent_pool._create_agent("TestAgent")
+            for _ in range(8):
+                await agent_pool.submit_task("TestAgent", "test", {})
+            assert len(agent_pool.task_queue) == 7
+            
+            for _ in range(100):
+                if not agent_pool.active_tasks:
+                    break
+                await asyncio.sleep(0.01)
+            
+            assert len(agent_pool.task_queue) == 0
+            assert len(mock_agent.execution_results) == 8
+
+    @pytest.mark.asyncio
+    async def test_dispatcher_assigns_tasks_to_new_agents(self, agent_pool):
+        """Test that the dispatcher hands queued tasks to agents added later."""
+        agent_pool.enable_auto_scaling = False
+        
+        with patch('lib.agent_pool.create_agent') as mock_create_agent:
+            mock_agent = MockAgent("TestAgent")
+            mock_agent.delay_seconds = 0.5
+            mock_create_agent.return_value = mock_agent
+            
+            await agent_pool.start()
+            try:
+                task_ids = [await agent_pool.submit_task("TestAgent", "test", {}) for _ in range(3)]
+                assert agent_pool.task_queue.queued_for("TestAgent") == 2
+                
+                await agent_pool._create_agent("TestAgent")
+                await agent_pool._create_agent("TestAgent")
+                await asyncio.sleep(0.05)
+                
+                assert len(agent_pool.task_queue) == 0
+                assert all("assigned_agent_id" in agent_pool.active_tasks[t].context for t in task_ids)
+            finally:
+                await agent_pool.stop()
+
+    @pytest.mark.asyncio
+    async def test_load_balancing_history_bounded(self, agent_pool):
+        """Test that the load balancing decision log keeps only recent decisions."""
+        agent_pool.config.decision_log_size = 5
+        agent_pool._load_balancing_history = deque(maxlen=5)
+        
+        with patch('lib.agent_pool.create_agent') as mock_create_agent:
+            mock_create_agent.return_value = MockAgent("TestAgent")
+            
+            await agent_pool._create_agent("TestAgent")
+            task = Task(id="test", agent_type="TestAgent", command="test", context={})
+            for _ in range(10):
+                await agent_pool._select_agent("TestAgent", task)
+            
+            assert len(agent_pool._load_balancing_history) == 5
+            assert agent_pool.statistics.load_balancing_decisions == 10
+
+    @pytest.mark.asyncio
+    async def test_queued_tasks_dispatched_by_priority(self, agent_pool):
+        """Test that a freed agent takes the most urgent queued task."""
+        agent_pool.enable_auto_scaling = False
+        
+        with patch('lib.agent_pool.create_agent') as mock_create_agent:
+            mock_agent = MockAgent("TestAgent")
+            mock_agent.delay_seconds = 0.01
+            mock_create_agent.return_value = mock_agent
+            
+            await agent_pool._create_agent("TestAgent")
+            await agent_pool.submit_task("TestAgent", "first", {}, priority=5)
+            docs_id = await agent_pool.submit_task("TestAgent", "docs", {}, priority=9)
+            green_id = await agent_pool.submit_task("TestAgent", "green", {}, priority=1)
+            
+            order = []
+            original_assign = agent_pool._assign_task_to_agent
+            
+            async def record_assign(agent, task):
+                order.append(task.id)
+                await original_assign(agent, task)
+            
+            with patch.object(agent_pool, '_assign_task_to_agent', side_effect=record_assign):
+                for _ in range(100):
+                    if not agent_pool.active_tasks:
+                        break
+                    await asyncio.sleep(0.01)
+            
+            assert order == [green_id, docs_id]
+            
+            status = await agent_pool.get_pool_status()
+            wait_times = status["queue_wait_times"]
+            assert set(wait_times) == {"1", "5", "9"}
+            assert wait_times["9"]["count"] == 1
+            assert wait_times["9"]["max"] >= wait_times["1"]["max"]
+            assert status["statistics"]["deadline_misses"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cycle_fair_share(self, agent_pool):
+        """Test that a cycle running its share yields agents to other cycles."""
+        agent_pool.enable_auto_scaling = False
+        
+        with patch('lib.agent_pool.create_agent') as mock_create_agent:
+            mock_agent = MockAgent("TestAgent")
+            mock_agent.delay_seconds = 1
+            mock_create_agent.return_value = mock_agent
+            
+            # Two agents with capacity 2 are split between two cycles
+            for _ in range(2):
+                await agent_pool._create_agent("TestAgent")
+            busy_ids = [
+                await agent_pool.submit_task("TestAgent", "test", {}, priority=1, cycle_id="cycle-a")
+                for _ in range(3)
+            ]
+            other_id = await agent_pool.submit_task("TestAgent", "test", {}, priority=9, cycle_id="cycle-b")
+            
+            # Free one agent held by cycle-a: cycle-b's task goes first despite its priority
+            agent = next(a for a in agent_pool.agents.values() if busy_ids[0] in a.current_tasks)
+            agent.current_tasks.discard(busy_ids[0])
+            agent.status = AgentStatus.IDLE
+            agent_pool._finish_cycle_task("TestAgent", agent_pool.active_tasks[busy_ids[0]])
+            agent_pool._update_agent_availability(agent)
+            await agent_pool._process_task_queue()
+            
+            assert "assigned_agent_id" in agent_pool.active_tasks[other_id].context
+            assert "assigned_agent_id" not in agent_pool.active_tasks[busy_ids[2]].context
+
+    @pytest.mark.asyncio
+    async def test_predictive_auto_scale_step(self, agent_pool):
+        """Test that predictive scaling adds the agents a backlog needs in one step."""
+        agent_pool.enable_auto_scaling = False
+        agent_pool.enable_predictive_scaling = True
+        
+        with patch('lib.agent_pool.create_agent') as mock_create_agent:
+            mock_agent = MockAgent("TestAgent")
+            mock_agent.delay_seconds = 1
+            mock_create_agent.return_value = mock_agent
+            
+            await agent_pool._create_agent("TestAgent")
+            for _ in range(4):
+                await agent_pool.submit_task("TestAgent", "test", {})
+            assert agent_pool.task_queue.queued_for("TestAgent") == 3
+            
+            # One busy agent and three queued tasks: scale to the configured maximum
+            agent_pool.enable_auto_scaling = True
+            await agent_pool._attempt_auto_scale("TestAgent")
+            
+            assert len(agent_pool.agent_types["TestAgent"]) == 3
+            assert agent_pool.statistics.scaling_events == 1
+
+    @pytest.mark.asyncio
+    async def test_prewarm_for_upcoming_phases(self, agent_pool):
+        """Test pre-warming agents for the phases cycles are about to enter."""
+        from lib.tdd_models import TDDCycle, TDDState
+        from lib.tdd_state_machine import TDDStateMachine
+        
+        state_machine = TDDStateMachine(enable_parallel_execution=True)
+        for i in range(2):
+            state_machine.register_parallel_cycle(
+                TDDCycle(id=f"cycle-{i}", story_id=f"STORY-{i}", current_state=TDDState.DESIGN)
+            )
+        agent_pool.enable_predictive_scaling = True
+        
+        with patch('lib.agent_pool.create_agent') as mock_create_agent:
+            mock_create_agent.side_effect = lambda agent_type, **kwargs: MockAgent(agent_type)
+            
+            result = await agent_pool.prewarm_for_upcoming_phases(state_machine, ["cycle-0", "cycle-1"])
+            
+            # Design agents run one task each; one QA agent has slots for both cycles
+            assert result["forecast"] == {"DesignAgent": 2, "QAAgent": 2}
+            assert len(agent_pool.agent_types["DesignAgent"]) == 2
+            assert len(agent_pool.agent_types["QAAgent"]) == 1
+            
+            # Submitted tasks consume the forecast
+            await agent_pool.submit_task("DesignAgent", "design", {})
+            assert agent_pool._scaling_predictions["DesignAgent"] == 1
+
     @pytest.mark.asyncio
     async def test_enums_and_constants(self):
         """Test enum values and constants."""
@@ -21,6 +21,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent.parent / "lib"))
 
 from agents.code_agent import CodeAgent
 from agents import Task, AgentResult, TaskStatus, TDDState, TDDCycle, TDDTask
+from async_test_runner import test_runner as shared_test_runner
 
 
 class TestCodeAgentInitialization:
@@ -37,6 +38,7 @@ class TestCodeAgentInitialization:
         assert "minimal_code_implementation" in agent.capabilities
         assert agent.claude_client is not None
         assert agent.github_client is None
+        assert agent.test_runner is shared_test_runner
     
     def test_code_agent_initialization_with_clients(self):
         """Test CodeAgent initialization with custom clients"""
@@ -1111,18 +1113,22 @@ class TestTDDGreenStateValidation:
                         mock_analyze_quality.assert_called_once()
     
     @pytest.mark.asyncio
-    async def test_run_comprehensive_test_suite(self):
-        """Test _run_comprehensive_test_suite method"""
-        test_files = ["test1.py", "test2.py"]
-        implementation_files = ["impl1.py", "impl2.py"]
-        
-        result = await self.agent._run_comprehensive_test_suite(test_files, implementation_files)
-        
-        assert result["total_tests"] == 20
-        assert result["passing_tests"] == 20
-        assert result["failing_tests"] == 0
+    async def test_run_comprehensive_test_suite(self, tmp_path):
+        """Test _run_comprehensive_test_suite runs the tests with pytest"""
+        impl = tmp_path / "impl1.py"
+        impl.write_text("def add(a, b):\n    return a + b\n")
+        test1 = tmp_path / "test_one.py"
+        test1.write_text("from impl1 import add\ndef test_add():\n    assert add(1, 2) == 3\ndef test_zero():\n    assert add(0, 0) == 0\n")
+        test2 = tmp_path / "test_two.py"
+        test2.write_text("from impl1 import add\ndef test_wrong():\n    assert add(1, 1) == 3\n")
+        
+        result = await self.agent._run_comprehensive_test_suite([str(test1), str(test2)], [str(impl)])
+        
+        assert result["total_tests"] == 3
+        assert result["passing_tests"] == 2
+        assert result["failing_tests"] == 1
         assert result["test_errors"] == 0
-        assert result["coverage_percentage"] == 96.5
+        assert "coverage_percentage" in result
         assert "test_duration" in result
     
     @pytest.mark.asyncio
@@ -0,0 +1,211 @@
+"""
+Unit tests for the async test runner.
+
+Runs real pytest subprocesses on small generated test files to check result
+parsing from JUnit XML and coverage JSON, that runs do not block the event
+loop, the concurrency limit and timeouts, and QAAgent's RED state and TDD
+coverage validation on actual outcomes.
+"""
+
+import asyncio
+import os
+import sys
+import time
+import pytest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from lib.agents.qa_agent import QAAgent
+from lib.async_test_runner import AsyncTestRunner, TestCaseResult
+
+
+def write(path: Path, content: str) -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    return str(path)
+
+
+class TestRunner:
+    """Test running pytest and reading its reports"""
+    
+    @pytest.mark.asyncio
+    async def test_outcomes_from_junit(self, tmp_path):
+        """Test passed, failed, errored and skipped tests"""
+        test_file = write(tmp_path / "test_sample.py", (
+            "import pytest\n"
+            "def test_pass():\n    assert True\n"
+            "def test_fail():\n    assert 1 == 2\n"
+            "@pytest.fixture\ndef broken():\n    raise RuntimeError('setup')\n"
+            "def test_error(broken):\n    pass\n"
+            "@pytest.mark.skip\ndef test_skip():\n    pass\n"
+        ))
+        
+        result = await AsyncTestRunner(max_concurrent=1).run([test_file], cwd=str(tmp_path))
+        
+        assert (result.total, result.passed, result.failed, result.errored, result.skipped) == (4, 1, 1, 1, 1)
+        assert result.returncode == 1 and not result.crashed
+        summary = result.to_dict()
+        assert summary["failed"] == 2
+        assert {failure["test"].split("::")[-1] for failure in summary["failures"]} == {"test_fail", "test_error"}
+        assert all(case.file.endswith("test_sample.py") for case in result.cases)
+    
+    @pytest.mark.asyncio
+    async def test_event_loop_keeps_running(self, tmp_path):
+        """Test that other tasks make progress while pytest runs"""
+        test_file = write(tmp_path / "test_slow.py", "import time\ndef test_slow():\n    time.sleep(1.0)\n")
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.05)
+        
+        tick_task = asyncio.create_task(ticker())
+        result = await AsyncTestRunner(max_concurrent=1).run([test_file], cwd=str(tmp_path))
+        tick_task.cancel()
+        
+        assert result.passed == 1
+        assert ticks >= 10
+    
+    @pytest.mark.asyncio
+    async def test_concurrency_limit(self, tmp_path):
+        """Test that runs beyond the limit wait for a free slot"""
+        test_file = write(tmp_path / "test_slow.py", "import time\ndef test_slow():\n    time.sleep(0.5)\n")
+        runner = AsyncTestRunner(max_concurrent=1)
+        
+        runs = [asyncio.create_task(runner.run([test_file], cwd=str(tmp_path))) for _ in range(2)]
+        await asyncio.sleep(0.2)
+        assert runner.get_stats()["running"] == 1 and runner.get_stats()["waiting"] == 1
+        
+        results = await asyncio.gather(*runs)
+        assert all(result.passed == 1 for result in results)
+        assert runner.get_stats()["completed"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_timeout_kills_run(self, tmp_path):
+        """Test that a hanging run is killed and reported as failed"""
+        test_file = write(tmp_path / "test_hang.py", "import time\ndef test_hang():\n    time.sleep(60)\n")
+        
+        started = time.monotonic()
+        result = await AsyncTestRunner(max_concurrent=1, timeout=1.0).run([test_file], cwd=str(tmp_path))
+        
+        assert time.monotonic() - started < 10
+        assert result.timed_out and result.crashed
+        assert result.to_dict()["failed"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_no_paths_runs_nothing(self):
+        """Test that an empty path list does not run the whole project suite"""
+        runner = AsyncTestRunner(max_concurrent=1)
+        result = await runner.run([])
+        
+        assert result.total == 0 and not result.crashed
+        assert runner.get_stats()["completed"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_coverage_report(self, tmp_path):
+        """Test that line coverage of the measured sources is read"""
+        write(tmp_path / "src" / "calc.py", (
+            "def add(a, b):\n    return a + b\n"
+            "def sub(a, b):\n    return a - b\n"
+        ))
+        test_file = write(tmp_path / "tests" / "test_calc.py", (
+            "from src.calc import add\n"
+            "def test_add():\n    assert add(1, 2) == 3\n"
+        ))
+        
+        result = await AsyncTestRunner(max_concurrent=1).run([test_file], cwd=str(tmp_path), coverage_sources=["src"])
+        
+        assert result.passed == 1
+        coverage = result.coverage.file_coverage(os.path.join("src", "calc.py"))
+        assert coverage["num_statements"] == 4 and coverage["covered_lines"] == 3
+        assert coverage["missing_lines"] == [4]
+    
+    @pytest.mark.asyncio
+    async def test_coverage_per_test_file(self, tmp_path):
+        """Test that coverage contexts map each test file to the sources it executed"""
+        write(tmp_path / "src" / "calc.py", "def add(a, b):\n    return a + b\n")
+        write(tmp_path / "src" / "text.py", "def upper(s):\n    return s.upper()\n")
+        calc_test = write(tmp_path / "tests" / "test_calc.py", "from src.calc import add\ndef test_add():\n    assert add(1, 2) == 3\n")
+        text_test = write(tmp_path / "tests" / "test_text.py", "from src.text import upper\ndef test_upper():\n    assert upper('a') == 'A'\n")
+        
+        result = await AsyncTestRunner(max_concurrent=1).run(
+            [calc_test, text_test], cwd=str(tmp_path), coverage_sources=["src"], coverage_contexts=True
+        )
+        
+        assert result.coverage.test_files == {
+            calc_test: [str(tmp_path / "src" / "calc.py")],
+            text_test: [str(tmp_path / "src" / "text.py")]
+        }
+    
+    def test_test_defects(self):
+        """Test telling broken tests from tests failing on missing implementation"""
+        assert TestCaseResult("m", "t", "error", message="collection failure", details="E   SyntaxError: invalid syntax").is_test_defect
+        assert TestCaseResult("m", "t", "error", message="failed on setup with \"fixture 'db' not found\"").is_test_defect
+        assert not TestCaseResult("m", "t", "failed", message="AttributeError: 'Service' object has no attribute 'run'").is_test_defect
+        assert not TestCaseResult("m", "t", "error", details="ModuleNotFoundError: No module named 'src.feature'").is_test_defect
+        assert not TestCaseResult("m", "t", "passed", details="NameError").is_test_defect
+
+
+class TestQAAgentValidation:
+    """Test QAAgent validation on actual test outcomes"""
+    
+    @pytest.fixture
+    def qa_agent(self):
+        return QAAgent(claude_code_client=object(), test_runner=AsyncTestRunner(max_concurrent=2))
+    
+    @pytest.mark.asyncio
+    async def test_red_state_confirmed(self, qa_agent, tmp_path, monkeypatch):
+        """Test that tests failing on a missing module confirm the RED state"""
+        monkeypatch.chdir(tmp_path)
+        validation = await qa_agent._validate_failing_tests({
+            "tests/tdd/S1/unit/test_feature.py": "from src.feature import run\ndef test_run():\n    assert run() == 1\n",
+            "tests/tdd/S1/unit/test_other.py": "def test_other():\n    assert False, 'not implemented'\n",
+            "test_validation.json": "{}"
+        })
+        
+        assert validation["validation_status"] == "RED_STATE_CONFIRMED"
+        assert validation["total_tests"] == 2 and validation["passing_tests"] == 0
+        assert len(validation["files_validated"]) == 2
+    
+    @pytest.mark.asyncio
+    async def test_red_state_rejected(self, qa_agent, tmp_path, monkeypatch):
+        """Test that passing and broken tests are not a RED state"""
+        monkeypatch.chdir(tmp_path)
+        passing = await qa_agent._validate_single_test_file_red_state(
+            "tests/test_passing.py", "def test_already_passes():\n    assert True\n"
+        )
+        broken = await qa_agent._validate_single_test_file_red_state(
+            "tests/test_broken.py", "def test_broken(:\n    pass\n"
+        )
+        missing = await qa_agent._validate_single_test_file_red_state(str(tmp_path / "test_missing.py"))
+        
+        assert not passing["all_tests_failing"]
+        assert "1 tests pass" in passing["status"]
+        assert not broken["failing_for_correct_reasons"]
+        assert missing["status"] == "Test file not found"
+    
+    @pytest.mark.asyncio
+    async def test_tdd_coverage_analysis(self, qa_agent, tmp_path, monkeypatch):
+        """Test coverage of implementation files overall and by test type"""
+        monkeypatch.chdir(tmp_path)
+        write(tmp_path / "src" / "__init__.py", "")
+        write(tmp_path / "src" / "cart.py", "def total(items):\n    return sum(items)\ndef empty(items):\n    return not items\n")
+        write(tmp_path / "src" / "unused.py", "def never():\n    return 1\n")
+        write(tmp_path / "tests" / "test_unit_cart.py", "from src.cart import total\ndef test_total():\n    assert total([1, 2]) == 3\n")
+        write(tmp_path / "tests" / "test_integration_cart.py", "from src.cart import empty\ndef test_empty():\n    assert empty([])\n")
+        
+        coverage = await qa_agent._run_tdd_coverage_analysis(
+            ["src/cart.py", "src/unused.py"],
+            ["tests/test_unit_cart.py", "tests/test_integration_cart.py"]
+        )
+        
+        assert coverage["coverage_by_file"]["src/cart.py"]["coverage"] == 100.0
+        assert coverage["overall_coverage"] == pytest.approx(100.0 * 4 / 6)
+        assert coverage["unit_coverage"] == pytest.approx(100.0 * 3 / 6)
+        assert coverage["edge_case_coverage"] == 0.0
+        assert coverage["critical_path_coverage"] == 50.0
+        assert coverage["low_coverage_files"] == [{"file": "src/unused.py", "coverage": 0.0}]
+        assert coverage["tests"] == {"total": 2, "passed": 2, "failed": 0}
@@ -0,0 +1,105 @@
+"""
+Test suite for diff-based change analysis.
+
+Tests mapping changed hunks onto line ranges and Python AST spans.
+"""
+
+import pytest
+from pathlib import Path
+
+# Import the modules under test
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "lib"))
+
+from change_analysis import analyze_changes
+
+
+BASE = """import os
+from typing import List
+
+
+class Parser:
+    def parse(self, text):
+        return text.split()
+
+    def render(self, tokens):
+        return " ".join(tokens)
+
+
+@cache
+def helper():
+    def inner():
+        return 1
+    return inner()
+"""
+
+
+class TestAnalyzeChanges:
+    """Test change extraction against a base snapshot"""
+    
+    def test_without_base_whole_file_changed(self):
+        """Test that a missing snapshot marks the whole file"""
+        changes = analyze_changes(None, BASE, is_python=True)
+        
+        assert changes.line_ranges == [(1, len(BASE.split('\n')))]
+        assert changes.functions == ["Parser.parse", "Parser.render", "helper"]
+        assert changes.classes == ["Parser"]
+        assert changes.imports == ["import os", "from typing import List"]
+    
+    def test_method_edit_touches_only_that_method(self):
+        """Test that editing a method body records the method, not its class"""
+        current = BASE.replace("return text.split()", "return text.split(',')")
+        changes = analyze_changes(BASE, current, is_python=True)
+        
+        assert changes.line_ranges == [(7, 7)]
+        assert changes.functions == ["Parser.parse"]
+        assert changes.classes == []
+        assert changes.imports == []
+    
+    def test_nested_function_attributed_to_outer_function(self):
+        """Test that nested functions count as their enclosing function"""
+        current = BASE.replace("return 1", "return 2")
+        assert analyze_changes(BASE, current, is_python=True).functions == ["helper"]
+    
+    def test_decorator_edit_touches_function(self):
+        """Test that decorators belong to the decorated function"""
+        current = BASE.replace("@cache", "@lru_cache")
+        assert analyze_changes(BASE, current, is_python=True).functions == ["helper"]
+    
+    def test_deleted_method_and_import(self):
+        """Test that deletions are attributed using the base version"""
+        current = BASE.replace("    def render(self, tokens):\n        return \" \".join(tokens)\n", "")
+        current = current.replace("import os\n", "")
+        changes = analyze_changes(BASE, current, is_python=True)
+        
+        assert changes.functions == ["Parser.render"]
+        assert changes.imports == ["import os"]
+        assert changes.line_ranges[0] == (1, 1)
+    
+    def test_insertion_anchored_in_base_coordinates(self):
+        """Test that inserted lines map onto the neighbouring base lines"""
+        current = BASE.replace("class Parser:\n", "class Parser:\n    separator = ','\n")
+        changes = analyze_changes(BASE, current, is_python=True)
+        
+        assert changes.line_ranges == [(5, 6)]
+        assert changes.classes == ["Parser"]
+        assert changes.functions == []
+    
+    def test_unchanged_file(self):
+        """Test that an unchanged file reports nothing"""
+        changes = analyze_changes(BASE, BASE, is_python=True)
+        assert changes.line_ranges == []
+        assert changes.functions == []
+    
+    def test_syntax_error_keeps_line_ranges(self):
+        """Test that unparsable sources still report changed lines"""
+        current = BASE.replace("return text.split()", "return text.split(")
+        changes = analyze_changes(BASE, current, is_python=True)
+        
+        assert changes.line_ranges == [(7, 7)]
+    
+    def test_non_python_file(self):
+        """Test that non-Python files get line ranges only"""
+        changes = analyze_changes("a\nb\nc", "a\nB\nc", is_python=False)
+        assert changes.line_ranges == [(2, 2)]
+        assert changes.functions == []
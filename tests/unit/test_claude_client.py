@@ -14,7 +14,7 @@ import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
-from lib.claude_client import ClaudeCodeClient, claude_client, create_agent_client
+from lib.claude_client import ClaudeAvailabilityProbe, ClaudeCodeClient, claude_client, create_agent_client
 from lib.agent_tool_config import AgentType
 
 
@@ -434,6 +434,78 @@ class TestClaudeCodeClient:
         assert "## Key Findings" in result
 
 
+class TestAvailabilityProbe:
+    """Test the process-wide claude availability probe."""
+    
+    def test_probe_runs_once_for_many_clients(self):
+        """Test that creating clients does not spawn claude each time."""
+        with patch('subprocess.run') as mock_run:
+            mock_run.return_value.returncode = 0
+            
+            clients = [create_agent_client(agent_type) for agent_type in AgentType for _ in range(5)]
+            
+            assert all(client.available for client in clients)
+            mock_run.assert_called_once()
+
+    def test_stale_answer_reprobed_outside_event_loop(self):
+        """Test that a stale answer is re-probed synchronously without a running loop."""
+        probe = ClaudeAvailabilityProbe(ttl_seconds=60)
+        with patch('subprocess.run') as mock_run:
+            mock_run.return_value.returncode = 0
+            assert probe.is_available() is True
+            
+            mock_run.return_value.returncode = 1
+            assert probe.is_available() is True
+            
+            probe._checked_at -= 61
+            assert probe.is_available() is False
+            assert mock_run.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_stale_answer_refreshed_in_background_on_loop(self):
+        """Test that on an event loop a stale answer is returned while re-probing asynchronously."""
+        probe = ClaudeAvailabilityProbe(ttl_seconds=60)
+        with patch('subprocess.run') as mock_run:
+            mock_run.return_value.returncode = 0
+            probe.is_available()
+        probe._checked_at -= 61
+        
+        mock_process = Mock()
+        mock_process.returncode = 1
+        mock_process.communicate = AsyncMock(return_value=(b"", b"not logged in"))
+        with patch('subprocess.run') as mock_run, \
+             patch('asyncio.create_subprocess_exec', new_callable=AsyncMock, return_value=mock_process):
+            assert probe.is_available() is True
+            mock_run.assert_not_called()
+            
+            await probe._refresh_task
+            assert probe.is_available() is False
+            assert probe.probe_count == 2
+
+    @pytest.mark.asyncio
+    async def test_refresh_pending_on_closed_loop_restarted(self):
+        """Test that a refresh left pending by a closed loop does not stop re-probing on a new loop."""
+        probe = ClaudeAvailabilityProbe(ttl_seconds=60)
+        with patch('subprocess.run') as mock_run:
+            mock_run.return_value.returncode = 0
+            probe.is_available()
+        probe._checked_at -= 61
+        
+        closed_loop = asyncio.new_event_loop()
+        probe._refresh_task = closed_loop.create_future()
+        closed_loop.close()
+        
+        mock_process = Mock()
+        mock_process.returncode = 1
+        mock_process.communicate = AsyncMock(return_value=(b"", b"not logged in"))
+        with patch('asyncio.create_subprocess_exec', new_callable=AsyncMock, return_value=mock_process):
+            assert probe.is_available() is True
+            assert probe._refresh_task.get_loop() is asyncio.get_running_loop()
+            
+            await probe._refresh_task
+            assert probe.is_available() is False
+
+
 class TestModuleFunctions:
     """Test module-level functions and variables."""
     
@@ -0,0 +1,253 @@
+"""
+Unit tests for the Claude process executor.
+
+Tests the global and per-agent-type concurrency limits, priority ordering of
+queued calls, cancellation, latency histograms, and that ClaudeCodeClient
+applies its timeout to run time only.
+"""
+
+import asyncio
+import os
+import sys
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from lib.agent_tool_config import AgentType
+from lib.claude_client import ClaudeCodeClient
+from lib.claude_executor import (
+    CallPriority, ClaudeCallCancelled, ClaudeProcessExecutor, LatencyHistogram, priority_for
+)
+
+
+async def hold(executor, log, name, agent_type=None, priority=CallPriority.NORMAL, seconds=0.05):
+    """Run a call that records when it starts and holds its slot for a while"""
+    async with executor.slot(agent_type, priority):
+        log.append(name)
+        await asyncio.sleep(seconds)
+
+
+class TestLimits:
+    """Test concurrency limits"""
+    
+    @pytest.mark.asyncio
+    async def test_global_limit(self):
+        """Test that no more calls run at once than allowed"""
+        executor = ClaudeProcessExecutor(max_concurrent=2, agent_limits={})
+        running = peak = 0
+        
+        async def call():
+            nonlocal running, peak
+            async with executor.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+        
+        await asyncio.gather(*(call() for _ in range(10)))
+        
+        assert peak == 2
+        stats = executor.get_stats()
+        assert stats["completed"] == 10
+        assert stats["running"] == 0 and stats["queued"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_agent_limit_does_not_block_other_types(self):
+        """Test that a call of a type at its sub-limit is skipped, not waited behind"""
+        executor = ClaudeProcessExecutor(max_concurrent=3, agent_limits={AgentType.DESIGN: 1})
+        log = []
+        
+        tasks = [
+            asyncio.create_task(hold(executor, log, "design-1", AgentType.DESIGN, seconds=0.1)),
+            asyncio.create_task(hold(executor, log, "design-2", AgentType.DESIGN, seconds=0.1)),
+            asyncio.create_task(hold(executor, log, "code", AgentType.CODE, seconds=0.1)),
+        ]
+        await asyncio.sleep(0.05)
+        
+        assert log == ["design-1", "code"]
+        assert executor.get_stats()["running_by_agent"] == {"DesignAgent": 1, "CodeAgent": 1}
+        
+        await asyncio.gather(*tasks)
+        assert log[-1] == "design-2"
+
+
+class TestPriority:
+    """Test ordering of queued calls"""
+    
+    @pytest.mark.asyncio
+    async def test_higher_priority_starts_first(self):
+        """Test that a GREEN phase call overtakes documentation work queued earlier"""
+        executor = ClaudeProcessExecutor(max_concurrent=1, agent_limits={})
+        log = []
+        
+        blocker = asyncio.create_task(hold(executor, log, "blocker", seconds=0.05))
+        await asyncio.sleep(0)
+        docs = [asyncio.create_task(hold(executor, log, f"docs-{i}", priority=CallPriority.LOW)) for i in range(2)]
+        await asyncio.sleep(0)
+        green = asyncio.create_task(hold(executor, log, "green", priority=priority_for(AgentType.CODE, "code_green")))
+        
+        await asyncio.gather(blocker, green, *docs)
+        
+        assert log == ["blocker", "green", "docs-0", "docs-1"]
+    
+    def test_priority_for(self):
+        """Test priorities by TDD phase and by agent type"""
+        assert priority_for(AgentType.DESIGN) == CallPriority.LOW
+        assert priority_for(AgentType.CODE) == CallPriority.HIGH
+        assert priority_for(None) == CallPriority.NORMAL
+        assert priority_for(AgentType.DESIGN, "code_green") == CallPriority.HIGH
+        assert priority_for(AgentType.CODE, "unknown") == CallPriority.HIGH
+
+
+class TestCancellation:
+    """Test cancelling calls"""
+    
+    @pytest.mark.asyncio
+    async def test_cancel_waiting_call(self):
+        """Test that a cancelled waiting call leaves the queue and never runs"""
+        executor = ClaudeProcessExecutor(max_concurrent=1, agent_limits={})
+        log = []
+        
+        blocker = asyncio.create_task(hold(executor, log, "blocker", seconds=0.05))
+        await asyncio.sleep(0)
+        waiting = asyncio.create_task(hold(executor, log, "cancelled"))
+        after = asyncio.create_task(hold(executor, log, "after"))
+        await asyncio.sleep(0)
+        assert executor.get_stats()["queued"] == 2
+        
+        waiting.cancel()
+        await asyncio.gather(blocker, after)
+        
+        assert waiting.cancelled()
+        assert log == ["blocker", "after"]
+        assert executor.get_stats()["cancelled"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_cancel_pending_by_agent_type(self):
+        """Test cancelling all queued calls of one agent type"""
+        executor = ClaudeProcessExecutor(max_concurrent=1, agent_limits={})
+        log = []
+        
+        blocker = asyncio.create_task(hold(executor, log, "blocker", seconds=0.05))
+        await asyncio.sleep(0)
+        design = [asyncio.create_task(hold(executor, log, "design", AgentType.DESIGN)) for _ in range(2)]
+        code = asyncio.create_task(hold(executor, log, "code", AgentType.CODE))
+        await asyncio.sleep(0)
+        
+        assert executor.cancel_pending(AgentType.DESIGN) == 2
+        await asyncio.gather(blocker, code)
+        
+        results = await asyncio.gather(*design, return_exceptions=True)
+        assert all(isinstance(result, ClaudeCallCancelled) for result in results)
+        assert not any(task.cancelled() for task in design)
+        assert log == ["blocker", "code"]
+        assert executor.get_stats()["cancelled"] == 2
+    
+    @pytest.mark.asyncio
+    async def test_cancelled_call_reaches_error_handling(self):
+        """Test that a dropped call is handled by a caller's generic exception fallback"""
+        executor = ClaudeProcessExecutor(max_concurrent=1, agent_limits={})
+        
+        async def call_with_fallback():
+            try:
+                await hold(executor, [], "queued")
+                return "ran"
+            except Exception:
+                return "fallback"
+        
+        blocker = asyncio.create_task(hold(executor, [], "blocker", seconds=0.05))
+        await asyncio.sleep(0)
+        queued = asyncio.create_task(call_with_fallback())
+        await asyncio.sleep(0)
+        
+        executor.cancel_pending()
+        
+        assert await queued == "fallback"
+        await blocker
+
+
+class TestHistograms:
+    """Test latency histograms"""
+    
+    def test_percentiles(self):
+        """Test bucket percentiles and the summary"""
+        histogram = LatencyHistogram()
+        for seconds in [0.05] * 9 + [20.0]:
+            histogram.observe(seconds)
+        
+        assert histogram.percentile(50) == 0.1
+        assert histogram.percentile(95) == 20.0
+        summary = histogram.to_dict()
+        assert summary["count"] == 10
+        assert summary["buckets"]["0.1"] == 9 and summary["buckets"]["30.0"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_queue_wait_and_run_time_recorded(self):
+        """Test that waiting and running are measured separately"""
+        executor = ClaudeProcessExecutor(max_concurrent=1, agent_limits={})
+        log = []
+        
+        await asyncio.gather(hold(executor, log, "first", seconds=0.1), hold(executor, log, "second", seconds=0.1))
+        
+        stats = executor.get_stats()
+        assert stats["queue_wait_seconds"]["count"] == 2
+        assert stats["queue_wait_seconds"]["max"] >= 0.09
+        assert stats["run_time_seconds"]["count"] == 2
+        assert stats["run_time_seconds"]["mean"] >= 0.09
+
+
+@pytest.mark.skipif(os.name != "posix", reason="requires an executable script as fake claude")
+class TestClientExecution:
+    """Test ClaudeCodeClient calls through the executor with a fake claude command"""
+    
+    @pytest.fixture
+    def fake_claude(self, tmp_path, monkeypatch):
+        """Put a claude command that echoes stdin after a delay on PATH"""
+        script = tmp_path / "claude"
+        script.write_text(
+            f"#!{sys.executable}\n"
+            "import os, sys, time\n"
+            "time.sleep(float(os.environ.get('CLAUDE_DELAY', '0.3')))\n"
+            "sys.stdout.write(sys.stdin.read())\n"
+        )
+        script.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+        return script
+    
+    def make_client(self, executor, timeout):
+        with patch('subprocess.run') as mock_run:
+            mock_run.return_value.returncode = 0
+            return ClaudeCodeClient(timeout=timeout, agent_type=AgentType.CODE, executor=executor)
+    
+    @pytest.mark.asyncio
+    async def test_timeout_excludes_queue_wait(self, fake_claude):
+        """Test that a call queued longer than its timeout still completes"""
+        executor = ClaudeProcessExecutor(max_concurrent=1, agent_limits={})
+        client = self.make_client(executor, timeout=1)
+        
+        results = await asyncio.gather(*(client._execute_claude_command(f"prompt {i}") for i in range(4)))
+        
+        assert results == [f"prompt {i}" for i in range(4)]
+        assert executor.get_stats()["queue_wait_seconds"]["max"] > 0.8
+    
+    @pytest.mark.asyncio
+    async def test_cancel_running_call_kills_process(self, fake_claude, monkeypatch):
+        """Test that cancelling a running call kills claude and frees the slot"""
+        monkeypatch.setenv("CLAUDE_DELAY", "30")
+        executor = ClaudeProcessExecutor(max_concurrent=1, agent_limits={})
+        client = self.make_client(executor, timeout=60)
+        
+        call = asyncio.create_task(client._execute_claude_command("prompt"))
+        await asyncio.sleep(0.3)
+        assert executor.get_stats()["running"] == 1
+        
+        started = time.monotonic()
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        
+        assert time.monotonic() - started < 5
+        assert executor.get_stats()["running"] == 0
@@ -0,0 +1,187 @@
+"""
+Unit tests for the Claude response cache.
+
+Tests keys, TTL per method, size-bounded LRU eviction across restarts and
+statistics, and that ClaudeCodeClient answers repeated prompts from the
+cache instead of running a stub claude command again, touching the disk
+only from worker threads.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from lib.agent_tool_config import AgentType
+from lib.claude_client import ClaudeCodeClient
+from lib.claude_executor import ClaudeProcessExecutor
+from lib.claude_response_cache import CacheRule, ClaudeResponseCache
+
+
+class TestResponseCache:
+    """Test the disk cache"""
+    
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return ClaudeResponseCache(str(tmp_path / "cache"))
+    
+    def test_key_depends_on_tool_restrictions_and_prompt(self, cache):
+        """Test that only identical prompts with identical tool access share a key"""
+        key = cache.make_key(["--disallowedTools", "Bash"], "Review this")
+        
+        assert key == cache.make_key(["--disallowedTools", "Bash"], "Review this")
+        assert key != cache.make_key([], "Review this")
+        assert key != cache.make_key(["--disallowedTools", "Bash"], "Review this!")
+    
+    def test_hit_and_saved_seconds(self, cache):
+        """Test that a stored response is returned and its run time counted as saved"""
+        key = cache.make_key([], "prompt")
+        assert cache.get("analyze_code", key) is None
+        
+        assert cache.put("analyze_code", key, "looks good", run_seconds=12.5)
+        assert cache.get("analyze_code", key) == "looks good"
+        
+        stats = cache.get_statistics()
+        assert stats["hits"] == 1 and stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+        assert stats["saved_seconds"] == 12.5
+    
+    def test_method_rules(self, tmp_path):
+        """Test that methods without a cacheable rule are never stored"""
+        cache = ClaudeResponseCache(str(tmp_path), rules={
+            "analyze_code": CacheRule(),
+            "generate_code": CacheRule(cacheable=False)
+        })
+        key = cache.make_key([], "prompt")
+        
+        assert not cache.put("generate_code", key, "code")
+        assert not cache.put("generate_tests", key, "tests")
+        assert not cache.put("analyze_code", key, "")
+        assert cache.get_statistics()["entries"] == 0
+    
+    def test_ttl_expiry(self, tmp_path):
+        """Test that entries older than the method's TTL are dropped"""
+        cache = ClaudeResponseCache(str(tmp_path), rules={"analyze_code": CacheRule(ttl_seconds=60)})
+        key = cache.make_key([], "prompt")
+        cache.put("analyze_code", key, "review")
+        
+        with patch("lib.claude_response_cache.time.time", return_value=time.time() + 61):
+            assert cache.get("analyze_code", key) is None
+        
+        stats = cache.get_statistics()
+        assert stats["expirations"] == 1 and stats["entries"] == 0
+    
+    def test_lru_eviction_survives_restart(self, tmp_path):
+        """Test that the least recently used entries go first, also after reopening"""
+        cache = ClaudeResponseCache(str(tmp_path), max_size_mb=0.01)
+        keys = [cache.make_key([], f"prompt {i}") for i in range(3)]
+        response = "x" * 3000
+        for key in keys:
+            cache.put("analyze_code", key, response)
+            time.sleep(0.01)
+        assert cache.get("analyze_code", keys[0]) == response
+        
+        # Reopen, as a new process would; recency comes from modification times
+        reopened = ClaudeResponseCache(str(tmp_path), max_size_mb=0.01)
+        reopened.put("analyze_code", reopened.make_key([], "prompt 3"), response)
+        
+        assert reopened.get("analyze_code", keys[1]) is None
+        assert reopened.get("analyze_code", keys[0]) == response
+        assert reopened.get_statistics()["size_bytes"] <= 0.01 * 1024 * 1024
+    
+    def test_corrupt_entry_is_a_miss(self, cache):
+        """Test that an unreadable entry is removed rather than returned"""
+        key = cache.make_key([], "prompt")
+        cache.put("analyze_code", key, "review")
+        cache._path(key).write_text("{not json")
+        
+        assert cache.get("analyze_code", key) is None
+        assert not cache._path(key).exists()
+
+
+@pytest.mark.skipif(os.name != "posix", reason="requires an executable script as fake claude")
+class TestClientCaching:
+    """Test ClaudeCodeClient with a stub claude command"""
+    
+    @pytest.fixture
+    def stub_claude(self, tmp_path, monkeypatch):
+        """Put a claude command on PATH that logs each run and echoes stdin"""
+        bin_dir = tmp_path / "bin"
+        bin_dir.mkdir()
+        runs = tmp_path / "runs.log"
+        script = bin_dir / "claude"
+        script.write_text(
+            f"#!{sys.executable}\n"
+            "import sys\n"
+            f"open({str(runs)!r}, 'a').write('run\\n')\n"
+            "sys.stdout.write('response to: ' + sys.stdin.read().strip()[:40])\n"
+        )
+        script.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+        return runs
+    
+    def make_client(self, agent_type, cache):
+        with patch('subprocess.run') as mock_run:
+            mock_run.return_value.returncode = 0
+            return ClaudeCodeClient(
+                timeout=30, agent_type=agent_type, cache=cache,
+                executor=ClaudeProcessExecutor(max_concurrent=2, agent_limits={})
+            )
+    
+    @pytest.mark.asyncio
+    async def test_repeated_prompt_runs_claude_once(self, tmp_path, stub_claude):
+        """Test that a retried review is answered from the cache"""
+        cache = ClaudeResponseCache(str(tmp_path / "cache"))
+        client = self.make_client(AgentType.QA, cache)
+        
+        first = await client.analyze_code("def f(): pass")
+        second = await client.analyze_code("def f(): pass")
+        
+        assert first == second
+        assert stub_claude.read_text().count("run") == 1
+        assert cache.get_statistics()["hits"] == 1
+        
+        # Another agent type has different tool access and does not share the entry
+        await self.make_client(AgentType.DESIGN, cache).analyze_code("def f(): pass")
+        assert stub_claude.read_text().count("run") == 2
+    
+    @pytest.mark.asyncio
+    async def test_cache_runs_off_the_event_loop(self, tmp_path, stub_claude, monkeypatch):
+        """Test that lookups, stores and the one-time index scan run in worker threads"""
+        cache = ClaudeResponseCache(str(tmp_path / "cache"))
+        client = self.make_client(AgentType.QA, cache)
+        loop_thread = threading.get_ident()
+        calls = []
+        
+        def recorded(name, method):
+            def wrapper(*args, **kwargs):
+                if name != "scan" or cache._index is None:
+                    calls.append((name, threading.get_ident()))
+                return method(*args, **kwargs)
+            return wrapper
+        
+        monkeypatch.setattr(cache, "_load_index", recorded("scan", cache._load_index))
+        monkeypatch.setattr(cache, "get", recorded("get", cache.get))
+        monkeypatch.setattr(cache, "put", recorded("put", cache.put))
+        
+        await client.analyze_code("def f(): pass")
+        await client.analyze_code("def f(): pass")
+        
+        assert [name for name, _ in calls] == ["get", "scan", "put", "get"]
+        assert all(thread != loop_thread for _, thread in calls)
+    
+    @pytest.mark.asyncio
+    async def test_no_cache_by_default(self, stub_claude, monkeypatch):
+        """Test that caching is opt-in"""
+        monkeypatch.delenv("CLAUDE_RESPONSE_CACHE_DIR", raising=False)
+        client = self.make_client(AgentType.QA, None)
+        assert client.cache is None
+        
+        await asyncio.gather(client.analyze_code("x = 1"), client.analyze_code("x = 1"))
+        assert stub_claude.read_text().count("run") == 2
@@ -0,0 +1,173 @@
+"""
+Unit tests for streaming claude output.
+
+Tests that ClaudeCodeClient yields output before claude exits, applies its
+timeout to silence rather than total run time, reports throttled progress,
+kills claude when the consumer stops early, and that CodeAgent streams
+generated code into its target file.
+"""
+
+import asyncio
+import os
+import subprocess
+import sys
+import time
+import pytest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+import lib.agents.code_agent as code_agent_module
+from lib.agents import Task
+from lib.agents.code_agent import CodeAgent
+from lib.agent_tool_config import AgentType
+from lib.claude_client import ClaudeCodeClient
+from lib.claude_executor import ClaudeProcessExecutor
+
+
+@pytest.mark.skipif(os.name != "posix", reason="requires an executable script as fake claude")
+class TestStreaming:
+    """Test streaming with a fake claude that prints lines with pauses"""
+    
+    @pytest.fixture
+    def fake_claude(self, tmp_path, monkeypatch):
+        """Put a claude command on PATH printing CLAUDE_LINES lines CLAUDE_PAUSE seconds apart"""
+        script = tmp_path / "claude"
+        script.write_text(
+            f"#!{sys.executable}\n"
+            "import os, sys, time\n"
+            "sys.stdin.read()\n"
+            "for i in range(int(os.environ.get('CLAUDE_LINES', '5'))):\n"
+            "    sys.stdout.write(f'line {i}\\n')\n"
+            "    sys.stdout.flush()\n"
+            "    time.sleep(float(os.environ.get('CLAUDE_PAUSE', '0.1')))\n"
+            "sys.exit(int(os.environ.get('CLAUDE_EXIT', '0')))\n"
+        )
+        script.chmod(0o755)
+        monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+        return script
+    
+    @pytest.fixture
+    def executor(self):
+        return ClaudeProcessExecutor(max_concurrent=1, agent_limits={})
+    
+    def make_client(self, executor, timeout=30):
+        with patch('subprocess.run') as mock_run:
+            mock_run.return_value.returncode = 0
+            return ClaudeCodeClient(timeout=timeout, agent_type=AgentType.CODE, executor=executor)
+    
+    @pytest.mark.asyncio
+    async def test_output_arrives_before_exit(self, fake_claude, executor, monkeypatch):
+        """Test that the first chunk is yielded long before claude finishes"""
+        monkeypatch.setenv("CLAUDE_PAUSE", "0.3")
+        client = self.make_client(executor)
+        
+        started = time.monotonic()
+        arrivals = []
+        text = ""
+        async for chunk in client.stream_claude_command("prompt"):
+            arrivals.append(time.monotonic() - started)
+            text += chunk
+        
+        assert text == "".join(f"line {i}\n" for i in range(5))
+        assert arrivals[0] < 1.0
+        assert arrivals[-1] >= 1.2
+        assert executor.get_stats()["running"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_idle_timeout_not_total_time(self, fake_claude, executor, monkeypatch):
+        """Test that steady output may run past the timeout while silence may not"""
+        monkeypatch.setenv("CLAUDE_LINES", "8")
+        monkeypatch.setenv("CLAUDE_PAUSE", "0.25")
+        client = self.make_client(executor, timeout=1)
+        
+        chunks = [chunk async for chunk in client.stream_claude_command("prompt")]
+        assert "".join(chunks).count("line") == 8
+        
+        monkeypatch.setenv("CLAUDE_LINES", "2")
+        monkeypatch.setenv("CLAUDE_PAUSE", "30")
+        started = time.monotonic()
+        with pytest.raises(asyncio.TimeoutError):
+            async for _ in client.stream_claude_command("prompt", idle_timeout=0.5):
+                pass
+        
+        assert time.monotonic() - started < 5
+        assert executor.get_stats()["running"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_progress_is_throttled(self, fake_claude, executor, monkeypatch):
+        """Test progress events at start, at most once per interval, and at the end"""
+        monkeypatch.setenv("CLAUDE_LINES", "10")
+        monkeypatch.setenv("CLAUDE_PAUSE", "0.05")
+        client = self.make_client(executor)
+        events = []
+        
+        async for _ in client.stream_claude_command("prompt", on_progress=events.append, progress_interval=0.2):
+            pass
+        
+        statuses = [event.status for event in events]
+        assert statuses[0] == "started" and statuses[-1] == "completed"
+        assert 1 <= statuses.count("streaming") <= 3
+        assert events[-1].bytes_received == len("".join(f"line {i}\n" for i in range(10)))
+    
+    @pytest.mark.asyncio
+    async def test_stopping_early_kills_claude(self, fake_claude, executor, monkeypatch):
+        """Test that closing the stream kills claude and frees its slot"""
+        monkeypatch.setenv("CLAUDE_LINES", "100")
+        monkeypatch.setenv("CLAUDE_PAUSE", "0.1")
+        client = self.make_client(executor)
+        events = []
+        
+        stream = client.stream_claude_command("prompt", on_progress=events.append)
+        first = await stream.__anext__()
+        await stream.aclose()
+        
+        assert first.startswith("line 0")
+        assert events[-1].status == "cancelled"
+        assert executor.get_stats()["running"] == 0
+    
+    @pytest.mark.asyncio
+    async def test_nonzero_exit_raises(self, fake_claude, executor, monkeypatch):
+        """Test that a failing claude raises after its output was streamed"""
+        monkeypatch.setenv("CLAUDE_LINES", "2")
+        monkeypatch.setenv("CLAUDE_EXIT", "3")
+        client = self.make_client(executor)
+        events = []
+        chunks = []
+        
+        with pytest.raises(subprocess.CalledProcessError):
+            async for chunk in client.stream_claude_command("prompt", on_progress=events.append):
+                chunks.append(chunk)
+        
+        assert "".join(chunks) == "line 0\nline 1\n"
+        assert events[-1].status == "failed"
+    
+    @pytest.mark.asyncio
+    async def test_code_agent_streams_to_file(self, fake_claude, tmp_path, monkeypatch):
+        """Test that CodeAgent writes streamed code and reports progress"""
+        monkeypatch.setenv("CLAUDE_LINES", "3")
+        
+        client = code_agent_module.ClaudeCodeClient(
+            timeout=30, agent_type=code_agent_module.AgentType.CODE,
+            executor=ClaudeProcessExecutor(max_concurrent=1, agent_limits={})
+        )
+        agent = CodeAgent(claude_code_client=client)
+        target = tmp_path / "src" / "feature.py"
+        activity = []
+        monkeypatch.setattr(code_agent_module, "emit_agent_activity", lambda *args, **kwargs: activity.append(args))
+        
+        with patch.object(client, "_check_claude_availability", return_value=True):
+            result = await agent._implement_feature(
+                Task(id="t1", agent_type="CodeAgent", command="implement",
+                     context={"story_id": "S1", "specification": "a feature", "target_file": str(target)}),
+                dry_run=False
+            )
+        
+        assert result.success
+        assert target.read_text() == "line 0\nline 1\nline 2\n"
+        assert result.artifacts[str(target)] == "line 0\nline 1\nline 2"
+        assert not (tmp_path / "src" / "feature.py.tmp").exists()
+        statuses = [args[3] for args in activity]
+        assert statuses[0] == "started" and statuses[-1] == "completed"
+        assert all(args[1] == "S1" for args in activity)
@@ -355,8 +355,11 @@ class TestCodeAgent:
         assert "[DRY RUN]" in result.output
 
     @pytest.mark.asyncio
-    async def test_validate_test_green_state(self, code_agent):
+    async def test_validate_test_green_state(self, code_agent, tmp_path, monkeypatch):
         """Test GREEN state validation."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "tests").mkdir()
+        (tmp_path / "tests" / "test_auth.py").write_text("def test_login():\n    assert True\n")
         task = Task(
             id="tdd-4",
             agent_type="CodeAgent",
@@ -377,6 +380,7 @@ class TestCodeAgent:
         # Check validation results
         validation_data = json.loads(result.artifacts["green_state_validation.json"])
         assert "test_results" in validation_data
+        assert validation_data["test_results"]["total_tests"] == 1
         assert "test_integrity" in validation_data
         assert "quality_metrics" in validation_data
 
@@ -475,8 +479,11 @@ class TestCodeAgent:
         assert "cycle_summary" in commit_data
 
     @pytest.mark.asyncio
-    async def test_execute_tdd_phase_code_green(self, code_agent):
+    async def test_execute_tdd_phase_code_green(self, code_agent, tmp_path, monkeypatch):
         """Test executing TDD CODE_GREEN phase."""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "tests").mkdir()
+        (tmp_path / "tests" / "test_feature.py").write_text("def test_create_feature():\n    assert True\n")
         context = {
             "test_files": ["tests/test_feature.py"],
             "failing_tests": ["test_create_feature"],
@@ -0,0 +1,94 @@
+"""
+Test suite for the conflict resolver's inverted indexes.
+
+Tests the interval tree against a brute-force scan and the per-file
+symbol/line index used for pairwise conflict detection.
+"""
+
+import random
+import pytest
+from datetime import datetime
+from pathlib import Path
+
+# Import the modules under test
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "lib"))
+
+from conflict_index import IntervalTree, FileConflictIndex
+from conflict_resolver import FileModification
+
+
+def _modification(cycle_id, line_ranges=(), functions=(), classes=(), imports=()):
+    """Create a modification of a test file"""
+    modification = FileModification("module.py", cycle_id, "story", "modify", "hash", datetime.utcnow())
+    modification.line_ranges = list(line_ranges)
+    modification.functions_modified = list(functions)
+    modification.classes_modified = list(classes)
+    modification.imports_modified = list(imports)
+    return modification
+
+
+class TestIntervalTree:
+    """Test overlap queries"""
+    
+    def test_closed_interval_overlap(self):
+        """Test that touching endpoints overlap"""
+        tree = IntervalTree()
+        tree.insert(1, 10, "a")
+        tree.insert(20, 30, "b")
+        
+        assert tree.overlapping(10, 15) == ["a"]
+        assert tree.overlapping(11, 19) == []
+        assert sorted(tree.overlapping(5, 25)) == ["a", "b"]
+        assert len(tree) == 2
+    
+    def test_matches_brute_force(self):
+        """Test random queries against a linear scan"""
+        rng = random.Random(7)
+        tree = IntervalTree()
+        intervals = []
+        for i in range(500):
+            start = rng.randint(0, 5000)
+            end = start + rng.randint(0, 50)
+            tree.insert(start, end, i)
+            intervals.append((start, end, i))
+        
+        for _ in range(200):
+            start = rng.randint(0, 5000)
+            end = start + rng.randint(0, 100)
+            expected = sorted(i for s, e, i in intervals if not (e < start or end < s))
+            assert sorted(tree.overlapping(start, end)) == expected
+
+
+class TestFileConflictIndex:
+    """Test per-file conflict indexing"""
+    
+    def test_conflicts_by_lines_and_symbols(self):
+        """Test that overlapping lines or shared symbols of the same kind conflict"""
+        index = FileConflictIndex()
+        assert index.add(_modification("cycle-1", [(1, 10)], functions=["parse"])) == []
+        assert index.add(_modification("cycle-2", [(5, 15)])) == ["cycle-1"]
+        assert index.add(_modification("cycle-3", [(50, 60)], functions=["parse"])) == ["cycle-1"]
+        assert index.add(_modification("cycle-4", [(70, 80)], classes=["parse"])) == []
+        
+        assert index.conflict_pairs() == [("cycle-1", "cycle-2"), ("cycle-1", "cycle-3")]
+        assert index.cycles_conflict("cycle-3", "cycle-1")
+        assert not index.cycles_conflict("cycle-2", "cycle-3")
+    
+    def test_same_cycle_never_conflicts(self):
+        """Test that a cycle's own modifications do not conflict"""
+        index = FileConflictIndex()
+        index.add(_modification("cycle-1", [(1, 10)], imports=["os"]))
+        assert index.add(_modification("cycle-1", [(1, 10)], imports=["os"])) == []
+        assert index.conflict_pairs() == []
+    
+    def test_tracks_appended_list(self):
+        """Test syncing with modifications appended to the wrapped list"""
+        modifications = [_modification("cycle-1", [(1, 5)])]
+        index = FileConflictIndex(modifications)
+        modifications.append(_modification("cycle-2", [(3, 4)]))
+        
+        assert index.tracks(modifications)
+        assert not index.tracks(list(modifications))
+        index.sync()
+        assert index.conflict_pairs() == [("cycle-1", "cycle-2")]
@@ -363,6 +363,100 @@ class TestConflictResolver:
         assert len(modifications) == 1
         assert modifications[0].content_hash == ""  # No hash for non-existent file
 
+    @pytest.mark.asyncio
+    async def test_register_file_modification_reports_only_touched_cycles(self, conflict_resolver, temp_project_dir):
+        """Test that a new modification is only checked against cycles touching its symbols."""
+        file_path = str(Path(temp_project_dir) / "module.py")
+        with open(file_path, 'w') as f:
+            f.write("def parse(): pass\ndef render(): pass\n")
+        
+        functions = {"cycle-1": ["parse"], "cycle-2": ["render"], "cycle-3": ["parse"]}
+        
+        async def analyze(modification):
+            modification.functions_modified = functions[modification.cycle_id]
+        
+        handled = []
+        with patch.object(conflict_resolver, "_analyze_file_modifications", side_effect=analyze), \
+             patch.object(conflict_resolver, "_handle_detected_conflict", side_effect=handled.append):
+            for cycle_id in functions:
+                await conflict_resolver.register_file_modification(file_path, cycle_id, "STORY-1")
+        
+        assert [conflict.affected_cycles for conflict in handled] == [{"cycle-1", "cycle-3"}]
+        conflicts = await conflict_resolver._detect_file_conflicts(file_path)
+        assert [conflict.conflict_id for conflict in conflicts] == [handled[0].conflict_id]
+        assert await conflict_resolver._cycles_conflict_on_file(file_path, "cycle-3", "cycle-1") is True
+        assert await conflict_resolver._cycles_conflict_on_file(file_path, "cycle-1", "cycle-2") is False
+    
+    @pytest.mark.asyncio
+    async def test_edits_to_different_methods_do_not_conflict(self, conflict_resolver, temp_project_dir):
+        """Test that changes diffed against base snapshots only conflict on shared symbols."""
+        file_path = str(Path(temp_project_dir) / "module.py")
+        base = "class Parser:\n    def parse(self):\n        return 1\n\n    def render(self):\n        return 2\n"
+        with open(file_path, 'w') as f:
+            f.write(base)
+        await conflict_resolver.capture_base_snapshots("cycle-1", [file_path])
+        await conflict_resolver.capture_base_snapshots("cycle-2", [file_path])
+        await conflict_resolver.capture_base_snapshots("cycle-3", [file_path])
+        
+        handled = []
+        edits = [("cycle-1", "return 1", "return 10"), ("cycle-2", "return 2", "return 20"),
+                 ("cycle-3", "return 1", "return 100")]
+        with patch.object(conflict_resolver, "_handle_detected_conflict", side_effect=handled.append):
+            for cycle_id, old, new in edits:
+                with open(file_path, 'w') as f:
+                    f.write(base.replace(old, new))
+                await conflict_resolver.register_file_modification(file_path, cycle_id, "STORY-1")
+        
+        modifications = conflict_resolver.file_modifications[file_path]
+        assert [m.functions_modified for m in modifications] == [["Parser.parse"], ["Parser.render"], ["Parser.parse"]]
+        assert [m.line_ranges for m in modifications] == [[(3, 3)], [(6, 6)], [(3, 3)]]
+        assert [conflict.affected_cycles for conflict in handled] == [{"cycle-1", "cycle-3"}]
+        
+        conflict_resolver.release_base_snapshots("cycle-1")
+        assert set(conflict_resolver._base_snapshots[file_path]) == {"cycle-2", "cycle-3"}
+
+    @pytest.mark.asyncio
+    async def test_declared_files_reanalyzed_after_writes(self, conflict_resolver, temp_project_dir):
+        """Test that a declared file counts as wholly modified until the cycle's version is recorded."""
+        file_path = str(Path(temp_project_dir) / "module.py")
+        base = "class Parser:\n    def parse(self):\n        return 1\n\n    def render(self):\n        return 2\n"
+        with open(file_path, 'w') as f:
+            f.write(base)
+        
+        handled = []
+        with patch.object(conflict_resolver, "_handle_detected_conflict", side_effect=handled.append):
+            for cycle_id in ("cycle-1", "cycle-2", "cycle-3"):
+                await conflict_resolver.capture_base_snapshots(cycle_id, [file_path])
+                await conflict_resolver.register_file_modification(file_path, cycle_id, "STORY-1")
+            
+            modifications = conflict_resolver.file_modifications[file_path]
+            assert [m.line_ranges for m in modifications] == [[(1, 7)]] * 3
+            assert [conflict.affected_cycles for conflict in handled] == [
+                {"cycle-1", "cycle-2"}, {"cycle-1", "cycle-3"}, {"cycle-2", "cycle-3"}
+            ]
+            
+            # Each cycle writes its edit, then finishes the phase; cycle-3 leaves the file unchanged
+            handled.clear()
+            for cycle_id, old, new in [("cycle-1", "return 1", "return 10"), ("cycle-2", "return 2", "return 20")]:
+                with open(file_path, 'w') as f:
+                    f.write(base.replace(old, new))
+                await conflict_resolver.record_cycle_version(cycle_id, file_path)
+            with open(file_path, 'w') as f:
+                f.write(base)
+            await conflict_resolver.record_cycle_version("cycle-3", file_path)
+        
+        modifications = conflict_resolver.file_modifications[file_path]
+        assert [(m.cycle_id, m.functions_modified, m.line_ranges) for m in modifications] == [
+            ("cycle-1", ["Parser.parse"], [(3, 3)]), ("cycle-2", ["Parser.render"], [(6, 6)])
+        ]
+        assert modifications[0].story_id == "STORY-1"
+        assert await conflict_resolver._cycles_conflict_on_file(file_path, "cycle-1", "cycle-2") is False
+        
+        # Recorded edits only conflicted with the cycles that had not written yet
+        assert [conflict.affected_cycles for conflict in handled] == [
+            {"cycle-1", "cycle-2"}, {"cycle-1", "cycle-3"}, {"cycle-2", "cycle-3"}
+        ]
+
     @pytest.mark.asyncio
     async def test_register_cycle_dependency(self, conflict_resolver):
         """Test registering cycle dependencies."""
@@ -876,6 +970,70 @@ def another_function(param: str) -> bool:
         result = await conflict_resolver._auto_merge_file(file_path, cycle_ids)
         assert result is False
 
+    @pytest.mark.asyncio
+    async def test_auto_merge_file_three_way(self, conflict_resolver, temp_project_dir):
+        """Test merging cycle versions against their base snapshots."""
+        file_path = str(Path(temp_project_dir) / "module.py")
+        base = "def parse():\n    return 1\n\n\ndef render():\n    return 2\n"
+        with open(file_path, 'w') as f:
+            f.write(base)
+        await conflict_resolver.capture_base_snapshots("cycle-1", [file_path])
+        await conflict_resolver.capture_base_snapshots("cycle-2", [file_path])
+        
+        # Each cycle writes its version from the base, so cycle-2 overwrites cycle-1's edit
+        with patch.object(conflict_resolver, "_handle_detected_conflict"):
+            for cycle_id, old, new in [("cycle-1", "return 1", "return 10"), ("cycle-2", "return 2", "return 20")]:
+                with open(file_path, 'w') as f:
+                    f.write(base.replace(old, new))
+                await conflict_resolver.record_cycle_version(cycle_id, file_path)
+        
+        # Recording cycle-2's version already merged the non-conflicting edits
+        with open(file_path) as f:
+            assert f.read() == base.replace("return 1", "return 10").replace("return 2", "return 20")
+        
+        result = await conflict_resolver._auto_merge_file(file_path, {"cycle-1", "cycle-2"})
+        
+        assert result is True
+        with open(file_path) as f:
+            assert f.read() == base.replace("return 1", "return 10").replace("return 2", "return 20")
+    
+    @pytest.mark.asyncio
+    async def test_declared_modifications_are_not_merged(self, conflict_resolver, temp_project_dir):
+        """Test that a merge does not report success before the cycles' versions are recorded."""
+        file_path = str(Path(temp_project_dir) / "module.py")
+        with open(file_path, 'w') as f:
+            f.write("def parse():\n    return 1\n")
+        
+        with patch.object(conflict_resolver, "_handle_detected_conflict"):
+            for cycle_id in ("cycle-1", "cycle-2"):
+                await conflict_resolver.capture_base_snapshots(cycle_id, [file_path])
+                await conflict_resolver.register_file_modification(file_path, cycle_id, "STORY-1")
+        
+        assert conflict_resolver._cycle_versions == {}
+        assert await conflict_resolver._auto_merge_file(file_path, {"cycle-1", "cycle-2"}) is False
+    
+    @pytest.mark.asyncio
+    async def test_auto_merge_file_conflicting_edits(self, conflict_resolver, temp_project_dir):
+        """Test that edits to the same lines are not merged and the file is left alone."""
+        file_path = str(Path(temp_project_dir) / "module.py")
+        base = "def parse():\n    return 1\n"
+        with open(file_path, 'w') as f:
+            f.write(base)
+        await conflict_resolver.capture_base_snapshots("cycle-1", [file_path])
+        await conflict_resolver.capture_base_snapshots("cycle-2", [file_path])
+        
+        with patch.object(conflict_resolver, "_handle_detected_conflict"):
+            for cycle_id, new in [("cycle-1", "return 10"), ("cycle-2", "return 20")]:
+                with open(file_path, 'w') as f:
+                    f.write(base.replace("return 1", new))
+                await conflict_resolver.record_cycle_version(cycle_id, file_path)
+        
+        result = await conflict_resolver._auto_merge_file(file_path, {"cycle-1", "cycle-2"})
+        
+        assert result is False
+        with open(file_path) as f:
+            assert f.read() == base.replace("return 1", "return 20")
+
     @pytest.mark.asyncio
     async def test_update_average_resolution_time(self, conflict_resolver):
         """Test updating average resolution time."""
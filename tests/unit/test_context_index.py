@@ -490,6 +490,29 @@ This is a test project for context indexing.
         assert len(index.file_nodes) == initial_count + 1
         assert str(new_file) in index.file_nodes
     
+    @pytest.mark.asyncio
+    async def test_update_files(self, index, temp_project):
+        """Test re-indexing single files and their dependency edges without a rescan"""
+        await index.build_index()
+        main_path = str(index.project_path / "main.py")
+        utils_path = str(index.project_path / "utils.py")
+        new_path = str(index.project_path / "report.py")
+        
+        Path(main_path).write_text("import os\n")
+        Path(new_path).write_text("from utils import helper_function\n")
+        with patch.object(index, '_scan_and_update_files') as mock_scan:
+            await index.update_files([main_path, new_path])
+            mock_scan.assert_not_called()
+        
+        assert index.dependency_graph.get(main_path, set()) == set()
+        assert index.reverse_dependency_graph[utils_path] == {new_path}
+        assert index.file_nodes[utils_path].reverse_dependencies == [new_path]
+        
+        Path(new_path).unlink()
+        await index.update_files([new_path])
+        assert new_path not in index.file_nodes
+        assert not index.reverse_dependency_graph.get(utils_path)
+    
     @pytest.mark.asyncio
     async def test_build_index_file_deletion(self, index, temp_project):
         """Test handling of deleted files"""
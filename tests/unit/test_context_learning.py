@@ -16,6 +16,7 @@ from pathlib import Path
 from datetime import datetime, timedelta
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from collections import deque
+from collections.abc import MutableMapping
 
 # Import the modules under test
 import sys
@@ -27,7 +28,8 @@ from context_learning import (
     FeatureType,
     LearningFeedback,
     FileFeatures,
-    LearningPattern
+    LearningPattern,
+    _refit_pattern_weights
 )
 from context.models import (
     ContextRequest,
@@ -377,7 +379,7 @@ class TestContextLearningSystemInit:
         assert learning_system.pattern_confidence_threshold == 0.7
         assert learning_system.enable_persistence is True
         
-        assert isinstance(learning_system.file_features, dict)
+        assert isinstance(learning_system.file_features, MutableMapping)
         assert isinstance(learning_system.learning_patterns, dict)
         assert isinstance(learning_system.feedback_history, deque)
         assert len(learning_system.file_features) == 0
@@ -410,9 +412,9 @@ class TestContextLearningSystemInit:
         assert expected_dir.exists()
         
         # Check file paths
-        assert learning_system.patterns_file == expected_dir / "patterns.pkl"
-        assert learning_system.features_file == expected_dir / "features.pkl"
-        assert learning_system.feedback_file == expected_dir / "feedback.json"
+        assert learning_system.patterns_file == expected_dir / "patterns.json"
+        assert learning_system.features_file == expected_dir / "features.npy"
+        assert learning_system.feedback_file == expected_dir / "feedback.jsonl"
     
     def test_feature_extractors_initialization(self, temp_project):
         """Test feature extractors initialization"""
@@ -1202,6 +1204,283 @@ class TestPerformanceOptimization:
         assert optimizations["feedback_archived"] > 0
 
 
+class TestStreamingLearning:
+    """Test online weight updates and incremental pattern discovery"""
+
+    @pytest.fixture
+    def learning_system(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield ContextLearningSystem(temp_dir, enable_persistence=False)
+
+    def _accurate_feedback(self, count, agent_type="QAAgent", tdd_phase=None, offset=0):
+        return [
+            LearningFeedback(
+                context_id=f"ctx_{offset + i}",
+                agent_type=agent_type,
+                story_id="story_stream",
+                file_path=f"/test/test_file_{offset + i}.py",
+                predicted_relevance=0.8,
+                actual_relevance=0.8,
+                feedback_type="usage",
+                timestamp=datetime.utcnow(),
+                metadata={"tdd_phase": tdd_phase} if tdd_phase else {}
+            )
+            for i in range(count)
+        ]
+
+    @pytest.mark.asyncio
+    async def test_record_feedback_updates_matching_patterns_online(self, learning_system):
+        """Test each feedback sample immediately adjusts matching patterns"""
+        await learning_system.initialize()
+        code_pattern = learning_system.learning_patterns["code_agent_base"]
+        qa_pattern = learning_system.learning_patterns["qa_agent_base"]
+        code_weight = code_pattern.feature_weights["is_python"]
+        qa_weights = dict(qa_pattern.feature_weights)
+
+        await learning_system.record_feedback(
+            context_id="ctx_1",
+            agent_type="CodeAgent",
+            story_id="story_stream",
+            file_relevance_scores={"/src/service.py": 0.2}
+        )
+
+        # The pattern over-predicted relevance, so the weight shrinks
+        assert code_pattern.feature_weights["is_python"] < code_weight
+        assert code_pattern.usage_count == 1
+        assert qa_pattern.feature_weights == qa_weights
+        assert qa_pattern.usage_count == 0
+
+    @pytest.mark.asyncio
+    async def test_record_feedback_groups_by_phase(self, learning_system):
+        """Test streaming statistics are keyed by agent type and TDD phase"""
+        await learning_system.initialize()
+
+        await learning_system.record_feedback(
+            context_id="ctx_1",
+            agent_type="QAAgent",
+            story_id="story_stream",
+            file_relevance_scores={"/test/test_a.py": 0.9, "/test/test_b.py": 0.7},
+            tdd_phase=TDDState.TEST_RED
+        )
+
+        stats = learning_system.feedback_groups[("QAAgent", TDDState.TEST_RED)]
+        assert stats.sample_count == 2
+        assert learning_system.feedback_history[-1].metadata["tdd_phase"] == TDDState.TEST_RED
+
+    @pytest.mark.asyncio
+    async def test_discovery_only_processes_new_feedback(self, learning_system):
+        """Test discovery cost is proportional to feedback since the last run"""
+        await learning_system.initialize()
+        learning_system.feedback_history.extend(self._accurate_feedback(40))
+
+        assert await learning_system.discover_new_patterns() == 1
+
+        with patch.object(
+            learning_system, 'extract_file_features',
+            wraps=learning_system.extract_file_features
+        ) as extract:
+            assert await learning_system._analyze_pattern_candidates() == []
+            learning_system.feedback_history.extend(self._accurate_feedback(2, offset=40))
+            candidates = await learning_system._analyze_pattern_candidates()
+
+        assert extract.call_count == 2
+        assert [c["sample_count"] for c in candidates] == [42]
+
+    @pytest.mark.asyncio
+    async def test_discovery_refreshes_existing_pattern(self, learning_system):
+        """Test a group promoted to a pattern is updated rather than duplicated"""
+        await learning_system.initialize()
+        learning_system.feedback_history.extend(
+            self._accurate_feedback(40, tdd_phase=TDDState.TEST_RED)
+        )
+
+        assert await learning_system.discover_new_patterns() == 1
+        pattern = learning_system.learning_patterns["discovered_QAAgent_test_red"]
+        assert pattern.tdd_phases == {TDDState.TEST_RED}
+
+        learning_system.feedback_history.extend(
+            self._accurate_feedback(10, tdd_phase=TDDState.TEST_RED, offset=40)
+        )
+        pattern_count = len(learning_system.learning_patterns)
+
+        assert await learning_system.discover_new_patterns() == 0
+        assert len(learning_system.learning_patterns) == pattern_count
+        assert pattern.confidence == 1.0
+        assert learning_system.pattern_discoveries == 1
+
+    @pytest.mark.asyncio
+    async def test_update_patterns_refits_only_new_feedback(self, learning_system):
+        """Test each re-fit uses only the feedback a group received since the previous one"""
+        await learning_system.initialize()
+        learning_system.feedback_history.extend(self._accurate_feedback(12))
+
+        with patch.object(
+            learning_system, '_update_pattern_for_group',
+            wraps=learning_system._update_pattern_for_group
+        ) as update:
+            assert await learning_system.update_patterns() == 1
+            assert await learning_system.update_patterns() == 0
+            learning_system.feedback_history.extend(self._accurate_feedback(10, offset=12))
+            assert await learning_system.update_patterns() == 1
+
+        assert [len(call.args[2]) for call in update.call_args_list] == [12, 10]
+        assert not learning_system.feedback_groups[("QAAgent", None)].pending_refit
+
+    def test_refit_pattern_weights(self):
+        """Test the batch re-fit step"""
+        samples = [
+            ({"is_python": 1.0, "unused": 1.0}, 0.5, 1.0),
+            ({"is_python": 1.0}, 0.8, 0.8)
+        ]
+
+        weights, updates, accurate = _refit_pattern_weights({"is_python": 0.5}, samples, 0.1)
+
+        assert weights == {"is_python": pytest.approx(0.55)}
+        assert updates == 1
+        assert accurate == 1
+
+    @pytest.mark.asyncio
+    async def test_refit_in_worker_process_matches_inline(self):
+        """Test re-fits offloaded to the worker process give the same weights"""
+        feedback = self._accurate_feedback(5, agent_type="CodeAgent")
+        for fb in feedback:
+            fb.predicted_relevance = 0.3
+
+        results = []
+        for threshold in (10000, 0):
+            with tempfile.TemporaryDirectory() as temp_dir:
+                system = ContextLearningSystem(
+                    temp_dir, enable_persistence=False, refit_process_threshold=threshold
+                )
+                await system.initialize()
+                pattern = system.learning_patterns["code_agent_base"]
+                await system._adjust_pattern_weights(pattern, feedback)
+                results.append((dict(pattern.feature_weights), pattern.usage_count))
+                started_worker = system._refit_executor is not None
+                await system.shutdown()
+
+        assert started_worker
+        assert results[0] == results[1]
+
+
+class TestBatchRelevancePrediction:
+    """Test batch relevance prediction"""
+
+    @pytest.fixture
+    def temp_project(self):
+        """Create temporary project with a mix of files"""
+        temp_dir = tempfile.mkdtemp()
+        project = Path(temp_dir)
+        (project / "lib").mkdir()
+        (project / "tests").mkdir()
+        (project / "lib" / "service.py").write_text("class Service:\n    def run(self):\n        pass\n")
+        (project / "tests" / "test_service.py").write_text("import pytest\n\ndef test_run():\n    pass\n")
+        (project / "README.md").write_text("# Project\n")
+        (project / "config.json").write_text("{}")
+        yield temp_dir
+        shutil.rmtree(temp_dir)
+
+    @pytest.fixture
+    def learning_system(self, temp_project):
+        """Create learning system without persistence"""
+        return ContextLearningSystem(temp_project, enable_persistence=False)
+
+    def _files(self, temp_project):
+        project = Path(temp_project)
+        return [
+            str(project / "lib" / "service.py"),
+            str(project / "tests" / "test_service.py"),
+            str(project / "README.md"),
+            str(project / "config.json"),
+        ]
+
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("strategy", [LearningStrategy.ENSEMBLE, LearningStrategy.FEEDBACK_BASED])
+    @pytest.mark.parametrize("agent_type,phase", [
+        ("CodeAgent", TDDState.CODE_GREEN),
+        ("QAAgent", TDDState.TEST_RED),
+        ("DesignAgent", None),
+    ])
+    async def test_batch_matches_single_predictions(
+        self, learning_system, temp_project, strategy, agent_type, phase
+    ):
+        """Test batch scores equal per-file predict_relevance scores"""
+        learning_system.strategy = strategy
+        await learning_system.initialize()
+        request = ContextRequest(
+            agent_type=agent_type,
+            story_id="story_batch",
+            task={"current_state": phase} if phase else None
+        )
+        files = self._files(temp_project)
+
+        batch = await learning_system.predict_relevance_batch(files, request)
+
+        for file_path in files:
+            single = await learning_system.predict_relevance(file_path, request)
+            assert batch[file_path] == pytest.approx(single)
+
+    @pytest.mark.asyncio
+    async def test_batch_uses_baseline_without_patterns(self, learning_system, temp_project):
+        """Test baseline scoring when no pattern applies"""
+        await learning_system.initialize()
+        learning_system.learning_patterns.clear()
+        request = ContextRequest(agent_type="QAAgent", story_id="story_batch")
+        files = self._files(temp_project)
+
+        batch = await learning_system.predict_relevance_batch(files, request)
+
+        assert batch[files[1]] > batch[files[0]]
+        for file_path in files:
+            assert batch[file_path] == pytest.approx(
+                await learning_system.predict_relevance(file_path, request)
+            )
+
+    @pytest.mark.asyncio
+    async def test_batch_refreshes_only_stale_files(self, learning_system, temp_project):
+        """Test that only files modified since extraction are re-extracted"""
+        await learning_system.initialize()
+        request = ContextRequest(agent_type="CodeAgent", story_id="story_batch")
+        files = self._files(temp_project)
+        await learning_system.predict_relevance_batch(files, request)
+
+        # Make one file look modified after its features were extracted
+        stale = learning_system.file_features[files[0]]
+        stale.last_updated = stale.last_updated - timedelta(days=365)
+
+        with patch.object(
+            learning_system, '_extract_features_internal',
+            wraps=learning_system._extract_features_internal
+        ) as extract:
+            await learning_system.predict_relevance_batch(files, request)
+
+        assert [call.args[0] for call in extract.call_args_list] == [files[0]]
+
+    @pytest.mark.asyncio
+    async def test_batch_handles_missing_and_duplicate_paths(self, learning_system, temp_project):
+        """Test missing tracked files score zero and duplicates are scored once"""
+        await learning_system.initialize()
+        request = ContextRequest(agent_type="CodeAgent", story_id="story_batch")
+        files = self._files(temp_project)
+        await learning_system.predict_relevance_batch(files, request)
+        Path(files[0]).unlink()
+        predictions_before = learning_system.total_predictions
+
+        batch = await learning_system.predict_relevance_batch([files[0], files[2], files[2]], request)
+
+        assert batch[files[0]] == 0.0
+        assert set(batch) == {files[0], files[2]}
+        assert learning_system.total_predictions == predictions_before + 2
+
+    @pytest.mark.asyncio
+    async def test_batch_empty_input(self, learning_system):
+        """Test empty batch"""
+        await learning_system.initialize()
+        request = ContextRequest(agent_type="CodeAgent", story_id="story_batch")
+
+        assert await learning_system.predict_relevance_batch([], request) == {}
+
+
 class TestPersistence:
     """Test persistence functionality"""
     
@@ -0,0 +1,307 @@
+"""
+Test suite for the context learning store.
+
+Tests the memory-mapped feature matrix with its delta log, the lazy feature
+map used by ContextLearningSystem, the append-only feedback log and the
+versioned pattern file.
+"""
+
+import pytest
+import asyncio
+import json
+import tempfile
+import threading
+from pathlib import Path
+from datetime import datetime
+from unittest.mock import patch
+
+import numpy as np
+
+# Import the modules under test
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "lib"))
+
+from context_learning_store import (
+    FeatureMatrixStore,
+    FeatureRecord,
+    FeedbackLog,
+    LazyFeatureMap,
+    PatternFile
+)
+from context_learning import (
+    ContextLearningSystem,
+    FileFeatures,
+    LearningFeedback,
+    LearningPattern
+)
+from tdd_models import TDDState
+
+
+@pytest.fixture
+def temp_dir():
+    """Create a temporary directory"""
+    with tempfile.TemporaryDirectory() as directory:
+        yield Path(directory)
+
+
+def _feature_map(store):
+    """Create a lazy map of FileFeatures over a store"""
+    return LazyFeatureMap(store, FileFeatures.from_record, FileFeatures.to_record)
+
+
+def _features(path, **values):
+    """Create FileFeatures with the given feature values"""
+    return FileFeatures(file_path=path, features=values, last_updated=datetime.utcnow())
+
+
+class TestFeatureMatrixStore:
+    """Test the columnar feature store"""
+
+    def test_roundtrip_through_compaction(self, temp_dir):
+        """Test sparse feature vectors survive compaction into the matrix"""
+        store = FeatureMatrixStore(temp_dir)
+        store.load()
+        features = _feature_map(store)
+        features["a.py"] = _features("a.py", is_python=1.0, path_depth=2.0)
+        features["b.md"] = _features("b.md", is_markdown=1.0)
+        features["a.py"].add_relevance_score(0.7)
+        features.flush()
+        store.compact()
+
+        reloaded = FeatureMatrixStore(temp_dir)
+        reloaded.load()
+        record = reloaded.read("a.py")
+
+        assert record.features == {"is_python": 1.0, "path_depth": 2.0}
+        assert record.relevance_history == [0.7]
+        assert reloaded.read("b.md").features == {"is_markdown": 1.0}
+        assert reloaded.delta_entries == 0
+        assert not store.delta_file.exists()
+
+    def test_base_snapshot_is_memory_mapped(self, temp_dir):
+        """Test that loading opens the matrix with mmap instead of reading it"""
+        store = FeatureMatrixStore(temp_dir)
+        store.load()
+        store.append_deltas([FeatureRecord("a.py", {"is_python": 1.0}, datetime.utcnow())], [])
+        store.compact()
+
+        assert isinstance(store._matrix, np.memmap)
+
+    def test_delta_log_replayed_over_base(self, temp_dir):
+        """Test that later deltas and deletions override the base snapshot"""
+        store = FeatureMatrixStore(temp_dir)
+        store.load()
+        store.append_deltas([
+            FeatureRecord("a.py", {"x": 1.0}, datetime.utcnow()),
+            FeatureRecord("b.py", {"x": 2.0}, datetime.utcnow())
+        ], [])
+        store.compact()
+        store.append_deltas([FeatureRecord("a.py", {"x": 5.0}, datetime.utcnow())], ["b.py"])
+
+        reloaded = FeatureMatrixStore(temp_dir)
+        reloaded.load()
+
+        assert reloaded.read("a.py").features == {"x": 5.0}
+        assert not reloaded.contains("b.py")
+        assert list(reloaded.paths()) == ["a.py"]
+
+    def test_compaction_threshold(self, temp_dir):
+        """Test compaction triggers once the delta log outgrows the base"""
+        store = FeatureMatrixStore(temp_dir, compaction_min_entries=3)
+        store.load()
+        features = _feature_map(store)
+        for i in range(4):
+            features[f"f{i}.py"] = _features(f"f{i}.py", x=float(i))
+        features.flush()
+
+        assert store.delta_entries == 0
+        assert store.index_file.exists()
+        assert store.count() == 4
+
+
+class TestLazyFeatureMap:
+    """Test lazy materialization and delta tracking"""
+
+    def test_only_changed_entries_are_written(self, temp_dir):
+        """Test that flush writes deltas only for modified entries"""
+        store = FeatureMatrixStore(temp_dir)
+        store.load()
+        features = _feature_map(store)
+        for i in range(5):
+            features[f"f{i}.py"] = _features(f"f{i}.py", x=float(i))
+        assert features.flush() == 5
+        store.compact()
+
+        features = _feature_map(store)
+        _ = features["f0.py"]
+        features["f1.py"].access_count += 1
+
+        assert features.flush() == 1
+        assert features.flush() == 0
+
+    @pytest.mark.asyncio
+    async def test_persist_compacts_a_snapshot_off_the_loop(self, temp_dir):
+        """Test that the store stays readable while persist() compacts in a worker thread"""
+        store = FeatureMatrixStore(temp_dir, compaction_min_entries=2)
+        store.load()
+        features = _feature_map(store)
+        for i in range(5):
+            features[f"f{i}.py"] = _features(f"f{i}.py", x=float(i))
+
+        started, release = threading.Event(), threading.Event()
+        compacted = []
+        compact = FeatureMatrixStore.compact
+
+        def blocking_compact(self):
+            compacted.append(self)
+            started.set()
+            release.wait(5)
+            compact(self)
+
+        with patch.object(FeatureMatrixStore, "compact", blocking_compact):
+            persist = asyncio.create_task(features.persist())
+            await asyncio.to_thread(started.wait, 5)
+
+            # The loop keeps using the live store while the snapshot is compacted
+            assert store.count() == 5
+            assert store.read("f3.py").features == {"x": 3.0}
+            features["f5.py"] = _features("f5.py", x=5.0)
+
+            release.set()
+            assert await persist == 5
+
+        assert compacted[0] is not store
+        assert store.delta_entries == 0 and store.count() == 5
+        assert features.flush() == 1
+
+        reloaded = FeatureMatrixStore(temp_dir)
+        reloaded.load()
+        assert reloaded.count() == 6
+        assert reloaded.read("f3.py").features == {"x": 3.0}
+
+    def test_entries_materialized_on_access(self, temp_dir):
+        """Test that reading the map does not materialize every row"""
+        store = FeatureMatrixStore(temp_dir)
+        store.load()
+        store.append_deltas([
+            FeatureRecord(f"f{i}.py", {"x": float(i)}, datetime.utcnow()) for i in range(10)
+        ], [])
+        store.compact()
+
+        features = _feature_map(store)
+        assert len(features) == 10
+        assert "f3.py" in features
+        assert features._loaded == {}
+
+        assert features["f3.py"].features == {"x": 3.0}
+        assert list(features._loaded) == ["f3.py"]
+
+    def test_delete_is_persisted(self, temp_dir):
+        """Test that deletions are written as tombstones"""
+        store = FeatureMatrixStore(temp_dir)
+        store.load()
+        features = _feature_map(store)
+        features["a.py"] = _features("a.py", x=1.0)
+        features.flush()
+
+        del features["a.py"]
+        assert "a.py" not in features
+        features.flush()
+
+        reloaded = FeatureMatrixStore(temp_dir)
+        reloaded.load()
+        assert not reloaded.contains("a.py")
+
+
+class TestFeedbackLogAndPatternFile:
+    """Test feedback log and pattern file formats"""
+
+    def test_feedback_log_appends_and_compacts(self, temp_dir):
+        """Test the log appends records and keeps only the newest on compaction"""
+        log = FeedbackLog(temp_dir / "feedback.jsonl", max_entries=3)
+        log.append([{"n": 1}, {"n": 2}])
+        log.append([{"n": 3}, {"n": 4}])
+
+        assert [r["n"] for r in log.read()] == [2, 3, 4]
+
+        log.append([{"n": 5}, {"n": 6}, {"n": 7}])
+        lines = (temp_dir / "feedback.jsonl").read_text().splitlines()
+        assert [json.loads(line)["n"] for line in lines] == [5, 6, 7]
+
+    def test_pattern_file_rewritten_only_on_change(self, temp_dir):
+        """Test unchanged patterns are not rewritten"""
+        pattern_file = PatternFile(temp_dir / "patterns.json")
+        patterns = [{"pattern_id": "p1", "success_rate": 0.5}]
+
+        assert pattern_file.write(patterns) is True
+        assert pattern_file.write(patterns) is False
+        assert pattern_file.write([{"pattern_id": "p1", "success_rate": 0.6}]) is True
+        assert json.loads((temp_dir / "patterns.json").read_text())["version"] == 1
+
+    def test_pattern_file_rejects_unknown_version(self, temp_dir):
+        """Test that documents from an unknown format version are refused"""
+        (temp_dir / "patterns.json").write_text(json.dumps({"version": 99, "patterns": []}))
+
+        with pytest.raises(ValueError):
+            PatternFile(temp_dir / "patterns.json").read()
+
+
+class TestLearningSystemPersistence:
+    """Test ContextLearningSystem persistence through the store"""
+
+    @pytest.mark.asyncio
+    async def test_persist_and_load_roundtrip(self, temp_dir):
+        """Test patterns, features and feedback survive a restart"""
+        system = ContextLearningSystem(str(temp_dir))
+        await system.initialize()
+        system.learning_patterns["custom"] = LearningPattern(
+            pattern_id="custom",
+            pattern_type="test",
+            agent_types={"CodeAgent"},
+            tdd_phases={TDDState.CODE_GREEN},
+            feature_weights={"is_python": 0.9},
+            success_rate=0.85,
+            confidence=0.8
+        )
+        system.file_features["a.py"] = _features("a.py", is_python=1.0)
+        system.feedback_history.append(LearningFeedback(
+            context_id="ctx", agent_type="CodeAgent", story_id="s1", file_path="a.py",
+            predicted_relevance=0.5, actual_relevance=0.9, feedback_type="usage",
+            timestamp=datetime.utcnow(), metadata={"tdd_phase": TDDState.CODE_GREEN}
+        ))
+        await system._persist_patterns()
+
+        restored = ContextLearningSystem(str(temp_dir))
+        await restored.initialize()
+
+        assert restored.learning_patterns["custom"].tdd_phases == {TDDState.CODE_GREEN}
+        assert restored.file_features["a.py"].features == {"is_python": 1.0}
+        assert len(restored.feedback_history) == 1
+        assert restored.feedback_history[0].metadata["tdd_phase"] == "code_green"
+
+    @pytest.mark.asyncio
+    async def test_feedback_persisted_incrementally(self, temp_dir):
+        """Test that each persist appends only new feedback"""
+        system = ContextLearningSystem(str(temp_dir))
+        await system.initialize()
+
+        for i in range(3):
+            system.feedback_history.append(LearningFeedback(
+                context_id=f"ctx{i}", agent_type="CodeAgent", story_id="s1", file_path="a.py",
+                predicted_relevance=0.5, actual_relevance=0.5, feedback_type="usage",
+                timestamp=datetime.utcnow()
+            ))
+            await system._persist_patterns()
+
+        lines = system.feedback_file.read_text().splitlines()
+        assert [json.loads(line)["context_id"] for line in lines] == ["ctx0", "ctx1", "ctx2"]
+
+    @pytest.mark.asyncio
+    async def test_legacy_pickles_are_not_loaded(self, temp_dir):
+        """Test that legacy pickle dumps are ignored rather than unpickled"""
+        system = ContextLearningSystem(str(temp_dir))
+        (system.persistence_dir / "patterns.pkl").write_bytes(b"not a pickle")
+
+        await system.initialize()
+
+        assert "code_agent_base" in system.learning_patterns
@@ -0,0 +1,241 @@
+"""
+Test suite for the shared file lock manager.
+
+Tests shared/exclusive compatibility, directory locks, FIFO waiting with
+timeouts, deadlock detection, lock expiry and hold-time metrics.
+"""
+
+import asyncio
+import pytest
+from pathlib import Path
+
+# Import the modules under test
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "lib"))
+
+from file_lock_manager import (
+    FileLockManager, LockMode, LockTimeoutError, DeadlockError, parse_lock_target
+)
+
+
+@pytest.fixture
+def lock_manager():
+    """Create a test lock manager"""
+    return FileLockManager()
+
+
+class TestLockCompatibility:
+    """Test which locks can be held together"""
+    
+    def test_shared_locks_coexist(self, lock_manager):
+        """Test that several readers can hold the same file"""
+        assert lock_manager.try_acquire("cycle-1", "lib/models.py", LockMode.SHARED)
+        assert lock_manager.try_acquire("cycle-2", "lib/models.py", LockMode.SHARED)
+        assert not lock_manager.try_acquire("cycle-3", "lib/models.py", LockMode.EXCLUSIVE)
+        assert lock_manager.lock_count() == 2
+    
+    def test_exclusive_lock_blocks_readers(self, lock_manager):
+        """Test that a writer excludes readers of the same file only"""
+        assert lock_manager.try_acquire("cycle-1", "lib/models.py", LockMode.EXCLUSIVE)
+        assert not lock_manager.try_acquire("cycle-2", "lib/models.py", LockMode.SHARED)
+        assert lock_manager.try_acquire("cycle-2", "lib/views.py", LockMode.SHARED)
+    
+    def test_reentrant_acquire_and_upgrade(self, lock_manager):
+        """Test that an owner may re-acquire and upgrade its own lock"""
+        assert lock_manager.try_acquire("cycle-1", "a.py", LockMode.SHARED)
+        assert lock_manager.try_acquire("cycle-1", "a.py", LockMode.EXCLUSIVE)
+        assert lock_manager.held_mode("cycle-1", "a.py") == LockMode.EXCLUSIVE
+        
+        # Each acquisition needs its own release
+        assert not lock_manager.release("cycle-1", "a.py")
+        assert lock_manager.release("cycle-1", "a.py")
+        assert lock_manager.held_mode("cycle-1", "a.py") is None
+    
+    def test_upgrade_refused_while_others_read(self, lock_manager):
+        """Test that a shared lock cannot be upgraded under other readers"""
+        lock_manager.try_acquire("cycle-1", "a.py", LockMode.SHARED)
+        lock_manager.try_acquire("cycle-2", "a.py", LockMode.SHARED)
+        assert not lock_manager.try_acquire("cycle-1", "a.py", LockMode.EXCLUSIVE)
+    
+    def test_try_acquire_all_is_atomic(self, lock_manager):
+        """Test that a failed batch acquisition takes no locks"""
+        lock_manager.try_acquire("cycle-1", "b.py")
+        assert not lock_manager.try_acquire_all("cycle-2", [("a.py", LockMode.EXCLUSIVE), ("b.py", LockMode.SHARED)])
+        assert lock_manager.owner_locks("cycle-2") == []
+    
+    def test_find_conflicts(self, lock_manager):
+        """Test reporting the holds that block a request"""
+        lock_manager.try_acquire("cycle-1", "a.py", LockMode.SHARED)
+        lock_manager.try_acquire("cycle-2", "b.py", LockMode.EXCLUSIVE)
+        conflicts = lock_manager.find_conflicts("cycle-3", [("a.py", LockMode.SHARED), ("b.py", LockMode.SHARED)])
+        assert [(hold.owner, hold.path) for hold in conflicts] == [("cycle-2", "b.py")]
+
+
+class TestDirectoryLocks:
+    """Test directory granularity"""
+    
+    def test_parse_lock_target(self):
+        """Test path normalization"""
+        assert parse_lock_target("./lib//models.py") == ("lib/models.py", False)
+        assert parse_lock_target("lib/") == ("lib", True)
+        assert parse_lock_target(".") == (".", True)
+    
+    def test_directory_lock_covers_files(self, lock_manager):
+        """Test that a directory lock conflicts with files below it"""
+        assert lock_manager.try_acquire("cycle-1", "lib/", LockMode.EXCLUSIVE)
+        assert not lock_manager.try_acquire("cycle-2", "lib/context/models.py", LockMode.SHARED)
+        assert lock_manager.try_acquire("cycle-2", "library/models.py", LockMode.EXCLUSIVE)
+    
+    def test_directory_lock_waits_for_files(self, lock_manager):
+        """Test that a directory lock conflicts with held files below it"""
+        lock_manager.try_acquire("cycle-1", "lib/models.py", LockMode.SHARED)
+        assert lock_manager.try_acquire("cycle-2", "lib/", LockMode.SHARED)
+        assert not lock_manager.try_acquire("cycle-3", "lib/", LockMode.EXCLUSIVE)
+    
+    def test_file_lock_does_not_cover_directory_siblings(self, lock_manager):
+        """Test that a file lock on a directory path is not a directory lock"""
+        lock_manager.try_acquire("cycle-1", "lib", LockMode.EXCLUSIVE)
+        assert lock_manager.try_acquire("cycle-2", "lib/models.py", LockMode.EXCLUSIVE)
+
+
+class TestWaiting:
+    """Test queued acquisition"""
+    
+    @pytest.mark.asyncio
+    async def test_waiters_granted_in_fifo_order(self, lock_manager):
+        """Test that waiters are granted in arrival order"""
+        lock_manager.try_acquire("holder", "a.py")
+        granted = []
+        
+        async def wait_for_lock(owner):
+            await lock_manager.acquire(owner, "a.py", timeout=1.0)
+            granted.append(owner)
+            await asyncio.sleep(0.01)
+            lock_manager.release(owner, "a.py")
+        
+        waiters = [asyncio.create_task(wait_for_lock(f"cycle-{i}")) for i in range(3)]
+        await asyncio.sleep(0.01)
+        
+        # New requests queue behind earlier waiters instead of barging
+        assert not lock_manager.try_acquire("late", "a.py")
+        
+        lock_manager.release("holder", "a.py")
+        await asyncio.gather(*waiters)
+        assert granted == ["cycle-0", "cycle-1", "cycle-2"]
+    
+    @pytest.mark.asyncio
+    async def test_shared_waiters_granted_together(self, lock_manager):
+        """Test that a release admits every compatible waiter at the head of the queue"""
+        lock_manager.try_acquire("writer", "a.py", LockMode.EXCLUSIVE)
+        readers = [
+            asyncio.create_task(lock_manager.acquire(f"reader-{i}", "a.py", LockMode.SHARED, timeout=1.0))
+            for i in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        
+        lock_manager.release("writer", "a.py")
+        await asyncio.gather(*readers)
+        assert len(lock_manager.holders("a.py")) == 3
+    
+    @pytest.mark.asyncio
+    async def test_timeout(self, lock_manager):
+        """Test that a waiter gives up after its timeout"""
+        lock_manager.try_acquire("holder", "a.py")
+        
+        with pytest.raises(LockTimeoutError):
+            await lock_manager.acquire("cycle-1", "a.py", timeout=0.02)
+        
+        assert lock_manager.waiter_count() == 0
+        assert lock_manager.get_metrics()["timeouts"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_deadlock_detected(self, lock_manager):
+        """Test that closing a cycle in the wait-for graph raises instead of hanging"""
+        lock_manager.try_acquire("cycle-1", "a.py")
+        lock_manager.try_acquire("cycle-2", "b.py")
+        
+        first = asyncio.create_task(lock_manager.acquire("cycle-1", "b.py", timeout=1.0))
+        await asyncio.sleep(0.01)
+        
+        with pytest.raises(DeadlockError) as exc_info:
+            await lock_manager.acquire("cycle-2", "a.py", timeout=1.0)
+        assert exc_info.value.cycle[0] == exc_info.value.cycle[-1] == "cycle-2"
+        
+        lock_manager.release_owner("cycle-2")
+        await first
+        assert lock_manager.held_mode("cycle-1", "b.py") == LockMode.EXCLUSIVE
+        assert lock_manager.get_metrics()["deadlocks"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_blocked_by_reports_holders_and_earlier_waiters(self, lock_manager):
+        """Test the wait-for graph queries"""
+        lock_manager.try_acquire("holder", "a.py")
+        waiters = [
+            asyncio.create_task(lock_manager.acquire(owner, "a.py", timeout=1.0))
+            for owner in ("cycle-1", "cycle-2")
+        ]
+        await asyncio.sleep(0.01)
+        
+        assert lock_manager.waiting_owners() == ["cycle-1", "cycle-2"]
+        assert lock_manager.blocked_by("cycle-1") == {"holder"}
+        assert lock_manager.blocked_by("cycle-2") == {"holder", "cycle-1"}
+        assert lock_manager.blocked_by("holder") == set()
+        
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+    
+    @pytest.mark.asyncio
+    async def test_acquire_all_orders_locks(self, lock_manager):
+        """Test that batch waits cannot deadlock each other"""
+        async def worker(owner, paths):
+            await lock_manager.acquire_all(owner, [(path, LockMode.EXCLUSIVE) for path in paths], timeout=1.0)
+            await asyncio.sleep(0.01)
+            lock_manager.release_owner(owner)
+        
+        await asyncio.gather(worker("cycle-1", ["a.py", "b.py"]), worker("cycle-2", ["b.py", "a.py"]))
+        assert lock_manager.lock_count() == 0
+
+
+class TestExpiryAndMetrics:
+    """Test lock TTLs, release listeners and metrics"""
+    
+    @pytest.mark.asyncio
+    async def test_expired_locks_released(self, lock_manager):
+        """Test that only locks past their TTL are released"""
+        lock_manager.try_acquire("cycle-1", "stale.py", ttl=0.01)
+        lock_manager.try_acquire("cycle-1", "fresh.py", ttl=60)
+        await asyncio.sleep(0.02)
+        
+        expired = lock_manager.expire_locks()
+        
+        assert [hold.path for hold in expired] == ["stale.py"]
+        assert [hold.path for hold in lock_manager.owner_locks("cycle-1")] == ["fresh.py"]
+        assert 0 < lock_manager.next_expiry() <= 60
+    
+    def test_release_listener(self, lock_manager):
+        """Test that listeners hear about every freed lock"""
+        released = []
+        lock_manager.add_release_listener(lambda path, owner: released.append((path, owner)))
+        lock_manager.try_acquire_all("cycle-1", [("a.py", LockMode.EXCLUSIVE), ("lib/", LockMode.SHARED)])
+        
+        lock_manager.release_owner("cycle-1")
+        
+        assert sorted(released) == [("a.py", "cycle-1"), ("lib", "cycle-1")]
+    
+    def test_hold_time_metrics(self, lock_manager):
+        """Test hold-time metrics per lock mode"""
+        lock_manager.try_acquire("cycle-1", "a.py", LockMode.EXCLUSIVE)
+        lock_manager.try_acquire("cycle-2", "b.py", LockMode.SHARED)
+        lock_manager.try_acquire("cycle-3", "b.py", LockMode.SHARED)
+        lock_manager.release_owner("cycle-1")
+        lock_manager.release_owner("cycle-2")
+        
+        metrics = lock_manager.get_metrics()
+        
+        assert metrics["acquired"] == 3
+        assert metrics["released"] == 2
+        assert metrics["held_locks"] == 1
+        assert metrics["hold_times"]["exclusive"]["count"] == 1
+        assert metrics["hold_times"]["shared"]["count"] == 1
+        assert metrics["hold_times"]["shared"]["max"] >= 0.0
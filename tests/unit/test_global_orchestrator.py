@@ -24,6 +24,8 @@ from lib.global_orchestrator import (
 from lib.multi_project_config import (
     MultiProjectConfigManager, ProjectConfig, ProjectPriority, ProjectStatus
 )
+from lib.process_resource_sampler import ProcessTreeUsage
+from lib.resource_scheduler import ResourceQuota, ResourceScheduler, ResourceUsage
 
 
 class TestProjectOrchestrator:
@@ -290,6 +292,9 @@ class TestGlobalOrchestrator:
         assert env["ORCH_MAX_AGENTS"] == "3"
         assert env["ORCH_MEMORY_LIMIT"] == "1024"
         assert env["ORCH_CPU_LIMIT"] == "20.0"
+        assert float(env["ORCH_CPU_CORES"]) == pytest.approx(
+            0.2 * global_orchestrator.global_config.global_cpu_cores
+        )
         assert env["ORCH_GLOBAL_MODE"] == "true"
 
     @pytest.mark.asyncio
@@ -511,6 +516,48 @@ class TestGlobalOrchestrator:
             assert orchestrator.memory_usage == 512.0
             assert orchestrator.last_heartbeat is not None
 
+    @pytest.mark.asyncio
+    async def test_sample_project_resources_feeds_scheduler(self, global_orchestrator):
+        """Test that measured process tree usage reaches the resource scheduler."""
+        orchestrator = ProjectOrchestrator(
+            project_name="sampled",
+            project_path="/path/to/project",
+            status=OrchestratorStatus.RUNNING,
+            pid=4321
+        )
+        global_orchestrator.orchestrators["sampled"] = orchestrator
+        global_orchestrator.orchestrators["stopped"] = ProjectOrchestrator(
+            project_name="stopped", project_path="/path/to/other", pid=999
+        )
+        
+        scheduler = ResourceScheduler(total_resources=ResourceQuota(cpu_cores=8.0, memory_mb=16384, max_agents=10))
+        scheduler.register_project(ProjectConfig(name="sampled", path="/path/to/project"))
+        scheduler.project_schedules["sampled"].current_usage = ResourceUsage(active_agents=2)
+        global_orchestrator.resource_scheduler = scheduler
+        
+        global_orchestrator.resource_sampler = Mock()
+        global_orchestrator.resource_sampler.sample.return_value = {
+            "sampled": ProcessTreeUsage(
+                root_pid=4321, cpu_cores=1.5, memory_mb=300.0,
+                read_mb_per_second=2.0, write_mb_per_second=1.0,
+                process_count=4, interval_seconds=30.0
+            )
+        }
+        
+        await global_orchestrator._sample_project_resources()
+        
+        # Only running orchestrators are sampled
+        global_orchestrator.resource_sampler.sample.assert_called_once_with({"sampled": 4321})
+        assert orchestrator.cpu_usage == 150.0
+        assert orchestrator.memory_usage == 300.0
+        
+        usage = scheduler.project_schedules["sampled"].current_usage
+        assert usage.cpu_usage == 1.5
+        assert usage.memory_usage_mb == 300
+        assert usage.disk_io_mbps == 3.0
+        assert usage.active_agents == 2
+        assert scheduler.project_schedules["sampled"].average_utilization["cpu"] > 0
+
     @pytest.mark.asyncio
     async def test_collect_metrics(self, global_orchestrator, config_manager):
         """Test collecting global metrics."""
@@ -1500,6 +1547,38 @@ class TestGlobalOrchestrator:
         await global_orchestrator._handle_project_dependencies()
         # Should complete without error
 
+    @pytest.mark.asyncio
+    async def test_rebalance_resources_updates_limits_live(self, global_orchestrator, config_manager, sample_project_config):
+        """Test that a changed allocation is applied to the running orchestrator's limits."""
+        config_manager.projects["sample-project"] = sample_project_config
+        allocation = await global_orchestrator._calculate_resource_allocation(sample_project_config)
+        global_orchestrator.resource_allocations["sample-project"] = allocation
+        global_orchestrator.orchestrators["sample-project"] = ProjectOrchestrator(
+            project_name="sample-project",
+            project_path=sample_project_config.path,
+            # Other tests reload the module, so use the status class the orchestrator sees now
+            status=sys.modules["lib.global_orchestrator"].OrchestratorStatus.RUNNING,
+            pid=4321
+        )
+        global_orchestrator.resource_limiter = Mock()
+        
+        # Unchanged allocations are left alone
+        await global_orchestrator._rebalance_resources()
+        global_orchestrator.resource_limiter.update.assert_not_called()
+        
+        # Lowering the project's CPU priority halves its CPU allocation
+        sample_project_config.resource_limits.cpu_priority = 0.5
+        previous_cpu = allocation.allocated_cpu_percent
+        await global_orchestrator._rebalance_resources()
+        
+        assert allocation.allocated_cpu_percent == previous_cpu / 2
+        name, pid, limits = global_orchestrator.resource_limiter.update.call_args.args
+        assert (name, pid) == ("sample-project", 4321)
+        assert limits.cpu_cores == pytest.approx(
+            allocation.allocated_cpu_percent / 100 * global_orchestrator.global_config.global_cpu_cores
+        )
+        assert limits.memory_mb == allocation.allocated_memory_mb
+
     @pytest.mark.asyncio
     async def test_rebalance_resources_placeholder(self, global_orchestrator):
         """Test resource rebalancing (placeholder implementation)."""
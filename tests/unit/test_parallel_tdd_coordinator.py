@@ -26,6 +26,16 @@ except ImportError:
     mock_websockets = Mock()
     sys.modules['websockets'] = mock_websockets
 
+from lib.parallel_tdd_coordinator import (
+    ParallelTDDCoordinator as EventDrivenCoordinator,
+    CycleStatus as ParallelCycleStatus,
+    AdmissionController
+)
+from lib.file_lock_manager import FileLockManager, LockMode
+from lib.resource_scheduler import ResourceQuota, ResourceUsage
+from lib.tdd_models import TDDCycle as ModelTDDCycle, TDDTask as ModelTDDTask, TDDState
+from lib.tdd_models import TestFile as ModelTestFile
+
 # Since the parallel_tdd_coordinator has complex dependencies, we'll mock the tests
 # This test file needs the actual implementation to be completed first
 
@@ -605,4 +615,436 @@ class TestParallelTDDCoordinator:
         # State should be restored
         assert "STORY-1" in coordinator.active_cycles
         restored_manager = coordinator.active_cycles["STORY-1"]
-        assert restored_manager.story_id == "STORY-1"
\ No newline at end of file
+        assert restored_manager.story_id == "STORY-1"
+
+
+class TestEventDrivenCoordination:
+    """Test that the coordinator reacts to events instead of polling."""
+    
+    @pytest.fixture
+    def context_manager(self):
+        """Create a mock context manager."""
+        manager = Mock()
+        manager.register_story = AsyncMock()
+        manager.unregister_story = AsyncMock()
+        manager.detect_story_conflicts = AsyncMock(return_value=[])
+        return manager
+    
+    @pytest.fixture
+    def event_coordinator(self, context_manager):
+        """Create a coordinator with an idle interval far beyond the test timeouts."""
+        return EventDrivenCoordinator(
+            context_manager=context_manager,
+            max_parallel_cycles=3,
+            coordination_check_interval=60.0,
+            performance_monitoring=False
+        )
+    
+    def _cycle_touching(self, story_id, *file_paths):
+        """Create a TDD cycle whose task writes the given test files."""
+        task = ModelTDDTask(
+            description=f"{story_id} task",
+            test_file_objects=[ModelTestFile(file_path=path) for path in file_paths]
+        )
+        return ModelTDDCycle(story_id=story_id, tasks=[task])
+    
+    async def _wait_for_status(self, coordinator, cycle_id, status, timeout=2.0):
+        """Wait until a cycle reaches the given status."""
+        deadline = asyncio.get_event_loop().time() + timeout
+        while coordinator.parallel_cycles[cycle_id].status != status:
+            assert asyncio.get_event_loop().time() < deadline, f"cycle never became {status}"
+            await asyncio.sleep(0.01)
+    
+    @pytest.mark.asyncio
+    async def test_submission_starts_cycle_without_waiting_for_interval(self, event_coordinator):
+        """Test that submitting a cycle wakes the loop immediately."""
+        await event_coordinator.start()
+        try:
+            cycle_id = await event_coordinator.submit_cycle(ModelTDDCycle(story_id="STORY-1"))
+            await self._wait_for_status(event_coordinator, cycle_id, ParallelCycleStatus.ACTIVE)
+        finally:
+            await event_coordinator.stop()
+    
+    @pytest.mark.asyncio
+    async def test_notify_cycle_updated_completes_cycle(self, event_coordinator):
+        """Test that reporting a state change is handled on the next pass."""
+        await event_coordinator.start()
+        try:
+            tdd_cycle = ModelTDDCycle(story_id="STORY-1")
+            cycle_id = await event_coordinator.submit_cycle(tdd_cycle)
+            await self._wait_for_status(event_coordinator, cycle_id, ParallelCycleStatus.ACTIVE)
+            
+            tdd_cycle.current_state = TDDState.COMMIT
+            event_coordinator.notify_cycle_updated(cycle_id)
+            
+            await self._wait_for_status(event_coordinator, cycle_id, ParallelCycleStatus.COMPLETED)
+            assert event_coordinator.parallel_cycles[cycle_id].resource_locks == set()
+        finally:
+            await event_coordinator.stop()
+    
+    @pytest.mark.asyncio
+    async def test_phase_completion_records_written_files(self, event_coordinator):
+        """Test that each completed phase reports the cycle's files to the conflict resolver."""
+        resolver = Mock()
+        resolver.capture_base_snapshots = AsyncMock()
+        resolver.cycle_files = Mock(return_value=["src/shared.py"])
+        resolver.record_cycle_version = AsyncMock()
+        event_coordinator.conflict_resolver = resolver
+        
+        tdd_cycle = ModelTDDCycle(story_id="STORY-1")
+        cycle_id = await event_coordinator.submit_cycle(tdd_cycle)
+        await event_coordinator._start_pending_cycles()
+        
+        await event_coordinator._update_cycle_statuses()
+        resolver.record_cycle_version.assert_not_called()
+        
+        tdd_cycle.current_state = TDDState.TEST_RED
+        await event_coordinator._update_cycle_statuses()
+        await event_coordinator._update_cycle_statuses()
+        resolver.record_cycle_version.assert_awaited_once_with(cycle_id, "src/shared.py")
+    
+    @pytest.mark.asyncio
+    async def test_released_lock_starts_queued_cycle(self, event_coordinator):
+        """Test that a cycle waiting on a lock starts as soon as the lock is freed."""
+        await event_coordinator.start()
+        try:
+            first = self._cycle_touching("STORY-1", "tests/test_shared.py")
+            first_id = await event_coordinator.submit_cycle(first)
+            await self._wait_for_status(event_coordinator, first_id, ParallelCycleStatus.ACTIVE)
+            
+            # Both cycles write the same test file
+            second_id = await event_coordinator.submit_cycle(
+                self._cycle_touching("STORY-2", "tests/test_shared.py")
+            )
+            await asyncio.sleep(0.05)
+            assert event_coordinator.parallel_cycles[second_id].status == ParallelCycleStatus.PENDING
+            
+            first.current_state = TDDState.COMMIT
+            event_coordinator.notify_cycle_updated(first_id)
+            
+            await self._wait_for_status(event_coordinator, second_id, ParallelCycleStatus.ACTIVE)
+        finally:
+            await event_coordinator.stop()
+    
+    @pytest.mark.asyncio
+    async def test_expired_locks_released_by_deadline(self, event_coordinator):
+        """Test that only locks past their deadline are released."""
+        lock_manager = event_coordinator.lock_manager
+        assert lock_manager.try_acquire("cycle-x", "stale.py", ttl=0.01)
+        assert lock_manager.try_acquire("cycle-x", "fresh.py", ttl=1800)
+        await asyncio.sleep(0.02)
+        
+        await event_coordinator._cleanup_expired_locks()
+        
+        assert [hold.path for hold in lock_manager.owner_locks("cycle-x")] == ["fresh.py"]
+        assert 0 < lock_manager.next_expiry() <= 1800
+    
+    @pytest.mark.asyncio
+    async def test_readers_run_concurrently_with_writer_elsewhere(self, event_coordinator):
+        """Test that shared read locks only block writers of the same file."""
+        await event_coordinator.start()
+        try:
+            reader_ids = [
+                await event_coordinator.submit_cycle(
+                    self._cycle_touching(f"STORY-{i}", f"tests/test_{i}.py"),
+                    read_paths=["lib/models.py"]
+                )
+                for i in range(2)
+            ]
+            for cycle_id in reader_ids:
+                await self._wait_for_status(event_coordinator, cycle_id, ParallelCycleStatus.ACTIVE)
+            assert event_coordinator.lock_manager.held_mode(reader_ids[0], "lib/models.py") == LockMode.SHARED
+            
+            # A writer of the read module waits; a writer elsewhere does not
+            blocked_id = await event_coordinator.submit_cycle(self._cycle_touching("STORY-W", "lib/models.py"))
+            free_id = await event_coordinator.submit_cycle(self._cycle_touching("STORY-X", "lib/other.py"))
+            await self._wait_for_status(event_coordinator, free_id, ParallelCycleStatus.ACTIVE)
+            assert event_coordinator.parallel_cycles[blocked_id].status == ParallelCycleStatus.PENDING
+            
+            for cycle_id in reader_ids:
+                event_coordinator.parallel_cycles[cycle_id].cycle.current_state = TDDState.COMMIT
+                event_coordinator.notify_cycle_updated(cycle_id)
+            await self._wait_for_status(event_coordinator, blocked_id, ParallelCycleStatus.ACTIVE)
+        finally:
+            await event_coordinator.stop()
+    
+    @pytest.mark.asyncio
+    async def test_cycles_sharing_read_locks_do_not_conflict(self, event_coordinator):
+        """Test that cycles only reading a common path are not compared."""
+        reader_ids = [
+            await event_coordinator.submit_cycle(
+                self._cycle_touching(f"STORY-{i}", f"tests/test_{i}.py"),
+                read_paths=["lib/models.py"]
+            )
+            for i in range(2)
+        ]
+        await event_coordinator._start_pending_cycles()
+        
+        assert event_coordinator._blocked_cycle_pairs() == []
+        assert not await event_coordinator._detect_cycle_conflict(
+            *(event_coordinator.parallel_cycles[cycle_id] for cycle_id in reader_ids)
+        )
+    
+    @pytest.mark.asyncio
+    async def test_cycle_waiting_for_another_cycles_lock_conflicts(self, event_coordinator):
+        """Test that an active cycle queued for a lock another active cycle holds is a conflict."""
+        holder_id = await event_coordinator.submit_cycle(self._cycle_touching("STORY-H", "tests/test_h.py"), priority=1)
+        waiter_id = await event_coordinator.submit_cycle(self._cycle_touching("STORY-W", "tests/test_w.py"), priority=9)
+        await event_coordinator.submit_cycle(self._cycle_touching("STORY-X", "tests/test_x.py"))
+        await event_coordinator._start_pending_cycles()
+        
+        lock_manager = event_coordinator.lock_manager
+        waiting = asyncio.create_task(lock_manager.acquire(waiter_id, "tests/test_h.py", timeout=5))
+        try:
+            await asyncio.sleep(0)
+            pairs = event_coordinator._blocked_cycle_pairs()
+            
+            assert [(cycle1.id, cycle2.id) for cycle1, cycle2 in pairs] == [(holder_id, waiter_id)]
+            assert await event_coordinator._detect_cycle_conflict(*pairs[0])
+            
+            await event_coordinator._check_and_resolve_conflicts()
+            assert event_coordinator.parallel_cycles[waiter_id].status == ParallelCycleStatus.PAUSED
+            assert event_coordinator.parallel_cycles[holder_id].status == ParallelCycleStatus.ACTIVE
+        finally:
+            waiting.cancel()
+            await asyncio.gather(waiting, return_exceptions=True)
+    
+    @pytest.mark.asyncio
+    async def test_lock_released_by_other_component_wakes_cycle(self, context_manager):
+        """Test that a lock taken outside the coordinator parks and then wakes a cycle."""
+        lock_manager = FileLockManager()
+        coordinator = EventDrivenCoordinator(
+            context_manager=context_manager,
+            max_parallel_cycles=3,
+            coordination_check_interval=60.0,
+            performance_monitoring=False,
+            lock_manager=lock_manager
+        )
+        assert lock_manager.try_acquire("merge-1", "tests/test_shared.py")
+        
+        await coordinator.start()
+        try:
+            cycle_id = await coordinator.submit_cycle(self._cycle_touching("STORY-1", "tests/test_shared.py"))
+            await asyncio.sleep(0.05)
+            assert coordinator.parallel_cycles[cycle_id].status == ParallelCycleStatus.PENDING
+            
+            lock_manager.release("merge-1", "tests/test_shared.py")
+            await self._wait_for_status(coordinator, cycle_id, ParallelCycleStatus.ACTIVE)
+        finally:
+            await coordinator.stop()
+    
+    @pytest.mark.asyncio
+    async def test_status_indexes_follow_transitions(self, event_coordinator):
+        """Test that status indexes and counters track every transition."""
+        cycle_id = await event_coordinator.submit_cycle(ModelTDDCycle(story_id="STORY-1"))
+        parallel_cycle = event_coordinator.parallel_cycles[cycle_id]
+        
+        await event_coordinator._start_pending_cycles()
+        assert event_coordinator._cycles_with_status(ParallelCycleStatus.ACTIVE) == [parallel_cycle]
+        assert event_coordinator._active_story_counts == {"STORY-1": 1}
+        
+        await event_coordinator.pause_cycle(cycle_id)
+        assert event_coordinator._cycles_with_status(ParallelCycleStatus.ACTIVE) == []
+        assert event_coordinator._active_story_counts == {}
+        
+        await event_coordinator.resume_cycle(cycle_id)
+        parallel_cycle.cycle.current_state = TDDState.COMMIT
+        await event_coordinator._update_cycle_statuses()
+        await event_coordinator._update_performance_stats()
+        
+        status = await event_coordinator.get_parallel_status()
+        assert status["cycle_summary"]["active_cycles"] == 0
+        assert event_coordinator.stats.completed_cycles == 1
+        assert event_coordinator.stats.active_cycles == 0
+
+
+class TestAdmissionControl:
+    """Test capacity-aware admission of parallel cycles."""
+    
+    def test_limit_not_clamped_to_five(self):
+        """Test that large ceilings are honoured when capacity allows."""
+        controller = AdmissionController(max_cycles=64)
+        
+        assert controller.compute_limit() == 64
+    
+    def test_quota_replaces_configured_ceiling(self):
+        """Test that a granted quota sizes admission instead of the configured ceiling."""
+        controller = AdmissionController(max_cycles=4, quota_headroom=1.0)
+        assert controller.compute_limit() == 4
+        
+        controller.update_quota(ResourceQuota(cpu_cores=8.0, memory_mb=65536, max_agents=8))
+        assert controller.compute_limit() == 16
+        
+        controller.update_quota(None)
+        assert controller.compute_limit() == 4
+    
+    def test_limit_sized_from_quota_and_footprint(self):
+        """Test that the quota divided by the per-cycle footprint bounds admission."""
+        controller = AdmissionController(
+            resource_quota=ResourceQuota(cpu_cores=10.0, memory_mb=100000, max_agents=10),
+            cycle_cpu_estimate=0.5,
+            quota_headroom=1.0
+        )
+        assert controller.compute_limit() == 20
+        
+        # Observed cycles use a full core each
+        for _ in range(50):
+            controller.observe_usage(cpu_cores=8.0, memory_mb=2048, active_cycles=8)
+        
+        assert controller.compute_limit() == 10
+    
+    def test_limit_bounded_by_agent_capacity(self):
+        """Test that admission never exceeds the agent pool's task slots."""
+        controller = AdmissionController(max_cycles=50)
+        controller.update_agent_capacity(12)
+        
+        assert controller.compute_limit() == 12
+    
+    def test_latency_degradation_applies_back_pressure(self):
+        """Test that admission shrinks when latency degrades and recovers after."""
+        controller = AdmissionController(max_cycles=40, latency_tolerance=2.0)
+        for _ in range(20):
+            controller.observe_latency("context", 0.5)
+        assert controller.compute_limit() == 40
+        
+        for _ in range(10):
+            controller.observe_latency("context", 4.0)
+        degraded_limit = controller.compute_limit()
+        assert controller.min_cycles <= degraded_limit < 40
+        
+        for _ in range(40):
+            controller.observe_latency("context", 0.5)
+        assert controller.compute_limit() > degraded_limit
+    
+    def test_back_pressure_keeps_minimum_concurrency(self):
+        """Test that back-pressure never stops admission entirely."""
+        controller = AdmissionController(max_cycles=10, min_cycles=2)
+        for _ in range(10):
+            controller.observe_latency("agent", 1.0)
+        for _ in range(30):
+            controller.observe_latency("agent", 1000.0)
+        
+        assert controller.compute_limit() == 2
+    
+    @pytest.mark.asyncio
+    async def test_coordinator_admits_beyond_five_cycles(self):
+        """Test that the coordinator starts more than five independent cycles."""
+        context_manager = Mock()
+        context_manager.register_story = AsyncMock()
+        context_manager.detect_story_conflicts = AsyncMock(return_value=[])
+        coordinator = EventDrivenCoordinator(
+            context_manager=context_manager,
+            max_parallel_cycles=None,
+            resource_quota=ResourceQuota(cpu_cores=16.0, memory_mb=32768, max_agents=16),
+            performance_monitoring=False
+        )
+        
+        for i in range(12):
+            await coordinator.submit_cycle(ModelTDDCycle(story_id=f"STORY-{i}"))
+        await coordinator._start_pending_cycles()
+        
+        assert len(coordinator._cycles_with_status(ParallelCycleStatus.ACTIVE)) == 12
+        
+        # Reported usage of two cores per cycle shrinks admission for new cycles
+        for _ in range(50):
+            coordinator.update_resource_usage(ResourceUsage(cpu_usage=24.0, memory_usage_mb=4096))
+        assert coordinator._refresh_admission_limit() == 7
+
+
+class TestNonBlockingExecutionQueue:
+    """Test that cycles waiting on locks or stories do not block the queue."""
+    
+    @pytest.fixture
+    def queue_coordinator(self):
+        """Create a coordinator driven directly through its scheduling steps."""
+        context_manager = Mock()
+        context_manager.register_story = AsyncMock()
+        context_manager.unregister_story = AsyncMock()
+        context_manager.detect_story_conflicts = AsyncMock(return_value=[])
+        return EventDrivenCoordinator(
+            context_manager=context_manager,
+            max_parallel_cycles=10,
+            performance_monitoring=False
+        )
+    
+    def _cycle(self, story_id, *file_paths):
+        """Create a TDD cycle whose task writes the given test files."""
+        task = ModelTDDTask(
+            description=f"{story_id} task",
+            test_file_objects=[ModelTestFile(file_path=path) for path in file_paths]
+        )
+        return ModelTDDCycle(story_id=story_id, tasks=[task])
+    
+    def _status(self, coordinator, cycle_id):
+        return coordinator.parallel_cycles[cycle_id].status
+    
+    @pytest.mark.asyncio
+    async def test_locked_head_does_not_block_runnable_cycles(self, queue_coordinator):
+        """Test that a high-priority cycle waiting on a lock lets others start."""
+        holder_id = await queue_coordinator.submit_cycle(self._cycle("STORY-A", "src/x.py"))
+        await queue_coordinator._start_pending_cycles()
+        
+        waiting_id = await queue_coordinator.submit_cycle(self._cycle("STORY-B", "src/x.py"), priority=1)
+        runnable_id = await queue_coordinator.submit_cycle(self._cycle("STORY-C", "src/y.py"), priority=9)
+        await queue_coordinator._start_pending_cycles()
+        
+        assert self._status(queue_coordinator, waiting_id) == ParallelCycleStatus.PENDING
+        assert self._status(queue_coordinator, runnable_id) == ParallelCycleStatus.ACTIVE
+        assert queue_coordinator._cycle_wait_keys[waiting_id] == {"resource:src/x.py"}
+        
+        await queue_coordinator._complete_cycle(queue_coordinator.parallel_cycles[holder_id])
+        await queue_coordinator._start_pending_cycles()
+        
+        assert self._status(queue_coordinator, waiting_id) == ParallelCycleStatus.ACTIVE
+        assert queue_coordinator._cycle_wait_keys == {}
+    
+    @pytest.mark.asyncio
+    async def test_release_wakes_only_its_waiters(self, queue_coordinator):
+        """Test that freeing one resource re-queues only cycles waiting on it."""
+        x_holder = await queue_coordinator.submit_cycle(self._cycle("STORY-A", "src/x.py"))
+        y_holder = await queue_coordinator.submit_cycle(self._cycle("STORY-B", "src/y.py"))
+        await queue_coordinator._start_pending_cycles()
+        
+        x_waiter = await queue_coordinator.submit_cycle(self._cycle("STORY-C", "src/x.py"))
+        y_waiter = await queue_coordinator.submit_cycle(self._cycle("STORY-D", "src/y.py"))
+        await queue_coordinator._start_pending_cycles()
+        assert queue_coordinator._queued_cycles == {}
+        
+        await queue_coordinator._release_cycle_locks(queue_coordinator.parallel_cycles[x_holder])
+        
+        assert list(queue_coordinator._queued_cycles) == [x_waiter]
+        assert queue_coordinator._cycle_wait_keys == {y_waiter: {"resource:src/y.py"}}
+    
+    @pytest.mark.asyncio
+    async def test_dependency_blocked_cycle_starts_when_story_finishes(self, queue_coordinator):
+        """Test that a dependency-blocked cycle is unblocked by its story completing."""
+        upstream_id = await queue_coordinator.submit_cycle(self._cycle("STORY-A"))
+        await queue_coordinator._start_pending_cycles()
+        
+        dependent_id = await queue_coordinator.submit_cycle(
+            self._cycle("STORY-B"), dependencies=["STORY-A"]
+        )
+        independent_id = await queue_coordinator.submit_cycle(self._cycle("STORY-C"))
+        assert self._status(queue_coordinator, dependent_id) == ParallelCycleStatus.BLOCKED
+        
+        await queue_coordinator._start_pending_cycles()
+        assert self._status(queue_coordinator, independent_id) == ParallelCycleStatus.ACTIVE
+        
+        await queue_coordinator._complete_cycle(queue_coordinator.parallel_cycles[upstream_id])
+        assert self._status(queue_coordinator, dependent_id) == ParallelCycleStatus.PENDING
+        
+        await queue_coordinator._start_pending_cycles()
+        assert self._status(queue_coordinator, dependent_id) == ParallelCycleStatus.ACTIVE
+    
+    @pytest.mark.asyncio
+    async def test_queue_order_and_cancellation(self, queue_coordinator):
+        """Test priority order, FIFO ties and lazy removal of cancelled cycles."""
+        first = await queue_coordinator.submit_cycle(self._cycle("STORY-A"), priority=5)
+        urgent = await queue_coordinator.submit_cycle(self._cycle("STORY-B"), priority=1)
+        second = await queue_coordinator.submit_cycle(self._cycle("STORY-C"), priority=5)
+        
+        await queue_coordinator.cancel_cycle(urgent)
+        
+        status = await queue_coordinator.get_parallel_status()
+        assert status["cycle_summary"]["queued_cycles"] == 2
+        assert [c["cycle_id"] for c in status["next_scheduled"]] == [first, second]
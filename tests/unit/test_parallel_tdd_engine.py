@@ -23,6 +23,8 @@ from lib.parallel_tdd_engine import (
     ParallelExecutionStatus
 )
 from lib.tdd_models import TDDState, TDDCycle, TDDTask
+from lib.process_resource_sampler import ProcessTreeUsage
+from lib.resource_scheduler import ResourceQuota
 
 
 class TestParallelTDDConfiguration:
@@ -925,6 +927,55 @@ class TestParallelTDDEngine:
         assert parallel_engine.coordinator.agent_pool == parallel_engine.agent_pool
         assert parallel_engine.coordinator.conflict_resolver == parallel_engine.conflict_resolver
 
+    def test_admission_uses_granted_quota_and_measurements(self, mock_context_manager, temp_project_dir, monkeypatch):
+        """Test that admission gets the orchestrator's quota, measured usage and task latency."""
+        monkeypatch.setenv("ORCH_CPU_CORES", "6.0")
+        monkeypatch.setenv("ORCH_MEMORY_LIMIT", "8192")
+        monkeypatch.setenv("ORCH_MAX_AGENTS", "5")
+        
+        with patch('lib.parallel_tdd_engine.ParallelTDDCoordinator') as mock_coord, \
+             patch('lib.parallel_tdd_engine.AgentPool') as mock_pool, \
+             patch('lib.parallel_tdd_engine.ConflictResolver'), \
+             patch('lib.parallel_tdd_engine.TDDStateMachine'):
+            
+            engine = ParallelTDDEngine(
+                context_manager=mock_context_manager,
+                project_path=temp_project_dir
+            )
+        
+        quota = mock_coord.call_args.kwargs["resource_quota"]
+        assert quota == ResourceQuota(cpu_cores=6.0, memory_mb=8192, max_agents=5)
+        
+        # Each finished agent task reports its own latency
+        listener = mock_pool.return_value.add_completion_listener.call_args.args[0]
+        listener("CodeAgent", Mock(), 2.5, True)
+        engine.coordinator.record_agent_latency.assert_called_once_with(2.5)
+        
+        # Usage measured on the engine's process tree
+        engine.resource_sampler = Mock()
+        engine.resource_sampler.sample.return_value = {"engine": ProcessTreeUsage(
+            root_pid=1, cpu_cores=3.0, memory_mb=1500.0, read_mb_per_second=0.0,
+            write_mb_per_second=0.0, process_count=4, interval_seconds=30.0
+        )}
+        engine._sample_resource_usage()
+        
+        usage = engine.coordinator.update_resource_usage.call_args.args[0]
+        assert usage.cpu_usage == 3.0 and usage.memory_usage_mb == 1500
+
+    def test_no_quota_outside_global_orchestrator(self, mock_context_manager, temp_project_dir, monkeypatch):
+        """Test that the configured concurrency applies when no quota is granted."""
+        monkeypatch.delenv("ORCH_CPU_CORES", raising=False)
+        
+        with patch('lib.parallel_tdd_engine.ParallelTDDCoordinator') as mock_coord, \
+             patch('lib.parallel_tdd_engine.AgentPool'), \
+             patch('lib.parallel_tdd_engine.ConflictResolver'), \
+             patch('lib.parallel_tdd_engine.TDDStateMachine'):
+            
+            ParallelTDDEngine(context_manager=mock_context_manager, project_path=temp_project_dir)
+        
+        assert mock_coord.call_args.kwargs["resource_quota"] is None
+        assert mock_coord.call_args.kwargs["max_parallel_cycles"] == 4
+
     def test_execution_tracking(self, parallel_engine):
         """Test execution tracking functionality."""
         execution_id = str(uuid.uuid4())
@@ -1005,4 +1056,109 @@ class TestParallelTDDEngine:
         
         assert context is None
         # Metrics should not be updated when no context is returned
-        assert parallel_engine.metrics.context_preparation_time == 0.0
\ No newline at end of file
+        assert parallel_engine.metrics.context_preparation_time == 0.0
+
+
+class TestParallelFileMerging:
+    """Test cycles of one engine execution writing the same file."""
+    
+    async def _wait_until(self, condition, timeout=5.0):
+        """Wait until a condition holds."""
+        deadline = asyncio.get_event_loop().time() + timeout
+        while not condition():
+            assert asyncio.get_event_loop().time() < deadline, "condition never held"
+            await asyncio.sleep(0.01)
+    
+    @pytest.mark.asyncio
+    async def test_phase_completion_records_version_immediately(self, temp_project_dir):
+        """Test that a phase transition records the cycle's file without waiting for the idle check."""
+        file_path = str(Path(temp_project_dir) / "service.py")
+        Path(file_path).write_text("def create():\n    return 1\n")
+        
+        context_manager = Mock()
+        context_manager.register_story = AsyncMock()
+        context_manager.unregister_story = AsyncMock()
+        context_manager.detect_story_conflicts = AsyncMock(return_value=[])
+        config = ParallelTDDConfiguration(coordination_check_interval=60.0, enable_performance_monitoring=False)
+        
+        with patch('lib.parallel_tdd_engine.AgentPool') as mock_pool_class:
+            pool = mock_pool_class.return_value
+            pool.start = AsyncMock()
+            pool.stop = AsyncMock()
+            pool.prewarm_for_upcoming_phases = AsyncMock()
+            pool.get_pool_status = AsyncMock(return_value={})
+            pool.get_utilization = AsyncMock(return_value=0.0)
+            pool.get_task_capacity = Mock(return_value=4)
+            engine = ParallelTDDEngine(context_manager=context_manager, project_path=temp_project_dir, config=config)
+        
+        cycle = TDDCycle(story_id="STORY-1", current_state=TDDState.DESIGN)
+        cycle.file_paths = [file_path]
+        resolver = engine.conflict_resolver
+        
+        await engine.start()
+        try:
+            execution = asyncio.create_task(engine.execute_parallel_cycles([cycle]))
+            await self._wait_until(lambda: resolver.cycle_files(cycle.id))
+            
+            Path(file_path).write_text("def create():\n    return 10\n")
+            assert engine.state_machine.transition("/tdd test", cycle).success
+            await self._wait_until(lambda: cycle.id in resolver._cycle_versions.get(file_path, {}), timeout=2.0)
+            assert "return 10" in resolver._cycle_versions[file_path][cycle.id]
+            
+            assert engine.state_machine.transition("/tdd abort", cycle).success
+            result = await asyncio.wait_for(execution, timeout=5)
+        finally:
+            await engine.stop()
+        
+        assert result["cycles_completed"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_edits_to_different_functions_are_merged(self, temp_project_dir):
+        """Test that the merged file keeps both cycles' edits when each overwrote the other."""
+        file_path = str(Path(temp_project_dir) / "service.py")
+        base = "def create():\n    return 1\n\n\ndef delete():\n    return 2\n"
+        Path(file_path).write_text(base)
+        
+        context_manager = Mock()
+        context_manager.register_story = AsyncMock()
+        context_manager.unregister_story = AsyncMock()
+        context_manager.detect_story_conflicts = AsyncMock(return_value=[])
+        config = ParallelTDDConfiguration(coordination_check_interval=60.0, enable_performance_monitoring=False)
+        
+        with patch('lib.parallel_tdd_engine.AgentPool') as mock_pool_class:
+            pool = mock_pool_class.return_value
+            pool.start = AsyncMock()
+            pool.stop = AsyncMock()
+            pool.prewarm_for_upcoming_phases = AsyncMock()
+            pool.get_pool_status = AsyncMock(return_value={})
+            pool.get_utilization = AsyncMock(return_value=0.0)
+            pool.get_task_capacity = Mock(return_value=4)
+            engine = ParallelTDDEngine(context_manager=context_manager, project_path=temp_project_dir, config=config)
+        
+        cycles = []
+        for story_id in ("STORY-1", "STORY-2"):
+            cycle = TDDCycle(story_id=story_id, current_state=TDDState.DESIGN)
+            cycle.file_paths = [file_path]
+            cycles.append(cycle)
+        resolver = engine.conflict_resolver
+        
+        await engine.start()
+        try:
+            execution = asyncio.create_task(engine.execute_parallel_cycles(cycles))
+            await self._wait_until(lambda: all(resolver.cycle_files(cycle.id) for cycle in cycles))
+            
+            # Each cycle writes its edit into the file as it was before either started
+            for cycle, old, new in [(cycles[0], "return 1", "return 10"), (cycles[1], "return 2", "return 20")]:
+                Path(file_path).write_text(base.replace(old, new))
+                assert engine.state_machine.transition("/tdd test", cycle).success
+                await self._wait_until(lambda: cycle.id in resolver._cycle_versions.get(file_path, {}))
+            
+            for cycle in cycles:
+                for command in ("/tdd code", "/tdd commit"):
+                    assert engine.state_machine.transition(command, cycle).success
+            result = await asyncio.wait_for(execution, timeout=10)
+        finally:
+            await engine.stop()
+        
+        assert result["cycles_completed"] == 2
+        assert Path(file_path).read_text() == base.replace("return 1", "return 10").replace("return 2", "return 20")
@@ -0,0 +1,126 @@
+"""
+Test suite for the process resource limiter.
+
+Tests cgroup v2 limit files on a fake cgroup filesystem, the niceness derived
+from CPU shares, and the setrlimit/nice fallback on real child processes.
+"""
+
+import os
+import subprocess
+import sys
+import pytest
+from pathlib import Path
+
+# Import the module under test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "lib"))
+
+from process_resource_limiter import ProcessLimits, ProcessResourceLimiter, resource
+
+
+@pytest.fixture
+def cgroup_root(tmp_path):
+    """Directory that looks like a cgroup2 mount"""
+    (tmp_path / "cgroup.controllers").write_text("cpuset cpu io memory pids\n")
+    (tmp_path / "cgroup.subtree_control").write_text("")
+    return tmp_path
+
+
+class TestCgroupLimits:
+    """Test limits written to cgroup v2 interface files"""
+    
+    def test_prepare_creates_project_cgroup(self, cgroup_root, tmp_path):
+        """Test that a project gets its own cgroup with cpu.max and memory.max"""
+        limiter = ProcessResourceLimiter(cpu_budget_cores=4, cgroup_root=str(cgroup_root))
+        assert limiter.mode == "cgroup"
+        
+        join = limiter.prepare("web app", str(tmp_path), ProcessLimits(cpu_cores=1.5, memory_mb=512))
+        
+        cgroup = cgroup_root / "agent-workflow" / "web_app"
+        assert (cgroup / "cpu.max").read_text() == "150000 100000"
+        assert (cgroup / "memory.max").read_text() == str(512 * 1024 * 1024)
+        
+        # The child writes its own PID before exec
+        join()
+        assert (cgroup / "cgroup.procs").read_text() == str(os.getpid())
+    
+    def test_update_rewrites_limits_live(self, cgroup_root, tmp_path):
+        """Test that new limits, including io.max, go to the running project's cgroup"""
+        limiter = ProcessResourceLimiter(cpu_budget_cores=4, cgroup_root=str(cgroup_root))
+        limiter.prepare("api", str(tmp_path), ProcessLimits(cpu_cores=2.0, memory_mb=1024))
+        cgroup = cgroup_root / "agent-workflow" / "api"
+        (cgroup / "io.max").write_text("")
+        limiter._devices["api"] = (8, 0)
+        
+        assert limiter.update("api", os.getpid(), ProcessLimits(cpu_cores=0.0, memory_mb=0, io_mbps=10))
+        
+        assert (cgroup / "cpu.max").read_text() == "max 100000"
+        assert (cgroup / "memory.max").read_text() == "max"
+        assert (cgroup / "io.max").read_text() == f"8:0 rbps={10 * 1024 * 1024} wbps={10 * 1024 * 1024}"
+        
+        # cgroupfs allows removing a cgroup with its interface files once it has no processes
+        limiter.release("api")
+        assert "api" not in limiter._cgroups
+    
+    def test_tiny_cpu_share_uses_minimum_quota(self, cgroup_root):
+        """Test that the quota never drops below what the kernel accepts"""
+        limiter = ProcessResourceLimiter(cpu_budget_cores=4, cgroup_root=str(cgroup_root))
+        assert limiter._cpu_max(0.001) == "1000 100000"
+    
+    def test_missing_cgroup2_falls_back(self, tmp_path):
+        """Test that without cgroup.controllers the limiter uses setrlimit and nice"""
+        limiter = ProcessResourceLimiter(cpu_budget_cores=4, cgroup_root=str(tmp_path))
+        assert limiter.mode == "rlimit"
+        
+        assert callable(limiter.prepare("api", str(tmp_path), ProcessLimits(cpu_cores=1.0, memory_mb=512)))
+        assert limiter.mode == "rlimit"
+        assert not (tmp_path / "agent-workflow").exists()
+    
+    def test_disabled(self, cgroup_root, tmp_path):
+        """Test that a disabled limiter does nothing"""
+        limiter = ProcessResourceLimiter(cpu_budget_cores=4, cgroup_root=str(cgroup_root), enabled=False)
+        assert limiter.mode == "disabled"
+        assert limiter.prepare("api", str(tmp_path), ProcessLimits(cpu_cores=1.0, memory_mb=512)) is None
+        assert not limiter.update("api", os.getpid(), ProcessLimits(cpu_cores=1.0, memory_mb=512))
+
+
+class TestRlimitFallback:
+    """Test the setrlimit and nice fallback"""
+    
+    def test_niceness_follows_cpu_share(self):
+        """Test that each halving of the share lowers the scheduler weight about twofold"""
+        limiter = ProcessResourceLimiter(cpu_budget_cores=4)
+        assert limiter._niceness(4.0) == 0
+        assert limiter._niceness(8.0) == 0
+        assert limiter._niceness(2.0) == 3
+        assert limiter._niceness(1.0) == 6
+        assert limiter._niceness(0.001) == 19
+    
+    @pytest.mark.skipif(resource is None, reason="requires the resource module")
+    def test_child_starts_with_limits(self, tmp_path):
+        """Test that the fallback preexec function limits memory and lowers priority"""
+        limiter = ProcessResourceLimiter(cpu_budget_cores=4, cgroup_root=str(tmp_path))
+        preexec = limiter.prepare("api", str(tmp_path), ProcessLimits(cpu_cores=1.0, memory_mb=512))
+        memory_limit = limiter._memory_rlimit()
+        
+        output = subprocess.run(
+            [sys.executable, "-c", f"import os, resource; print(os.nice(0), resource.getrlimit({memory_limit})[0])"],
+            preexec_fn=preexec, capture_output=True, text=True, check=True
+        ).stdout.split()
+        
+        assert int(output[0]) == os.nice(0) + 6
+        assert int(output[1]) == 512 * 1024 * 1024
+    
+    @pytest.mark.skipif(not hasattr(os, "setpriority"), reason="requires setpriority")
+    def test_update_renices_running_process(self, tmp_path):
+        """Test that a rebalance changes the priority and memory limit of a running orchestrator"""
+        limiter = ProcessResourceLimiter(cpu_budget_cores=4, cgroup_root=str(tmp_path))
+        process = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+        try:
+            assert limiter.update("api", process.pid, ProcessLimits(cpu_cores=0.5, memory_mb=256))
+            assert os.getpriority(os.PRIO_PROCESS, process.pid) == os.nice(0) + 9
+            if hasattr(resource, "prlimit"):
+                soft, _ = resource.prlimit(process.pid, limiter._memory_rlimit())
+                assert soft == 256 * 1024 * 1024
+        finally:
+            process.kill()
+            process.wait()
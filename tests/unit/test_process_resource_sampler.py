@@ -0,0 +1,142 @@
+"""
+Test suite for the process tree resource sampler.
+
+Tests /proc parsing, tree aggregation and rate calculation on a fake procfs,
+and sampling a real process tree through both psutil and /proc.
+"""
+
+import os
+import signal
+import subprocess
+import sys
+import time
+import pytest
+from pathlib import Path
+from typing import Tuple
+
+# Import the module under test
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "lib"))
+
+from process_resource_sampler import ProcessTreeSampler, psutil
+
+
+class FakeClock:
+    """Manually advanced time source"""
+    
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+def write_process(proc_root: Path, pid: int, ppid: int, comm: str, ticks: int, rss_pages: int, io=None):
+    """Write a /proc/<pid> entry with the given parent, CPU ticks (utime) and RSS"""
+    process_dir = proc_root / str(pid)
+    process_dir.mkdir(exist_ok=True)
+    fields = ["S", str(ppid)] + ["0"] * 9 + [str(ticks), "0", "0", "0"] + ["0"] * 6 + [str(rss_pages)] + ["0"] * 20
+    (process_dir / "stat").write_text(f"{pid} ({comm}) " + " ".join(fields) + "\n")
+    if io is not None:
+        (process_dir / "io").write_text(f"rchar: 1\nwchar: 1\nread_bytes: {io[0]}\nwrite_bytes: {io[1]}\n")
+
+
+class TestProcFallback:
+    """Test the /proc reader on a fake procfs"""
+    
+    @pytest.fixture
+    def clock(self):
+        return FakeClock()
+    
+    @pytest.fixture
+    def sampler(self, tmp_path, clock):
+        sampler = ProcessTreeSampler(use_psutil=False, proc_root=str(tmp_path), clock=clock)
+        sampler._clock_ticks = 100
+        sampler._page_size = 4096
+        return sampler
+    
+    def test_parses_command_names_with_spaces_and_parentheses(self, tmp_path, sampler):
+        """Test that stat fields are read after the last closing parenthesis"""
+        write_process(tmp_path, 10, 1, "agent (worker) 1", ticks=250, rss_pages=256)
+        
+        assert sampler._read_proc_stat(10) == (1, 2.5, 256 * 4096)
+        assert sampler._read_proc_stat(11) is None
+    
+    def test_tree_sums_descendants_only(self, tmp_path, sampler, clock):
+        """Test that a tree covers the root and its descendants and rates use the interval"""
+        mb = 1024 * 1024
+        write_process(tmp_path, 100, 1, "orchestrator", ticks=100, rss_pages=256, io=(0, 0))
+        write_process(tmp_path, 101, 100, "agent", ticks=200, rss_pages=512, io=(mb, 0))
+        write_process(tmp_path, 102, 101, "pytest", ticks=0, rss_pages=256)
+        write_process(tmp_path, 200, 1, "other project", ticks=999, rss_pages=9999)
+        
+        assert sampler.sample({"project": 100}) == {}
+        
+        clock.now = 10.0
+        write_process(tmp_path, 101, 100, "agent", ticks=1200, rss_pages=512, io=(21 * mb, 10 * mb))
+        write_process(tmp_path, 102, 101, "pytest", ticks=1000, rss_pages=1280)
+        usage = sampler.sample({"project": 100})["project"]
+        
+        # 20 CPU seconds over 10 seconds, 2048 pages of 4 KiB
+        assert usage.cpu_cores == pytest.approx(2.0)
+        assert usage.memory_mb == pytest.approx(8.0)
+        assert usage.read_mb_per_second == pytest.approx(2.0)
+        assert usage.write_mb_per_second == pytest.approx(1.0)
+        assert usage.process_count == 3
+    
+    def test_exited_root_and_restart_reset_series(self, tmp_path, sampler, clock):
+        """Test that a vanished root is dropped and a new root PID starts over"""
+        write_process(tmp_path, 100, 1, "orchestrator", ticks=100, rss_pages=1)
+        sampler.sample({"project": 100})
+        
+        clock.now = 5.0
+        write_process(tmp_path, 300, 1, "orchestrator", ticks=0, rss_pages=1)
+        assert sampler.sample({"project": 300}) == {}
+        
+        clock.now = 10.0
+        assert "project" in sampler.sample({"project": 300})
+        
+        # Projects no longer sampled are forgotten
+        sampler.sample({})
+        assert sampler._previous == {}
+
+
+def spawn_tree() -> Tuple[subprocess.Popen, int]:
+    """Start a process whose child spins on the CPU holding 64 MB, returning it and the child's PID"""
+    child = "x = bytearray(64 * 1024 * 1024)\nimport time\nend = time.time() + 10\nwhile time.time() < end: pass"
+    parent = (
+        f"import subprocess, sys\nchild = subprocess.Popen([sys.executable, '-c', {child!r}])\n"
+        "print(child.pid, flush=True)\nchild.wait()"
+    )
+    process = subprocess.Popen(
+        [sys.executable, "-c", parent], stdout=subprocess.PIPE, text=True, start_new_session=True
+    )
+    return process, int(process.stdout.readline())
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="requires procfs")
+@pytest.mark.parametrize("use_psutil", [
+    pytest.param(True, marks=pytest.mark.skipif(psutil is None, reason="requires psutil")),
+    False
+])
+def test_samples_real_process_tree(use_psutil):
+    """Test that CPU and memory of a spawned child count towards its parent's tree"""
+    process, child_pid = spawn_tree()
+    try:
+        sampler = ProcessTreeSampler(use_psutil=use_psutil)
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            sampler.sample({"project": process.pid})
+            time.sleep(0.5)
+            usage = sampler.sample({"project": process.pid}).get("project")
+            if usage and usage.process_count == 2 and usage.memory_mb > 64:
+                break
+        
+        assert usage.process_count == 2
+        assert sorted(usage.pids) == sorted([process.pid, child_pid])
+        assert usage.memory_mb > 64
+        # How much of the interval the child got a core for depends on the machine's load
+        assert usage.cpu_cores > 0
+    finally:
+        os.killpg(process.pid, signal.SIGKILL)
+        process.wait()
+        process.stdout.close()
@@ -1126,6 +1126,119 @@ class TestResourceScheduler:
         assert task.started_at is not None
         assert len(resource_scheduler.global_task_queue) == 0
 
+    @pytest.mark.asyncio
+    async def test_dependency_countdown_promotes_dependents(self, resource_scheduler, sample_project_config):
+        """Test that a task becomes ready once its last dependency completes."""
+        resource_scheduler.register_project(sample_project_config)
+        
+        def make_task(task_id, dependencies=None):
+            return ScheduledTask(
+                task_id, "test-project", TaskPriority.NORMAL,
+                timedelta(minutes=10), ResourceQuota(cpu_cores=0.1, memory_mb=64, max_agents=1),
+                dependencies=dependencies or []
+            )
+        
+        for task in [make_task("a"), make_task("b"), make_task("c", ["a", "b"])]:
+            resource_scheduler.submit_task(task)
+        
+        await resource_scheduler._process_task_queue()
+        schedule = resource_scheduler.project_schedules["test-project"]
+        assert sorted(t.task_id for t in schedule.running_tasks) == ["a", "b"]
+        
+        assert resource_scheduler.complete_task("a") is True
+        await resource_scheduler._process_task_queue()
+        assert [t.task_id for t in schedule.pending_tasks] == ["c"]
+        
+        resource_scheduler.complete_task("b")
+        await resource_scheduler._process_task_queue()
+        assert [t.task_id for t in schedule.running_tasks] == ["c"]
+        assert [t.task_id for t in schedule.completed_tasks] == ["a", "b"]
+        assert resource_scheduler.completed_tasks == {"a", "b"}
+        assert schedule.completed_tasks[0].completed_at is not None
+        
+        # Dependencies completed before submission are already satisfied
+        resource_scheduler.submit_task(make_task("d", ["a"]))
+        await resource_scheduler._process_task_queue()
+        assert "d" in [t.task_id for t in schedule.running_tasks]
+
+    @pytest.mark.asyncio
+    async def test_process_task_queue_per_project(self, resource_scheduler, sample_project_config):
+        """Test that a task exceeding its project's quota does not hold up other projects."""
+        other_config = ProjectConfig(name="other-project", path="/path/to/other")
+        resource_scheduler.register_project(sample_project_config)
+        resource_scheduler.register_project(other_config)
+        
+        quota = resource_scheduler.project_schedules["test-project"].current_quota
+        too_big = ScheduledTask(
+            "too-big", "test-project", TaskPriority.CRITICAL,
+            timedelta(minutes=10), ResourceQuota(cpu_cores=quota.cpu_cores + 1)
+        )
+        other = ScheduledTask(
+            "other", "other-project", TaskPriority.LOW,
+            timedelta(minutes=10), ResourceQuota(cpu_cores=0.1, memory_mb=64, max_agents=1)
+        )
+        resource_scheduler.submit_task(too_big)
+        resource_scheduler.submit_task(other)
+        
+        await resource_scheduler._process_task_queue()
+        
+        assert resource_scheduler.project_schedules["other-project"].running_tasks == [other]
+        assert resource_scheduler.project_schedules["test-project"].pending_tasks == [too_big]
+
+    @pytest.mark.asyncio
+    async def test_process_task_queue_counts_tasks_started_in_same_pass(self, resource_scheduler, sample_project_config):
+        """Test that one pass starts no more tasks than the project's quota allows."""
+        resource_scheduler.register_project(sample_project_config)
+        quota = resource_scheduler.project_schedules["test-project"].current_quota
+        
+        for i in range(quota.max_agents + 2):
+            resource_scheduler.submit_task(ScheduledTask(
+                f"task-{i}", "test-project", TaskPriority.NORMAL,
+                timedelta(minutes=10), ResourceQuota(cpu_cores=0.1, memory_mb=64, max_agents=1)
+            ))
+        
+        await resource_scheduler._process_task_queue()
+        
+        schedule = resource_scheduler.project_schedules["test-project"]
+        assert len(schedule.running_tasks) == quota.max_agents
+        assert len(schedule.pending_tasks) == 2
+
+    @pytest.mark.asyncio
+    async def test_cancel_task_lazily_removed(self, resource_scheduler, sample_project_config):
+        """Test that cancelled tasks are skipped by dispatch."""
+        resource_scheduler.register_project(sample_project_config)
+        
+        tasks = [
+            ScheduledTask(
+                f"task-{i}", "test-project", TaskPriority.NORMAL,
+                timedelta(minutes=10), ResourceQuota(cpu_cores=0.1, memory_mb=64, max_agents=1)
+            )
+            for i in range(3)
+        ]
+        for task in tasks:
+            resource_scheduler.submit_task(task)
+        
+        assert resource_scheduler.cancel_task("task-0") is True
+        assert resource_scheduler.cancel_task("task-0") is False
+        await resource_scheduler._process_task_queue()
+        
+        schedule = resource_scheduler.project_schedules["test-project"]
+        assert sorted(t.task_id for t in schedule.running_tasks) == ["task-1", "task-2"]
+        assert schedule.pending_tasks == []
+        assert resource_scheduler._ready_queues["test-project"] == []
+
+    def test_complete_and_resubmit_rejected(self, resource_scheduler, sample_project_config):
+        """Test completing a task that is not running and submitting a task twice."""
+        resource_scheduler.register_project(sample_project_config)
+        task = ScheduledTask(
+            "dup", "test-project", TaskPriority.NORMAL, timedelta(minutes=10), ResourceQuota()
+        )
+        
+        assert resource_scheduler.submit_task(task) is True
+        assert resource_scheduler.submit_task(task) is False
+        assert resource_scheduler.complete_task("dup") is False
+        assert len(resource_scheduler.global_task_queue) == 1
+
     def test_collect_performance_metrics(self, resource_scheduler, sample_project_config):
         """Test collecting system-wide performance metrics."""
         resource_scheduler.register_project(sample_project_config)
@@ -1260,6 +1373,98 @@ class TestResourceScheduler:
         changes = await resource_scheduler._optimize_efficiency()
         assert changes == []
 
+    def _register_drf_projects(self, scheduler, priorities=(ProjectPriority.NORMAL, ProjectPriority.NORMAL)):
+        """Register a CPU-heavy and a memory-heavy project and switch to DRF."""
+        scheduler.strategy = SchedulingStrategy.DOMINANT_RESOURCE_FAIRNESS
+        for name, priority in zip(("analytics", "indexer"), priorities):
+            scheduler.register_project(ProjectConfig(
+                name, f"/path/{name}", priority=priority,
+                resource_limits=ResourceLimits(max_parallel_agents=2, max_memory_mb=1024)
+            ))
+
+    def _submit_drf_tasks(self, scheduler, project_name, count, requirements):
+        """Submit identical tasks for a project."""
+        for i in range(count):
+            scheduler.submit_task(ScheduledTask(
+                task_id=f"{project_name}-{i}",
+                project_name=project_name,
+                priority=TaskPriority.NORMAL,
+                estimated_duration=timedelta(minutes=5),
+                resource_requirements=requirements
+            ))
+
+    @pytest.mark.asyncio
+    async def test_drf_dispatch_equalizes_dominant_shares(self, resource_scheduler):
+        """Test that DRF dispatch interleaves CPU-heavy and memory-heavy projects."""
+        self._register_drf_projects(resource_scheduler)
+        # Each task takes 1/8 of the system's CPU or memory respectively
+        self._submit_drf_tasks(resource_scheduler, "analytics", 10, ResourceQuota(cpu_cores=2.0, memory_mb=1024, max_agents=1))
+        self._submit_drf_tasks(resource_scheduler, "indexer", 10, ResourceQuota(cpu_cores=1.0, memory_mb=4096, max_agents=1))
+        
+        await resource_scheduler._process_task_queue()
+        
+        analytics = resource_scheduler.project_schedules["analytics"].running_tasks
+        indexer = resource_scheduler.project_schedules["indexer"].running_tasks
+        
+        # Equal shares at 5 tasks each use 15 of 16 cores; the last core fits one more indexer task
+        assert len(analytics) == 5
+        assert len(indexer) == 6
+        assert resource_scheduler._running_allocations["analytics"].cpu_cores == 10.0
+        assert resource_scheduler._running_allocations["indexer"].memory_mb == 6 * 4096
+        
+        # A finished task frees room for the project with the smallest share
+        resource_scheduler.complete_task(analytics[0].task_id)
+        await resource_scheduler._process_task_queue()
+        assert len(resource_scheduler.project_schedules["analytics"].running_tasks) == 5
+        assert resource_scheduler._running_allocations["analytics"].cpu_cores == 10.0
+
+    @pytest.mark.asyncio
+    async def test_drf_dispatch_respects_priority_weights(self, resource_scheduler):
+        """Test that higher priority projects get proportionally larger dominant shares."""
+        self._register_drf_projects(resource_scheduler, (ProjectPriority.CRITICAL, ProjectPriority.LOW))
+        requirements = ResourceQuota(cpu_cores=1.0, memory_mb=512, max_agents=1)
+        self._submit_drf_tasks(resource_scheduler, "analytics", 16, requirements)
+        self._submit_drf_tasks(resource_scheduler, "indexer", 16, requirements)
+        
+        await resource_scheduler._process_task_queue()
+        
+        # 16 cores split 1.5 : 0.7
+        assert len(resource_scheduler.project_schedules["analytics"].running_tasks) == 11
+        assert len(resource_scheduler.project_schedules["indexer"].running_tasks) == 5
+
+    @pytest.mark.asyncio
+    async def test_optimize_drf_progressive_filling(self, resource_scheduler):
+        """Test that DRF quotas equalize dominant shares until a resource runs out."""
+        self._register_drf_projects(resource_scheduler)
+        self._submit_drf_tasks(resource_scheduler, "analytics", 10, ResourceQuota(cpu_cores=2.0, memory_mb=1024, max_agents=1))
+        self._submit_drf_tasks(resource_scheduler, "indexer", 10, ResourceQuota(cpu_cores=1.0, memory_mb=4096, max_agents=1))
+        
+        result = await resource_scheduler.optimize_allocation()
+        
+        assert result["strategy_used"] == "drf"
+        analytics = resource_scheduler.allocated_resources["analytics"]
+        indexer = resource_scheduler.allocated_resources["indexer"]
+        
+        # CPU is exhausted with both projects at a dominant share of 2/3
+        assert analytics.cpu_cores + indexer.cpu_cores == pytest.approx(16.0)
+        assert analytics.cpu_cores / 16.0 == pytest.approx(2 / 3)
+        assert indexer.memory_mb / 32768 == pytest.approx(2 / 3, abs=1e-4)
+        assert resource_scheduler.project_schedules["indexer"].current_quota == indexer
+
+    @pytest.mark.asyncio
+    async def test_optimize_drf_caps_at_demand(self, resource_scheduler):
+        """Test that a project's unused fair share goes to projects with more demand."""
+        self._register_drf_projects(resource_scheduler)
+        self._submit_drf_tasks(resource_scheduler, "analytics", 10, ResourceQuota(cpu_cores=2.0, memory_mb=1024, max_agents=1))
+        self._submit_drf_tasks(resource_scheduler, "indexer", 1, ResourceQuota(cpu_cores=1.0, memory_mb=4096, max_agents=1))
+        
+        await resource_scheduler.optimize_allocation()
+        
+        indexer = resource_scheduler.allocated_resources["indexer"]
+        assert indexer.cpu_cores == pytest.approx(1.0)
+        assert indexer.memory_mb == 4096
+        assert resource_scheduler.allocated_resources["analytics"].cpu_cores == pytest.approx(15.0)
+    
     def test_calculate_improvement_metrics(self, resource_scheduler, sample_project_config):
         """Test calculation of improvement metrics."""
         resource_scheduler.register_project(sample_project_config)
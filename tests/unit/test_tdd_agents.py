@@ -448,10 +448,15 @@ class TestQAAgentTDDCapabilities:
         assert any("test_" in filename for filename in result.artifacts.keys())
     
     @pytest.mark.asyncio
-    async def test_validate_test_red_state(self, qa_agent, qa_task):
+    async def test_validate_test_red_state(self, qa_agent, qa_task, tmp_path):
         """Test RED state validation"""
+        test_files = []
+        for name in ["test_auth.py", "test_login.py"]:
+            test_file = tmp_path / name
+            test_file.write_text("from src.auth import login\n\ndef test_login():\n    assert login('user', 'secret')\n")
+            test_files.append(str(test_file))
         qa_task.command = "validate_test_red_state"
-        qa_task.context["test_files"] = ["tests/test_auth.py", "tests/test_login.py"]
+        qa_task.context["test_files"] = test_files
         
         result = await qa_agent._validate_test_red_state(qa_task, dry_run=False)
         
@@ -470,10 +475,21 @@ class TestQAAgentTDDCapabilities:
         assert "organized" in result.output.lower()
     
     @pytest.mark.asyncio
-    async def test_check_test_coverage(self, qa_agent, qa_task):
+    async def test_check_test_coverage(self, qa_agent, qa_task, tmp_path, monkeypatch):
         """Test coverage checking"""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "src").mkdir()
+        (tmp_path / "src" / "auth.py").write_text("def login(user, password):\n    return bool(user and password)\n")
+        (tmp_path / "src" / "user.py").write_text("def name(user):\n    return user.title()\n")
+        (tmp_path / "tests").mkdir()
+        (tmp_path / "tests" / "test_auth.py").write_text(
+            "from src.auth import login\nfrom src.user import name\n\n"
+            "def test_login():\n    assert login('user', 'secret')\n\n"
+            "def test_name():\n    assert name('ada') == 'Ada'\n"
+        )
         qa_task.command = "check_test_coverage"
-        qa_task.context["source_files"] = ["src/auth.py", "src/user.py"]
+        qa_task.context["implementation_files"] = ["src/auth.py", "src/user.py"]
+        qa_task.context["test_files"] = ["tests/test_auth.py"]
         
         result = await qa_agent._check_test_coverage(qa_task, dry_run=False)
         
@@ -530,6 +546,14 @@ class TestCodeAgentTDDCapabilities:
             }
         )
     
+    @pytest.fixture
+    def passing_auth_tests(self, tmp_path, monkeypatch):
+        """Project with passing tests/test_auth.py, as the current directory"""
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "tests").mkdir()
+        (tmp_path / "tests" / "test_auth.py").write_text("def test_login_success():\n    assert True\n")
+        return tmp_path
+    
     @pytest.mark.asyncio
     async def test_implement_minimal_solution(self, code_agent, code_task):
         """Test minimal implementation for GREEN phase"""
@@ -540,7 +564,7 @@ class TestCodeAgentTDDCapabilities:
         assert "test_results.json" in result.artifacts
     
     @pytest.mark.asyncio
-    async def test_validate_test_green_state(self, code_agent, code_task):
+    async def test_validate_test_green_state(self, code_agent, code_task, passing_auth_tests):
         """Test GREEN state validation"""
         code_task.command = "validate_test_green_state"
         code_task.context["implementation_files"] = ["src/auth.py"]
@@ -578,7 +602,7 @@ class TestCodeAgentTDDCapabilities:
         assert "commit_details.json" in result.artifacts
     
     @pytest.mark.asyncio
-    async def test_execute_code_green_phase(self, code_agent):
+    async def test_execute_code_green_phase(self, code_agent, passing_auth_tests):
         """Test executing CODE_GREEN phase"""
         context = {
             "test_files": ["tests/test_auth.py"],
@@ -112,6 +112,20 @@ class TestTDDStateMachine:
         assert cycle.current_state == TDDState.TEST_RED
         assert task.current_state == TDDState.TEST_RED
     
+    def test_transition_listeners_notified_of_state_changes(self):
+        """Test that listeners see each cycle state change, and a failing listener is isolated"""
+        sm = TDDStateMachine()
+        cycle = TDDCycle(story_id="story-123")
+        seen = []
+        sm.add_transition_listener(lambda *args: 1 / 0)
+        sm.add_transition_listener(lambda c, old, new: seen.append((c.id, old, new)))
+        
+        assert sm.transition("/tdd test", cycle).success
+        assert sm.transition("/tdd test", cycle).success  # Stays in TEST_RED
+        assert not sm.transition("/tdd commit", cycle).success
+        
+        assert seen == [(cycle.id, TDDState.DESIGN, TDDState.TEST_RED)]
+    
     def test_condition_checking_failing_tests_required(self):
         """Test condition checking for failing tests requirement"""
         sm = TDDStateMachine(TDDState.TEST_RED)
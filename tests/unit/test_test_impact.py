@@ -0,0 +1,237 @@
+"""
+Unit tests for test impact analysis.
+
+Builds a small project with a ContextIndex to check that changed files
+select the tests importing them directly or indirectly, that changes the
+import graph cannot trace select the full suite, scheduled full runs, the
+coverage map, and that QAAgent and CodeAgent run only the selected tests.
+"""
+
+import sys
+import pytest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from lib.agents import Task
+from lib.agents.code_agent import CodeAgent
+from lib.agents.qa_agent import QAAgent
+from lib.async_test_runner import AsyncTestRunner, CoverageReport
+from lib.context_index import ContextIndex
+from lib.test_impact import TestImpactSelector
+
+
+def write(path: Path, content: str) -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content)
+    return str(path)
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """Project where orders imports pricing, each with its tests, and an unrelated users module"""
+    monkeypatch.chdir(tmp_path)
+    write(tmp_path / "src" / "__init__.py", "")
+    write(tmp_path / "src" / "pricing.py", "def price(n):\n    return n * 2\n")
+    write(tmp_path / "src" / "orders.py", "from src.pricing import price\ndef order(n):\n    return price(n) + 1\n")
+    write(tmp_path / "src" / "users.py", "def name():\n    return 'ann'\n")
+    write(tmp_path / "tests" / "test_pricing.py", "from src.pricing import price\ndef test_price():\n    assert price(2) == 4\n")
+    write(tmp_path / "tests" / "test_orders.py", "from src.orders import order\ndef test_order():\n    assert order(2) == 5\n")
+    write(tmp_path / "tests" / "test_users.py", "from src.users import name\ndef test_name():\n    assert name() == 'bob'\n")
+    return tmp_path
+
+
+@pytest.fixture
+def selector(project):
+    return TestImpactSelector(context_index=ContextIndex(str(project)), full_suite_every=0)
+
+
+class TestSelection:
+    """Test selecting tests from the import graph"""
+    
+    @pytest.mark.asyncio
+    async def test_transitive_importers_selected(self, selector):
+        """Test that a change selects tests importing it directly or through other modules"""
+        selection = await selector.select(["src/pricing.py"], test_roots=["tests"])
+        
+        assert sorted(Path(test).name for test in selection.tests) == ["test_orders.py", "test_pricing.py"]
+        assert len(selection.candidates) == 3
+        assert selection.is_subset and not selection.run_full_suite
+        
+        selection = await selector.select(["src/users.py"], test_roots=["tests"])
+        assert [Path(test).name for test in selection.tests] == ["test_users.py"]
+    
+    @pytest.mark.asyncio
+    async def test_changed_test_selects_itself(self, selector):
+        """Test that a changed test file is run"""
+        selection = await selector.select(["tests/test_users.py"], test_roots=["tests"])
+        assert [Path(test).name for test in selection.tests] == ["test_users.py"]
+    
+    @pytest.mark.asyncio
+    async def test_untraceable_changes_select_full_suite(self, selector, project):
+        """Test that configuration, conftest and unindexed files select every test"""
+        write(project / "pytest.ini", "[pytest]\n")
+        
+        for changed in (["pytest.ini"], ["tests/conftest.py"], ["elsewhere/module.py"], []):
+            selection = await selector.select(changed, test_roots=["tests"])
+            assert not selection.is_subset, changed
+            assert len(selection.tests) == 3
+    
+    @pytest.mark.asyncio
+    async def test_change_affecting_no_test_selects_full_suite(self, selector, project):
+        """Test that a change no test reaches through the graph runs every test"""
+        write(project / "src" / "plugins.py", "def load():\n    return 1\n")
+        
+        selection = await selector.select(["src/plugins.py"], test_roots=["tests"])
+        
+        assert not selection.is_subset
+        assert "no tests affected" in selection.reason
+    
+    @pytest.mark.asyncio
+    async def test_new_file_refreshes_index(self, selector, project):
+        """Test that a module created after the index was built is traced"""
+        await selector.select(["src/users.py"], test_roots=["tests"])
+        write(project / "src" / "report.py", "from src.users import name\n")
+        write(project / "tests" / "test_report.py", "import src.report\ndef test_report():\n    pass\n")
+        
+        selection = await selector.select(["src/report.py"], test_roots=["tests"])
+        
+        assert [Path(test).name for test in selection.tests] == ["test_report.py"]
+    
+    @pytest.mark.asyncio
+    async def test_later_selections_update_changed_files_only(self, selector, project, monkeypatch):
+        """Test that after the first build, selections re-index the changes instead of the project"""
+        await selector.select(["src/users.py"], test_roots=["tests"])
+        
+        async def full_build(*args, **kwargs):
+            raise AssertionError("index rebuilt")
+        monkeypatch.setattr(selector.context_index, "build_index", full_build)
+        write(project / "src" / "orders.py", "def order(n):\n    return n + 1\n")
+        
+        await selector.select(["src/orders.py"], test_roots=["tests"])
+        selection = await selector.select(["src/pricing.py"], test_roots=["tests"])
+        
+        assert [Path(test).name for test in selection.tests] == ["test_pricing.py"]
+    
+    @pytest.mark.asyncio
+    async def test_scheduled_full_run(self, project):
+        """Test that every Nth validation of a scope also runs the full suite"""
+        selector = TestImpactSelector(context_index=ContextIndex(str(project)), full_suite_every=2)
+        
+        first = await selector.select(["src/users.py"], test_roots=["tests"], scope="S1")
+        other_scope = await selector.select(["src/users.py"], test_roots=["tests"], scope="S2")
+        second = await selector.select(["src/users.py"], test_roots=["tests"], scope="S1")
+        
+        assert not first.run_full_suite and not other_scope.run_full_suite
+        assert second.run_full_suite and len(second.tests) == 1
+        assert selector.get_stats()["full_runs"] == 1
+    
+    @pytest.mark.asyncio
+    async def test_coverage_map(self, project):
+        """Test that recorded coverage selects tests the import graph misses, and persists"""
+        map_path = str(project / "coverage_map.json")
+        selector = TestImpactSelector(context_index=ContextIndex(str(project)), full_suite_every=0,
+                                      coverage_map_path=map_path)
+        report = CoverageReport(0.0, 0, 0, 0, test_files={
+            str(project / "tests" / "test_users.py"): [str(project / "src" / "pricing.py")]
+        })
+        
+        selector.record_coverage(report)
+        reopened = TestImpactSelector(context_index=ContextIndex(str(project)), full_suite_every=0,
+                                      coverage_map_path=map_path)
+        selection = await reopened.select(["src/pricing.py"], test_roots=["tests"])
+        
+        assert len(selection.tests) == 3
+    
+    @pytest.mark.asyncio
+    async def test_no_index_runs_everything(self, project):
+        """Test that without a dependency graph nothing is skipped"""
+        selection = await TestImpactSelector().select(["src/users.py"], test_roots=["tests"])
+        assert not selection.is_subset
+
+
+class TestAgentIntegration:
+    """Test agents running the selected tests"""
+    
+    @pytest.mark.asyncio
+    async def test_qa_agent_runs_affected_tests(self, selector):
+        """Test that QAAgent skips the failing test unaffected by the change"""
+        agent = QAAgent(claude_code_client=object(), test_runner=AsyncTestRunner(max_concurrent=1),
+                        test_selector=selector)
+        
+        result = await agent._execute_tests(
+            Task(id="t1", agent_type="QAAgent", command="execute",
+                 context={"test_path": "tests", "changed_files": ["src/pricing.py"]}),
+            dry_run=False
+        )
+        
+        assert result.success
+        assert "Tests executed: 2 total, 2 passed, 0 failed" in result.output
+        assert "2 of 3 tests affected" in result.output
+    
+    @pytest.mark.asyncio
+    async def test_qa_agent_scheduled_full_run(self, project):
+        """Test that the scheduled full run follows passing affected tests"""
+        selector = TestImpactSelector(context_index=ContextIndex(str(project)), full_suite_every=1)
+        agent = QAAgent(claude_code_client=object(), test_runner=AsyncTestRunner(max_concurrent=1),
+                        test_selector=selector)
+        
+        test_results = await agent._run_impacted_tests("tests", "test_*.py", ["src/pricing.py"])
+        
+        assert test_results["total"] == 3 and test_results["failed"] == 1
+        assert test_results["selection"]["run_full_suite"]
+    
+    @pytest.mark.asyncio
+    async def test_code_agent_green_runs_affected_tests(self, selector):
+        """Test that GREEN validation runs only the tests affected by the implementation"""
+        agent = CodeAgent(claude_code_client=object(), test_runner=AsyncTestRunner(max_concurrent=1),
+                          test_selector=selector)
+        
+        result = await agent._validate_test_green_state(
+            Task(id="t1", agent_type="CodeAgent", command="validate_test_green_state", context={
+                "test_files": ["tests/test_pricing.py", "tests/test_orders.py", "tests/test_users.py"],
+                "implementation_files": ["src/orders.py"],
+                "story_id": "S1"
+            }),
+            dry_run=False
+        )
+        
+        assert result.success
+        assert "Total tests: 1" in result.output
+        assert "Tests run: 1 of 3" in result.output
+    
+    @pytest.mark.asyncio
+    async def test_code_agent_green_fails_test_missed_by_graph(self, selector, project):
+        """Test that a failing test importing the implementation dynamically fails GREEN validation"""
+        write(project / "src" / "plugins.py", "def load():\n    return 1\n")
+        write(project / "tests" / "test_plugins.py",
+              "import importlib\ndef test_load():\n    assert importlib.import_module('src.plugins').load() == 2\n")
+        agent = CodeAgent(claude_code_client=object(), test_runner=AsyncTestRunner(max_concurrent=1),
+                          test_selector=selector)
+        
+        result = await agent._validate_test_green_state(
+            Task(id="t1", agent_type="CodeAgent", command="validate_test_green_state", context={
+                "test_files": ["tests/test_plugins.py"],
+                "implementation_files": ["src/plugins.py"],
+                "story_id": "S1"
+            }),
+            dry_run=False
+        )
+        
+        assert not result.success
+        assert "Failing: 1" in result.output
+    
+    @pytest.mark.asyncio
+    async def test_code_agent_green_requires_tests_to_run(self, project):
+        """Test that GREEN validation in which no test ran is not green"""
+        agent = CodeAgent(claude_code_client=object(), test_runner=AsyncTestRunner(max_concurrent=1))
+        
+        result = await agent._validate_test_green_state(
+            Task(id="t1", agent_type="CodeAgent", command="validate_test_green_state", context={
+                "test_files": [], "implementation_files": ["src/users.py"], "story_id": "S1"
+            }),
+            dry_run=False
+        )
+        
+        assert not result.success
+        assert "Total tests: 0" in result.output
@@ -0,0 +1,115 @@
+"""
+Test suite for the three-way merge engine.
+
+Tests line-based diff3 merging and the definition-level fallback for Python.
+"""
+
+import pytest
+from pathlib import Path
+
+# Import the modules under test
+import sys
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "lib"))
+
+from three_way_merge import three_way_merge, merge_lines, merge_python
+
+
+BASE = """import os
+
+
+class Service:
+    def start(self):
+        return 1
+
+    def stop(self):
+        return 2
+
+
+def helper():
+    return 0
+"""
+
+
+class TestMergeLines:
+    """Test line-based merging"""
+    
+    def test_separate_regions_merge(self):
+        """Test that edits to separate lines are combined"""
+        result = merge_lines("a\nb\nc\nd\ne", "a\nB\nc\nd\ne", "a\nb\nc\nD\ne")
+        
+        assert result.clean
+        assert result.content == "a\nB\nc\nD\ne"
+    
+    def test_identical_changes_taken_once(self):
+        """Test that both sides making the same change is not a conflict"""
+        result = merge_lines("a\nb\nc", "a\nX\nc\nd", "a\nX\nc")
+        
+        assert result.clean
+        assert result.content == "a\nX\nc\nd"
+    
+    def test_overlapping_changes_conflict(self):
+        """Test that different edits to the same lines conflict"""
+        result = merge_lines("a\nb\nc", "a\nX\nc", "a\nY\nc")
+        
+        assert not result.clean
+        assert result.conflicts == [(2, 2)]
+        assert result.content == "a\nX\nc"
+
+
+class TestThreeWayMerge:
+    """Test merging Python sources"""
+    
+    def test_adjacent_method_edits_merge(self):
+        """Test that edits to neighbouring methods merge"""
+        base = "class A:\n    def f(self):\n        return 1\n    def g(self):\n        return 2\n"
+        ours = base.replace("return 1", "return 10")
+        theirs = base.replace("return 2", "return 20")
+        
+        result = three_way_merge(base, ours, theirs, is_python=True)
+        
+        assert result.clean
+        assert result.content == base.replace("return 1", "return 10").replace("return 2", "return 20")
+    
+    def test_functions_appended_by_both_sides(self):
+        """Test that functions added at the same place are both kept"""
+        ours = BASE + "\n\ndef first():\n    pass\n"
+        theirs = BASE + "\n\ndef second():\n    pass\n"
+        
+        assert not merge_lines(BASE, ours, theirs).clean
+        result = three_way_merge(BASE, ours, theirs, is_python=True)
+        
+        assert result.strategy == "ast"
+        assert "def first():" in result.content
+        assert "def second():" in result.content
+        assert result.content.count("def helper():") == 1
+    
+    def test_imports_and_methods_merge(self):
+        """Test that imports and members added by both sides are combined"""
+        ours = BASE.replace("import os\n", "import os\nimport re\n").replace("return 1", "return 10")
+        theirs = BASE.replace("import os\n", "import os\nimport sys\n").replace(
+            "        return 2\n", "        return 2\n\n    def restart(self):\n        return 3\n"
+        )
+        
+        result = three_way_merge(BASE, ours, theirs, is_python=True)
+        
+        assert result.clean
+        for text in ["import re", "import sys", "return 10", "def restart(self):", "return 2"]:
+            assert text in result.content
+    
+    def test_same_function_changed_by_both_sides(self):
+        """Test that different edits to one function conflict"""
+        ours = BASE.replace("return 0", "return 10")
+        theirs = BASE.replace("return 0", "return 20")
+        
+        assert not three_way_merge(BASE, ours, theirs, is_python=True).clean
+    
+    def test_deleted_and_modified_function_conflict(self):
+        """Test that deleting a function another side changed conflicts"""
+        ours = BASE.replace("\n\ndef helper():\n    return 0\n", "\n")
+        theirs = BASE.replace("return 0", "return 5")
+        
+        assert merge_python(BASE, ours, theirs) is None
+    
+    def test_unparsable_version_not_merged_by_definition(self):
+        """Test that syntax errors disable the definition-level merge"""
+        assert merge_python(BASE, BASE.replace("return 0", "return ("), BASE) is None